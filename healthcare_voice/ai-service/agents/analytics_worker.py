@@ -0,0 +1,219 @@
+"""Background worker pool for post-call analytics
+
+Call teardown only inserts a row into analytics_jobs; workers claim ready
+jobs from Postgres, analyze them with one shared HTTP client (several short
+transcripts per request; any the model leaves out are analyzed again alone
+right away) and retry failures with exponential backoff. The
+queue survives restarts and is shared safely across replicas.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+import httpx
+
+from config import settings
+from stats_utils import percentile
+from db import queries
+from agents.analyze import analyze_transcript, analyze_transcripts
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_SECONDS = 30.0
+RETRY_MAX_SECONDS = 1800.0
+
+
+class AnalyticsWorkerPool:
+    """Drains analytics_jobs with a fixed number of worker tasks"""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        batch_size: int = 5,
+        batch_max_chars: int = 6000,
+        max_attempts: int = 5,
+        poll_seconds: float = 5.0,
+    ):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_max_chars = batch_max_chars
+        self.max_attempts = max_attempts
+        self.poll_seconds = poll_seconds
+        self._client: Optional[httpx.AsyncClient] = None
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+
+        # Metrics
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self.requests = 0
+        self.batched_requests = 0
+        self._request_ms: Deque[float] = deque(maxlen=200)
+
+    def start(self) -> None:
+        """Start the worker tasks and the shared HTTP client"""
+        if self._tasks or self.workers <= 0:
+            return
+        if not settings.openai_api_key:
+            logger.warning("OPENAI_API_KEY not configured, analytics workers not started")
+            return
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            limits=httpx.Limits(max_connections=self.workers * 2, max_keepalive_connections=self.workers),
+        )
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Analytics workers started ({self.workers} workers, batch size {self.batch_size})")
+
+    async def stop(self) -> None:
+        """Stop workers; jobs they held are reclaimed once stale"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def notify(self) -> None:
+        """Wake idle workers (a job was just queued)"""
+        self._wakeup.set()
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            try:
+                jobs = await queries.claim_analytics_jobs(self.batch_size)
+            except Exception as e:
+                logger.error(f"Analytics worker {index} claim failed: {e}")
+                jobs = []
+
+            if not jobs:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._process(jobs)
+
+    def _group(self, jobs: List[Dict]) -> List[List[Dict]]:
+        """Pack short transcripts into shared requests; long ones go alone"""
+        groups: List[List[Dict]] = []
+        current: List[Dict] = []
+        current_chars = 0
+        for job in sorted(jobs, key=lambda j: len(j["transcript"])):
+            size = len(job["transcript"])
+            if current and current_chars + size > self.batch_max_chars:
+                groups.append(current)
+                current, current_chars = [], 0
+            current.append(job)
+            current_chars += size
+        if current:
+            groups.append(current)
+        return groups
+
+    async def _process(self, jobs: List[Dict]) -> None:
+        ready = []
+        for job in jobs:
+            if (job.get("transcript") or "").strip():
+                ready.append(job)
+            else:
+                logger.info(f"Skipping analysis for {job['log_id']}: empty transcript")
+                await queries.complete_analytics_job(job["job_id"])
+
+        await asyncio.gather(*(self._run_group(group) for group in self._group(ready)))
+
+    async def _run_group(self, group: List[Dict]) -> None:
+        items = [(str(i + 1), job["transcript"]) for i, job in enumerate(group)]
+        started = time.perf_counter()
+        try:
+            results = await analyze_transcripts(self._client, items)
+        except Exception as e:
+            logger.error(f"Analytics request failed for {len(group)} transcript(s): {e}")
+            for job in group:
+                await self._fail(job, str(e))
+            return
+        finally:
+            self.requests += 1
+            self.batched_requests += 1 if len(group) > 1 else 0
+            self._request_ms.append((time.perf_counter() - started) * 1000)
+
+        errors: Dict[str, str] = {}
+        missing = [(item_id, transcript) for item_id, transcript in items if not results.get(item_id)]
+        if missing and len(group) > 1:
+            # One request per transcript the batch left out, without requeueing
+            retried = await asyncio.gather(
+                *(self._analyze_alone(transcript) for _, transcript in missing),
+                return_exceptions=True,
+            )
+            for (item_id, _), analytics in zip(missing, retried):
+                if isinstance(analytics, Exception):
+                    errors[item_id] = str(analytics)
+                else:
+                    results[item_id] = analytics
+
+        for (item_id, _), job in zip(items, group):
+            analytics = results.get(item_id)
+            if not analytics:
+                await self._fail(job, errors.get(item_id, "No analysis returned for transcript"))
+                continue
+            saved = await queries.save_call_log_analytics(job["log_id"], analytics)
+            if saved:
+                await queries.complete_analytics_job(job["job_id"])
+                self.completed += 1
+                logger.info(f"Analytics saved for log {job['log_id']}: sentiment={analytics.get('sentiment_label')}, intent={analytics.get('intent')}")
+            else:
+                await self._fail(job, "Failed to save analytics")
+
+    async def _analyze_alone(self, transcript: str) -> Dict:
+        started = time.perf_counter()
+        try:
+            return await analyze_transcript(self._client, transcript)
+        finally:
+            self.requests += 1
+            self._request_ms.append((time.perf_counter() - started) * 1000)
+
+    async def _fail(self, job: Dict, error: str) -> None:
+        if job["attempts"] >= self.max_attempts:
+            self.failed += 1
+            logger.error(f"Giving up on analytics for log {job['log_id']} after {job['attempts']} attempts: {error}")
+            await queries.fail_analytics_job(job["job_id"], error, None)
+            return
+        self.retried += 1
+        retry_in = min(RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1), RETRY_MAX_SECONDS)
+        await queries.fail_analytics_job(job["job_id"], error, retry_in)
+
+    async def snapshot(self) -> Dict:
+        return {
+            "workers": len(self._tasks),
+            "queue": await queries.get_analytics_queue_counts(),
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "requests": self.requests,
+            "batched_requests": self.batched_requests,
+            "request_ms_p50": round(percentile(self._request_ms, 0.50), 1),
+            "request_ms_p95": round(percentile(self._request_ms, 0.95), 1),
+        }
+
+
+analytics_workers = AnalyticsWorkerPool(
+    workers=settings.analytics_workers,
+    batch_size=settings.analytics_batch_size,
+    batch_max_chars=settings.analytics_batch_max_chars,
+    max_attempts=settings.analytics_max_attempts,
+    poll_seconds=settings.analytics_poll_seconds,
+)
+
+
+async def enqueue_analysis(log_id: str, agent_type: str = "voice") -> bool:
+    """Queue a finished call/chat for analysis; returns immediately after the insert"""
+    job = await queries.enqueue_analytics_job(log_id, agent_type)
+    if not job:
+        logger.error(f"Failed to queue analytics for log {log_id}")
+        return False
+    analytics_workers.notify()
+    return True
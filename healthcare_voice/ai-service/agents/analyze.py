@@ -1,18 +1,21 @@
-"""Post-session AI analysis for call/chat transcripts"""
+"""Post-session AI analysis for call/chat transcripts
+
+Called by the analytics worker pool (agents/analytics_worker.py) with its
+shared HTTP client; short transcripts are analyzed several per request.
+"""
 import json
 import logging
 import httpx
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 from config import settings
-from db import queries
 
 logger = logging.getLogger(__name__)
 
 OPENAI_CHAT_URL = "https://api.openai.com/v1/chat/completions"
+ANALYSIS_MODEL = "gpt-4o-mini"
+SYSTEM_PROMPT = "You are a healthcare call analytics AI. Analyze transcripts and return structured JSON."
 
-ANALYSIS_PROMPT = """Analyze the following healthcare call/chat transcript and return a JSON object with these fields:
-
-1. **sentiment_label**: Overall sentiment - one of: "positive", "negative", "neutral", "mixed"
+ANALYSIS_FIELDS = """1. **sentiment_label**: Overall sentiment - one of: "positive", "negative", "neutral", "mixed"
 2. **sentiment_score**: Float from -1.0 (very negative) to 1.0 (very positive)
 3. **lead_classification**: Patient lead quality - one of: "hot", "warm", "cold", "none"
    - "hot": New patient actively seeking appointment, ready to commit
@@ -31,51 +34,71 @@ ANALYSIS_PROMPT = """Analyze the following healthcare call/chat transcript and r
 8. **escalation_required**: Boolean - true if the conversation indicates need for human follow-up
 9. **escalation_reason**: String explaining why escalation is needed (null if not required)
 10. **ai_summary**: 2-3 sentence summary of the conversation including outcome and any notable observations
+"""
 
+ANALYSIS_PROMPT = """Analyze the following healthcare call/chat transcript and return a JSON object with these fields:
+
+""" + ANALYSIS_FIELDS + """
 Return ONLY valid JSON, no markdown or extra text.
 
 Transcript:
 """
 
+BATCH_ANALYSIS_PROMPT = """Analyze each of the following healthcare call/chat transcripts independently. For each one, produce an object with an "id" field (the transcript's id) and these fields:
+
+""" + ANALYSIS_FIELDS + """
+Return ONLY valid JSON of the form {"results": [{"id": "...", ...}, ...]} with one entry per transcript, no markdown or extra text.
+
+"""
+
+
+async def _complete_json(client: httpx.AsyncClient, prompt: str) -> Dict:
+    response = await client.post(
+        OPENAI_CHAT_URL,
+        headers={
+            "Authorization": f"Bearer {settings.openai_api_key}",
+            "Content-Type": "application/json"
+        },
+        json={
+            "model": ANALYSIS_MODEL,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.3,
+            "response_format": {"type": "json_object"}
+        }
+    )
+    response.raise_for_status()
+    result = response.json()
+    return json.loads(result["choices"][0]["message"]["content"])
+
+
+async def analyze_transcript(client: httpx.AsyncClient, transcript: str) -> Dict:
+    """Analyze one transcript; raises on HTTP or parse errors"""
+    return await _complete_json(client, ANALYSIS_PROMPT + transcript)
+
+
+async def analyze_transcripts(
+    client: httpx.AsyncClient,
+    items: List[Tuple[str, str]]
+) -> Dict[str, Optional[Dict]]:
+    """
+    Analyze several (id, transcript) pairs in one request.
+
+    Returns analytics by id; an id the model left out maps to None so the
+    caller can retry just that transcript.
+    """
+    if len(items) == 1:
+        item_id, transcript = items[0]
+        return {item_id: await analyze_transcript(client, transcript)}
+
+    sections = [f"=== Transcript id: {item_id} ===\n{transcript}" for item_id, transcript in items]
+    data = await _complete_json(client, BATCH_ANALYSIS_PROMPT + "\n\n".join(sections))
 
-async def analyze_session(log_id: str, transcript: str, agent_type: str = "voice") -> Optional[Dict]:
-    """Analyze a completed session transcript using GPT and store results"""
-    if not transcript or not transcript.strip():
-        logger.info(f"Skipping analysis for {log_id}: empty transcript")
-        return None
-
-    try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                OPENAI_CHAT_URL,
-                headers={
-                    "Authorization": f"Bearer {settings.openai_api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "gpt-4o-mini",
-                    "messages": [
-                        {"role": "system", "content": "You are a healthcare call analytics AI. Analyze transcripts and return structured JSON."},
-                        {"role": "user", "content": ANALYSIS_PROMPT + transcript}
-                    ],
-                    "temperature": 0.3,
-                    "response_format": {"type": "json_object"}
-                }
-            )
-            response.raise_for_status()
-            result = response.json()
-            analysis_text = result["choices"][0]["message"]["content"]
-            analytics = json.loads(analysis_text)
-
-            # Save to database
-            saved = queries.save_call_log_analytics(log_id, analytics)
-            if saved:
-                logger.info(f"Analytics saved for log {log_id}: sentiment={analytics.get('sentiment_label')}, intent={analytics.get('intent')}")
-            else:
-                logger.error(f"Failed to save analytics for log {log_id}")
-
-            return analytics
-
-    except Exception as e:
-        logger.error(f"Error analyzing session {log_id}: {e}", exc_info=True)
-        return None
+    results: Dict[str, Optional[Dict]] = {item_id: None for item_id, _ in items}
+    for entry in data.get("results", []):
+        entry_id = str(entry.pop("id", ""))
+        if entry_id in results:
+            results[entry_id] = entry
+    return results
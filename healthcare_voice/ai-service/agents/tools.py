@@ -6,6 +6,9 @@ from db import queries
 
 logger = logging.getLogger(__name__)
 
+# How far ahead find_next_available searches
+AVAILABILITY_WINDOW_DAYS = 14
+
 
 def serialize_value(value: Any) -> Any:
     """Serialize dates/times to strings for JSON"""
@@ -34,7 +37,7 @@ async def lookup_patient(args: Dict, session) -> Dict:
     dob = args.get("date_of_birth", "")
 
     logger.info(f"Looking up patient: {first_name} {last_name}, DOB: {dob}")
-    patient = queries.find_patient_by_name_dob(first_name, last_name, dob)
+    patient = await queries.find_patient_by_name_dob(first_name, last_name, dob)
 
     if patient:
         # Update session with patient info
@@ -65,7 +68,7 @@ async def lookup_patient_by_phone(args: Dict, session) -> Dict:
     phone = args.get("phone", "")
 
     logger.info(f"Looking up patient by phone: {phone}")
-    patient = queries.find_patient_by_phone(phone)
+    patient = await queries.find_patient_by_phone(phone)
 
     if patient:
         session.patient_id = patient["patient_id"]
@@ -96,7 +99,7 @@ async def get_patient_appointments(args: Dict, session) -> Dict:
         return {"error": "Patient ID required. Please look up the patient first."}
 
     logger.info(f"Getting appointments for patient: {patient_id}")
-    appointments = queries.get_patient_appointments(patient_id, upcoming_only=True)
+    appointments = await queries.get_patient_appointments(patient_id, upcoming_only=True)
     logger.info(f"Found {len(appointments)} appointments")
 
     formatted = []
@@ -144,7 +147,7 @@ async def get_available_slots(args: Dict, session) -> Dict:
     if target_date < date.today():
         return {"error": "Cannot check availability for past dates"}
 
-    slots = queries.get_available_slots(provider_id, target_date, duration)
+    slots = await queries.get_available_slots(provider_id, target_date, duration)
     logger.info(f"Found {len(slots)} available slots")
 
     return serialize_result({
@@ -166,11 +169,11 @@ async def find_next_available(args: Dict, session) -> Dict:
     providers_to_check = []
 
     if provider_id:
-        provider = queries.get_provider_by_id(provider_id)
+        provider = await queries.get_provider_by_id(provider_id)
         if provider:
             providers_to_check = [provider]
     else:
-        all_providers = queries.get_all_providers()
+        all_providers = await queries.get_all_providers()
         if specialization:
             providers_to_check = [
                 p for p in all_providers
@@ -184,26 +187,32 @@ async def find_next_available(args: Dict, session) -> Dict:
 
     logger.info(f"Checking {len(providers_to_check)} providers for availability")
 
-    # Check next 14 days
+    # Whole window for all candidates in three set-based queries
+    start_date = date.today()
+    end_date = start_date + timedelta(days=AVAILABILITY_WINDOW_DAYS - 1)
+    providers_by_id = {str(p["provider_id"]): p for p in providers_to_check}
+    provider_ids = list(providers_by_id)
+    availability = await queries.get_availability_data(provider_ids, start_date, end_date)
+
+    # Earliest day first; keep the first available day per provider
     results = []
-    for provider in providers_to_check:
-        for day_offset in range(14):
-            check_date = date.today() + timedelta(days=day_offset)
-            slots = queries.get_available_slots(
-                provider["provider_id"],
-                check_date,
-                duration
-            )
-            if slots:
-                results.append({
-                    "provider_id": provider["provider_id"],
-                    "provider_name": f"{provider.get('title', '')} {provider['first_name']} {provider['last_name']}".strip(),
-                    "specialization": provider.get("specialization", ""),
-                    "date": check_date.isoformat(),
-                    "first_available_slot": slots[0],
-                    "total_slots": len(slots)
-                })
-                break  # Found availability for this provider
+    for day in queries.iter_available_days(
+        provider_ids, availability, start_date, AVAILABILITY_WINDOW_DAYS, duration
+    ):
+        provider_id = day["provider_id"]
+        provider = providers_by_id.pop(provider_id, None)
+        if provider is None:
+            continue
+        results.append({
+            "provider_id": provider_id,
+            "provider_name": f"{provider.get('title', '')} {provider['first_name']} {provider['last_name']}".strip(),
+            "specialization": provider.get("specialization", ""),
+            "date": day["date"].isoformat(),
+            "first_available_slot": day["slots"][0],
+            "total_slots": len(day["slots"])
+        })
+        if not providers_by_id:
+            break
 
     logger.info(f"Found {len(results)} providers with availability")
     return serialize_result({
@@ -255,7 +264,7 @@ async def schedule_appointment(args: Dict, session) -> Dict:
             return {"error": "Cannot schedule appointments in the past. Please choose a later time."}
 
     # Check availability
-    slots = queries.get_available_slots(provider_id, target_date, duration)
+    slots = await queries.get_available_slots(provider_id, target_date, duration)
     time_available = any(
         s["start_time"] == time_str for s in slots
     )
@@ -270,7 +279,7 @@ async def schedule_appointment(args: Dict, session) -> Dict:
 
     # Create appointment
     logger.info("Creating appointment in database...")
-    appointment = queries.create_appointment({
+    appointment = await queries.create_appointment({
         "patient_id": patient_id,
         "provider_id": provider_id,
         "scheduled_date": date_str,
@@ -283,7 +292,7 @@ async def schedule_appointment(args: Dict, session) -> Dict:
     })
 
     if appointment:
-        provider = queries.get_provider_by_id(provider_id)
+        provider = await queries.get_provider_by_id(provider_id)
         provider_name = f"{provider.get('title', '')} {provider['first_name']} {provider['last_name']}".strip() if provider else "Provider"
         logger.info(f"Appointment created successfully: {appointment['appointment_id']}")
 
@@ -314,7 +323,7 @@ async def cancel_appointment(args: Dict, session) -> Dict:
     if not appointment_id:
         return {"error": "Appointment ID required"}
 
-    success = queries.cancel_appointment(appointment_id, reason)
+    success = await queries.cancel_appointment(appointment_id, reason)
 
     return {
         "success": success,
@@ -349,7 +358,7 @@ async def reschedule_appointment(args: Dict, session) -> Dict:
         if new_time <= now:
             return {"error": "Cannot reschedule to a past time. Please choose a later time."}
 
-    result = queries.reschedule_appointment(
+    result = await queries.reschedule_appointment(
         appointment_id,
         new_date,
         new_time,
@@ -378,7 +387,7 @@ async def get_providers(args: Dict, session) -> Dict:
     accepting_new = args.get("accepting_new_patients")
 
     logger.info(f"Getting providers, filter: specialization={specialization}, accepting_new={accepting_new}")
-    providers = queries.get_all_providers()
+    providers = await queries.get_all_providers()
     logger.info(f"Found {len(providers)} providers")
 
     if specialization:
@@ -417,15 +426,15 @@ async def get_provider_info(args: Dict, session) -> Dict:
 
     provider = None
     if provider_id:
-        provider = queries.get_provider_by_id(provider_id)
+        provider = await queries.get_provider_by_id(provider_id)
     elif provider_name:
-        provider = queries.get_provider_by_name(provider_name)
+        provider = await queries.get_provider_by_name(provider_name)
 
     if not provider:
         return {"error": "Provider not found"}
 
     # Fetch schedule separately from provider_schedules table
-    schedules = queries.get_provider_schedule(provider["provider_id"])
+    schedules = await queries.get_provider_schedule(provider["provider_id"])
     day_names = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
     schedule_formatted = []
 
@@ -459,7 +468,7 @@ async def get_services(args: Dict, session) -> Dict:
     """Get available services"""
     category = args.get("category")
 
-    services = queries.get_services(category=category)
+    services = await queries.get_services(category=category)
 
     formatted = []
     for s in services:
@@ -480,7 +489,7 @@ async def get_services(args: Dict, session) -> Dict:
 
 async def get_office_hours(args: Dict, session) -> Dict:
     """Get office hours"""
-    hours = queries.get_office_hours()
+    hours = await queries.get_office_hours()
 
     if hours:
         formatted = []
@@ -527,7 +536,7 @@ async def create_new_patient(args: Dict, session) -> Dict:
         return {"error": f"Missing required fields: {', '.join(missing)}"}
 
     # Check if patient already exists
-    existing = queries.find_patient_by_name_dob(first_name, last_name, dob)
+    existing = await queries.find_patient_by_name_dob(first_name, last_name, dob)
     if existing:
         logger.info(f"Patient already exists: {existing['patient_id']}")
         session.patient_id = existing["patient_id"]
@@ -540,7 +549,7 @@ async def create_new_patient(args: Dict, session) -> Dict:
         })
 
     logger.info("Creating patient in database...")
-    patient = queries.create_patient({
+    patient = await queries.create_patient({
         "first_name": first_name,
         "last_name": last_name,
         "date_of_birth": dob,
@@ -574,7 +583,7 @@ async def get_patient_insurance(args: Dict, session) -> Dict:
     if not patient_id:
         return {"error": "Patient ID required"}
 
-    insurance = queries.get_patient_insurance(patient_id)
+    insurance = await queries.get_patient_insurance(patient_id)
 
     formatted = []
     for ins in insurance:
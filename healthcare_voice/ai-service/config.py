@@ -15,9 +15,27 @@ class Settings(BaseSettings):
     openai_api_key: str = ""
     openai_model: str = "gpt-4o-realtime-preview-2025-06-03"
     openai_voice: str = "coral"
+    # Pre-configured Realtime sessions kept ready for new callers (0 disables)
+    realtime_pool_size: int = 2
+    # Retire idle sessions well before OpenAI's 30 minute session limit
+    realtime_pool_max_age_seconds: float = 900.0
+    realtime_connect_timeout: float = 10.0
 
     # Database
     database_url: str = ""
+    db_pool_min_size: int = 1
+    db_pool_max_size: int = 10
+    # Turn off behind a transaction-mode pooler (e.g. PgBouncer / Supabase port 6543)
+    db_prepared_statements: bool = True
+    db_prepared_cache_size: int = 100
+    db_slow_query_ms: float = 250.0
+
+    # Post-call analytics queue
+    analytics_workers: int = 2
+    analytics_batch_size: int = 5  # jobs claimed per worker round
+    analytics_batch_max_chars: int = 6000  # transcripts up to this total share one request
+    analytics_max_attempts: int = 5
+    analytics_poll_seconds: float = 5.0
 
     # Twilio (optional)
     twilio_account_sid: Optional[str] = None
@@ -1,108 +1,324 @@
-"""PostgreSQL client for database operations"""
+"""PostgreSQL client for database operations
+
+Queries run on a small dedicated thread pool against a psycopg2 connection
+pool, so async tool handlers and routes await them without blocking the event
+loop that relays realtime audio. Each pooled connection caches server-side
+prepared statements for the queries it has seen, and every query is timed.
+"""
+import asyncio
 import logging
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Dict, Any
-from contextlib import contextmanager
-import psycopg2
+from psycopg2 import errors as pg_errors
+from psycopg2.extensions import connection as PGConnection
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
 from config import settings
+from stats_utils import percentile
 
 logger = logging.getLogger(__name__)
 
-_connection_pool = None
+_connection_pool: Optional[ThreadedConnectionPool] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_init_lock = threading.Lock()
+
+_PLACEHOLDER = re.compile(r"%([s%])")
+
+# Per-query timing, keyed by normalized SQL
+_query_stats: Dict[str, Dict[str, Any]] = {}
+_stats_lock = threading.Lock()
+_MAX_TRACKED_QUERIES = 500
+_SAMPLES_PER_QUERY = 200
+
+# Connection checkouts, counted here rather than read from the pool's internals
+_checkouts = {"in_use": 0, "peak_in_use": 0, "total": 0}
+_checkout_lock = threading.Lock()
+
+
+class PreparingConnection(PGConnection):
+    """psycopg2 connection that remembers the statements it has prepared"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared: "OrderedDict[str, str]" = OrderedDict()
+        self.prepared_seq = 0
 
 
 def init_db():
-    """Initialize database connection"""
-    global _connection_pool
+    """Initialize the connection pool and query executor"""
+    global _connection_pool, _executor
     if not settings.database_url:
         logger.warning("DATABASE_URL not configured")
         return None
-    logger.info("Database connection configured")
+
+    with _init_lock:
+        if _connection_pool is None:
+            try:
+                _connection_pool = ThreadedConnectionPool(
+                    settings.db_pool_min_size,
+                    settings.db_pool_max_size,
+                    settings.database_url,
+                    connection_factory=PreparingConnection,
+                )
+            except Exception as e:
+                logger.error(f"Database connection error: {e}")
+                return None
+        if _executor is None:
+            # One worker per pooled connection, so a checkout never finds the pool empty
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.db_pool_max_size,
+                thread_name_prefix="db",
+            )
+
+    logger.info(
+        f"Database pool ready ({settings.db_pool_min_size}-{settings.db_pool_max_size} connections, "
+        f"prepared statements {'on' if settings.db_prepared_statements else 'off'})"
+    )
     return True
 
 
-def get_connection():
-    """Get a database connection"""
-    if not settings.database_url:
-        return None
-    try:
-        conn = psycopg2.connect(settings.database_url)
-        return conn
-    except Exception as e:
-        logger.error(f"Database connection error: {e}")
+def close_db():
+    """Close the executor and every pooled connection"""
+    global _connection_pool, _executor
+    with _init_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+        if _connection_pool is not None:
+            _connection_pool.closeall()
+            _connection_pool = None
+
+
+def _get_pool() -> Optional[ThreadedConnectionPool]:
+    if _connection_pool is None:
+        init_db()
+    return _connection_pool
+
+
+def _get_executor() -> Optional[ThreadPoolExecutor]:
+    if _executor is None:
+        init_db()
+    return _executor
+
+
+# ============================================
+# PREPARED STATEMENTS
+# ============================================
+
+def _to_server_placeholders(query: str):
+    """Rewrite psycopg2 %s placeholders to $1..$n for PREPARE"""
+    count = 0
+
+    def _replace(match):
+        nonlocal count
+        if match.group(1) == "%":
+            return "%"
+        count += 1
+        return f"${count}"
+
+    return _PLACEHOLDER.sub(_replace, query), count
+
+
+def _array_literal(values) -> Optional[str]:
+    """Postgres array literal, so EXECUTE coerces it to the prepared parameter type"""
+    if values is None:
         return None
+    items = []
+    for value in values:
+        if value is None:
+            items.append("NULL")
+        else:
+            text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+            items.append(f'"{text}"')
+    return "{" + ",".join(items) + "}"
 
 
-@contextmanager
-def get_cursor():
-    """Context manager for database cursor"""
-    conn = get_connection()
-    if not conn:
-        yield None
+def _execute(cursor, conn: PreparingConnection, query: str, params) -> None:
+    """Run a query, preparing it on this connection the first time it is seen"""
+    if not settings.db_prepared_statements or not params:
+        cursor.execute(query, params)
         return
+
     try:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        yield cursor
-        conn.commit()
-    except Exception as e:
+        _execute_prepared(cursor, conn, query, params)
+    except pg_errors.InvalidSqlStatementName:
+        # Server dropped the statements (e.g. DISCARD ALL behind a pooler).
+        # Nothing else ran in this transaction, so roll back, forget them and
+        # prepare again once.
+        logger.info("Prepared statements were dropped by the server, re-preparing")
         conn.rollback()
-        logger.error(f"Database error: {e}")
+        conn.prepared.clear()
+        _execute_prepared(cursor, conn, query, params)
+
+
+def _execute_prepared(cursor, conn: PreparingConnection, query: str, params) -> None:
+    name = conn.prepared.get(query)
+    if name is None:
+        server_sql, count = _to_server_placeholders(query)
+        if count != len(params):
+            cursor.execute(query, params)
+            return
+        conn.prepared_seq += 1
+        name = f"hv_stmt_{conn.prepared_seq}"
+        cursor.execute(f"PREPARE {name} AS {server_sql}")
+        conn.prepared[query] = name
+        if len(conn.prepared) > settings.db_prepared_cache_size:
+            _, evicted = conn.prepared.popitem(last=False)
+            cursor.execute(f"DEALLOCATE {evicted}")
+    else:
+        conn.prepared.move_to_end(query)
+
+    args = [_array_literal(p) if isinstance(p, list) else p for p in params]
+    cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(args))})", args)
+
+
+# ============================================
+# QUERY TIMING
+# ============================================
+
+def _record_timing(query: str, elapsed_ms: float, ok: bool) -> None:
+    key = " ".join(query.split())
+    if elapsed_ms >= settings.db_slow_query_ms:
+        logger.warning(f"Slow query ({elapsed_ms:.0f}ms): {key[:200]}")
+
+    with _stats_lock:
+        stats = _query_stats.get(key)
+        if stats is None:
+            if len(_query_stats) >= _MAX_TRACKED_QUERIES:
+                return
+            stats = _query_stats[key] = {
+                "calls": 0,
+                "errors": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "samples": deque(maxlen=_SAMPLES_PER_QUERY),
+            }
+        stats["calls"] += 1
+        stats["errors"] += 0 if ok else 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        stats["samples"].append(elapsed_ms)
+
+
+def get_query_stats(limit: int = 20) -> List[Dict[str, Any]]:
+    """Per-query call counts and latency (ms), slowest total first"""
+    with _stats_lock:
+        snapshot = [(key, dict(stats), list(stats["samples"])) for key, stats in _query_stats.items()]
+
+    rows = []
+    for key, stats, samples in snapshot:
+        rows.append({
+            "query": key[:200],
+            "calls": stats["calls"],
+            "errors": stats["errors"],
+            "total_ms": round(stats["total_ms"], 1),
+            "avg_ms": round(stats["total_ms"] / stats["calls"], 2),
+            "p50_ms": round(percentile(samples, 0.50), 2),
+            "p95_ms": round(percentile(samples, 0.95), 2),
+            "max_ms": round(stats["max_ms"], 2),
+        })
+    rows.sort(key=lambda r: r["total_ms"], reverse=True)
+    return rows[:limit]
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Connection pool state plus the slowest queries"""
+    with _checkout_lock:
+        checkouts = dict(_checkouts)
+    return {
+        "configured": _connection_pool is not None,
+        "min_size": settings.db_pool_min_size,
+        "max_size": settings.db_pool_max_size,
+        "in_use": checkouts["in_use"],
+        "peak_in_use": checkouts["peak_in_use"],
+        "checkouts": checkouts["total"],
+        "prepared_statements": settings.db_prepared_statements,
+        "queries": get_query_stats(),
+    }
+
+
+# ============================================
+# EXECUTION
+# ============================================
+
+def _run(query: str, params, fetch: str):
+    """Check out a connection, run one statement and commit (runs on the executor)"""
+    pool = _get_pool()
+    if pool is None:
+        return [] if fetch == "all" else None
+
+    conn = pool.getconn()
+    with _checkout_lock:
+        _checkouts["in_use"] += 1
+        _checkouts["total"] += 1
+        _checkouts["peak_in_use"] = max(_checkouts["peak_in_use"], _checkouts["in_use"])
+    started = time.perf_counter()
+    ok = False
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            _execute(cursor, conn, query, params)
+            if fetch == "all":
+                result = [dict(row) for row in cursor.fetchall()]
+            else:
+                row = cursor.fetchone()
+                result = dict(row) if row else None
+        conn.commit()
+        ok = True
+        return result
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
         raise
     finally:
-        cursor.close()
-        conn.close()
+        _record_timing(query, (time.perf_counter() - started) * 1000, ok)
+        pool.putconn(conn, close=bool(conn.closed))
+        with _checkout_lock:
+            _checkouts["in_use"] -= 1
+
+
+async def _submit(query: str, params, fetch: str):
+    executor = _get_executor()
+    if executor is None:
+        return [] if fetch == "all" else None
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, _run, query, params, fetch)
 
 
-def execute_query(query: str, params: tuple = None) -> List[Dict[str, Any]]:
+async def execute_query(query: str, params: tuple = None) -> List[Dict[str, Any]]:
     """Execute a SELECT query and return results"""
-    with get_cursor() as cursor:
-        if cursor is None:
-            return []
-        try:
-            cursor.execute(query, params)
-            return [dict(row) for row in cursor.fetchall()]
-        except Exception as e:
-            logger.error(f"Query error: {e}")
-            return []
+    try:
+        return await _submit(query, params, "all")
+    except Exception as e:
+        logger.error(f"Query error: {e}")
+        return []
 
 
-def execute_query_one(query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
+async def execute_query_one(query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
     """Execute a SELECT query and return single result"""
-    with get_cursor() as cursor:
-        if cursor is None:
-            return None
-        try:
-            cursor.execute(query, params)
-            row = cursor.fetchone()
-            return dict(row) if row else None
-        except Exception as e:
-            logger.error(f"Query error: {e}")
-            return None
+    try:
+        return await _submit(query, params, "one")
+    except Exception as e:
+        logger.error(f"Query error: {e}")
+        return None
 
 
-def execute_insert(query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
+async def execute_insert(query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
     """Execute an INSERT query and return the inserted row"""
-    with get_cursor() as cursor:
-        if cursor is None:
-            return None
-        try:
-            cursor.execute(query, params)
-            row = cursor.fetchone()
-            return dict(row) if row else None
-        except Exception as e:
-            logger.error(f"Insert error: {e}")
-            return None
+    try:
+        return await _submit(query, params, "one")
+    except Exception as e:
+        logger.error(f"Insert error: {e}")
+        return None
 
 
-def execute_update(query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
+async def execute_update(query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
     """Execute an UPDATE query and return the updated row"""
-    with get_cursor() as cursor:
-        if cursor is None:
-            return None
-        try:
-            cursor.execute(query, params)
-            row = cursor.fetchone()
-            return dict(row) if row else None
-        except Exception as e:
-            logger.error(f"Update error: {e}")
-            return None
+    try:
+        return await _submit(query, params, "one")
+    except Exception as e:
+        logger.error(f"Update error: {e}")
+        return None
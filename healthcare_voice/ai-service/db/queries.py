@@ -1,6 +1,8 @@
 """Database query functions for healthcare voice AI"""
+import asyncio
 import logging
-from typing import Optional, List, Dict, Any
+from collections import defaultdict
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 from datetime import date, time, datetime, timedelta
 from db.postgres_client import execute_query, execute_query_one, execute_insert, execute_update
 from config import settings
@@ -12,7 +14,7 @@ logger = logging.getLogger(__name__)
 # PATIENT QUERIES
 # ============================================
 
-def find_patient_by_phone(phone: str, practice_id: str = None) -> Optional[Dict]:
+async def find_patient_by_phone(phone: str, practice_id: str = None) -> Optional[Dict]:
     """Find patient by phone number (primary, secondary, or work)"""
     practice_id = practice_id or settings.default_practice_id
 
@@ -26,10 +28,10 @@ def find_patient_by_phone(phone: str, practice_id: str = None) -> Optional[Dict]
         AND (phone_primary ILIKE %s OR phone_secondary ILIKE %s OR phone_work ILIKE %s)
         LIMIT 1
     """
-    return execute_query_one(query, (practice_id, phone_pattern, phone_pattern, phone_pattern))
+    return await execute_query_one(query, (practice_id, phone_pattern, phone_pattern, phone_pattern))
 
 
-def find_patient_by_name_dob(
+async def find_patient_by_name_dob(
     first_name: str,
     last_name: str,
     dob: str,
@@ -47,7 +49,7 @@ def find_patient_by_name_dob(
         AND date_of_birth = %s
         LIMIT 1
     """
-    result = execute_query_one(query, (practice_id, f"%{first_name}%", f"%{last_name}%", dob))
+    result = await execute_query_one(query, (practice_id, f"%{first_name}%", f"%{last_name}%", dob))
     if result:
         return result
 
@@ -59,25 +61,25 @@ def find_patient_by_name_dob(
         AND last_name ILIKE %s
         LIMIT 1
     """
-    return execute_query_one(query_name_only, (practice_id, f"%{first_name}%", f"%{last_name}%"))
+    return await execute_query_one(query_name_only, (practice_id, f"%{first_name}%", f"%{last_name}%"))
 
 
-def get_patient_by_id(patient_id: str) -> Optional[Dict]:
+async def get_patient_by_id(patient_id: str) -> Optional[Dict]:
     """Get patient by ID"""
     query = "SELECT * FROM patients WHERE patient_id = %s"
-    return execute_query_one(query, (patient_id,))
+    return await execute_query_one(query, (patient_id,))
 
 
-def get_patient_insurance(patient_id: str) -> List[Dict]:
+async def get_patient_insurance(patient_id: str) -> List[Dict]:
     """Get patient's insurance information"""
     query = """
         SELECT * FROM patient_insurance
         WHERE patient_id = %s AND is_active = true
     """
-    return execute_query(query, (patient_id,))
+    return await execute_query(query, (patient_id,))
 
 
-def create_patient(patient_data: Dict) -> Optional[Dict]:
+async def create_patient(patient_data: Dict) -> Optional[Dict]:
     """Create a new patient"""
     patient_data["practice_id"] = patient_data.get(
         "practice_id", settings.default_practice_id
@@ -91,14 +93,14 @@ def create_patient(patient_data: Dict) -> Optional[Dict]:
         VALUES ({placeholders})
         RETURNING *
     """
-    return execute_insert(query, tuple(patient_data.values()))
+    return await execute_insert(query, tuple(patient_data.values()))
 
 
 # ============================================
 # PROVIDER QUERIES
 # ============================================
 
-def get_all_providers(practice_id: str = None, active_only: bool = True) -> List[Dict]:
+async def get_all_providers(practice_id: str = None, active_only: bool = True) -> List[Dict]:
     """Get all providers for a practice"""
     practice_id = practice_id or settings.default_practice_id
 
@@ -112,10 +114,10 @@ def get_all_providers(practice_id: str = None, active_only: bool = True) -> List
     if active_only:
         query += " AND p.is_active = true"
 
-    return execute_query(query, (practice_id,))
+    return await execute_query(query, (practice_id,))
 
 
-def get_provider_by_id(provider_id: str) -> Optional[Dict]:
+async def get_provider_by_id(provider_id: str) -> Optional[Dict]:
     """Get provider by ID with schedule"""
     query = """
         SELECT p.*, d.name as department_name
@@ -123,10 +125,10 @@ def get_provider_by_id(provider_id: str) -> Optional[Dict]:
         LEFT JOIN departments d ON p.department_id = d.department_id
         WHERE p.provider_id = %s
     """
-    return execute_query_one(query, (provider_id,))
+    return await execute_query_one(query, (provider_id,))
 
 
-def get_provider_by_name(name: str, practice_id: str = None) -> Optional[Dict]:
+async def get_provider_by_name(name: str, practice_id: str = None) -> Optional[Dict]:
     """Find provider by name (partial match)"""
     practice_id = practice_id or settings.default_practice_id
 
@@ -141,7 +143,7 @@ def get_provider_by_name(name: str, practice_id: str = None) -> Optional[Dict]:
             AND last_name ILIKE %s
             LIMIT 1
         """
-        return execute_query_one(query, (practice_id, f"%{parts[0]}%", f"%{parts[-1]}%"))
+        return await execute_query_one(query, (practice_id, f"%{parts[0]}%", f"%{parts[-1]}%"))
     else:
         query = """
             SELECT * FROM providers
@@ -149,20 +151,20 @@ def get_provider_by_name(name: str, practice_id: str = None) -> Optional[Dict]:
             AND (first_name ILIKE %s OR last_name ILIKE %s)
             LIMIT 1
         """
-        return execute_query_one(query, (practice_id, f"%{name}%", f"%{name}%"))
+        return await execute_query_one(query, (practice_id, f"%{name}%", f"%{name}%"))
 
 
-def get_provider_schedule(provider_id: str) -> List[Dict]:
+async def get_provider_schedule(provider_id: str) -> List[Dict]:
     """Get provider's weekly schedule"""
     query = """
         SELECT * FROM provider_schedules
         WHERE provider_id = %s AND is_available = true
         ORDER BY day_of_week
     """
-    return execute_query(query, (provider_id,))
+    return await execute_query(query, (provider_id,))
 
 
-def get_provider_time_off(
+async def get_provider_time_off(
     provider_id: str,
     start_date: date,
     end_date: date
@@ -174,14 +176,14 @@ def get_provider_time_off(
         AND end_date >= %s
         AND start_date <= %s
     """
-    return execute_query(query, (provider_id, start_date, end_date))
+    return await execute_query(query, (provider_id, start_date, end_date))
 
 
 # ============================================
 # APPOINTMENT QUERIES
 # ============================================
 
-def get_patient_appointments(
+async def get_patient_appointments(
     patient_id: str,
     upcoming_only: bool = True,
     limit: int = 10
@@ -210,10 +212,10 @@ def get_patient_appointments(
     query += " ORDER BY a.scheduled_date, a.scheduled_time LIMIT %s"
     params.append(limit)
 
-    return execute_query(query, tuple(params))
+    return await execute_query(query, tuple(params))
 
 
-def get_appointments_for_date(
+async def get_appointments_for_date(
     provider_id: str,
     target_date: date
 ) -> List[Dict]:
@@ -226,21 +228,74 @@ def get_appointments_for_date(
         AND status NOT IN ('cancelled', 'no_show')
         ORDER BY scheduled_time
     """
-    return execute_query(query, (provider_id, target_date))
+    return await execute_query(query, (provider_id, target_date))
 
 
-def get_available_slots(
+def _as_time(value: Any) -> time:
+    """Coerce a TIME column (time object or "HH:MM:SS[.ffffff]" string) to time"""
+    if isinstance(value, time):
+        return value
+    return datetime.strptime(str(value).split('.')[0], "%H:%M:%S").time()
+
+
+def _compute_day_slots(
+    target_date: date,
+    day_schedule: Dict,
+    existing: List[Dict],
+    duration: int = 30
+) -> List[Dict]:
+    """Free slots on one day given the provider's schedule and booked appointments"""
+    start_time = _as_time(day_schedule["start_time"])
+    end_time = _as_time(day_schedule["end_time"])
+
+    # Booked intervals for the day
+    booked = []
+    for appt in existing:
+        appt_start = _as_time(appt["scheduled_time"])
+        if appt["end_time"]:
+            appt_end = _as_time(appt["end_time"])
+        else:
+            # Calculate end time from duration
+            appt_end = (datetime.combine(target_date, appt_start) +
+                        timedelta(minutes=appt.get("duration") or 30)).time()
+        booked.append((appt_start, appt_end))
+
+    slots = []
+    current = datetime.combine(target_date, start_time)
+    end_dt = datetime.combine(target_date, end_time)
+
+    while current + timedelta(minutes=duration) <= end_dt:
+        slot_start = current.time()
+        slot_end = (current + timedelta(minutes=duration)).time()
+
+        # Check if slot overlaps with any existing appointment
+        if all(slot_end <= appt_start or slot_start >= appt_end for appt_start, appt_end in booked):
+            slots.append({
+                "start_time": slot_start.strftime("%H:%M"),
+                "end_time": slot_end.strftime("%H:%M"),
+                "date": target_date.isoformat()
+            })
+
+        current += timedelta(minutes=30)  # 30-minute slot intervals
+
+    return slots
+
+
+def _db_day_of_week(target_date: date) -> int:
+    """Convert Python weekday (0=Monday) to database format (0=Sunday)"""
+    return (target_date.weekday() + 1) % 7
+
+
+async def get_available_slots(
     provider_id: str,
     target_date: date,
     duration: int = 30
 ) -> List[Dict]:
     """Get available appointment slots for a provider on a date"""
     # Get provider schedule for this day of week
-    day_of_week = target_date.weekday()
-    # Convert Python weekday (0=Monday) to database format (0=Sunday)
-    db_day_of_week = (day_of_week + 1) % 7
+    db_day_of_week = _db_day_of_week(target_date)
 
-    schedule = get_provider_schedule(provider_id)
+    schedule = await get_provider_schedule(provider_id)
     day_schedule = next(
         (s for s in schedule if s["day_of_week"] == db_day_of_week),
         None
@@ -250,71 +305,131 @@ def get_available_slots(
         return []
 
     # Check for time off
-    time_off = get_provider_time_off(provider_id, target_date, target_date)
+    time_off = await get_provider_time_off(provider_id, target_date, target_date)
     if time_off:
         return []
 
     # Get existing appointments
-    existing = get_appointments_for_date(provider_id, target_date)
+    existing = await get_appointments_for_date(provider_id, target_date)
 
-    # Generate available slots
-    slots = []
-    start_time_str = str(day_schedule["start_time"])
-    end_time_str = str(day_schedule["end_time"])
+    return _compute_day_slots(target_date, day_schedule, existing, duration)
 
-    # Handle time objects or strings
-    if isinstance(day_schedule["start_time"], time):
-        start_time = day_schedule["start_time"]
-        end_time = day_schedule["end_time"]
-    else:
-        start_time = datetime.strptime(start_time_str.split('.')[0], "%H:%M:%S").time()
-        end_time = datetime.strptime(end_time_str.split('.')[0], "%H:%M:%S").time()
 
-    current = datetime.combine(target_date, start_time)
-    end_dt = datetime.combine(target_date, end_time)
+# ============================================
+# RANGE AVAILABILITY (set-based)
+# ============================================
 
-    while current + timedelta(minutes=duration) <= end_dt:
-        slot_start = current.time()
-        slot_end = (current + timedelta(minutes=duration)).time()
+async def get_schedules_for_providers(provider_ids: List[str]) -> List[Dict]:
+    """Get weekly schedules for several providers in one query"""
+    query = """
+        SELECT provider_id, day_of_week, start_time, end_time
+        FROM provider_schedules
+        WHERE provider_id = ANY(%s::uuid[]) AND is_available = true
+        ORDER BY provider_id, day_of_week, start_time
+    """
+    return await execute_query(query, (list(provider_ids),))
 
-        # Check if slot overlaps with any existing appointment
-        is_available = True
-        for appt in existing:
-            appt_start_str = str(appt["scheduled_time"])
-            appt_end_str = str(appt["end_time"]) if appt["end_time"] else None
-
-            if isinstance(appt["scheduled_time"], time):
-                appt_start = appt["scheduled_time"]
-            else:
-                appt_start = datetime.strptime(appt_start_str.split('.')[0], "%H:%M:%S").time()
-
-            if appt_end_str:
-                if isinstance(appt["end_time"], time):
-                    appt_end = appt["end_time"]
-                else:
-                    appt_end = datetime.strptime(appt_end_str.split('.')[0], "%H:%M:%S").time()
-            else:
-                # Calculate end time from duration
-                appt_end = (datetime.combine(target_date, appt_start) +
-                           timedelta(minutes=appt.get("duration", 30))).time()
-
-            if not (slot_end <= appt_start or slot_start >= appt_end):
-                is_available = False
-                break
-
-        if is_available:
-            slots.append({
-                "start_time": slot_start.strftime("%H:%M"),
-                "end_time": slot_end.strftime("%H:%M"),
-                "date": target_date.isoformat()
-            })
 
-        current += timedelta(minutes=30)  # 30-minute slot intervals
+async def get_time_off_for_providers(
+    provider_ids: List[str],
+    start_date: date,
+    end_date: date
+) -> List[Dict]:
+    """Get time off overlapping a date range for several providers in one query"""
+    query = """
+        SELECT provider_id, start_date, end_date
+        FROM provider_time_off
+        WHERE provider_id = ANY(%s::uuid[])
+        AND end_date >= %s
+        AND start_date <= %s
+    """
+    return await execute_query(query, (list(provider_ids), start_date, end_date))
 
-    return slots
+
+async def get_appointments_for_providers(
+    provider_ids: List[str],
+    start_date: date,
+    end_date: date
+) -> List[Dict]:
+    """Get booked appointments in a date range for several providers in one query"""
+    query = """
+        SELECT provider_id, scheduled_date, scheduled_time, end_time, duration
+        FROM appointments
+        WHERE provider_id = ANY(%s::uuid[])
+        AND scheduled_date BETWEEN %s AND %s
+        AND status NOT IN ('cancelled', 'no_show')
+        ORDER BY scheduled_date, scheduled_time
+    """
+    return await execute_query(query, (list(provider_ids), start_date, end_date))
+
+
+async def get_availability_data(
+    provider_ids: List[str],
+    start_date: date,
+    end_date: date
+) -> Dict[str, List[Dict]]:
+    """
+    Fetch everything needed to compute availability for a set of providers
+    over a date range: three concurrent queries regardless of provider or day count.
+    """
+    schedules, time_off, appointments = await asyncio.gather(
+        get_schedules_for_providers(provider_ids),
+        get_time_off_for_providers(provider_ids, start_date, end_date),
+        get_appointments_for_providers(provider_ids, start_date, end_date),
+    )
+    return {
+        "schedules": schedules,
+        "time_off": time_off,
+        "appointments": appointments,
+    }
 
 
-def create_appointment(appointment_data: Dict) -> Optional[Dict]:
+def iter_available_days(
+    provider_ids: List[str],
+    availability: Dict[str, List[Dict]],
+    start_date: date,
+    days: int,
+    duration: int = 30
+) -> Iterator[Dict]:
+    """
+    Yield {"provider_id", "date", "slots"} for each provider/day with free slots,
+    earliest date first (providers in the given order within a day).
+
+    Works purely in memory on the output of get_availability_data, so callers
+    can stop as soon as they have enough results.
+    """
+    # One schedule row per provider/day, as in get_available_slots
+    schedules: Dict[Tuple[str, int], Dict] = {}
+    for row in availability["schedules"]:
+        schedules.setdefault((str(row["provider_id"]), row["day_of_week"]), row)
+
+    time_off: Dict[str, List[Tuple[date, date]]] = defaultdict(list)
+    for row in availability["time_off"]:
+        time_off[str(row["provider_id"])].append((row["start_date"], row["end_date"]))
+
+    booked: Dict[Tuple[str, date], List[Dict]] = defaultdict(list)
+    for row in availability["appointments"]:
+        booked[(str(row["provider_id"]), row["scheduled_date"])].append(row)
+
+    for day_offset in range(days):
+        target_date = start_date + timedelta(days=day_offset)
+        db_day_of_week = _db_day_of_week(target_date)
+
+        for provider_id in provider_ids:
+            provider_id = str(provider_id)
+            day_schedule = schedules.get((provider_id, db_day_of_week))
+            if not day_schedule:
+                continue
+            if any(start <= target_date <= end for start, end in time_off.get(provider_id, [])):
+                continue
+
+            existing = booked.get((provider_id, target_date), [])
+            slots = _compute_day_slots(target_date, day_schedule, existing, duration)
+            if slots:
+                yield {"provider_id": provider_id, "date": target_date, "slots": slots}
+
+
+async def create_appointment(appointment_data: Dict) -> Optional[Dict]:
     """Create a new appointment"""
     appointment_data["practice_id"] = appointment_data.get(
         "practice_id", settings.default_practice_id
@@ -329,10 +444,10 @@ def create_appointment(appointment_data: Dict) -> Optional[Dict]:
         VALUES ({placeholders})
         RETURNING *
     """
-    return execute_insert(query, tuple(appointment_data.values()))
+    return await execute_insert(query, tuple(appointment_data.values()))
 
 
-def update_appointment(appointment_id: str, updates: Dict) -> Optional[Dict]:
+async def update_appointment(appointment_id: str, updates: Dict) -> Optional[Dict]:
     """Update an existing appointment"""
     set_clause = ', '.join([f"{k} = %s" for k in updates.keys()])
 
@@ -341,10 +456,10 @@ def update_appointment(appointment_id: str, updates: Dict) -> Optional[Dict]:
         WHERE appointment_id = %s
         RETURNING *
     """
-    return execute_update(query, tuple(list(updates.values()) + [appointment_id]))
+    return await execute_update(query, tuple(list(updates.values()) + [appointment_id]))
 
 
-def cancel_appointment(appointment_id: str, reason: str = None) -> bool:
+async def cancel_appointment(appointment_id: str, reason: str = None) -> bool:
     """Cancel an appointment"""
     query = """
         UPDATE appointments
@@ -352,11 +467,11 @@ def cancel_appointment(appointment_id: str, reason: str = None) -> bool:
         WHERE appointment_id = %s
         RETURNING *
     """
-    result = execute_update(query, (datetime.utcnow(), reason, appointment_id))
+    result = await execute_update(query, (datetime.utcnow(), reason, appointment_id))
     return result is not None
 
 
-def reschedule_appointment(
+async def reschedule_appointment(
     appointment_id: str,
     new_date: date,
     new_time: time,
@@ -365,7 +480,7 @@ def reschedule_appointment(
 ) -> Optional[Dict]:
     """Reschedule an appointment"""
     # Get original appointment
-    original = execute_query_one(
+    original = await execute_query_one(
         "SELECT * FROM appointments WHERE appointment_id = %s",
         (appointment_id,)
     )
@@ -374,7 +489,7 @@ def reschedule_appointment(
         return None
 
     # Mark original as rescheduled
-    execute_update(
+    await execute_update(
         "UPDATE appointments SET status = 'rescheduled' WHERE appointment_id = %s RETURNING *",
         (appointment_id,)
     )
@@ -389,7 +504,7 @@ def reschedule_appointment(
         RETURNING *
     """
 
-    new_appt = execute_insert(query, (
+    new_appt = await execute_insert(query, (
         original["practice_id"],
         original["patient_id"],
         provider_id or original["provider_id"],
@@ -405,7 +520,7 @@ def reschedule_appointment(
 
     if new_appt:
         # Update original with reference to new appointment
-        execute_update(
+        await execute_update(
             "UPDATE appointments SET rescheduled_to_id = %s WHERE appointment_id = %s RETURNING *",
             (new_appt["appointment_id"], appointment_id)
         )
@@ -417,7 +532,7 @@ def reschedule_appointment(
 # SERVICE QUERIES
 # ============================================
 
-def get_services(practice_id: str = None, category: str = None) -> List[Dict]:
+async def get_services(practice_id: str = None, category: str = None) -> List[Dict]:
     """Get available services"""
     practice_id = practice_id or settings.default_practice_id
 
@@ -433,10 +548,10 @@ def get_services(practice_id: str = None, category: str = None) -> List[Dict]:
         query += " AND sc.name = %s"
         params.append(category)
 
-    return execute_query(query, tuple(params))
+    return await execute_query(query, tuple(params))
 
 
-def get_service_by_name(name: str, practice_id: str = None) -> Optional[Dict]:
+async def get_service_by_name(name: str, practice_id: str = None) -> Optional[Dict]:
     """Find service by name"""
     practice_id = practice_id or settings.default_practice_id
 
@@ -445,14 +560,14 @@ def get_service_by_name(name: str, practice_id: str = None) -> Optional[Dict]:
         WHERE practice_id = %s AND name ILIKE %s AND is_active = true
         LIMIT 1
     """
-    return execute_query_one(query, (practice_id, f"%{name}%"))
+    return await execute_query_one(query, (practice_id, f"%{name}%"))
 
 
 # ============================================
 # CALL LOG QUERIES
 # ============================================
 
-def create_call_log(call_data: Dict) -> Optional[Dict]:
+async def create_call_log(call_data: Dict) -> Optional[Dict]:
     """Create a call log entry"""
     call_data["practice_id"] = call_data.get(
         "practice_id", settings.default_practice_id
@@ -466,10 +581,10 @@ def create_call_log(call_data: Dict) -> Optional[Dict]:
         VALUES ({placeholders})
         RETURNING *
     """
-    return execute_insert(query, tuple(call_data.values()))
+    return await execute_insert(query, tuple(call_data.values()))
 
 
-def update_call_log(log_id: str, updates: Dict) -> Optional[Dict]:
+async def update_call_log(log_id: str, updates: Dict) -> Optional[Dict]:
     """Update a call log entry"""
     set_clause = ', '.join([f"{k} = %s" for k in updates.keys()])
 
@@ -478,10 +593,10 @@ def update_call_log(log_id: str, updates: Dict) -> Optional[Dict]:
         WHERE log_id = %s
         RETURNING *
     """
-    return execute_update(query, tuple(list(updates.values()) + [log_id]))
+    return await execute_update(query, tuple(list(updates.values()) + [log_id]))
 
 
-def get_call_logs(
+async def get_call_logs(
     patient_id: str = None,
     limit: int = 50
 ) -> List[Dict]:
@@ -500,14 +615,14 @@ def get_call_logs(
     query += " ORDER BY cl.created_at DESC LIMIT %s"
     params.append(limit)
 
-    return execute_query(query, tuple(params))
+    return await execute_query(query, tuple(params))
 
 
 # ============================================
 # CALL LOG ANALYTICS QUERIES
 # ============================================
 
-def save_call_log_analytics(log_id: str, analytics: Dict) -> Optional[Dict]:
+async def save_call_log_analytics(log_id: str, analytics: Dict) -> Optional[Dict]:
     """Save AI-generated analytics for a call log"""
     import json
     query = """
@@ -543,24 +658,108 @@ def save_call_log_analytics(log_id: str, analytics: Dict) -> Optional[Dict]:
         analytics.get("escalation_reason"),
         analytics.get("ai_summary"),
     )
-    return execute_insert(query, params)
+    return await execute_insert(query, params)
+
+
+# ============================================
+# ANALYTICS QUEUE QUERIES
+# ============================================
+
+async def enqueue_analytics_job(log_id: str, agent_type: str = "voice") -> Optional[Dict]:
+    """Queue a call log for post-call analysis (re-queues an existing job)"""
+    query = """
+        INSERT INTO analytics_jobs (log_id, agent_type)
+        VALUES (%s, %s)
+        ON CONFLICT (log_id) DO UPDATE SET
+            status = 'pending',
+            attempts = 0,
+            last_error = NULL,
+            run_after = NOW(),
+            locked_at = NULL,
+            completed_at = NULL
+        RETURNING job_id
+    """
+    return await execute_insert(query, (log_id, agent_type))
+
+
+async def claim_analytics_jobs(limit: int, stale_after_seconds: int = 300) -> List[Dict]:
+    """
+    Claim up to `limit` ready jobs with their transcripts.
+
+    SKIP LOCKED lets several workers (and replicas) claim concurrently; jobs
+    left running by a crashed worker are reclaimed after stale_after_seconds.
+    """
+    query = """
+        WITH claimed AS (
+            SELECT job_id FROM analytics_jobs
+            WHERE (status = 'pending' AND run_after <= NOW())
+               OR (status = 'running' AND locked_at < NOW() - make_interval(secs => %s))
+            ORDER BY run_after
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        )
+        UPDATE analytics_jobs j
+        SET status = 'running', attempts = j.attempts + 1, locked_at = NOW()
+        FROM claimed, call_logs cl
+        WHERE j.job_id = claimed.job_id AND cl.log_id = j.log_id
+        RETURNING j.job_id, j.log_id, j.agent_type, j.attempts, cl.transcript
+    """
+    return await execute_query(query, (stale_after_seconds, limit))
+
+
+async def complete_analytics_job(job_id: str) -> Optional[Dict]:
+    """Mark an analytics job done"""
+    query = """
+        UPDATE analytics_jobs
+        SET status = 'done', completed_at = NOW(), locked_at = NULL, last_error = NULL
+        WHERE job_id = %s
+        RETURNING job_id
+    """
+    return await execute_update(query, (job_id,))
+
+
+async def fail_analytics_job(job_id: str, error: str, retry_in_seconds: Optional[float]) -> Optional[Dict]:
+    """Record a failed attempt; retry later, or give up when retry_in_seconds is None"""
+    if retry_in_seconds is None:
+        query = """
+            UPDATE analytics_jobs
+            SET status = 'failed', last_error = %s, locked_at = NULL
+            WHERE job_id = %s
+            RETURNING job_id
+        """
+        return await execute_update(query, (error[:2000], job_id))
+
+    query = """
+        UPDATE analytics_jobs
+        SET status = 'pending', last_error = %s, locked_at = NULL,
+            run_after = NOW() + make_interval(secs => %s)
+        WHERE job_id = %s
+        RETURNING job_id
+    """
+    return await execute_update(query, (error[:2000], retry_in_seconds, job_id))
+
+
+async def get_analytics_queue_counts() -> Dict[str, int]:
+    """Number of analytics jobs by status"""
+    rows = await execute_query("SELECT status, COUNT(*) AS count FROM analytics_jobs GROUP BY status")
+    return {row["status"]: row["count"] for row in rows}
 
 
 # ============================================
 # PRACTICE / SETTINGS QUERIES
 # ============================================
 
-def get_practice(practice_id: str = None) -> Optional[Dict]:
+async def get_practice(practice_id: str = None) -> Optional[Dict]:
     """Get practice information"""
     practice_id = practice_id or settings.default_practice_id
 
     query = "SELECT * FROM practices WHERE practice_id = %s"
-    return execute_query_one(query, (practice_id,))
+    return await execute_query_one(query, (practice_id,))
 
 
-def get_office_hours(practice_id: str = None) -> Optional[Dict]:
+async def get_office_hours(practice_id: str = None) -> Optional[Dict]:
     """Get practice office hours"""
-    practice = get_practice(practice_id)
+    practice = await get_practice(practice_id)
     if practice:
         return practice.get("office_hours", {})
     return None
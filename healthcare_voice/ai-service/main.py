@@ -9,7 +9,9 @@ from contextlib import asynccontextmanager
 
 from config import settings
 from routes import voice, chat, patients, appointments, providers
-from db.postgres_client import init_db
+from db.postgres_client import init_db, close_db, get_pool_stats
+from realtime_pool import realtime_pool
+from agents.analytics_worker import analytics_workers
 
 # Configure logging
 logging.basicConfig(
@@ -24,8 +26,13 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     logger.info("Starting Healthcare Voice AI Service...")
     init_db()
+    realtime_pool.start()
+    analytics_workers.start()
     yield
     logger.info("Shutting down Healthcare Voice AI Service...")
+    await analytics_workers.stop()
+    await realtime_pool.stop()
+    close_db()
 
 
 app = FastAPI(
@@ -80,6 +87,18 @@ async def ai_health_check():
     return {"status": "healthy"}
 
 
+@app.get("/ai/health/db")
+async def db_stats():
+    """Connection pool usage and per-query timing"""
+    return get_pool_stats()
+
+
+@app.get("/ai/health/analytics")
+async def analytics_stats():
+    """Post-call analytics queue depth and worker throughput"""
+    return await analytics_workers.snapshot()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,265 @@
+"""Pre-warmed OpenAI Realtime sessions for the voice WebSocket
+
+Opening a Realtime session means a TLS WebSocket handshake, waiting for
+session.created, sending session.update with every tool schema and waiting
+for session.updated. The pool does that ahead of time so a new caller claims
+a configured session instantly. Idle sessions are refilled in the background
+and retired well before OpenAI's server-side session limit.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import websockets
+
+from config import settings
+from stats_utils import summarize
+from agents.definitions.head_agent import get_all_tools, HEAD_AGENT_INSTRUCTIONS
+
+logger = logging.getLogger(__name__)
+
+OPENAI_REALTIME_URL = "wss://api.openai.com/v1/realtime"
+
+
+def _summary(samples) -> Dict[str, float]:
+    return {"count": len(samples), **summarize(samples, digits=1)}
+
+
+class LatencyStats:
+    """Rolling latency samples (ms) by metric name"""
+
+    def __init__(self, sample_size: int = 500):
+        self.sample_size = sample_size
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, name: str, ms: float) -> None:
+        self._samples.setdefault(name, deque(maxlen=self.sample_size)).append(ms)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {name: _summary(samples) for name, samples in self._samples.items()}
+
+
+voice_latency = LatencyStats()
+
+
+def build_session_config() -> Dict[str, Any]:
+    """session.update payload shared by every voice call"""
+    return {
+        "type": "session.update",
+        "session": {
+            "modalities": ["text", "audio"],
+            "instructions": HEAD_AGENT_INSTRUCTIONS,
+            "voice": settings.openai_voice,
+            "input_audio_format": "pcm16",
+            "output_audio_format": "pcm16",
+            "input_audio_transcription": {
+                "model": "whisper-1"
+            },
+            "turn_detection": {
+                "type": "server_vad",
+                "threshold": 0.6,
+                "prefix_padding_ms": 300,
+                "silence_duration_ms": 800
+            },
+            "tools": get_all_tools(),
+            "tool_choice": "auto",
+            "temperature": 0.8
+        }
+    }
+
+
+async def open_realtime_session():
+    """Connect to OpenAI Realtime and wait until the session is configured"""
+    openai_ws_url = f"{OPENAI_REALTIME_URL}?model={settings.openai_model}"
+    headers = {
+        "Authorization": f"Bearer {settings.openai_api_key}",
+        "OpenAI-Beta": "realtime=v1"
+    }
+    timeout = settings.realtime_connect_timeout
+
+    openai_ws = await asyncio.wait_for(
+        websockets.connect(
+            openai_ws_url,
+            extra_headers=headers,
+            ping_interval=20,
+            ping_timeout=20
+        ),
+        timeout=timeout
+    )
+    try:
+        # Wait for session.created
+        session_created = await asyncio.wait_for(openai_ws.recv(), timeout=timeout)
+        logger.debug(f"Session created: {session_created[:200]}")
+
+        await openai_ws.send(json.dumps(build_session_config()))
+
+        # Wait for session.updated
+        while True:
+            data = json.loads(await asyncio.wait_for(openai_ws.recv(), timeout=timeout))
+            if data.get("type") == "session.updated":
+                break
+            if data.get("type") == "error":
+                raise RuntimeError(f"Realtime session.update failed: {data.get('error')}")
+    except BaseException:
+        await openai_ws.close()
+        raise
+    return openai_ws
+
+
+class WarmSession:
+    """A configured Realtime connection waiting for a caller"""
+
+    def __init__(self, ws, setup_ms: float):
+        self.ws = ws
+        self.setup_ms = setup_ms
+        self.created_at = time.monotonic()
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.created_at
+
+    def usable(self, max_age: float) -> bool:
+        return self.ws.open and self.age < max_age
+
+
+class RealtimeSessionPool:
+    """
+    Keeps `size` configured Realtime sessions ready to claim.
+
+    acquire() hands out the oldest live idle session (falling back to a cold
+    connect when the pool is empty) and wakes the refill task. Sessions older
+    than max_age are closed and replaced.
+    """
+
+    def __init__(self, size: int, max_age: float, check_interval: float = 30.0):
+        self.size = size
+        self.max_age = max_age
+        self.check_interval = check_interval
+        self._idle: Deque[WarmSession] = deque()
+        self._warming = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.failures = 0
+        self._setup_ms: Deque[float] = deque(maxlen=200)
+
+    def start(self) -> None:
+        """Start the background refill task (no-op when disabled)"""
+        if self.size <= 0 or not settings.openai_api_key:
+            logger.info("Realtime session pool disabled")
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Realtime session pool started (size={self.size}, max_age={self.max_age:.0f}s)")
+
+    async def stop(self) -> None:
+        """Stop refilling and close idle sessions"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        while self._idle:
+            await self._idle.popleft().ws.close()
+
+    async def acquire(self) -> Tuple[Any, bool]:
+        """Return (openai_ws, was_warm)"""
+        while self._idle:
+            warm = self._idle.popleft()
+            if warm.usable(self.max_age):
+                self.hits += 1
+                self._wakeup.set()
+                return warm.ws, True
+            self.expired += 1
+            asyncio.create_task(warm.ws.close())
+
+        self.misses += 1
+        self._wakeup.set()
+        started = time.perf_counter()
+        openai_ws = await open_realtime_session()
+        self._setup_ms.append((time.perf_counter() - started) * 1000)
+        return openai_ws, False
+
+    @asynccontextmanager
+    async def session(self):
+        """Claim a configured session for one call; it is closed afterwards"""
+        openai_ws, was_warm = await self.acquire()
+        try:
+            yield openai_ws, was_warm
+        finally:
+            await openai_ws.close()
+
+    def _evict_stale(self) -> None:
+        fresh = deque()
+        for warm in self._idle:
+            if warm.usable(self.max_age):
+                fresh.append(warm)
+            else:
+                self.expired += 1
+                asyncio.create_task(warm.ws.close())
+        self._idle = fresh
+
+    async def _warm_one(self) -> None:
+        self._warming += 1
+        started = time.perf_counter()
+        try:
+            openai_ws = await open_realtime_session()
+        finally:
+            self._warming -= 1
+        setup_ms = (time.perf_counter() - started) * 1000
+        self._setup_ms.append(setup_ms)
+        self._idle.append(WarmSession(openai_ws, setup_ms))
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            self._evict_stale()
+            missing = self.size - len(self._idle) - self._warming
+            if missing > 0:
+                results = await asyncio.gather(
+                    *(self._warm_one() for _ in range(missing)),
+                    return_exceptions=True
+                )
+                errors = [r for r in results if isinstance(r, Exception)]
+                if errors:
+                    self.failures += len(errors)
+                    logger.warning(f"Realtime pool refill failed ({len(errors)}): {errors[0]}; retrying in {backoff:.0f}s")
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 60.0)
+                else:
+                    backoff = 1.0
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.check_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "warming": self._warming,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "failures": self.failures,
+            "setup_ms": _summary(self._setup_ms),
+        }
+
+
+realtime_pool = RealtimeSessionPool(
+    size=settings.realtime_pool_size,
+    max_age=settings.realtime_pool_max_age_seconds,
+)
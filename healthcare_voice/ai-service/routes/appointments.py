@@ -69,7 +69,7 @@ async def list_appointments(
     query += " ORDER BY a.scheduled_date, a.scheduled_time LIMIT %s"
     params.append(limit)
 
-    appointments = execute_query(query, tuple(params))
+    appointments = await execute_query(query, tuple(params))
     return {"appointments": appointments, "count": len(appointments)}
 
 
@@ -99,7 +99,7 @@ async def get_todays_appointments(provider_id: Optional[str] = Query(None)):
 
     query += " ORDER BY a.scheduled_time"
 
-    appointments = execute_query(query, tuple(params))
+    appointments = await execute_query(query, tuple(params))
     return {"appointments": appointments, "count": len(appointments)}
 
 
@@ -115,7 +115,7 @@ async def check_availability(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format")
 
-    slots = queries.get_available_slots(provider_id, target_date, duration)
+    slots = await queries.get_available_slots(provider_id, target_date, duration)
 
     return {
         "provider_id": provider_id,
@@ -145,7 +145,7 @@ async def get_appointment(appointment_id: str):
         WHERE a.appointment_id = %s
     """
 
-    appointment = execute_query_one(query, (appointment_id,))
+    appointment = await execute_query_one(query, (appointment_id,))
 
     if not appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
@@ -157,12 +157,12 @@ async def get_appointment(appointment_id: str):
 async def create_appointment(appointment: AppointmentCreate):
     """Create a new appointment"""
     # Verify patient exists
-    patient = queries.get_patient_by_id(appointment.patient_id)
+    patient = await queries.get_patient_by_id(appointment.patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
 
     # Verify provider exists
-    provider = queries.get_provider_by_id(appointment.provider_id)
+    provider = await queries.get_provider_by_id(appointment.provider_id)
     if not provider:
         raise HTTPException(status_code=404, detail="Provider not found")
 
@@ -172,7 +172,7 @@ async def create_appointment(appointment: AppointmentCreate):
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format")
 
-    slots = queries.get_available_slots(
+    slots = await queries.get_available_slots(
         appointment.provider_id,
         target_date,
         appointment.duration
@@ -185,7 +185,7 @@ async def create_appointment(appointment: AppointmentCreate):
         )
 
     # Create appointment
-    new_appt = queries.create_appointment(appointment.model_dump())
+    new_appt = await queries.create_appointment(appointment.model_dump())
     if not new_appt:
         raise HTTPException(status_code=500, detail="Failed to create appointment")
 
@@ -204,7 +204,7 @@ async def reschedule_appointment(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date or time format")
 
-    result = queries.reschedule_appointment(
+    result = await queries.reschedule_appointment(
         appointment_id,
         new_date,
         new_time,
@@ -220,7 +220,7 @@ async def reschedule_appointment(
 @router.put("/{appointment_id}/cancel")
 async def cancel_appointment(appointment_id: str, cancel: AppointmentCancel):
     """Cancel an appointment"""
-    success = queries.cancel_appointment(appointment_id, cancel.reason)
+    success = await queries.cancel_appointment(appointment_id, cancel.reason)
     if not success:
         raise HTTPException(status_code=400, detail="Failed to cancel")
 
@@ -230,7 +230,7 @@ async def cancel_appointment(appointment_id: str, cancel: AppointmentCancel):
 @router.put("/{appointment_id}/confirm")
 async def confirm_appointment(appointment_id: str):
     """Confirm an appointment"""
-    result = queries.update_appointment(appointment_id, {
+    result = await queries.update_appointment(appointment_id, {
         "status": "confirmed",
         "confirmation_sent": True,
         "confirmation_sent_at": datetime.utcnow().isoformat()
@@ -245,7 +245,7 @@ async def confirm_appointment(appointment_id: str):
 @router.put("/{appointment_id}/checkin")
 async def checkin_appointment(appointment_id: str):
     """Check in patient for appointment"""
-    result = queries.update_appointment(appointment_id, {
+    result = await queries.update_appointment(appointment_id, {
         "status": "checked_in",
         "checked_in_at": datetime.utcnow().isoformat()
     })
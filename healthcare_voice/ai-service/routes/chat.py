@@ -10,6 +10,7 @@ import httpx
 from config import settings
 from agents.definitions.head_agent import get_all_tools
 from agents.tools import TOOL_HANDLERS
+from agents.analytics_worker import enqueue_analysis
 from db import queries
 
 logger = logging.getLogger(__name__)
@@ -135,7 +136,7 @@ class ChatSession:
         return f"{reason}{tools_summary}"
 
 
-def create_chat_log_entry(session: ChatSession) -> Optional[str]:
+async def create_chat_log_entry(session: ChatSession) -> Optional[str]:
     """Create a call log entry for chat session"""
     try:
         call_data = {
@@ -147,7 +148,7 @@ def create_chat_log_entry(session: ChatSession) -> Optional[str]:
         }
         if session.patient_id:
             call_data["patient_id"] = session.patient_id
-        result = queries.create_call_log(call_data)
+        result = await queries.create_call_log(call_data)
         if result:
             return result.get("log_id")
         return None
@@ -156,7 +157,7 @@ def create_chat_log_entry(session: ChatSession) -> Optional[str]:
         return None
 
 
-def update_chat_log_entry(session: ChatSession, status: str = "completed"):
+async def update_chat_log_entry(session: ChatSession, status: str = "completed"):
     """Update chat log when session ends"""
     if not session.call_log_id:
         return
@@ -190,7 +191,7 @@ def update_chat_log_entry(session: ChatSession, status: str = "completed"):
         else:
             updates["resolution_status"] = "no_interaction"
 
-        queries.update_call_log(session.call_log_id, updates)
+        await queries.update_call_log(session.call_log_id, updates)
     except Exception as e:
         logger.error(f"Error updating chat log: {e}")
 
@@ -246,7 +247,7 @@ async def chat_websocket(
 
     logger.info(f"Chat WebSocket connected: {session_id}")
 
-    session.call_log_id = create_chat_log_entry(session)
+    session.call_log_id = await create_chat_log_entry(session)
     chat_status = "completed"
 
     try:
@@ -357,13 +358,12 @@ async def chat_websocket(
         logger.error(f"Chat WebSocket error: {e}", exc_info=True)
         chat_status = "failed"
     finally:
-        update_chat_log_entry(session, chat_status)
+        await update_chat_log_entry(session, chat_status)
         logger.info(f"Chat session ended: {session_id}")
 
-        # Run AI analytics on the transcript
+        # Queue AI analytics on the transcript (analyzed by the background workers)
         if session.call_log_id and session.transcript_messages:
             try:
-                from agents.analyze import analyze_session
-                await analyze_session(session.call_log_id, session.get_full_transcript(), "chat")
+                await enqueue_analysis(session.call_log_id, "chat")
             except Exception as e:
-                logger.error(f"Error running chat analytics: {e}")
+                logger.error(f"Error queueing chat analytics: {e}")
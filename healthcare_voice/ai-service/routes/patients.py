@@ -37,14 +37,14 @@ async def list_patients(
         ORDER BY last_name, first_name
         LIMIT %s OFFSET %s
     """
-    patients = execute_query(query, (limit, offset))
+    patients = await execute_query(query, (limit, offset))
     return {"patients": patients, "count": len(patients)}
 
 
 @router.get("/{patient_id}")
 async def get_patient(patient_id: str):
     """Get patient by ID"""
-    patient = queries.get_patient_by_id(patient_id)
+    patient = await queries.get_patient_by_id(patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     return patient
@@ -54,9 +54,9 @@ async def get_patient(patient_id: str):
 async def search_patient(search: PatientSearch):
     """Search for a patient"""
     if search.phone:
-        patient = queries.find_patient_by_phone(search.phone)
+        patient = await queries.find_patient_by_phone(search.phone)
     elif search.first_name and search.last_name and search.date_of_birth:
-        patient = queries.find_patient_by_name_dob(
+        patient = await queries.find_patient_by_name_dob(
             search.first_name,
             search.last_name,
             search.date_of_birth
@@ -77,7 +77,7 @@ async def search_patient(search: PatientSearch):
 async def create_patient(patient: PatientCreate):
     """Create a new patient"""
     # Check if patient exists
-    existing = queries.find_patient_by_name_dob(
+    existing = await queries.find_patient_by_name_dob(
         patient.first_name,
         patient.last_name,
         patient.date_of_birth
@@ -88,7 +88,7 @@ async def create_patient(patient: PatientCreate):
             detail="Patient already exists"
         )
 
-    new_patient = queries.create_patient(patient.model_dump())
+    new_patient = await queries.create_patient(patient.model_dump())
     if not new_patient:
         raise HTTPException(status_code=500, detail="Failed to create patient")
 
@@ -101,20 +101,20 @@ async def get_patient_appointments(
     upcoming_only: bool = Query(True)
 ):
     """Get patient's appointments"""
-    patient = queries.get_patient_by_id(patient_id)
+    patient = await queries.get_patient_by_id(patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
 
-    appointments = queries.get_patient_appointments(patient_id, upcoming_only)
+    appointments = await queries.get_patient_appointments(patient_id, upcoming_only)
     return {"appointments": appointments, "count": len(appointments)}
 
 
 @router.get("/{patient_id}/insurance")
 async def get_patient_insurance(patient_id: str):
     """Get patient's insurance information"""
-    patient = queries.get_patient_by_id(patient_id)
+    patient = await queries.get_patient_by_id(patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
 
-    insurance = queries.get_patient_insurance(patient_id)
+    insurance = await queries.get_patient_insurance(patient_id)
     return {"insurance": insurance, "count": len(insurance)}
@@ -14,7 +14,7 @@ async def list_providers(
     active_only: bool = Query(True)
 ):
     """List all providers"""
-    providers = queries.get_all_providers(active_only=active_only)
+    providers = await queries.get_all_providers(active_only=active_only)
 
     if specialization:
         providers = [
@@ -51,12 +51,12 @@ async def list_providers(
 @router.get("/{provider_id}")
 async def get_provider(provider_id: str):
     """Get provider by ID with schedule"""
-    provider = queries.get_provider_by_id(provider_id)
+    provider = await queries.get_provider_by_id(provider_id)
     if not provider:
         raise HTTPException(status_code=404, detail="Provider not found")
 
     # Fetch schedule separately from provider_schedules table
-    schedules = queries.get_provider_schedule(provider_id)
+    schedules = await queries.get_provider_schedule(provider_id)
     day_names = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
 
     schedule_formatted = []
@@ -98,7 +98,7 @@ async def get_provider(provider_id: str):
 @router.get("/{provider_id}/schedule")
 async def get_provider_schedule(provider_id: str):
     """Get provider's weekly schedule"""
-    schedule = queries.get_provider_schedule(provider_id)
+    schedule = await queries.get_provider_schedule(provider_id)
     if not schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
 
@@ -132,7 +132,7 @@ async def get_provider_time_off(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format")
 
-    time_off = queries.get_provider_time_off(provider_id, start, end)
+    time_off = await queries.get_provider_time_off(provider_id, start, end)
 
     return {"time_off": time_off, "count": len(time_off)}
 
@@ -167,14 +167,14 @@ async def get_provider_appointments(
 
     query += " ORDER BY a.scheduled_date, a.scheduled_time"
 
-    appointments = execute_query(query, tuple(params))
+    appointments = await execute_query(query, tuple(params))
     return {"appointments": appointments, "count": len(appointments)}
 
 
 @router.get("/search/name")
 async def search_provider_by_name(name: str = Query(..., min_length=2)):
     """Search provider by name"""
-    provider = queries.get_provider_by_name(name)
+    provider = await queries.get_provider_by_name(name)
     if not provider:
         raise HTTPException(status_code=404, detail="Provider not found")
 
@@ -2,22 +2,20 @@
 import json
 import logging
 import asyncio
+import time
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
-import websockets
 
-from config import settings
-from agents.definitions.head_agent import get_all_tools, HEAD_AGENT_INSTRUCTIONS
+from agents.definitions.head_agent import get_all_tools
 from agents.tools import TOOL_HANDLERS
+from agents.analytics_worker import enqueue_analysis
 from db import queries
+from realtime_pool import realtime_pool, voice_latency
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-OPENAI_REALTIME_URL = "wss://api.openai.com/v1/realtime"
-
-
 class VoiceSession:
     """Session state for a voice call with call logging"""
     def __init__(self, session_id: str, patient_id: Optional[str] = None):
@@ -66,7 +64,7 @@ class VoiceSession:
         return f"{reason}{tools_summary}"
 
 
-def create_call_log_entry(session: VoiceSession) -> Optional[str]:
+async def create_call_log_entry(session: VoiceSession) -> Optional[str]:
     """Create a call log entry when session starts"""
     try:
         call_data = {
@@ -80,7 +78,7 @@ def create_call_log_entry(session: VoiceSession) -> Optional[str]:
         if session.patient_id:
             call_data["patient_id"] = session.patient_id
 
-        result = queries.create_call_log(call_data)
+        result = await queries.create_call_log(call_data)
         if result:
             logger.info(f"Created call log: {result.get('log_id')}")
             return result.get("log_id")
@@ -92,7 +90,7 @@ def create_call_log_entry(session: VoiceSession) -> Optional[str]:
         return None
 
 
-def update_call_log_entry(session: VoiceSession, status: str = "completed"):
+async def update_call_log_entry(session: VoiceSession, status: str = "completed"):
     """Update call log when session ends"""
     if not session.call_log_id:
         logger.warning("No call log ID to update")
@@ -140,7 +138,7 @@ def update_call_log_entry(session: VoiceSession, status: str = "completed"):
         else:
             updates["resolution_status"] = "no_interaction"
 
-        result = queries.update_call_log(session.call_log_id, updates)
+        result = await queries.update_call_log(session.call_log_id, updates)
         if result:
             logger.info(f"Updated call log {session.call_log_id}: status={status}, duration={duration}s")
         else:
@@ -187,72 +185,25 @@ async def voice_websocket(
 
     logger.info(f"Voice WebSocket connected: {session_id}")
 
-    # Create call log entry
-    session.call_log_id = create_call_log_entry(session)
+    # Create the call log row while the Realtime session is claimed
+    call_log_task = asyncio.create_task(create_call_log_entry(session))
 
     call_status = "completed"  # Default status
+    accepted_at = time.perf_counter()
 
     try:
-        # Connect to OpenAI Realtime API
-        openai_ws_url = f"{OPENAI_REALTIME_URL}?model={settings.openai_model}"
-        headers = {
-            "Authorization": f"Bearer {settings.openai_api_key}",
-            "OpenAI-Beta": "realtime=v1"
-        }
-
-        logger.info(f"Connecting to OpenAI: {openai_ws_url}")
-
-        async with websockets.connect(
-            openai_ws_url,
-            extra_headers=headers,
-            ping_interval=20,
-            ping_timeout=20
-        ) as openai_ws:
-            logger.info(f"Connected to OpenAI Realtime API")
-
-            # Wait for session.created
-            session_created = await openai_ws.recv()
-            logger.info(f"Session created: {session_created[:200]}")
-
-            # Get all tools for the session
-            all_tools = get_all_tools()
-            logger.info(f"Configured {len(all_tools)} tools for the session")
-
-            # Configure the session with tools
-            session_config = {
-                "type": "session.update",
-                "session": {
-                    "modalities": ["text", "audio"],
-                    "instructions": HEAD_AGENT_INSTRUCTIONS,
-                    "voice": settings.openai_voice,
-                    "input_audio_format": "pcm16",
-                    "output_audio_format": "pcm16",
-                    "input_audio_transcription": {
-                        "model": "whisper-1"
-                    },
-                    "turn_detection": {
-                        "type": "server_vad",
-                        "threshold": 0.6,
-                        "prefix_padding_ms": 300,
-                        "silence_duration_ms": 800
-                    },
-                    "tools": all_tools,
-                    "tool_choice": "auto",
-                    "temperature": 0.8
-                }
-            }
-
-            await openai_ws.send(json.dumps(session_config))
-            logger.info("Session config with tools sent")
-
-            # Wait for session.updated
-            session_updated = await openai_ws.recv()
-            logger.info(f"Session updated: {session_updated[:200]}")
+        # Claim a pre-configured OpenAI Realtime session (cold connect if the pool is empty)
+        async with realtime_pool.session() as (openai_ws, was_warm):
+            ready_ms = (time.perf_counter() - accepted_at) * 1000
+            voice_latency.record("session_ready_warm_ms" if was_warm else "session_ready_cold_ms", ready_ms)
+            logger.info(f"OpenAI session ready for {session_id} in {ready_ms:.0f}ms ({'warm' if was_warm else 'cold'})")
 
             # Notify browser that OpenAI session is ready
             await websocket.send_json({"type": "ready"})
             logger.info("Sent ready message to browser")
 
+            session.call_log_id = await call_log_task
+
             # Wait for browser to finish audio setup before greeting
             logger.info("Waiting for browser audio setup...")
             while True:
@@ -275,6 +226,8 @@ async def voice_websocket(
                 }
             }
             await openai_ws.send(json.dumps(initial_greeting))
+            greeting_sent_at = time.perf_counter()
+            first_audio_sent = False
             logger.info("Triggered proactive greeting")
 
             # Create tasks for bidirectional communication
@@ -318,7 +271,7 @@ async def voice_websocket(
 
             async def openai_to_browser():
                 """Relay responses from OpenAI to browser and handle tool calls"""
-                nonlocal pending_tool_calls, current_response_item_id, current_audio_content_index
+                nonlocal pending_tool_calls, current_response_item_id, current_audio_content_index, first_audio_sent
                 try:
                     async for message in openai_ws:
                         data = json.loads(message)
@@ -339,6 +292,13 @@ async def voice_websocket(
                                 "type": "audio",
                                 "audio": data.get("delta")
                             })
+                            if not first_audio_sent:
+                                first_audio_sent = True
+                                now = time.perf_counter()
+                                ttfa_ms = (now - accepted_at) * 1000
+                                voice_latency.record("time_to_first_audio_ms", ttfa_ms)
+                                voice_latency.record("greeting_to_first_audio_ms", (now - greeting_sent_at) * 1000)
+                                logger.info(f"Time to first audio for {session_id}: {ttfa_ms:.0f}ms")
 
                         elif event_type == "response.audio_transcript.delta":
                             await websocket.send_json({
@@ -471,19 +431,26 @@ async def voice_websocket(
         logger.error(f"Voice WebSocket error: {e}", exc_info=True)
         call_status = "failed"
     finally:
+        if session.call_log_id is None:
+            session.call_log_id = await call_log_task
+
         # Update call log with final status
-        update_call_log_entry(session, call_status)
+        await update_call_log_entry(session, call_status)
         logger.info(f"Voice session ended: {session_id}, status: {call_status}")
 
-        # Run AI analytics on the transcript
+        # Queue AI analytics on the transcript (analyzed by the background workers)
         if session.call_log_id and session.transcript_messages:
             try:
-                from agents.analyze import analyze_session
-                await analyze_session(session.call_log_id, session.get_full_transcript(), "voice")
+                await enqueue_analysis(session.call_log_id, "voice")
             except Exception as e:
-                logger.error(f"Error running session analytics: {e}")
+                logger.error(f"Error queueing session analytics: {e}")
 
 
 @router.get("/health")
 async def health():
-    return {"status": "healthy", "tools_loaded": len(get_all_tools())}
+    return {
+        "status": "healthy",
+        "tools_loaded": len(get_all_tools()),
+        "realtime_pool": realtime_pool.snapshot(),
+        "latency_ms": voice_latency.snapshot(),
+    }
@@ -181,6 +181,8 @@ CREATE TABLE provider_schedules (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+CREATE INDEX idx_provider_schedules_provider ON provider_schedules(provider_id, day_of_week);
+
 -- Provider Time Off
 CREATE TABLE provider_time_off (
     time_off_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -191,6 +193,8 @@ CREATE TABLE provider_time_off (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+CREATE INDEX idx_provider_time_off_provider ON provider_time_off(provider_id, end_date);
+
 -- Patients
 CREATE TABLE patients (
     patient_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -538,6 +542,22 @@ CREATE INDEX idx_call_logs_phone ON call_logs(phone_from);
 CREATE INDEX idx_call_logs_patient ON call_logs(patient_id);
 CREATE INDEX idx_call_logs_session ON call_logs(session_id);
 
+-- Post-call analytics queue (drained by the AI service analytics workers)
+CREATE TABLE analytics_jobs (
+    job_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    log_id UUID NOT NULL UNIQUE REFERENCES call_logs(log_id) ON DELETE CASCADE,
+    agent_type VARCHAR(50),
+    status VARCHAR(20) NOT NULL DEFAULT 'pending', -- pending, running, done, failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    run_after TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    locked_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    completed_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX idx_analytics_jobs_ready ON analytics_jobs(status, run_after);
+
 -- AI Agent Interactions (For tracking multi-agent handoffs)
 CREATE TABLE agent_interactions (
     interaction_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -702,6 +722,7 @@ ALTER TABLE prescriptions ENABLE ROW LEVEL SECURITY;
 ALTER TABLE invoices ENABLE ROW LEVEL SECURITY;
 ALTER TABLE payments ENABLE ROW LEVEL SECURITY;
 ALTER TABLE call_logs ENABLE ROW LEVEL SECURITY;
+ALTER TABLE analytics_jobs ENABLE ROW LEVEL SECURITY;
 ALTER TABLE agent_interactions ENABLE ROW LEVEL SECURITY;
 ALTER TABLE system_settings ENABLE ROW LEVEL SECURITY;
 ALTER TABLE users ENABLE ROW LEVEL SECURITY;
@@ -730,6 +751,7 @@ CREATE POLICY service_role_prescriptions ON prescriptions FOR ALL TO service_rol
 CREATE POLICY service_role_invoices ON invoices FOR ALL TO service_role USING (true) WITH CHECK (true);
 CREATE POLICY service_role_payments ON payments FOR ALL TO service_role USING (true) WITH CHECK (true);
 CREATE POLICY service_role_call_logs ON call_logs FOR ALL TO service_role USING (true) WITH CHECK (true);
+CREATE POLICY service_role_analytics_jobs ON analytics_jobs FOR ALL TO service_role USING (true) WITH CHECK (true);
 CREATE POLICY service_role_agent_interactions ON agent_interactions FOR ALL TO service_role USING (true) WITH CHECK (true);
 CREATE POLICY service_role_system_settings ON system_settings FOR ALL TO service_role USING (true) WITH CHECK (true);
 CREATE POLICY service_role_users ON users FOR ALL TO service_role USING (true) WITH CHECK (true);
@@ -3,11 +3,12 @@ import json
 from typing import Optional
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
-from quiz_agents.processor import process_import
+from quiz_agents.processor import iter_import_batches
 
 load_dotenv()
 
@@ -34,6 +35,7 @@ supabase: Client = create_client(supabase_url, supabase_key)
 
 class ProcessImportRequest(BaseModel):
     importId: str
+    stream: bool = False  # stream NDJSON batch events instead of a single response
 
 
 class ProcessImportResponse(BaseModel):
@@ -47,90 +49,163 @@ async def health_check():
     return {"status": "ok", "service": "quiz-ai"}
 
 
+def _mark_import_failed(import_id: str, error: str) -> None:
+    supabase.table("imports").update({
+        "status": "failed",
+        "result_summary": {"error": error}
+    }).eq("id", import_id).execute()
+
+
+def _load_import(import_id: str):
+    """Fetch the import record and its file, or raise HTTPException."""
+    result = supabase.table("imports").select("*").eq("id", import_id).single().execute()
+
+    if not result.data:
+        raise HTTPException(status_code=404, detail="Import not found")
+
+    import_record = result.data
+
+    if import_record["status"] not in ["queued", "processing"]:
+        raise HTTPException(status_code=400, detail="Import already processed")
+
+    # Download file from storage
+    file_data = supabase.storage.from_("quiz-imports").download(import_record["file_path"])
+
+    if not file_data:
+        raise HTTPException(status_code=404, detail="File not found in storage")
+
+    return import_record, file_data
+
+
+def _ensure_quiz(import_id: str, import_record: dict) -> str:
+    quiz_id = import_record.get("quiz_id")
+    if quiz_id:
+        return quiz_id
+
+    # Create a new quiz if not specified
+    quiz_result = supabase.table("quizzes").insert({
+        "title": f"Imported Quiz {import_id[:8]}",
+        "description": "Automatically generated from import",
+        "is_active": False,
+        "created_by": import_record["uploaded_by"]
+    }).execute()
+    quiz_id = quiz_result.data[0]["id"]
+
+    # Update import with quiz_id
+    supabase.table("imports").update({"quiz_id": quiz_id}).eq("id", import_id).execute()
+    import_record["quiz_id"] = quiz_id
+    return quiz_id
+
+
+def _insert_questions(quiz_id: str, import_record: dict, questions: list) -> None:
+    questions_to_insert = [
+        {
+            "quiz_id": quiz_id,
+            "qtype": q["qtype"],
+            "prompt": q["prompt"],
+            "options": q["options"],
+            "correct": q["correct"],
+            "explanation": q.get("explanation"),
+            "tags": q.get("tags"),
+            "created_by": import_record["uploaded_by"]
+        }
+        for q in questions
+    ]
+
+    if questions_to_insert:
+        supabase.table("questions").insert(questions_to_insert).execute()
+
+
+async def _run_import(import_id: str, import_record: dict, file_data: bytes):
+    """
+    Extract questions chunk by chunk, inserting each batch as it finishes.
+
+    Yields one event per chunk and a final "done" event; raises if no chunk
+    succeeded.
+    """
+    created = 0
+    failed_chunks = 0
+    total_chunks = 0
+    quiz_id = import_record.get("quiz_id")
+
+    async for batch in iter_import_batches(file_data, import_record["file_type"]):
+        total_chunks = batch["total_chunks"]
+        if "error" in batch:
+            failed_chunks += 1
+            yield {"type": "chunk_failed", **batch}
+            continue
+
+        questions = batch["questions"]
+        if questions:
+            quiz_id = _ensure_quiz(import_id, import_record)
+            _insert_questions(quiz_id, import_record, questions)
+            created += len(questions)
+        yield {"type": "batch", "questionsCreated": created, **batch}
+
+    if failed_chunks and failed_chunks == total_chunks:
+        raise RuntimeError(f"Extraction failed for all {total_chunks} chunk(s)")
+
+    # Update import status
+    supabase.table("imports").update({
+        "status": "done",
+        "result_summary": {
+            "questions_created": created,
+            "quiz_id": quiz_id,
+            "chunks": total_chunks,
+            "failed_chunks": failed_chunks
+        }
+    }).eq("id", import_id).execute()
+
+    yield {
+        "type": "done",
+        "success": True,
+        "questionsCreated": created,
+        "message": f"Successfully created {created} questions"
+    }
+
+
+async def _stream_import(import_id: str, import_record: dict, file_data: bytes):
+    try:
+        async for event in _run_import(import_id, import_record, file_data):
+            yield json.dumps(event) + "\n"
+    except Exception as e:
+        _mark_import_failed(import_id, str(e))
+        yield json.dumps({"type": "error", "success": False, "message": str(e)}) + "\n"
+
+
 @app.post("/ai/imports/process", response_model=ProcessImportResponse)
 async def process_import_endpoint(request: ProcessImportRequest):
-    """Process an uploaded CSV/PDF file and convert it to quiz questions."""
+    """
+    Process an uploaded CSV/PDF file and convert it to quiz questions.
+
+    The document is extracted in chunks and questions are inserted as each
+    chunk finishes. With stream=true the response is NDJSON: one "batch"
+    (or "chunk_failed") event per chunk, then "done" or "error".
+    """
     try:
-        # Get import record
-        result = supabase.table("imports").select("*").eq("id", request.importId).single().execute()
-
-        if not result.data:
-            raise HTTPException(status_code=404, detail="Import not found")
-
-        import_record = result.data
-
-        if import_record["status"] not in ["queued", "processing"]:
-            raise HTTPException(status_code=400, detail="Import already processed")
-
-        # Download file from storage
-        file_path = import_record["file_path"]
-        file_type = import_record["file_type"]
-
-        file_data = supabase.storage.from_("quiz-imports").download(file_path)
-
-        if not file_data:
-            raise HTTPException(status_code=404, detail="File not found in storage")
-
-        # Process with AI agents
-        questions = await process_import(file_data, file_type)
-
-        # Insert questions into database
-        quiz_id = import_record.get("quiz_id")
-
-        if not quiz_id:
-            # Create a new quiz if not specified
-            quiz_result = supabase.table("quizzes").insert({
-                "title": f"Imported Quiz {request.importId[:8]}",
-                "description": "Automatically generated from import",
-                "is_active": False,
-                "created_by": import_record["uploaded_by"]
-            }).execute()
-            quiz_id = quiz_result.data[0]["id"]
-
-            # Update import with quiz_id
-            supabase.table("imports").update({"quiz_id": quiz_id}).eq("id", request.importId).execute()
-
-        # Insert questions
-        questions_to_insert = [
-            {
-                "quiz_id": quiz_id,
-                "qtype": q["qtype"],
-                "prompt": q["prompt"],
-                "options": q["options"],
-                "correct": q["correct"],
-                "explanation": q.get("explanation"),
-                "tags": q.get("tags"),
-                "created_by": import_record["uploaded_by"]
-            }
-            for q in questions
-        ]
-
-        if questions_to_insert:
-            supabase.table("questions").insert(questions_to_insert).execute()
-
-        # Update import status
-        supabase.table("imports").update({
-            "status": "done",
-            "result_summary": {
-                "questions_created": len(questions),
-                "quiz_id": quiz_id
-            }
-        }).eq("id", request.importId).execute()
+        import_record, file_data = _load_import(request.importId)
+
+        if request.stream:
+            return StreamingResponse(
+                _stream_import(request.importId, import_record, file_data),
+                media_type="application/x-ndjson"
+            )
+
+        final = None
+        async for event in _run_import(request.importId, import_record, file_data):
+            final = event
 
         return ProcessImportResponse(
             success=True,
-            questionsCreated=len(questions),
-            message=f"Successfully created {len(questions)} questions"
+            questionsCreated=final["questionsCreated"],
+            message=final["message"]
         )
 
     except HTTPException:
         raise
     except Exception as e:
         # Update import status to failed
-        supabase.table("imports").update({
-            "status": "failed",
-            "result_summary": {"error": str(e)}
-        }).eq("id", request.importId).execute()
+        _mark_import_failed(request.importId, str(e))
 
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -0,0 +1,207 @@
+"""Deterministic CSV import
+
+Spreadsheets exported with a recognizable header (prompt, option_a..option_f
+or a delimited options column, correct, explanation, tags) are mapped to
+questions directly; only rows that cannot be parsed go to the extraction
+agent.
+"""
+import csv
+import io
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Header aliases, compared after normalization (lowercase, spaces/hyphens -> "_")
+PROMPT_COLUMNS = ("prompt", "question", "question_text", "questiontext", "stem", "text")
+OPTIONS_COLUMNS = ("options", "choices")
+CORRECT_COLUMNS = (
+    "correct", "correct_answer", "correct_answers", "answer", "answers",
+    "correct_option", "correct_options", "key",
+)
+EXPLANATION_COLUMNS = ("explanation", "rationale", "feedback")
+TAG_COLUMNS = ("tags", "tag", "category", "categories", "topic", "topics")
+
+# option_a .. option_f, choice_b, opt_3, "Option C", plain "a" .. "f"
+OPTION_COLUMN = re.compile(r"^(?:option|choice|opt)?_?([a-f]|[1-6])$")
+
+
+@dataclass
+class CsvSchema:
+    """Which CSV columns hold each part of a question."""
+    prompt: str
+    correct: str
+    option_columns: List[str] = field(default_factory=list)
+    options_column: Optional[str] = None
+    explanation: Optional[str] = None
+    tags: Optional[str] = None
+
+
+def _norm_header(header: str) -> str:
+    return re.sub(r"[\s\-]+", "_", (header or "").strip().lower())
+
+
+def detect_schema(headers: List[str]) -> Optional[CsvSchema]:
+    """Map CSV headers to question fields, or None if the layout is not recognized."""
+    normalized = {_norm_header(h): h for h in headers if h}
+
+    def pick(aliases) -> Optional[str]:
+        for alias in aliases:
+            if alias in normalized:
+                return normalized[alias]
+        return None
+
+    prompt = pick(PROMPT_COLUMNS)
+    correct = pick(CORRECT_COLUMNS)
+    if not prompt or not correct:
+        return None
+
+    lettered = []
+    for norm, original in normalized.items():
+        match = OPTION_COLUMN.match(norm)
+        if match:
+            key = match.group(1)
+            index = ord(key) - ord("a") if key.isalpha() else int(key) - 1
+            lettered.append((index, original))
+    lettered.sort()
+    # Letters in the correct column only line up with a contiguous a, b, c... run
+    if [index for index, _ in lettered] != list(range(len(lettered))):
+        lettered = []
+
+    options_column = pick(OPTIONS_COLUMNS)
+    if len(lettered) < 2 and not options_column:
+        return None
+
+    return CsvSchema(
+        prompt=prompt,
+        correct=correct,
+        option_columns=[original for _, original in lettered],
+        options_column=options_column if len(lettered) < 2 else None,
+        explanation=pick(EXPLANATION_COLUMNS),
+        tags=pick(TAG_COLUMNS),
+    )
+
+
+def _split_list(value: str) -> List[str]:
+    for delimiter in ("|", ";", "\n"):
+        if delimiter in value:
+            return [part.strip() for part in value.split(delimiter) if part.strip()]
+    return [value.strip()] if value.strip() else []
+
+
+def _correct_by_position(value: str, options: List[str]) -> Optional[List[int]]:
+    """Letters ("B", "a, c") or numbers (1-based unless a 0 appears)."""
+    tokens = [t.strip("().").lower() for t in re.split(r"[,;|/\s]+", value) if t.strip("().")]
+    if tokens and all(len(t) == 1 and "a" <= t <= "f" for t in tokens):
+        indices = [ord(t) - ord("a") for t in tokens]
+    elif tokens and all(t.isdigit() for t in tokens):
+        numbers = [int(t) for t in tokens]
+        base = 0 if 0 in numbers else 1
+        indices = [n - base for n in numbers]
+    else:
+        return None
+    if any(i < 0 or i >= len(options) for i in indices):
+        return None
+    return sorted(set(indices))
+
+
+def _correct_by_text(value: str, options: List[str]) -> Optional[List[int]]:
+    """The option text itself ("Paris", "Red | Blue")."""
+    lowered = [o.lower() for o in options]
+    if value.lower() in lowered:
+        return [lowered.index(value.lower())]
+    parts = [p.lower() for p in _split_list(value)]
+    if not parts or any(p not in lowered for p in parts):
+        return None
+    return sorted(set(lowered.index(p) for p in parts))
+
+
+def parse_correct(value: str, options: List[str], positional: bool = False) -> Optional[List[int]]:
+    """
+    Resolve a correct-answer cell to 0-based option indices.
+
+    Accepts letters ("B", "a, c"), numbers (1-based unless a 0 appears) or
+    the option text itself ("Paris", "Red | Blue"). With lettered option
+    columns (positional) the letter/number reading wins and text is only a
+    fallback. Otherwise a cell that reads as both and disagrees (options
+    "10", "20", "1" with answer "1") is ambiguous and returns None.
+    """
+    value = (value or "").strip()
+    if not value:
+        return None
+
+    by_position = _correct_by_position(value, options)
+    if positional and by_position:
+        return by_position
+
+    by_text = _correct_by_text(value, options)
+    if by_text and by_position and by_text != by_position:
+        return None
+    return by_text or by_position
+
+
+def parse_row(row: Dict[str, str], schema: CsvSchema) -> Optional[dict]:
+    """Map one CSV row to question fields, or None if it cannot be parsed deterministically."""
+    prompt = (row.get(schema.prompt) or "").strip()
+    if not prompt:
+        return None
+
+    if schema.option_columns:
+        options = [(row.get(column) or "").strip() for column in schema.option_columns]
+        while options and not options[-1]:
+            options.pop()
+        # A gap would shift the letters the correct column refers to
+        if any(not option for option in options):
+            return None
+    else:
+        options = _split_list(row.get(schema.options_column) or "")
+
+    if not 2 <= len(options) <= 6:
+        return None
+
+    correct = parse_correct(row.get(schema.correct) or "", options, positional=bool(schema.option_columns))
+    if not correct:
+        return None
+
+    explanation = (row.get(schema.explanation) or "").strip() if schema.explanation else ""
+    tags = [t.strip() for t in re.split(r"[,;|]", row.get(schema.tags) or "") if t.strip()] if schema.tags else []
+
+    return {
+        "prompt": prompt,
+        "qtype": "multi" if len(correct) > 1 else "single",
+        "options": options,
+        "correct": correct,
+        "explanation": explanation or None,
+        "tags": tags or None,
+    }
+
+
+def read_csv_rows(file_data: bytes) -> Tuple[List[str], List[Dict[str, str]]]:
+    """Decode a CSV upload (BOM tolerant) into its header and rows."""
+    content = file_data.decode("utf-8-sig")
+    reader = csv.DictReader(io.StringIO(content))
+    rows = list(reader)
+    return list(reader.fieldnames or []), rows
+
+
+def parse_csv_questions(
+    headers: List[str],
+    rows: List[Dict[str, str]],
+) -> Optional[Tuple[List[dict], List[Dict[str, str]]]]:
+    """
+    Parse rows with a detected schema.
+
+    Returns (parsed question dicts, rows that need the LLM), or None when the
+    header layout is not recognized at all.
+    """
+    schema = detect_schema(headers)
+    if schema is None:
+        return None
+
+    parsed, failed = [], []
+    for row in rows:
+        question = parse_row(row, schema)
+        if question is None:
+            failed.append(row)
+        else:
+            parsed.append(question)
+    return parsed, failed
@@ -1,10 +1,14 @@
 import os
-import csv
+import re
 import io
-from typing import List, Literal, Optional
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, List, Literal, Optional, Tuple
 from pydantic import BaseModel, Field
 from agents import Agent, Runner
 
+from .csv_import import parse_csv_questions, read_csv_rows
+
 # Try to import PyPDF2
 try:
     from PyPDF2 import PdfReader
@@ -12,6 +16,8 @@ try:
 except ImportError:
     HAS_PDF = False
 
+logger = logging.getLogger(__name__)
+
 
 class Question(BaseModel):
     """A single quiz question."""
@@ -44,16 +50,8 @@ def extract_text_from_pdf(file_data: bytes) -> str:
     return "\n\n".join(text_parts)
 
 
-def parse_csv(file_data: bytes) -> str:
-    """Parse CSV and return as structured text."""
-    content = file_data.decode("utf-8")
-    reader = csv.DictReader(io.StringIO(content))
-
-    rows = list(reader)
-    if not rows:
-        return ""
-
-    # Convert to text format for the AI to process
+def rows_to_text(rows: List[Dict[str, str]]) -> str:
+    """Convert CSV rows to structured text for the AI to process."""
     text_parts = []
     for i, row in enumerate(rows, 1):
         text_parts.append(f"Question {i}:")
@@ -65,6 +63,14 @@ def parse_csv(file_data: bytes) -> str:
     return "\n".join(text_parts)
 
 
+def parse_csv(file_data: bytes) -> str:
+    """Parse CSV and return as structured text."""
+    _, rows = read_csv_rows(file_data)
+    if not rows:
+        return ""
+    return rows_to_text(rows)
+
+
 # Create the quiz extraction agent
 extractor_agent = Agent(
     name="QuizExtractor",
@@ -93,31 +99,11 @@ If the content doesn't contain valid quiz questions, return an empty questions a
 )
 
 
-async def process_import(file_data: bytes, file_type: str) -> List[dict]:
-    """Process imported file and return quiz questions."""
-
-    # Extract text based on file type
-    if file_type == "pdf":
-        text_content = extract_text_from_pdf(file_data)
-    elif file_type == "csv":
-        text_content = parse_csv(file_data)
-    else:
-        raise ValueError(f"Unsupported file type: {file_type}")
-
-    if not text_content.strip():
-        raise ValueError("No content found in file")
-
-    # Run the extraction agent
-    result = await Runner.run(
-        extractor_agent,
-        f"Extract quiz questions from the following content:\n\n{text_content}"
-    )
-
-    # Validate and clean the output
-    quiz_import: QuizImport = result.final_output
+def validate_questions(questions: List[Question]) -> List[dict]:
+    """Apply the import rules to extracted questions and return clean dicts."""
     validated_questions = []
 
-    for q in quiz_import.questions:
+    for q in questions:
         # Validate options
         if len(q.options) < 2:
             continue
@@ -143,3 +129,191 @@ async def process_import(file_data: bytes, file_type: str) -> List[dict]:
         })
 
     return validated_questions
+
+
+# Chunked extraction settings
+CHUNK_MAX_CHARS = int(os.getenv("QUIZ_CHUNK_MAX_CHARS", "12000"))
+EXTRACT_CONCURRENCY = int(os.getenv("QUIZ_EXTRACT_CONCURRENCY", "4"))
+
+# Lines that start a new question: "12.", "12)", "Q12:", "Question 12:" ...
+QUESTION_START = re.compile(r"^[ \t]*(?:Q(?:uestion)?[ \t]*)?\d{1,4}[ \t]*[.):][ \t]*", re.IGNORECASE | re.MULTILINE)
+
+
+def _split_segments(text: str) -> List[str]:
+    """Split text into question-sized segments (paragraphs if no numbering is found)."""
+    starts = [m.start() for m in QUESTION_START.finditer(text)]
+    if len(starts) < 2:
+        return [p for p in re.split(r"\n\s*\n", text) if p.strip()]
+    if starts[0] != 0:
+        starts.insert(0, 0)
+    starts.append(len(text))
+    return [text[a:b] for a, b in zip(starts, starts[1:]) if text[a:b].strip()]
+
+
+def split_into_chunks(text: str, max_chars: int = CHUNK_MAX_CHARS) -> List[str]:
+    """
+    Split document text into chunks at question boundaries.
+
+    Each chunk repeats the last segment of the previous one, so a question cut
+    by a missed boundary is still seen whole; the duplicates are removed by
+    dedupe_key. Segments longer than max_chars are split on line breaks.
+    """
+    segments = []
+    for segment in _split_segments(text):
+        while len(segment) > max_chars:
+            cut = segment.rfind("\n", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            segments.append(segment[:cut])
+            segment = segment[cut:]
+        segments.append(segment)
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for segment in segments:
+        if current and size + len(segment) > max_chars:
+            chunks.append("".join(current))
+            overlap = current[-1] if len(current) > 1 else None
+            current = [overlap] if overlap and len(overlap) + len(segment) <= max_chars else []
+            size = sum(len(s) for s in current)
+        current.append(segment)
+        size += len(segment)
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def dedupe_key(question: dict) -> tuple:
+    """Identity of a question for de-duplication across overlapping chunks."""
+    def norm(value: str) -> str:
+        return re.sub(r"\s+", " ", value).strip().lower()
+
+    prompt = QUESTION_START.sub("", norm(question["prompt"]), count=1)
+    return prompt, tuple(sorted(norm(o) for o in question["options"]))
+
+
+async def extract_questions(text_content: str) -> List[dict]:
+    """Run the extraction agent on one piece of text and validate the output."""
+    result = await Runner.run(
+        extractor_agent,
+        f"Extract quiz questions from the following content:\n\n{text_content}"
+    )
+    quiz_import: QuizImport = result.final_output
+    return validate_questions(quiz_import.questions)
+
+
+def import_csv_questions(file_data: bytes) -> Optional[Tuple[List[dict], str]]:
+    """
+    Map CSV rows straight to questions when the header layout is recognized.
+
+    Returns (validated questions, text of the rows that still need the
+    extraction agent), or None when the layout is unknown and the whole file
+    should go through extraction.
+    """
+    headers, rows = read_csv_rows(file_data)
+    parsed = parse_csv_questions(headers, rows)
+    if parsed is None:
+        return None
+
+    parsed_rows, failed_rows = parsed
+    questions = validate_questions([Question(**row) for row in parsed_rows])
+    logger.info(f"CSV fast path: {len(questions)} of {len(rows)} row(s) parsed, {len(failed_rows)} left for extraction")
+    return questions, rows_to_text(failed_rows) if failed_rows else ""
+
+
+def load_import_text(file_data: bytes, file_type: str) -> str:
+    """Extract the text to import based on file type."""
+    if file_type == "pdf":
+        text_content = extract_text_from_pdf(file_data)
+    elif file_type == "csv":
+        text_content = parse_csv(file_data)
+    else:
+        raise ValueError(f"Unsupported file type: {file_type}")
+
+    if not text_content.strip():
+        raise ValueError("No content found in file")
+    return text_content
+
+
+async def iter_import_batches(
+    file_data: bytes,
+    file_type: str,
+    concurrency: int = EXTRACT_CONCURRENCY,
+) -> AsyncIterator[dict]:
+    """
+    Extract questions chunk by chunk, yielding batches as chunks finish.
+
+    Yields {"chunk", "total_chunks", "questions"} for each finished chunk
+    (questions already seen in another chunk are dropped) and
+    {"chunk", "total_chunks", "error"} for a chunk that failed, so one bad
+    chunk does not fail the whole import. For a recognized CSV layout, chunk 1
+    holds the rows parsed without the model.
+    """
+    seen = set()
+
+    def new_questions(questions: List[dict]) -> List[dict]:
+        batch = []
+        for q in questions:
+            key = dedupe_key(q)
+            if key not in seen:
+                seen.add(key)
+                batch.append(q)
+        return batch
+
+    # Recognized CSV layouts skip the model except for rows that did not parse
+    fast = import_csv_questions(file_data) if file_type == "csv" else None
+    if fast is not None:
+        parsed, leftover_text = fast
+        chunks = split_into_chunks(leftover_text) if leftover_text.strip() else []
+        if not parsed and not chunks:
+            raise ValueError("No content found in file")
+        first_chunk = 2
+        total_chunks = len(chunks) + 1
+        yield {"chunk": 1, "total_chunks": total_chunks, "questions": new_questions(parsed)}
+    else:
+        chunks = split_into_chunks(load_import_text(file_data, file_type))
+        first_chunk = 1
+        total_chunks = len(chunks)
+
+    if not chunks:
+        return
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    logger.info(f"Extracting {len(chunks)} chunk(s) with concurrency {concurrency}")
+
+    async def run_chunk(number: int, chunk: str):
+        async with semaphore:
+            try:
+                return number, await extract_questions(chunk), None
+            except Exception as e:
+                logger.error(f"Chunk {number}/{total_chunks} failed: {e}")
+                return number, [], str(e)
+
+    tasks = [asyncio.create_task(run_chunk(first_chunk + i, chunk)) for i, chunk in enumerate(chunks)]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            number, questions, error = await finished
+            if error:
+                yield {"chunk": number, "total_chunks": total_chunks, "error": error}
+                continue
+            yield {"chunk": number, "total_chunks": total_chunks, "questions": new_questions(questions)}
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def process_import(file_data: bytes, file_type: str) -> List[dict]:
+    """Process imported file and return quiz questions."""
+    questions: List[dict] = []
+    errors: List[str] = []
+
+    async for batch in iter_import_batches(file_data, file_type):
+        if "error" in batch:
+            errors.append(batch["error"])
+        else:
+            questions.extend(batch["questions"])
+
+    if errors and not questions:
+        raise RuntimeError(f"Extraction failed: {errors[0]}")
+
+    return questions
@@ -51,6 +51,16 @@ class Config:
     max_concurrent_sessions: int = field(default_factory=lambda: int(os.getenv("MAX_CONCURRENT_SESSIONS", "50")))
     session_timeout_seconds: int = field(default_factory=lambda: int(os.getenv("SESSION_TIMEOUT_SECONDS", "3600")))
     
+    # Tool execution (blocking DB tools run on a bounded thread pool)
+    tool_max_workers: int = field(default_factory=lambda: int(os.getenv("TOOL_MAX_WORKERS", "16")))
+    tool_max_concurrency: int = field(default_factory=lambda: int(os.getenv("TOOL_MAX_CONCURRENCY", "8")))
+    tool_timeout_seconds: float = field(default_factory=lambda: float(os.getenv("TOOL_TIMEOUT_SECONDS", "6.0")))
+    
+    # Outbound playout buffer (frames are xAI audio deltas)
+    playout_max_frames: int = field(default_factory=lambda: int(os.getenv("PLAYOUT_MAX_FRAMES", "200")))
+    playout_max_batch: int = field(default_factory=lambda: int(os.getenv("PLAYOUT_MAX_BATCH", "8")))
+    playout_put_timeout: float = field(default_factory=lambda: float(os.getenv("PLAYOUT_PUT_TIMEOUT", "0.2")))
+    
     def validate(self) -> List[str]:
         """Validate configuration and return list of errors."""
         errors = []
@@ -10,25 +10,22 @@ from datetime import datetime, date, timezone
 from typing import Optional, List, Dict, Any
 
 from .connection import get_db
+from .phone import normalize_phone, RecentCallerCache
 
 logger = logging.getLogger(__name__)
 
 # Get database instance
 db = get_db()
 
+# Recent caller lookups keyed by E.164 number (runs on every inbound call)
+_recent_callers = RecentCallerCache()
+
 
 def _format_error(err: Exception) -> str:
     """Format exception for user-friendly response."""
     return str(err)
 
 
-def _format_phone(phone: str) -> str:
-    """Normalize phone number for database lookup."""
-    if not phone:
-        return ""
-    return "".join(c for c in phone if c.isdigit() or c == '+')
-
-
 def _format_date(d: Any) -> str:
     """Format date for display."""
     if isinstance(d, str):
@@ -68,30 +65,20 @@ def find_tenant_by_phone(phone: str) -> str:
         return "Phone number is required to look up tenant."
     
     try:
-        clean_phone = _format_phone(phone)
-        
-        # Try exact match first
-        params = {
-            "phone": f"eq.{clean_phone}",
-            "select": "tenant_id,first_name,last_name,email,phone"
-        }
-        rows = db._make_request("GET", "tenants", params=params)
-        
-        # Try with different formats if not found
-        if not rows:
-            # Try without + prefix
-            if clean_phone.startswith('+'):
-                params["phone"] = f"eq.{clean_phone[1:]}"
-                rows = db._make_request("GET", "tenants", params=params)
+        phone_e164 = normalize_phone(phone)
+        if not phone_e164:
+            return f"No tenant found with phone number: {phone}. This may be a new caller."
         
-        if not rows:
-            # Try with ilike for partial match
+        hit, rows = _recent_callers.get(phone_e164)
+        if not hit:
+            # Exact match on the indexed E.164 column
             params = {
-                "phone": f"ilike.%{clean_phone[-10:]}%",
+                "phone_e164": f"eq.{phone_e164}",
                 "select": "tenant_id,first_name,last_name,email,phone",
                 "limit": "1"
             }
             rows = db._make_request("GET", "tenants", params=params)
+            _recent_callers.put(phone_e164, rows)
         
         if not rows:
             return f"No tenant found with phone number: {phone}. This may be a new caller."
@@ -178,15 +165,18 @@ def create_tenant(
         Confirmation of tenant creation.
     """
     try:
+        phone_e164 = normalize_phone(phone)
         tenant_data = {
             "first_name": first_name.strip(),
             "last_name": last_name.strip(),
-            "phone": _format_phone(phone),
+            "phone": phone_e164 or phone.strip(),
+            "phone_e164": phone_e164,
         }
         if email:
             tenant_data["email"] = email.strip()
         
         result = db.insert("tenants", tenant_data)
+        _recent_callers.invalidate(phone_e164)
         
         if result:
             tenant_id = result[0].get("tenant_id")
@@ -66,6 +66,7 @@ CREATE TABLE IF NOT EXISTS tenants (
     last_name VARCHAR(100) NOT NULL,
     email VARCHAR(255),
     phone VARCHAR(50) NOT NULL,
+    phone_e164 VARCHAR(20), -- normalized copy of phone, see normalize_phone_e164()
     alternate_phone VARCHAR(50),
     emergency_contact_name VARCHAR(255),
     emergency_contact_phone VARCHAR(50),
@@ -75,8 +76,12 @@ CREATE TABLE IF NOT EXISTS tenants (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Databases created before phone_e164 was added
+ALTER TABLE tenants ADD COLUMN IF NOT EXISTS phone_e164 VARCHAR(20);
+
 -- Create index on phone for quick lookups
 CREATE INDEX IF NOT EXISTS idx_tenants_phone ON tenants(phone);
+CREATE INDEX IF NOT EXISTS idx_tenants_phone_e164 ON tenants(phone_e164);
 
 -- Leases
 CREATE TABLE IF NOT EXISTS leases (
@@ -407,6 +412,27 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Normalize a phone number to E.164 (mirrors db/phone.py:normalize_phone)
+CREATE OR REPLACE FUNCTION normalize_phone_e164(p_phone TEXT)
+RETURNS TEXT AS $$
+    SELECT CASE
+        WHEN btrim(p_phone) LIKE '+%' THEN
+            CASE WHEN length(d) BETWEEN 8 AND 15 THEN '+' || d END
+        WHEN length(d) = 10 THEN '+1' || d
+        WHEN length(d) BETWEEN 11 AND 15 THEN '+' || d
+    END
+    FROM (SELECT regexp_replace(coalesce(p_phone, ''), '\D', '', 'g') AS d) digits;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Trigger to keep tenants.phone_e164 in sync with tenants.phone
+CREATE OR REPLACE FUNCTION set_tenant_phone_e164()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.phone_e164 = normalize_phone_e164(NEW.phone);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
 -- Trigger to update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -429,6 +455,12 @@ CREATE TRIGGER update_units_updated_at BEFORE UPDATE ON units FOR EACH ROW EXECU
 DROP TRIGGER IF EXISTS update_tenants_updated_at ON tenants;
 CREATE TRIGGER update_tenants_updated_at BEFORE UPDATE ON tenants FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+DROP TRIGGER IF EXISTS set_tenants_phone_e164 ON tenants;
+CREATE TRIGGER set_tenants_phone_e164 BEFORE INSERT OR UPDATE OF phone ON tenants FOR EACH ROW EXECUTE FUNCTION set_tenant_phone_e164();
+
+-- Backfill rows inserted before the trigger existed
+UPDATE tenants SET phone_e164 = normalize_phone_e164(phone) WHERE phone_e164 IS NULL;
+
 DROP TRIGGER IF EXISTS update_leases_updated_at ON leases;
 CREATE TRIGGER update_leases_updated_at BEFORE UPDATE ON leases FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
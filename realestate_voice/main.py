@@ -31,6 +31,7 @@ from xai_integration import (
 )
 from xai_integration.session_manager import CallInfo, init_session_manager, SessionState
 from agents import get_triage_agent_config
+from tool_executor import ToolExecutor, ToolTimeoutError
 from db.queries import (
     find_tenant_by_phone,
     get_tenant_details,
@@ -73,6 +74,15 @@ FUNCTION_HANDLERS = {
     "create_tenant": create_tenant,
 }
 
+# Runs the blocking handlers above on a bounded thread pool
+_config = get_config()
+tool_executor = ToolExecutor(
+    FUNCTION_HANDLERS,
+    max_workers=_config.tool_max_workers,
+    max_concurrency_per_tool=_config.tool_max_concurrency,
+    default_timeout=_config.tool_timeout_seconds,
+)
+
 
 async def handle_function_call(
     function_name: str,
@@ -87,8 +97,7 @@ async def handle_function_call(
         return {"error": f"Unknown function: {function_name}"}
     
     try:
-        handler = FUNCTION_HANDLERS[function_name]
-        result = handler(**arguments)
+        result = await tool_executor.run(function_name, arguments)
         
         # Log tool call
         session.add_tool_call(function_name, arguments, result, success=True)
@@ -108,6 +117,10 @@ async def handle_function_call(
         
         return result
         
+    except ToolTimeoutError as e:
+        logger.error(f"Timeout executing {function_name}: {e}")
+        session.add_tool_call(function_name, arguments, str(e), success=False)
+        return {"error": f"{e}. The system is slow right now, please try again."}
     except Exception as e:
         logger.error(f"Error executing {function_name}: {e}")
         session.add_tool_call(function_name, arguments, str(e), success=False)
@@ -148,6 +161,7 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down...")
     session_manager = get_session_manager()
     await session_manager.stop()
+    tool_executor.shutdown()
     logger.info("Server stopped")
 
 
@@ -736,7 +750,10 @@ async def twilio_websocket(websocket: WebSocket, call_sid: str):
         media_handler = MediaStreamHandler(
             session=session,
             twilio_ws=websocket,
-            xai_connection=xai_connection
+            xai_connection=xai_connection,
+            playout_max_frames=config.playout_max_frames,
+            playout_max_batch=config.playout_max_batch,
+            playout_put_timeout=config.playout_put_timeout
         )
         
         # Handle media stream
@@ -898,7 +915,8 @@ async def get_session_details(session_id: str):
         "toolCalls": session.tool_calls,
         "metrics": {
             "audioPacketsSent": session.audio_packets_sent,
-            "audioPacketsReceived": session.audio_packets_received
+            "audioPacketsReceived": session.audio_packets_received,
+            "playout": session.playout_buffer.snapshot() if session.playout_buffer else None
         }
     }
 
@@ -0,0 +1,79 @@
+"""
+Tool executor for xAI function calls.
+
+The database tools in db/queries.py are synchronous and make blocking
+Supabase requests. They run on a dedicated bounded thread pool so a slow
+query never stalls the event loop (and with it, audio for every call on
+this worker), with a per-tool timeout and a per-tool concurrency limit.
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Writes get a longer budget than lookups
+DEFAULT_TOOL_TIMEOUTS = {
+    "create_maintenance_request": 10.0,
+    "update_maintenance_request": 10.0,
+    "record_payment": 10.0,
+    "create_tenant": 10.0,
+}
+
+
+class ToolTimeoutError(Exception):
+    """Raised when a tool does not finish within its timeout."""
+
+
+class ToolExecutor:
+    """Runs blocking tool handlers off the event loop with limits."""
+
+    def __init__(
+        self,
+        handlers: Dict[str, Callable[..., Any]],
+        max_workers: int = 16,
+        max_concurrency_per_tool: int = 8,
+        default_timeout: float = 6.0,
+        timeouts: Optional[Dict[str, float]] = None,
+    ):
+        self.handlers = handlers
+        self.default_timeout = default_timeout
+        self.timeouts = {**DEFAULT_TOOL_TIMEOUTS, **(timeouts or {})}
+        self.max_concurrency_per_tool = max_concurrency_per_tool
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+
+    def _limit(self, name: str) -> asyncio.Semaphore:
+        if name not in self._limits:
+            self._limits[name] = asyncio.Semaphore(self.max_concurrency_per_tool)
+        return self._limits[name]
+
+    async def run(self, name: str, arguments: Dict[str, Any]) -> Any:
+        """
+        Execute a tool by name.
+
+        The timeout covers waiting for a slot and running the handler. A
+        timed-out handler keeps its worker thread until its own request
+        timeout fires; the caller gets ToolTimeoutError immediately.
+        """
+        handler = self.handlers[name]
+        timeout = self.timeouts.get(name, self.default_timeout)
+        loop = asyncio.get_running_loop()
+
+        async def _call():
+            async with self._limit(name):
+                if asyncio.iscoroutinefunction(handler):
+                    return await handler(**arguments)
+                return await loop.run_in_executor(self._pool, functools.partial(handler, **arguments))
+
+        try:
+            return await asyncio.wait_for(_call(), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise ToolTimeoutError(f"{name} did not finish within {timeout:.0f}s")
+
+    def shutdown(self) -> None:
+        """Stop accepting work; running handlers finish in the background."""
+        self._pool.shutdown(wait=False)
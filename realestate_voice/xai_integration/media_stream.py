@@ -8,10 +8,11 @@ import asyncio
 import base64
 import json
 import logging
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import WebSocket
 
+from .playout_buffer import PlayoutBuffer
 from .realtime import XAIRealtimeConnection
 from .session_manager import VoiceSession, SessionState
 
@@ -25,7 +26,10 @@ class MediaStreamHandler:
         self,
         session: VoiceSession,
         twilio_ws: WebSocket,
-        xai_connection: XAIRealtimeConnection
+        xai_connection: XAIRealtimeConnection,
+        playout_max_frames: int = 200,
+        playout_max_batch: int = 8,
+        playout_put_timeout: float = 0.2
     ):
         self.session = session
         self.twilio_ws = twilio_ws
@@ -33,7 +37,16 @@ class MediaStreamHandler:
         
         self._stream_sid: Optional[str] = None
         self._is_running = False
-        self._audio_queue: asyncio.Queue = asyncio.Queue()
+        
+        # Bounded outbound audio buffer drained by one ordered sender task
+        self._playout = PlayoutBuffer(
+            self._send_audio_batch,
+            max_frames=playout_max_frames,
+            max_batch=playout_max_batch,
+            put_timeout=playout_put_timeout,
+            name=session.session_id
+        )
+        self.session.playout_buffer = self._playout
     
     async def start(self) -> None:
         """Start handling the media stream."""
@@ -44,20 +57,17 @@ class MediaStreamHandler:
         self.xai.on_audio(self._handle_xai_audio)
         self.xai.on_transcript(self._handle_transcript)
         self.xai.on_speaking(self._handle_speaking_state)
+        self.xai.on_interrupt(self._handle_interrupt)
         
         # Start audio sender task
-        sender_task = asyncio.create_task(self._audio_sender_loop())
+        self._playout.start()
         
         try:
             # Process incoming Twilio messages
             await self._receive_loop()
         finally:
             self._is_running = False
-            sender_task.cancel()
-            try:
-                await sender_task
-            except asyncio.CancelledError:
-                pass
+            await self._playout.stop()
     
     async def _receive_loop(self) -> None:
         """Receive and process messages from Twilio WebSocket."""
@@ -108,47 +118,29 @@ class MediaStreamHandler:
         await asyncio.sleep(0.5)
         await self.xai.send_greeting()
     
-    def _handle_xai_audio(self, audio_bytes: bytes) -> None:
+    async def _handle_xai_audio(self, audio_bytes: bytes) -> None:
         """Handle audio output from xAI."""
-        # Queue audio for sending to Twilio
-        try:
-            self._audio_queue.put_nowait(audio_bytes)
-        except asyncio.QueueFull:
-            logger.warning("Audio queue full, dropping packet")
+        # Queue audio for sending to Twilio; waits briefly if Twilio is slow
+        await self._playout.put(audio_bytes)
     
-    async def _audio_sender_loop(self) -> None:
-        """Send queued audio to Twilio."""
-        try:
-            while self._is_running:
-                try:
-                    audio_bytes = await asyncio.wait_for(
-                        self._audio_queue.get(),
-                        timeout=0.1
-                    )
-                    
-                    # Encode as base64 for Twilio
-                    audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-                    
-                    # Send to Twilio
-                    media_message = {
-                        "event": "media",
-                        "streamSid": self._stream_sid,
-                        "media": {
-                            "payload": audio_base64
-                        }
-                    }
-                    
-                    await self.twilio_ws.send_text(json.dumps(media_message))
-                    self.session.audio_packets_sent += 1
-                    
-                except asyncio.TimeoutError:
-                    continue
-                    
-        except asyncio.CancelledError:
-            logger.debug("Audio sender cancelled")
-            raise
-        except Exception as e:
-            logger.error(f"Error in audio sender: {e}")
+    async def _send_audio_batch(self, frames: List[bytes]) -> None:
+        """Send queued audio to Twilio as one media message."""
+        if not self._stream_sid:
+            return
+        
+        # Raw μ-law frames concatenate, so a batch is one base64 payload
+        audio_base64 = base64.b64encode(b"".join(frames)).decode('utf-8')
+        
+        media_message = {
+            "event": "media",
+            "streamSid": self._stream_sid,
+            "media": {
+                "payload": audio_base64
+            }
+        }
+        
+        await self.twilio_ws.send_text(json.dumps(media_message))
+        self.session.audio_packets_sent += len(frames)
     
     def _handle_transcript(self, role: str, transcript: str) -> None:
         """Handle transcript from xAI."""
@@ -160,6 +152,10 @@ class MediaStreamHandler:
         """Handle AI speaking state changes."""
         logger.debug(f"AI speaking: {is_speaking}")
     
+    def _handle_interrupt(self) -> None:
+        """Caller barged in - drop queued AI audio."""
+        asyncio.create_task(self.clear_audio())
+    
     async def send_mark(self, name: str) -> None:
         """Send a mark event to Twilio for tracking audio playback."""
         if self._stream_sid:
@@ -174,11 +170,9 @@ class MediaStreamHandler:
     
     async def clear_audio(self) -> None:
         """Clear queued audio (for interruption handling)."""
-        while not self._audio_queue.empty():
-            try:
-                self._audio_queue.get_nowait()
-            except asyncio.QueueEmpty:
-                break
+        dropped = self._playout.clear()
+        if dropped:
+            logger.debug(f"Dropped {dropped} queued audio frames on barge-in")
         
         # Send clear message to Twilio
         if self._stream_sid:
@@ -6,6 +6,7 @@ Handles WebSocket connection to xAI's realtime voice API.
 
 import asyncio
 import base64
+import inspect
 import json
 import logging
 from typing import Any, Callable, Dict, List, Optional
@@ -45,11 +46,12 @@ class XAIRealtimeConnection:
         self._greeting_sent = False
         
         # Callbacks
-        self._audio_callback: Optional[Callable[[bytes], None]] = None
+        self._audio_callback: Optional[Callable[[bytes], Any]] = None
         self._text_callback: Optional[Callable[[str, str], None]] = None
         self._function_callback: Optional[Callable[[str, str, Dict[str, Any]], Any]] = None
         self._transcript_callback: Optional[Callable[[str, str], None]] = None
         self._speaking_callback: Optional[Callable[[bool], None]] = None
+        self._interrupt_callback: Optional[Callable[[], None]] = None
         
         # Background task for receiving messages
         self._receive_task: Optional[asyncio.Task] = None
@@ -60,6 +62,9 @@ class XAIRealtimeConnection:
         self._current_response_id: Optional[str] = None
         self._is_responding = False
         
+        # Function calls from the current response, executed concurrently (call_id -> task)
+        self._pending_calls: Dict[str, asyncio.Task] = {}
+        
         # Event to signal session is ready
         self._session_ready = asyncio.Event()
     
@@ -221,9 +226,12 @@ class XAIRealtimeConnection:
         # Speech detection events
         elif event_type == "input_audio_buffer.speech_started":
             logger.debug("User started speaking")
-            if self._is_responding and self._speaking_callback:
+            if self._is_responding:
                 # User interrupted, stop speaking
-                self._speaking_callback(False)
+                if self._speaking_callback:
+                    self._speaking_callback(False)
+                if self._interrupt_callback:
+                    self._interrupt_callback()
         
         elif event_type == "input_audio_buffer.speech_stopped":
             logger.debug("User stopped speaking")
@@ -249,7 +257,9 @@ class XAIRealtimeConnection:
             if audio_data and self._audio_callback:
                 # Decode base64 audio
                 audio_bytes = base64.b64decode(audio_data)
-                self._audio_callback(audio_bytes)
+                result = self._audio_callback(audio_bytes)
+                if inspect.isawaitable(result):
+                    await result
         
         elif event_type == "response.output_audio_transcript.delta":
             # Transcript delta
@@ -270,18 +280,24 @@ class XAIRealtimeConnection:
             self._current_response_id = None
             if self._speaking_callback:
                 self._speaking_callback(False)
+            if self._pending_calls:
+                # Send every tool result from this response, then continue once
+                pending, self._pending_calls = self._pending_calls, {}
+                asyncio.create_task(self._send_function_results(pending))
         
         # Function call events
         elif event_type == "response.function_call_arguments.done":
-            await self._handle_function_call(event)
+            # Start the tool now so independent calls in one response run in parallel
+            call_id = event.get("call_id", "")
+            self._pending_calls[call_id] = asyncio.create_task(self._handle_function_call(event))
         
         # Error events
         elif event_type == "error":
             error = event.get("error", {})
             logger.error(f"xAI API error: {error}")
     
-    async def _handle_function_call(self, event: Dict[str, Any]) -> None:
-        """Handle a function call from the AI."""
+    async def _handle_function_call(self, event: Dict[str, Any]) -> Any:
+        """Execute a function call from the AI and return its result."""
         function_name = event.get("name", "")
         call_id = event.get("call_id", "")
         arguments_str = event.get("arguments", "{}")
@@ -293,36 +309,44 @@ class XAIRealtimeConnection:
         
         logger.info(f"Function call: {function_name} with args: {arguments}")
         
-        result = None
+        if not self._function_callback:
+            return {"error": f"Function {function_name} not implemented"}
         
-        if self._function_callback:
-            try:
-                result = await self._function_callback(function_name, call_id, arguments)
-            except Exception as e:
-                logger.error(f"Error executing function {function_name}: {e}")
-                result = {"error": str(e)}
-        else:
-            result = {"error": f"Function {function_name} not implemented"}
-        
-        # Send function result back to xAI
-        await self._send_event({
-            "type": "conversation.item.create",
-            "item": {
-                "type": "function_call_output",
-                "call_id": call_id,
-                "output": json.dumps(result)
-            }
-        })
+        try:
+            return await self._function_callback(function_name, call_id, arguments)
+        except Exception as e:
+            logger.error(f"Error executing function {function_name}: {e}")
+            return {"error": str(e)}
+    
+    async def _send_function_results(self, pending: Dict[str, asyncio.Task]) -> None:
+        """Wait for a response's function calls, send their outputs, then continue."""
+        results = await asyncio.gather(*pending.values(), return_exceptions=True)
+        
+        for call_id, result in zip(pending.keys(), results):
+            if isinstance(result, BaseException):
+                result = {"error": str(result)}
+            await self._send_event({
+                "type": "conversation.item.create",
+                "item": {
+                    "type": "function_call_output",
+                    "call_id": call_id,
+                    "output": json.dumps(result)
+                }
+            })
         
-        # Request AI to continue with the result
+        # Request AI to continue with the results
         await self._send_event({
             "type": "response.create"
         })
     
     # === Public API ===
     
-    def on_audio(self, callback: Callable[[bytes], None]) -> None:
-        """Register callback for audio output from AI."""
+    def on_audio(self, callback: Callable[[bytes], Any]) -> None:
+        """Register callback for audio output from AI.
+
+        Coroutine callbacks are awaited, so a full playout buffer slows down
+        the receive loop (backpressure).
+        """
         self._audio_callback = callback
     
     def on_text(self, callback: Callable[[str, str], None]) -> None:
@@ -341,6 +365,10 @@ class XAIRealtimeConnection:
         """Register callback for when AI starts/stops speaking."""
         self._speaking_callback = callback
     
+    def on_interrupt(self, callback: Callable[[], None]) -> None:
+        """Register callback for when the caller talks over the AI (barge-in)."""
+        self._interrupt_callback = callback
+    
     async def send_audio(self, audio_bytes: bytes) -> None:
         """Send audio data to xAI API."""
         if not self.is_connected:
@@ -65,6 +65,9 @@ class VoiceSession:
     # xAI connection
     xai_connection: Optional[Any] = None
     
+    # Outbound audio buffer (see playout_buffer.py), exposed for metrics
+    playout_buffer: Optional[Any] = None
+    
     def add_message(self, role: str, content: str) -> None:
         """Add a message to conversation history."""
         self.conversation_history.append({
@@ -13,6 +13,7 @@ from db.queries import (
     get_all_stylists,
     get_stylist_by_name,
     get_available_slots,
+    get_available_slots_range,
     create_appointment,
 )
 
@@ -49,6 +50,7 @@ STEP 3: DATE & TIME
 Ask: "What date works best for you?"
 - Accept natural language: "tomorrow", "next Saturday", "January 5th"
 - Use get_available_slots to find availability
+- For "next available" or "sometime this week", use get_available_slots_range over the whole range
 - Offer 3-4 time slots: "I have openings at 10am, 2pm, and 4pm. Which works for you?"
 
 STEP 4: CONFIRM BOOKING
@@ -111,6 +113,7 @@ Agent: "Wonderful! Your appointment is confirmed. Your booking reference is GB-2
         get_all_stylists,
         get_stylist_by_name,
         get_available_slots,
+        get_available_slots_range,
         create_appointment,
     ],
     handoffs=[],  # Will be populated for transfer back to triage
@@ -1,42 +1,116 @@
 """
 GlamBook AI Service - Database Connection
 
-PostgreSQL client for database operations using psycopg2.
+PostgreSQL client for database operations using pooled psycopg2
+connections, plus an asyncpg pool for async endpoints.
 """
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from contextlib import contextmanager
+from contextlib import contextmanager, asynccontextmanager
 from config import get_config
+from db.pool import ConnectionPool, AsyncConnectionPool, PoolTimeout
 from typing import Optional, List, Dict, Any
+import threading
 import logging
 
 logger = logging.getLogger(__name__)
 
-_connection_pool = None
+_connection_pool: Optional[ConnectionPool] = None
+_async_connection_pool: Optional[AsyncConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_connection_pool() -> ConnectionPool:
+    """Get (or lazily create) the shared sync connection pool."""
+    global _connection_pool
+    if _connection_pool is None:
+        with _pool_lock:
+            if _connection_pool is None:
+                config = get_config()
+                _connection_pool = ConnectionPool(
+                    config.database_url,
+                    min_size=config.db_pool_min_size,
+                    max_size=config.db_pool_max_size,
+                    timeout=config.db_pool_timeout,
+                    health_check_interval=config.db_pool_health_check_interval,
+                )
+    return _connection_pool
+
+
+def get_async_connection_pool() -> AsyncConnectionPool:
+    """Get the shared asyncpg pool (connections open on first checkout)."""
+    global _async_connection_pool
+    if _async_connection_pool is None:
+        config = get_config()
+        _async_connection_pool = AsyncConnectionPool(
+            config.database_url,
+            min_size=config.db_pool_min_size,
+            max_size=config.db_pool_max_size,
+            timeout=config.db_pool_timeout,
+        )
+    return _async_connection_pool
 
 
 def get_db_connection():
-    """Get a database connection."""
-    config = get_config()
-    return psycopg2.connect(config.database_url, cursor_factory=RealDictCursor)
+    """Check out a pooled database connection. Return it with release_db_connection()."""
+    return get_connection_pool().getconn()
+
+
+def release_db_connection(conn, close: bool = False):
+    """Return a connection to the pool."""
+    get_connection_pool().putconn(conn, close=close)
 
 
 @contextmanager
 def get_db_cursor():
     """Context manager for database cursor with automatic commit/rollback."""
     conn = get_db_connection()
+    cursor = None
+    broken = False
     try:
         cursor = conn.cursor()
         yield cursor
         conn.commit()
     except Exception as e:
-        conn.rollback()
+        try:
+            conn.rollback()
+        except Exception:
+            broken = True
         logger.error(f"Database error: {e}")
         raise
     finally:
-        cursor.close()
-        conn.close()
+        if cursor is not None:
+            cursor.close()
+        release_db_connection(conn, close=broken)
+
+
+@asynccontextmanager
+async def get_async_db_connection():
+    """
+    Async context manager yielding a pooled asyncpg connection inside a transaction.
+    Use from async endpoints so queries do not block the event loop.
+    """
+    async with get_async_connection_pool().connection() as conn:
+        async with conn.transaction():
+            yield conn
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Pool size, wait time and checkout latency metrics for both pools."""
+    return {
+        "sync": get_connection_pool().metrics.snapshot() if _connection_pool else None,
+        "async": _async_connection_pool.metrics.snapshot() if _async_connection_pool else None,
+    }
+
+
+async def close_db_pools():
+    """Close both pools (application shutdown)."""
+    global _connection_pool, _async_connection_pool
+    if _async_connection_pool is not None:
+        await _async_connection_pool.close()
+        _async_connection_pool = None
+    if _connection_pool is not None:
+        _connection_pool.closeall()
+        _connection_pool = None
 
 
 class PostgresClient:
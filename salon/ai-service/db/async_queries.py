@@ -0,0 +1,26 @@
+"""
+GlamBook AI Service - Async Database Queries
+
+asyncpg queries that have no sync counterpart in db/queries.py. Tool
+endpoints call the sync query functions through asyncio.to_thread so the
+booking logic lives in one place.
+"""
+
+from typing import Optional
+from db import get_async_db_connection
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def get_active_webrtc_call_id() -> Optional[str]:
+    """
+    Get the most recent in-progress WebRTC call, used to link bookings made
+    through ElevenLabs webhooks (which carry no session context).
+    """
+    async with get_async_db_connection() as conn:
+        return await conn.fetchval("""
+            SELECT call_id FROM call_logs
+            WHERE status = 'in_progress' AND caller_phone = 'webrtc'
+            ORDER BY created_at DESC LIMIT 1
+        """)
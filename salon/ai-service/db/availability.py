@@ -0,0 +1,285 @@
+"""
+GlamBook AI Service - Availability Engine
+
+Set-based slot search. Schedules, time off, closures and appointments for
+every candidate stylist are loaded for the whole date range in a fixed set
+of queries on one connection, then free slots are computed in memory with
+interval arithmetic.
+"""
+
+from datetime import datetime, date, time, timedelta
+from typing import Optional, List, Dict, Any, Tuple
+from db import get_db_cursor
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Slots are offered on this grid, aligned to the salon's opening time
+SLOT_INTERVAL_MINUTES = 30
+
+# Longest date range searched in one call; longer requests are cut short
+MAX_RANGE_DAYS = 14
+
+# Slots returned for a range search, enough for the caller to pick from
+RANGE_SLOT_LIMIT = 20
+
+Interval = Tuple[datetime, datetime]
+
+
+def _parse_time(time_val) -> Optional[time]:
+    """Coerce a TIME column value (or its string form) to a time."""
+    if time_val is None:
+        return None
+    if isinstance(time_val, time):
+        return time_val
+    if isinstance(time_val, datetime):
+        return time_val.time()
+    if isinstance(time_val, str):
+        for fmt in ["%H:%M:%S", "%H:%M", "%I:%M:%S %p", "%I:%M %p"]:
+            try:
+                return datetime.strptime(time_val, fmt).time()
+            except ValueError:
+                continue
+    return None
+
+
+def _naive(value: datetime) -> datetime:
+    """Drop tzinfo so TIMESTAMPTZ rows compare with local wall-clock slots."""
+    return value.replace(tzinfo=None) if value.tzinfo else value
+
+
+def _span(day: date, start, end) -> Optional[Interval]:
+    """Build an interval on a day from two TIME values, or None if empty."""
+    start_t, end_t = _parse_time(start), _parse_time(end)
+    if start_t is None or end_t is None or start_t >= end_t:
+        return None
+    return datetime.combine(day, start_t), datetime.combine(day, end_t)
+
+
+def _intersect(a: Interval, b: Interval) -> Optional[Interval]:
+    """Intersection of two intervals, or None if they do not overlap."""
+    start, end = max(a[0], b[0]), min(a[1], b[1])
+    return (start, end) if start < end else None
+
+
+def _subtract(free: List[Interval], busy: List[Interval]) -> List[Interval]:
+    """Remove every busy interval from a sorted list of free intervals."""
+    for b_start, b_end in sorted(busy):
+        remaining = []
+        for f_start, f_end in free:
+            if b_end <= f_start or b_start >= f_end:
+                remaining.append((f_start, f_end))
+                continue
+            if f_start < b_start:
+                remaining.append((f_start, b_start))
+            if b_end < f_end:
+                remaining.append((b_end, f_end))
+        free = remaining
+        if not free:
+            break
+    return free
+
+
+def _load_availability_data(
+    cursor,
+    service_id: int,
+    start_date: date,
+    end_date: date,
+    stylist_id: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Load everything needed to compute availability for a date range.
+    Runs a fixed number of queries regardless of stylist count or range length.
+    """
+    cursor.execute("SELECT duration_minutes FROM services WHERE service_id = %s", (service_id,))
+    service = cursor.fetchone()
+    if not service:
+        return None
+
+    if stylist_id:
+        cursor.execute(
+            "SELECT stylist_id, full_name FROM stylists WHERE stylist_id = %s AND is_active = true",
+            (stylist_id,)
+        )
+    else:
+        cursor.execute("SELECT stylist_id, full_name FROM stylists WHERE is_active = true ORDER BY stylist_id")
+    stylists = [dict(row) for row in cursor.fetchall()]
+    if not stylists:
+        return None
+
+    stylist_ids = [s["stylist_id"] for s in stylists]
+    range_start = datetime.combine(start_date, time.min)
+    range_end = datetime.combine(end_date + timedelta(days=1), time.min)
+
+    cursor.execute("SELECT * FROM business_hours")
+    business_hours = {str(row["day_of_week"]): dict(row) for row in cursor.fetchall()}
+
+    cursor.execute("""
+        SELECT * FROM salon_closures
+        WHERE closure_date BETWEEN %s AND %s
+    """, (start_date.isoformat(), end_date.isoformat()))
+    closures = [dict(row) for row in cursor.fetchall()]
+
+    cursor.execute("""
+        SELECT * FROM stylist_schedules
+        WHERE stylist_id = ANY(%s)
+    """, (stylist_ids,))
+    schedules = {
+        (row["stylist_id"], str(row["day_of_week"])): dict(row)
+        for row in cursor.fetchall()
+    }
+
+    cursor.execute("""
+        SELECT stylist_id, start_datetime, end_datetime
+        FROM stylist_time_off
+        WHERE stylist_id = ANY(%s)
+        AND start_datetime < %s
+        AND end_datetime > %s
+    """, (stylist_ids, range_end.isoformat(), range_start.isoformat()))
+    time_off = [dict(row) for row in cursor.fetchall()]
+
+    cursor.execute("""
+        SELECT stylist_id, appointment_date, start_time, end_time
+        FROM appointments
+        WHERE stylist_id = ANY(%s)
+        AND appointment_date BETWEEN %s AND %s
+        AND status NOT IN ('cancelled')
+    """, (stylist_ids, start_date.isoformat(), end_date.isoformat()))
+    appointments = [dict(row) for row in cursor.fetchall()]
+
+    return {
+        "duration": service["duration_minutes"],
+        "stylists": stylists,
+        "business_hours": business_hours,
+        "closures": closures,
+        "schedules": schedules,
+        "time_off": time_off,
+        "appointments": appointments,
+    }
+
+
+def _compute_slots(
+    data: Dict[str, Any],
+    start_date: date,
+    end_date: date,
+    limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Compute bookable slots in memory; stops after the day that reaches limit."""
+    duration = timedelta(minutes=data["duration"])
+    step = timedelta(minutes=SLOT_INTERVAL_MINUTES)
+
+    # Index busy intervals by (stylist, day) so each day only touches its own rows
+    busy: Dict[Tuple[int, date], List[Interval]] = {}
+    for apt in data["appointments"]:
+        apt_date = apt["appointment_date"]
+        if isinstance(apt_date, str):
+            apt_date = date.fromisoformat(apt_date)
+        span = _span(apt_date, apt["start_time"], apt["end_time"])
+        if span:
+            busy.setdefault((apt["stylist_id"], apt_date), []).append(span)
+
+    for off in data["time_off"]:
+        off_start, off_end = _naive(off["start_datetime"]), _naive(off["end_datetime"])
+        day = max(off_start.date(), start_date)
+        while day <= min(off_end.date(), end_date):
+            busy.setdefault((off["stylist_id"], day), []).append((off_start, off_end))
+            day += timedelta(days=1)
+
+    closures_by_day: Dict[date, List[Dict[str, Any]]] = {}
+    for closure in data["closures"]:
+        closure_date = closure["closure_date"]
+        if isinstance(closure_date, str):
+            closure_date = date.fromisoformat(closure_date)
+        closures_by_day.setdefault(closure_date, []).append(closure)
+
+    slots = []
+    day = start_date
+    # Days are visited in order, so once limit is reached later days cannot
+    # contribute earlier slots
+    while day <= end_date and not (limit and len(slots) >= limit):
+        day_name = day.strftime("%A").lower()
+        hours = data["business_hours"].get(day_name)
+        salon_span = _span(day, hours.get("open_time"), hours.get("close_time")) if hours and hours.get("is_open") else None
+        if salon_span is None:
+            day += timedelta(days=1)
+            continue
+
+        salon_busy = []
+        salon_break = _span(day, hours.get("break_start"), hours.get("break_end"))
+        if salon_break:
+            salon_busy.append(salon_break)
+        for closure in closures_by_day.get(day, []):
+            if closure.get("is_full_day", True) is not False:
+                salon_busy.append(salon_span)
+            else:
+                partial = _span(day, closure.get("close_from"), closure.get("close_until"))
+                if partial:
+                    salon_busy.append(partial)
+
+        salon_free = _subtract([salon_span], salon_busy)
+        if not salon_free:
+            day += timedelta(days=1)
+            continue
+
+        grid_origin = salon_span[0]
+        for order, stylist in enumerate(data["stylists"]):
+            sid = stylist["stylist_id"]
+            schedule = data["schedules"].get((sid, day_name))
+            if not schedule or not schedule.get("is_working"):
+                continue
+
+            working = _span(day, schedule.get("start_time"), schedule.get("end_time"))
+            if working is None:
+                continue
+
+            free = [i for i in (_intersect(f, working) for f in salon_free) if i]
+            stylist_busy = list(busy.get((sid, day), []))
+            stylist_break = _span(day, schedule.get("break_start"), schedule.get("break_end"))
+            if stylist_break:
+                stylist_busy.append(stylist_break)
+            free = _subtract(free, stylist_busy)
+
+            for free_start, free_end in free:
+                # First grid point at or after the free interval starts
+                offset = free_start - grid_origin
+                steps = -(-offset // step) if offset > timedelta(0) else 0
+                slot = grid_origin + steps * step
+                while slot + duration <= free_end:
+                    slots.append((slot, order, {
+                        "date": day.isoformat(),
+                        "time": slot.strftime("%H:%M"),
+                        "stylist_id": sid,
+                        "stylist_name": stylist.get("full_name", "Any Stylist")
+                    }))
+                    slot += step
+
+        day += timedelta(days=1)
+
+    slots.sort(key=lambda s: (s[0], s[1]))
+    return [s[2] for s in slots]
+
+
+def find_available_slots(
+    service_id: int,
+    start_date: date,
+    end_date: Optional[date] = None,
+    stylist_id: Optional[int] = None,
+    limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Find bookable slots for a service between start_date and end_date (inclusive).
+    Returns slots earliest-first; pass limit for "next available" style questions.
+    Ranges longer than MAX_RANGE_DAYS are cut to MAX_RANGE_DAYS.
+    """
+    end_date = min(end_date or start_date, start_date + timedelta(days=MAX_RANGE_DAYS - 1))
+    if end_date < start_date:
+        return []
+
+    with get_db_cursor() as cursor:
+        data = _load_availability_data(cursor, service_id, start_date, end_date, stylist_id)
+
+    if not data:
+        return []
+
+    slots = _compute_slots(data, start_date, end_date, limit)
+    return slots[:limit] if limit else slots
@@ -0,0 +1,237 @@
+"""
+GlamBook AI Service - Connection Pools
+
+Bounded PostgreSQL connection pools with checkout metrics:
+a thread-safe psycopg2 pool for the sync query helpers and an
+asyncpg pool for async tool endpoints.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any
+
+import asyncpg
+import psycopg2
+import psycopg2.pool
+from psycopg2.extras import RealDictCursor
+import logging
+
+from stats_utils import summarize
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(psycopg2.pool.PoolError):
+    """Raised when no connection becomes free within the checkout timeout."""
+
+
+class PoolMetrics:
+    """Thread-safe counters and latency samples for one pool."""
+
+    def __init__(self, name: str, max_size: int, sample_size: int = 1000):
+        self.name = name
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._wait_ms = deque(maxlen=sample_size)
+        self._hold_ms = deque(maxlen=sample_size)
+        self.in_use = 0
+        self.waiting = 0
+        self.peak_in_use = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.discarded = 0
+
+    def start_wait(self):
+        with self._lock:
+            self.waiting += 1
+
+    def end_wait(self, wait_ms: float, acquired: bool):
+        with self._lock:
+            self.waiting -= 1
+            self._wait_ms.append(wait_ms)
+            if acquired:
+                self.checkouts += 1
+                self.in_use += 1
+                self.peak_in_use = max(self.peak_in_use, self.in_use)
+            else:
+                self.timeouts += 1
+
+    def release(self, hold_ms: float):
+        with self._lock:
+            self.in_use -= 1
+            self._hold_ms.append(hold_ms)
+
+    def record_discard(self):
+        with self._lock:
+            self.discarded += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current pool state plus wait/checkout latency summaries (ms)."""
+        with self._lock:
+            return {
+                "pool": self.name,
+                "max_size": self.max_size,
+                "in_use": self.in_use,
+                "waiting": self.waiting,
+                "peak_in_use": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "discarded": self.discarded,
+                "wait_ms": summarize(self._wait_ms),
+                "checkout_ms": summarize(self._hold_ms),
+            }
+
+
+class ConnectionPool:
+    """
+    Bounded psycopg2 pool.
+
+    Callers block (up to `timeout` seconds) when every connection is checked
+    out instead of failing immediately. Connections idle longer than
+    `health_check_interval` are pinged before being handed out, and broken
+    ones are replaced.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 5.0,
+        health_check_interval: float = 30.0
+    ):
+        self._pool = psycopg2.pool.ThreadedConnectionPool(
+            min_size, max_size, dsn, cursor_factory=RealDictCursor
+        )
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._last_used: Dict[int, float] = {}
+        self._checked_out: Dict[int, float] = {}
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.metrics = PoolMetrics("sync", max_size)
+
+    def _is_healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(id(conn), 0.0)
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self):
+        """Check out a healthy connection, waiting for a free slot if needed."""
+        self.metrics.start_wait()
+        started = time.perf_counter()
+        acquired = self._slots.acquire(timeout=self.timeout)
+        self.metrics.end_wait((time.perf_counter() - started) * 1000, acquired)
+        if not acquired:
+            raise PoolTimeout(f"No database connection available within {self.timeout}s")
+
+        try:
+            conn = self._pool.getconn()
+            while not self._is_healthy(conn):
+                logger.warning("Discarding unhealthy pooled database connection")
+                self.metrics.record_discard()
+                self._last_used.pop(id(conn), None)
+                self._pool.putconn(conn, close=True)
+                conn = self._pool.getconn()
+        except Exception:
+            self.metrics.release(0.0)
+            self._slots.release()
+            raise
+
+        self._checked_out[id(conn)] = time.perf_counter()
+        return conn
+
+    def putconn(self, conn, close: bool = False):
+        """Return a connection to the pool."""
+        started = self._checked_out.pop(id(conn), None)
+        hold_ms = (time.perf_counter() - started) * 1000 if started else 0.0
+        try:
+            if close or conn.closed:
+                self._last_used.pop(id(conn), None)
+                self._pool.putconn(conn, close=True)
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+                self._pool.putconn(conn)
+        finally:
+            self.metrics.release(hold_ms)
+            self._slots.release()
+
+    def closeall(self):
+        """Close every connection in the pool."""
+        self._pool.closeall()
+        self._last_used.clear()
+
+
+class AsyncConnectionPool:
+    """
+    Bounded asyncpg pool for async endpoints.
+
+    asyncpg resets and validates connections on release; idle connections
+    are recycled after `max_inactive_lifetime` seconds.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 5.0,
+        max_inactive_lifetime: float = 300.0
+    ):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_inactive_lifetime = max_inactive_lifetime
+        self.metrics = PoolMetrics("async", max_size)
+        self._pool: Optional[asyncpg.Pool] = None
+        self._init_lock = asyncio.Lock()
+
+    async def open(self) -> asyncpg.Pool:
+        """Create the underlying pool on first use."""
+        if self._pool is None:
+            async with self._init_lock:
+                if self._pool is None:
+                    self._pool = await asyncpg.create_pool(
+                        self.dsn,
+                        min_size=self.min_size,
+                        max_size=self.max_size,
+                        max_inactive_connection_lifetime=self.max_inactive_lifetime,
+                    )
+        return self._pool
+
+    @asynccontextmanager
+    async def connection(self):
+        """Check out a connection for the duration of the block."""
+        pool = await self.open()
+        self.metrics.start_wait()
+        started = time.perf_counter()
+        try:
+            conn = await pool.acquire(timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.metrics.end_wait((time.perf_counter() - started) * 1000, False)
+            raise PoolTimeout(f"No database connection available within {self.timeout}s")
+        checked_out = time.perf_counter()
+        self.metrics.end_wait((checked_out - started) * 1000, True)
+        try:
+            yield conn
+        finally:
+            await pool.release(conn)
+            self.metrics.release((time.perf_counter() - checked_out) * 1000)
+
+    async def close(self):
+        """Close the underlying pool."""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
@@ -7,6 +7,7 @@ Query functions for the salon voice agent using plain PostgreSQL.
 from datetime import datetime, date, time, timedelta
 from typing import Optional, List, Dict, Any
 from db import get_db_cursor
+from db.availability import find_available_slots
 import logging
 
 logger = logging.getLogger(__name__)
@@ -286,117 +287,21 @@ def get_available_slots(
     """
     Get available time slots for a service on a specific date.
     """
-    day_name = check_date.strftime("%A").lower()
-
-    with get_db_cursor() as cursor:
-        # Get service duration
-        cursor.execute("SELECT duration_minutes FROM services WHERE service_id = %s", (service_id,))
-        service = cursor.fetchone()
+    return find_available_slots(service_id, check_date, stylist_id=stylist_id)
 
-        if not service:
-            return []
 
-        duration = service["duration_minutes"]
-
-        # Get business hours
-        cursor.execute("""
-            SELECT * FROM business_hours WHERE day_of_week = %s
-        """, (day_name,))
-        hours = cursor.fetchone()
-
-        if not hours or not hours.get("is_open"):
-            return []
-
-        hours = dict(hours)
-
-        # Check for salon closure
-        cursor.execute("""
-            SELECT * FROM salon_closures WHERE closure_date = %s
-        """, (check_date.isoformat(),))
-
-        if cursor.fetchone():
-            return []
-
-        # Get stylists
-        if stylist_id:
-            cursor.execute("SELECT stylist_id, full_name FROM stylists WHERE stylist_id = %s AND is_active = true", (stylist_id,))
-        else:
-            cursor.execute("SELECT stylist_id, full_name FROM stylists WHERE is_active = true")
-
-        stylists = [dict(row) for row in cursor.fetchall()]
-
-        if not stylists:
-            return []
-
-        # Helper to parse time strings
-        def parse_time_str(time_val) -> time:
-            if isinstance(time_val, time):
-                return time_val
-            if isinstance(time_val, datetime):
-                return time_val.time()
-            if isinstance(time_val, str):
-                for fmt in ["%H:%M:%S", "%H:%M", "%I:%M:%S %p", "%I:%M %p"]:
-                    try:
-                        return datetime.strptime(time_val, fmt).time()
-                    except ValueError:
-                        continue
-            return time(0, 0)
-
-        open_time = parse_time_str(hours.get("open_time", "09:00:00"))
-        close_time = parse_time_str(hours.get("close_time", "18:00:00"))
-
-        # Generate time slots
-        available_slots = []
-        slot_duration = 30
-
-        current_slot = datetime.combine(check_date, open_time)
-        end_of_day = datetime.combine(check_date, close_time)
-
-        while current_slot + timedelta(minutes=duration) <= end_of_day:
-            slot_time = current_slot.time()
-
-            for stylist in stylists:
-                sid = stylist["stylist_id"]
-                availability = get_stylist_availability(sid, check_date)
-
-                if not availability.get("available"):
-                    continue
-
-                # Check if slot is within stylist's hours
-                try:
-                    stylist_start = parse_time_str(availability.get("start_time", "09:00:00"))
-                    stylist_end = parse_time_str(availability.get("end_time", "18:00:00"))
-                except Exception:
-                    continue
-
-                if slot_time < stylist_start or slot_time >= stylist_end:
-                    continue
-
-                # Check if slot conflicts with booked appointments
-                slot_end = (current_slot + timedelta(minutes=duration)).time()
-                is_booked = False
-
-                for booked_start, booked_end in availability.get("booked_slots", []):
-                    try:
-                        booked_start_time = parse_time_str(booked_start)
-                        booked_end_time = parse_time_str(booked_end)
-                    except Exception:
-                        continue
-
-                    if not (slot_end <= booked_start_time or slot_time >= booked_end_time):
-                        is_booked = True
-                        break
-
-                if not is_booked:
-                    available_slots.append({
-                        "time": slot_time.strftime("%H:%M"),
-                        "stylist_id": sid,
-                        "stylist_name": stylist.get("full_name", "Any Stylist")
-                    })
-
-            current_slot += timedelta(minutes=slot_duration)
-
-        return available_slots
+def get_available_slots_range(
+    service_id: int,
+    start_date: date,
+    end_date: date,
+    stylist_id: Optional[int] = None,
+    limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Get available time slots for a service across a date range, earliest first.
+    Use for "next available this week" style questions.
+    """
+    return find_available_slots(service_id, start_date, end_date, stylist_id=stylist_id, limit=limit)
 
 
 def create_appointment(
@@ -23,14 +23,17 @@ from pydantic import BaseModel, Field
 from config import get_config
 from app_agents import triage_agent, booking_agent, inquiry_agent, reschedule_agent
 from voice import get_voice
+from db import get_pool_stats, close_db_pools
+from db import async_queries
+from db.availability import MAX_RANGE_DAYS, RANGE_SLOT_LIMIT
 from db.queries import (
-    find_customer_by_phone,
     get_salon_settings,
     get_business_hours,
     get_all_services,
     get_service_categories,
     get_all_stylists,
-    get_available_slots,
+    get_available_slots_range,
+    find_customer_by_phone,
     create_appointment,
     cancel_appointment,
     reschedule_appointment,
@@ -211,6 +214,10 @@ def get_agent_tools_config(webhook_base_url: str) -> list:
                             "type": "string",
                             "description": "The date to check availability for in YYYY-MM-DD format (e.g., 2025-01-15)"
                         },
+                        "end_date": {
+                            "type": "string",
+                            "description": "Optional last date (YYYY-MM-DD) to search a range, e.g. for 'next available this week'"
+                        },
                         "stylist_id": {
                             "type": "integer",
                             "description": "Optional stylist ID to check availability for a specific stylist"
@@ -460,6 +467,7 @@ async def lifespan(app: FastAPI):
     
     # Shutdown - optionally delete the agent
     logger.info("GlamBook AI Service shutting down...")
+    await close_db_pools()
 
 
 # Create FastAPI app
@@ -740,7 +748,8 @@ async def get_elevenlabs_signed_url():
                 
                 # Create call log in database
                 try:
-                    create_call_log(
+                    await asyncio.to_thread(
+                        create_call_log,
                         call_id=session_id,
                         caller_phone="webrtc",
                         session_id=session_id,
@@ -796,7 +805,8 @@ async def log_voice_transcript(request: Request):
         # Log each message to database
         try:
             for msg in messages:
-                log_agent_interaction(
+                await asyncio.to_thread(
+                    log_agent_interaction,
                     call_id=session_id,
                     session_id=session_id,
                     agent_type="elevenlabs",
@@ -836,7 +846,8 @@ async def webrtc_voice_disconnect(request: Request):
         
         # Update call log with completion status
         try:
-            update_call_log(
+            await asyncio.to_thread(
+                update_call_log,
                 session_id,
                 status="completed",
                 ended_at=datetime.now().isoformat(),
@@ -963,7 +974,7 @@ async def tool_get_services():
     Called by ElevenLabs agent when user asks about services.
     """
     try:
-        services = get_all_services()
+        services = await asyncio.to_thread(get_all_services)
         
         # Log the tool call
         log_broadcaster.log_function_call(
@@ -1003,7 +1014,7 @@ async def tool_get_stylists():
     Called by ElevenLabs agent when user asks about stylists.
     """
     try:
-        stylists = get_all_stylists()
+        stylists = await asyncio.to_thread(get_all_stylists)
         
         log_broadcaster.log_function_call(
             session_id="agent",
@@ -1043,10 +1054,11 @@ async def tool_get_available_slots(request: Request):
         logger.info(f"🗓️ get_available_slots processing...")
         
         date_str = data.get("date")
+        end_date_str = data.get("end_date")
         stylist_id = data.get("stylist_id")
         service_id = data.get("service_id", 1)  # Default to first service if not specified
         
-        logger.info(f"   📅 Date: {date_str}")
+        logger.info(f"   📅 Date: {date_str}{f' to {end_date_str}' if end_date_str else ''}")
         logger.info(f"   💇 Service ID: {service_id}")
         logger.info(f"   👤 Stylist ID: {stylist_id}")
         
@@ -1057,17 +1069,23 @@ async def tool_get_available_slots(request: Request):
         # Parse date
         try:
             target_date = date.fromisoformat(date_str)
+            end_date = date.fromisoformat(end_date_str) if end_date_str else target_date
+            # Bound the search and the slot list read back to the caller
+            end_date = min(end_date, target_date + timedelta(days=MAX_RANGE_DAYS - 1))
             logger.info(f"   ✅ Parsed date: {target_date}")
         except ValueError:
             logger.warning(f"   ❌ Invalid date format: {date_str}")
             return {"success": False, "error": "Invalid date format. Use YYYY-MM-DD"}
         
-        # Get available slots
+        # Get available slots (one batched lookup for the whole range)
         logger.info(f"   🔍 Querying database for available slots...")
-        slots = get_available_slots(
+        slots = await asyncio.to_thread(
+            get_available_slots_range,
             service_id=service_id,
-            check_date=target_date,
-            stylist_id=stylist_id
+            start_date=target_date,
+            end_date=end_date,
+            stylist_id=stylist_id,
+            limit=RANGE_SLOT_LIMIT if end_date > target_date else None
         )
         logger.info(f"   📊 Database returned {len(slots)} slots")
         
@@ -1075,6 +1093,7 @@ async def tool_get_available_slots(request: Request):
         formatted_slots = []
         for slot in slots:
             formatted_slots.append({
+                "date": slot.get("date"),
                 "stylist_id": slot.get("stylist_id"),
                 "stylist_name": slot.get("stylist_name"),
                 "time": slot.get("time"),
@@ -1088,8 +1107,11 @@ async def tool_get_available_slots(request: Request):
         result = {
             "success": True,
             "date": date_str,
+            "end_date": end_date.isoformat(),
             "available_slots": formatted_slots,
-            "message": f"Found {len(formatted_slots)} available slots on {date_str}"
+            "message": f"Found {len(formatted_slots)} available slots on {date_str}" if end_date == target_date
+                       else f"Found {len(formatted_slots)} available slots from {date_str} to {end_date.isoformat()}"
+                       + (" (earliest ones only)" if len(formatted_slots) >= RANGE_SLOT_LIMIT else "")
         }
         
         logger.info(f"   ✅ Returning {len(formatted_slots)} slots")
@@ -1162,10 +1184,11 @@ async def tool_create_appointment(request: Request):
         
         # Find or create customer
         logger.info(f"   🔍 Looking up customer by phone: {customer_phone}")
-        customer = find_customer_by_phone(customer_phone)
+        customer = await asyncio.to_thread(find_customer_by_phone, customer_phone)
         if not customer:
             logger.info(f"   ➕ Creating new customer: {customer_name}")
-            customer = create_customer(
+            customer = await asyncio.to_thread(
+                create_customer,
                 phone=customer_phone,
                 full_name=customer_name
             )
@@ -1182,23 +1205,16 @@ async def tool_create_appointment(request: Request):
         # Since ElevenLabs webhooks don't pass session context, we link to the latest in_progress call
         call_id = None
         try:
-            from db import get_db_cursor
-            with get_db_cursor() as cursor:
-                cursor.execute("""
-                    SELECT call_id FROM call_logs
-                    WHERE status = 'in_progress' AND caller_phone = 'webrtc'
-                    ORDER BY created_at DESC LIMIT 1
-                """)
-                result = cursor.fetchone()
-                if result:
-                    call_id = result['call_id']
-                    logger.info(f"   📞 Linking to call: {call_id}")
+            call_id = await async_queries.get_active_webrtc_call_id()
+            if call_id:
+                logger.info(f"   📞 Linking to call: {call_id}")
         except Exception as e:
             logger.warning(f"   ⚠️ Could not find active call: {e}")
 
         # Create the appointment
         logger.info(f"   📝 Creating appointment in database...")
-        appointment = create_appointment(
+        appointment = await asyncio.to_thread(
+            create_appointment,
             customer_id=customer_id,
             stylist_id=stylist_id,
             service_ids=[service_id],
@@ -1213,7 +1229,8 @@ async def tool_create_appointment(request: Request):
             # Update the call log with the appointment_id
             if call_id:
                 try:
-                    update_call_log(
+                    await asyncio.to_thread(
+                        update_call_log,
                         call_id,
                         appointment_id=appointment.get("appointment_id"),
                         action_taken="appointment_booked"
@@ -1287,12 +1304,12 @@ async def tool_lookup_appointment(request: Request):
         
         if phone:
             logger.info(f"   🔍 Looking up customer by phone...")
-            customer = find_customer_by_phone(phone)
+            customer = await asyncio.to_thread(find_customer_by_phone, phone)
             if customer:
                 customer_id = customer.get("customer_id")
                 logger.info(f"   ✅ Found customer ID: {customer_id}")
                 if customer_id:
-                    appointments = get_customer_appointments(customer_id, upcoming_only=True)
+                    appointments = await asyncio.to_thread(get_customer_appointments, customer_id, upcoming_only=True)
                     logger.info(f"   📊 Found {len(appointments)} appointments")
             else:
                 logger.info(f"   ℹ️ No customer found with phone: {phone}")
@@ -1348,7 +1365,8 @@ async def tool_cancel_appointment(request: Request):
             return {"success": False, "error": "Appointment ID is required"}
         
         logger.info(f"   🗑️ Cancelling appointment...")
-        result = cancel_appointment(
+        result = await asyncio.to_thread(
+            cancel_appointment,
             appointment_id=appointment_id,
             cancelled_by=None,  # Voice agent cancellation - no user ID
             reason=reason or "Cancelled via voice agent"
@@ -1412,7 +1430,8 @@ async def tool_reschedule_appointment(request: Request):
         except ValueError as e:
             return {"success": False, "error": f"Invalid date/time format: {e}"}
         
-        result = reschedule_appointment(
+        result = await asyncio.to_thread(
+            reschedule_appointment,
             appointment_id=appointment_id,
             new_date=new_date,
             new_start_time=new_time
@@ -1448,7 +1467,7 @@ async def tool_get_business_hours():
     Called by ElevenLabs agent when customer asks about hours.
     """
     try:
-        hours = get_business_hours()
+        hours = await asyncio.to_thread(get_business_hours)
         
         log_broadcaster.log_function_call(
             session_id="agent",
@@ -1558,7 +1577,8 @@ async def twilio_voice_app_webhook(
     logger.info(f"Web dialer call: {CallSid} from {From} to {To}")
     
     # Create call log
-    create_call_log(
+    await asyncio.to_thread(
+        create_call_log,
         call_id=CallSid,
         caller_phone=From or "web-dialer",
         session_id=CallSid
@@ -1566,9 +1586,9 @@ async def twilio_voice_app_webhook(
     
     # Look up customer if phone provided
     if From and From != "web-dialer":
-        customer = find_customer_by_phone(From)
+        customer = await asyncio.to_thread(find_customer_by_phone, From)
         if customer:
-            update_call_log(CallSid, customer_id=customer.get("customer_id"))
+            await asyncio.to_thread(update_call_log, CallSid, customer_id=customer.get("customer_id"))
     
     # Build WebSocket URL
     host = request.headers.get("host", f"localhost:{config.port}")
@@ -1592,7 +1612,7 @@ async def twilio_voice_app_webhook(
 @app.get("/", response_model=HealthResponse)
 async def root():
     """Health check endpoint."""
-    settings = get_salon_settings()
+    settings = await asyncio.to_thread(get_salon_settings)
     return HealthResponse(
         status="healthy",
         version="1.0.0",
@@ -1607,6 +1627,12 @@ async def health_check():
     return await root()
 
 
+@app.get("/health/db-pool")
+async def db_pool_stats():
+    """Connection pool size, wait time and checkout latency metrics."""
+    return get_pool_stats()
+
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """
@@ -1705,7 +1731,7 @@ async def list_voices():
 async def get_services():
     """Get all salon services."""
     try:
-        services = get_all_services()
+        services = await asyncio.to_thread(get_all_services)
         return {"services": services}
     except Exception as e:
         logger.error(f"Error getting services: {e}")
@@ -1716,7 +1742,7 @@ async def get_services():
 async def get_categories():
     """Get service categories."""
     try:
-        categories = get_service_categories()
+        categories = await asyncio.to_thread(get_service_categories)
         return {"categories": categories}
     except Exception as e:
         logger.error(f"Error getting categories: {e}")
@@ -1727,7 +1753,7 @@ async def get_categories():
 async def get_stylists():
     """Get all stylists."""
     try:
-        stylists = get_all_stylists()
+        stylists = await asyncio.to_thread(get_all_stylists)
         return {"stylists": stylists}
     except Exception as e:
         logger.error(f"Error getting stylists: {e}")
@@ -1738,7 +1764,7 @@ async def get_stylists():
 async def get_hours():
     """Get business hours."""
     try:
-        hours = get_business_hours()
+        hours = await asyncio.to_thread(get_business_hours)
         return {"hours": hours}
     except Exception as e:
         logger.error(f"Error getting hours: {e}")
@@ -1749,7 +1775,7 @@ async def get_hours():
 async def get_salon_info():
     """Get salon settings/info."""
     try:
-        settings = get_salon_settings()
+        settings = await asyncio.to_thread(get_salon_settings)
         return {"salon": settings}
     except Exception as e:
         logger.error(f"Error getting salon info: {e}")
@@ -1770,7 +1796,8 @@ async def voice_websocket(websocket: WebSocket, session_id: str):
     
     try:
         # Create call log
-        create_call_log(
+        await asyncio.to_thread(
+            create_call_log,
             call_id=session_id,
             caller_phone="webrtc",
             session_id=session_id
@@ -1792,10 +1819,10 @@ async def voice_websocket(websocket: WebSocket, session_id: str):
             
     except WebSocketDisconnect:
         logger.info(f"Voice WebSocket disconnected: {session_id}")
-        update_call_log(session_id, status="completed", ended_at=datetime.now().isoformat())
+        await asyncio.to_thread(update_call_log, session_id, status="completed", ended_at=datetime.now().isoformat())
     except Exception as e:
         logger.error(f"Voice WebSocket error: {e}")
-        update_call_log(session_id, status="failed")
+        await asyncio.to_thread(update_call_log, session_id, status="failed")
 
 
 # ============================================
@@ -1815,16 +1842,17 @@ async def twilio_voice_webhook(request: Dict[str, Any] = Body(...)):
     logger.info(f"Incoming call: {call_sid} from {from_number}")
     
     # Create call log
-    create_call_log(
+    await asyncio.to_thread(
+        create_call_log,
         call_id=call_sid,
         caller_phone=from_number,
         session_id=call_sid
     )
     
     # Look up customer
-    customer = find_customer_by_phone(from_number)
+    customer = await asyncio.to_thread(find_customer_by_phone, from_number)
     if customer:
-        update_call_log(call_sid, customer_id=customer.get("customer_id"))
+        await asyncio.to_thread(update_call_log, call_sid, customer_id=customer.get("customer_id"))
     
     # Generate TwiML response
     response = VoiceResponse()
@@ -13,15 +13,27 @@ class Settings:
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-5.2")
 
+    # Speech-to-text
+    STT_MAX_CONCURRENCY: int = int(os.getenv("STT_MAX_CONCURRENCY", "8"))
+    STT_PARTIAL_INTERVAL_MS: int = int(os.getenv("STT_PARTIAL_INTERVAL_MS", "1500"))
+
     # Server settings
     PORT: int = int(os.getenv("PORT", "8084"))
 
     # Backend URL for sending logs
     BACKEND_URL: str = os.getenv("BACKEND_URL", "http://backend:3001")
 
+    # Realtime log queue (batched POSTs to the backend)
+    LOG_QUEUE_MAX: int = int(os.getenv("LOG_QUEUE_MAX", "1000"))
+    LOG_BATCH_SIZE: int = int(os.getenv("LOG_BATCH_SIZE", "50"))
+    LOG_FLUSH_INTERVAL_MS: int = int(os.getenv("LOG_FLUSH_INTERVAL_MS", "200"))
+
     # Output directory (PersistentVolume mount point in k8s)
     OUTPUT_DIR: Path = Path(os.getenv("OUTPUT_DIR", "/data/outputs"))
 
+    # Content-addressed store for uploaded files (defaults to the output volume)
+    FILE_STORE_DIR: Path = Path(os.getenv("FILE_STORE_DIR", str(OUTPUT_DIR / "_files")))
+
     def __init__(self):
         # Ensure output directory exists
         self.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
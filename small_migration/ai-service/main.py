@@ -13,7 +13,8 @@ from dotenv import load_dotenv
 
 from config import settings
 from routes.migration import router as migration_router
-from routes.stt import router as stt_router
+from routes.stt import router as stt_router, close_stt_client
+from utils.realtime_logger import log_queue
 
 load_dotenv()
 
@@ -22,9 +23,12 @@ async def lifespan(app: FastAPI):
     # Startup
     print(f"AI Service starting on port {settings.PORT}")
     print(f"Using model: {settings.OPENAI_MODEL}")
+    log_queue.start()
     yield
     # Shutdown
     print("AI Service shutting down")
+    await log_queue.stop()
+    await close_stt_client()
 
 app = FastAPI(
     title="Circini Migration Agent AI Service",
@@ -55,7 +59,8 @@ async def health_check():
     return {
         "status": "healthy",
         "model": settings.OPENAI_MODEL,
-        "output_dir": str(settings.OUTPUT_DIR)
+        "output_dir": str(settings.OUTPUT_DIR),
+        "log_queue": log_queue.snapshot()
     }
 
 if __name__ == "__main__":
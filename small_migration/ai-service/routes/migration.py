@@ -3,11 +3,14 @@ Circini Migration Agent - FastAPI Routes
 """
 
 import os
+import re
+import json
 import time
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, List, Any
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
@@ -15,6 +18,7 @@ load_dotenv()
 
 from config import settings
 from utils.realtime_logger import RealtimeLogger
+from utils.file_store import file_store
 
 # Try to import the agents library
 try:
@@ -31,9 +35,19 @@ router = APIRouter()
 class ChatRequest(BaseModel):
     session_id: str
     message: str
+    # filename -> sha256 of content already uploaded via POST /files
+    file_refs: Optional[Dict[str, str]] = None
+    # Legacy: full file contents inline (stored and converted to refs)
     files: Optional[Dict[str, str]] = None
     history: Optional[List[Dict[str, str]]] = None
 
+class MissingFilesRequest(BaseModel):
+    hashes: List[str]
+
+class UploadFilesRequest(BaseModel):
+    # sha256 -> content
+    blobs: Dict[str, str]
+
 class GeneratedFile(BaseModel):
     name: str
     path: str
@@ -80,7 +94,7 @@ def get_session_storage(session_id: str) -> Dict[str, Any]:
     session_last_access[session_id] = time.time()
     if session_id not in session_storage:
         session_storage[session_id] = {
-            "files": {},
+            "files": {},  # filename -> content hash in file_store
             "outputs": {},
             "output_folder": None,
         }
@@ -119,7 +133,7 @@ def create_tools(session_id: str):
             file_name: Name of the file being uploaded.
             content: The content of the file.
         """
-        storage["files"][file_name] = content
+        storage["files"][file_name] = file_store.put(content)
         return f"File '{file_name}' loaded ({len(content)} characters)."
 
     @function_tool
@@ -158,7 +172,9 @@ def create_tools(session_id: str):
             file_name: Name of the file to retrieve.
         """
         if file_name in storage["files"]:
-            return storage["files"][file_name]
+            content = file_store.get(storage["files"][file_name])
+            if content is not None:
+                return content
         if file_name in storage["outputs"]:
             return storage["outputs"][file_name]
         return f"File '{file_name}' not found."
@@ -263,7 +279,7 @@ Before presenting output, verify ALL of the following:
 
 ## TOOL USAGE
 
-- When the user uploads files, use `read_file` to store them.
+- Uploaded files are already stored in the session (see the `[Uploaded files: ...]` note); read them with `get_file_content`. Use `read_file` only for file content pasted directly into the chat.
 - Use `get_file_content` to retrieve and analyze file contents before generating.
 - Use `list_files` to check what's available in the session.
 - Use `generate_output` to save each generated model as a downloadable file."""
@@ -285,6 +301,59 @@ def get_or_create_agent(session_id: str) -> "Agent":
         )
     return session_agents[session_id]
 
+async def _prepare_turn(request: ChatRequest, storage: Dict[str, Any], logger: RealtimeLogger) -> List[Dict[str, str]]:
+    """Register the turn's files and build the message list for the agent"""
+    # Files arrive as content hashes; the agent reads them with get_file_content
+    # instead of having every file inlined into every turn
+    file_refs = dict(request.file_refs or {})
+    if request.files:
+        for filename, content in request.files.items():
+            file_refs[filename] = file_store.put(content)
+
+    missing = file_store.missing(file_refs.values())
+    if missing:
+        # Client uploads these via POST /files and retries
+        raise HTTPException(status_code=409, detail={"missing": missing})
+
+    changed = [name for name, digest in file_refs.items() if storage["files"].get(name) != digest]
+    if changed:
+        await logger.thinking("Loading uploaded files...")
+    storage["files"].update(file_refs)
+
+    # Build the current user message (with file upload context if any)
+    current_message = request.message
+    if storage["files"]:
+        current_message += f"\n\n[Uploaded files: {', '.join(storage['files'].keys())}]"
+        if changed:
+            current_message += f"\n[New or updated this turn: {', '.join(changed)}. Use get_file_content to read them.]"
+        current_message += "\n"
+
+    # Bug 2 fix: Build structured message list instead of flat text
+    messages: List[Dict[str, str]] = []
+    if request.history:
+        for msg in request.history:
+            messages.append({
+                "role": msg["role"],
+                "content": msg["content"],  # No truncation
+            })
+    # Append the current user message
+    messages.append({"role": "user", "content": current_message})
+    return messages
+
+def _new_outputs(storage: Dict[str, Any], existing_output_keys: set) -> List[GeneratedFile]:
+    """Bug 4 fix: Only return NEW outputs generated this turn"""
+    generated_files = []
+    for filename, content in storage["outputs"].items():
+        if content and filename not in existing_output_keys:
+            output_folder = storage.get("output_folder")
+            filepath = str(output_folder / filename) if output_folder else filename
+            generated_files.append(GeneratedFile(
+                name=filename,
+                path=filepath,
+                content=content
+            ))
+    return generated_files
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """Process chat message with the agent"""
@@ -292,31 +361,7 @@ async def chat(request: ChatRequest):
     logger = RealtimeLogger(request.session_id)
 
     try:
-        # Bug 7 fix: Hydrate session storage from request files if storage is empty
-        # (handles pod restart — files come from DB via backend)
-        if request.files:
-            await logger.thinking("Loading uploaded files...")
-            for filename, content in request.files.items():
-                storage["files"][filename] = content
-
-        # Build the current user message (with file upload context if any)
-        current_message = request.message
-        if request.files:
-            file_list = ", ".join(request.files.keys())
-            current_message += f"\n\n[Uploaded files: {file_list}]\n"
-            for filename, content in request.files.items():
-                current_message += f"\n[{filename}]:\n{content}\n"
-
-        # Bug 2 fix: Build structured message list instead of flat text
-        messages: List[Dict[str, str]] = []
-        if request.history:
-            for msg in request.history:
-                messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"],  # No truncation
-                })
-        # Append the current user message
-        messages.append({"role": "user", "content": current_message})
+        messages = await _prepare_turn(request, storage, logger)
 
         # Bug 4 fix: Snapshot output keys before processing to track only new outputs
         existing_output_keys = set(storage["outputs"].keys())
@@ -338,30 +383,184 @@ async def chat(request: ChatRequest):
 
                 await logger.complete("Response ready")
             else:
-                response_text = f"Received: {request.message}\nFiles: {list(request.files.keys()) if request.files else 'None'}"
+                response_text = f"Received: {request.message}\nFiles: {list(storage['files'].keys()) or 'None'}"
         except Exception as e:
             await logger.error(f"AI processing failed: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
 
-        # Bug 4 fix: Only return NEW outputs generated this turn
-        generated_files = []
-        for filename, content in storage["outputs"].items():
-            if content and filename not in existing_output_keys:
-                output_folder = storage.get("output_folder")
-                filepath = str(output_folder / filename) if output_folder else filename
-                generated_files.append(GeneratedFile(
-                    name=filename,
-                    path=filepath,
-                    content=content
-                ))
-
         return ChatResponse(
             response=response_text,
-            generated_files=generated_files
+            generated_files=_new_outputs(storage, existing_output_keys)
         )
     finally:
         await logger.close()
 
+class StreamedOutputFile:
+    """
+    Follows the arguments of a streaming generate_output call and appends the
+    decoded `content` to the output file as it arrives, so partial SQL is on
+    disk (and relayed to the client) long before the tool itself runs. The
+    tool call then overwrites the file with the complete content.
+    """
+
+    _NAME = re.compile(r'"file_name"\s*:\s*"((?:[^"\\]|\\.)*)"')
+    _CONTENT = re.compile(r'"content"\s*:\s*"')
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.arguments = ""
+        self.name: Optional[str] = None
+        self.path: Optional[Path] = None
+        self._pos: Optional[int] = None
+        self._pending: List[str] = []
+        self._done = False
+
+    def _decodable_end(self, start: int) -> int:
+        """Index up to which the raw JSON string can be decoded without splitting an escape"""
+        raw = self.arguments
+        i = start
+        while i < len(raw):
+            char = raw[i]
+            if char == '"':
+                self._done = True
+                return i
+            if char != "\\":
+                i += 1
+                continue
+            if i + 1 >= len(raw):
+                break
+            if raw[i + 1] != "u":
+                i += 2
+                continue
+            # Keep surrogate pairs together
+            width = 12 if raw[i + 2:i + 4].lower() in ("d8", "d9", "da", "db") else 6
+            if i + width > len(raw):
+                break
+            i += width
+        return i
+
+    def feed(self, delta: str) -> str:
+        """Consume an arguments delta; return the content newly written to the file"""
+        self.arguments += delta
+        if self.name is None:
+            match = self._NAME.search(self.arguments)
+            if match:
+                self.name = json.loads(f'"{match.group(1)}"')
+        if self._pos is None:
+            match = self._CONTENT.search(self.arguments)
+            if match:
+                self._pos = match.end()
+        if self._pos is not None and not self._done:
+            end = self._decodable_end(self._pos)
+            if end > self._pos:
+                self._pending.append(json.loads(f'"{self.arguments[self._pos:end]}"'))
+            self._pos = end
+        return self._flush()
+
+    def _flush(self) -> str:
+        # Content can stream before file_name; hold it until the name is known
+        if self.name is None or not self._pending:
+            return ""
+        if self.path is None:
+            self.path = get_session_output_folder(self.session_id) / self.name
+            self.path.write_text("")
+        text = "".join(self._pending)
+        with self.path.open("a") as f:
+            f.write(text)
+        self._pending.clear()
+        return text
+
+def _sse(event: Dict[str, Any]) -> str:
+    return f"data: {json.dumps(event)}\n\n"
+
+async def _stream_chat(request: ChatRequest, storage: Dict[str, Any], messages: List[Dict[str, str]], logger: RealtimeLogger):
+    """
+    Relay one agent run as server-sent events.
+
+    Events: {"type": "delta", "content"} for response text,
+    {"type": "file_delta", "name", "content"} while generate_output streams,
+    {"type": "tool_call", "name"} / {"type": "tool_output", "output"} for tools,
+    then a final {"type": "response", ...ChatResponse} or {"type": "error", "detail"}.
+    """
+    existing_output_keys = set(storage["outputs"].keys())
+    output_files: Dict[str, StreamedOutputFile] = {}
+
+    try:
+        if not AGENTS_AVAILABLE:
+            response_text = f"Received: {request.message}\nFiles: {list(storage['files'].keys()) or 'None'}"
+            yield _sse({"type": "delta", "content": response_text})
+        else:
+            agent = get_or_create_agent(request.session_id)
+            await logger.ai_thinking("AI agent is analyzing...")
+
+            result = Runner.run_streamed(agent, messages)
+            async for event in result.stream_events():
+                if event.type == "raw_response_event":
+                    data = event.data
+                    if data.type == "response.output_text.delta":
+                        yield _sse({"type": "delta", "content": data.delta})
+                    elif data.type == "response.output_item.added":
+                        item = data.item
+                        if getattr(item, "type", None) == "function_call" and item.name == "generate_output":
+                            output_files[item.id] = StreamedOutputFile(request.session_id)
+                    elif data.type == "response.function_call_arguments.delta":
+                        streamed = output_files.get(data.item_id)
+                        if streamed is not None:
+                            text = streamed.feed(data.delta)
+                            if text:
+                                yield _sse({"type": "file_delta", "name": streamed.name, "content": text})
+                elif event.type == "run_item_stream_event":
+                    if event.name == "tool_called":
+                        yield _sse({"type": "tool_call", "name": getattr(event.item.raw_item, "name", None)})
+                    elif event.name == "tool_output":
+                        yield _sse({"type": "tool_output", "output": str(event.item.output)[:500]})
+            response_text = result.final_output
+
+        await logger.complete("Response ready")
+        response = ChatResponse(
+            response=response_text,
+            generated_files=_new_outputs(storage, existing_output_keys)
+        )
+        yield _sse({"type": "response", **response.model_dump()})
+    except Exception as e:
+        await logger.error(f"AI processing failed: {str(e)}")
+        yield _sse({"type": "error", "detail": str(e)})
+    finally:
+        await logger.close()
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Process chat message with the agent, streaming deltas and tool events (SSE)"""
+    storage = get_session_storage(request.session_id)
+    logger = RealtimeLogger(request.session_id)
+
+    try:
+        messages = await _prepare_turn(request, storage, logger)
+        await logger.thinking("Processing your request...")
+    except BaseException:
+        await logger.close()
+        raise
+
+    return StreamingResponse(
+        _stream_chat(request, storage, messages, logger),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/files/missing")
+async def missing_files(request: MissingFilesRequest):
+    """Return which of the given content hashes still need uploading"""
+    return {"missing": file_store.missing(request.hashes)}
+
+@router.post("/files")
+async def upload_files(request: UploadFilesRequest):
+    """Store file contents keyed by their sha256"""
+    try:
+        stored = file_store.put_many(request.blobs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"stored": stored}
+
 @router.post("/reset/{session_id}")
 async def reset_session(session_id: str):
     """Reset session storage and cached agent"""
@@ -1,17 +1,101 @@
 """
 Speech-to-Text route using OpenAI Whisper
+
+All transcription goes through one AsyncOpenAI client (pooled connections)
+and a process-wide concurrency limit. Besides the one-shot POST /stt, the
+/stt/stream WebSocket accepts MediaRecorder chunks while the user is still
+speaking and sends back partial transcripts.
 """
 
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from openai import OpenAI
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Optional
+
+import httpx
+from fastapi import APIRouter, UploadFile, File, HTTPException, WebSocket, WebSocketDisconnect
+from openai import AsyncOpenAI
 from config import settings
 
 router = APIRouter()
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
-
 STT_MODEL = "gpt-4o-transcribe"
 
+# Whisper's upload limit
+MAX_AUDIO_BYTES = 25 * 1024 * 1024
+
+EXT_MAP = {
+    "audio/webm": "webm",
+    "audio/ogg": "ogg",
+    "audio/wav": "wav",
+    "audio/mp4": "mp4",
+    "audio/mpeg": "mp3",
+    "application/octet-stream": "webm",  # MediaRecorder default
+}
+
+_client: Optional[AsyncOpenAI] = None
+_limit = asyncio.Semaphore(settings.STT_MAX_CONCURRENCY)
+
+
+def get_stt_client() -> AsyncOpenAI:
+    """Shared async client; connections are pooled across requests"""
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            http_client=httpx.AsyncClient(
+                timeout=httpx.Timeout(60.0, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=settings.STT_MAX_CONCURRENCY,
+                    max_keepalive_connections=settings.STT_MAX_CONCURRENCY,
+                ),
+            ),
+        )
+    return _client
+
+
+async def close_stt_client():
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def _filename(content_type: Optional[str]) -> str:
+    # Determine file extension from content type
+    base_type = (content_type or "").split(";")[0].strip()
+    return f"recording.{EXT_MAP.get(base_type, 'webm')}"
+
+
+async def transcribe(filename: str, audio_bytes: bytes, wait: bool = True) -> Optional[str]:
+    """
+    Transcribe a complete recording.
+
+    With wait=False the call is skipped (returns None) when every slot is
+    busy, so optional work like partial transcripts never queues.
+    """
+    if not wait and _limit.locked():
+        return None
+    async with _limit:
+        transcript = await get_stt_client().audio.transcriptions.create(
+            model=STT_MODEL,
+            file=(filename, audio_bytes),
+        )
+    return transcript.text
+
+
+async def transcribe_stream(filename: str, audio_bytes: bytes) -> AsyncIterator[str]:
+    """Transcribe a recording, yielding text deltas as the model produces them"""
+    async with _limit:
+        stream = await get_stt_client().audio.transcriptions.create(
+            model=STT_MODEL,
+            file=(filename, audio_bytes),
+            stream=True,
+        )
+        async for event in stream:
+            if event.type == "transcript.text.delta":
+                yield event.delta
+
 
 @router.post("/stt")
 async def speech_to_text(audio: UploadFile = File(...)):
@@ -23,25 +107,96 @@ async def speech_to_text(audio: UploadFile = File(...)):
 
     try:
         audio_bytes = await audio.read()
-
-        # Determine file extension from content type
-        ext_map = {
-            "audio/webm": "webm",
-            "audio/ogg": "ogg",
-            "audio/wav": "wav",
-            "audio/mp4": "mp4",
-            "audio/mpeg": "mp3",
-            "application/octet-stream": "webm",  # MediaRecorder default
-        }
-        ext = ext_map.get(audio.content_type, "webm")
-        filename = f"recording.{ext}"
-
-        transcript = client.audio.transcriptions.create(
-            model=STT_MODEL,
-            file=(filename, audio_bytes),
-        )
-
-        return {"text": transcript.text}
+        text = await transcribe(_filename(audio.content_type), audio_bytes)
+        return {"text": text}
     except Exception as e:
         print(f"[STT] Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.websocket("/stt/stream")
+async def speech_to_text_stream(websocket: WebSocket):
+    """
+    Streaming transcription over WebSocket.
+
+    Client -> server: optional {"type": "start", "mime_type": "audio/webm"},
+    then binary MediaRecorder chunks, then {"type": "stop"}.
+    Server -> client: {"type": "partial", "text"} while recording (at most
+    every STT_PARTIAL_INTERVAL_MS, skipped when the service is saturated),
+    {"type": "delta", "text"} as the final transcript streams in, then
+    {"type": "final", "text"} or {"type": "error", "detail"}.
+
+    MediaRecorder chunks are not independently decodable, so each partial
+    transcribes everything received so far.
+    """
+    await websocket.accept()
+    interval = settings.STT_PARTIAL_INTERVAL_MS / 1000
+    buffer = bytearray()
+    filename = _filename("audio/webm")
+    partial_size = 0
+    last_partial = 0.0
+    partial_task: Optional[asyncio.Task] = None
+
+    async def send_partial(audio_bytes: bytes):
+        try:
+            text = await transcribe(filename, audio_bytes, wait=False)
+            if text:
+                await websocket.send_json({"type": "partial", "text": text})
+        except Exception as e:
+            print(f"[STT] Partial transcription failed: {e}")
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+            if message.get("bytes"):
+                buffer.extend(message["bytes"])
+                if len(buffer) > MAX_AUDIO_BYTES:
+                    await websocket.send_json({"type": "error", "detail": "Recording too large"})
+                    await websocket.close()
+                    return
+
+                now = time.monotonic()
+                if (partial_task is None or partial_task.done()) and now - last_partial >= interval and len(buffer) > partial_size:
+                    last_partial = now
+                    partial_size = len(buffer)
+                    partial_task = asyncio.create_task(send_partial(bytes(buffer)))
+
+            elif message.get("text"):
+                control = json.loads(message["text"])
+                if control.get("type") == "start":
+                    filename = _filename(control.get("mime_type"))
+                    buffer.clear()
+                    partial_size = 0
+                elif control.get("type") == "stop":
+                    break
+
+        if partial_task is not None and not partial_task.done():
+            partial_task.cancel()
+            await asyncio.gather(partial_task, return_exceptions=True)
+
+        if not buffer:
+            await websocket.send_json({"type": "final", "text": ""})
+            await websocket.close()
+            return
+
+        parts = []
+        async for delta in transcribe_stream(filename, bytes(buffer)):
+            parts.append(delta)
+            await websocket.send_json({"type": "delta", "text": delta})
+        await websocket.send_json({"type": "final", "text": "".join(parts)})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"[STT] Stream error: {e}")
+        try:
+            await websocket.send_json({"type": "error", "detail": str(e)})
+            await websocket.close()
+        except Exception:
+            pass
+    finally:
+        if partial_task is not None and not partial_task.done():
+            partial_task.cancel()
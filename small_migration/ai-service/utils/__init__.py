@@ -1,3 +1,4 @@
-from .realtime_logger import RealtimeLogger
+from .realtime_logger import RealtimeLogger, LogQueue, log_queue
+from .file_store import FileStore, file_store, content_hash
 
-__all__ = ['RealtimeLogger']
+__all__ = ['RealtimeLogger', 'LogQueue', 'log_queue', 'FileStore', 'file_store', 'content_hash']
@@ -0,0 +1,105 @@
+"""
+Content-addressed store for uploaded session files
+
+Files are stored once under their SHA-256 (of the UTF-8 text) on the output
+volume, so clients send hashes on each chat turn and upload only blobs the
+service has not seen. Recently read blobs are kept in memory.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from config import settings
+
+_HASH = re.compile(r"^[0-9a-f]{64}$")
+
+
+def content_hash(content: str) -> str:
+    """SHA-256 hex digest of the file text (UTF-8)"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class FileStore:
+    """Blob store on local disk keyed by content hash"""
+
+    def __init__(self, root: Path, cache_bytes: int = 64 * 1024 * 1024):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.cache_bytes = cache_bytes
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cached_bytes = 0
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def _remember(self, digest: str, content: str) -> None:
+        if digest in self._cache:
+            self._cache.move_to_end(digest)
+            return
+        size = len(content)
+        if size > self.cache_bytes:
+            return
+        self._cache[digest] = content
+        self._cached_bytes += size
+        while self._cached_bytes > self.cache_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= len(evicted)
+
+    def has(self, digest: str) -> bool:
+        if not _HASH.match(digest):
+            return False
+        return digest in self._cache or self._path(digest).exists()
+
+    def missing(self, digests: Iterable[str]) -> List[str]:
+        """Hashes the store does not have yet"""
+        return [d for d in dict.fromkeys(digests) if not self.has(d)]
+
+    def put(self, content: str) -> str:
+        """Store content (no-op if already present) and return its hash"""
+        digest = content_hash(content)
+        path = self._path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so readers never see a partial blob
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            try:
+                # Bytes, not text mode: newline translation would change the hash
+                with os.fdopen(fd, "wb") as f:
+                    f.write(content.encode("utf-8"))
+                os.replace(tmp, path)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+                raise
+        self._remember(digest, content)
+        return digest
+
+    def put_many(self, blobs: Dict[str, str]) -> List[str]:
+        """Store {hash: content} uploads, rejecting any whose hash does not match"""
+        mismatched = [d for d, content in blobs.items() if content_hash(content) != d]
+        if mismatched:
+            raise ValueError(f"Content does not match hash: {', '.join(mismatched)}")
+        return [self.put(content) for content in blobs.values()]
+
+    def get(self, digest: str) -> Optional[str]:
+        """Content for a hash, or None if unknown"""
+        content = self._cache.get(digest)
+        if content is not None:
+            self._cache.move_to_end(digest)
+            return content
+        if not _HASH.match(digest):
+            return None
+        path = self._path(digest)
+        if not path.exists():
+            return None
+        content = path.read_bytes().decode("utf-8")
+        self._remember(digest, content)
+        return content
+
+
+file_store = FileStore(settings.FILE_STORE_DIR)
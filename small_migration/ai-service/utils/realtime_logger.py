@@ -1,34 +1,147 @@
 """
 Real-time logger that sends progress updates to backend WebSocket
+
+Entries go onto one process-wide, bounded in-memory queue and are POSTed to
+the backend in batches by a background task using a single shared client,
+so logging never adds latency to a request. When the queue is full,
+progress-only entries are dropped first.
 """
 
+import asyncio
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, Optional, Any
+
 import httpx
-from typing import Optional, Any
 from config import settings
 
+# Status lines that are safe to lose under pressure
+PROGRESS_ONLY_TYPES = {"progress", "thinking", "info"}
+
+
+class LogQueue:
+    """Bounded queue of log entries flushed to the backend in batches"""
+
+    def __init__(self, max_entries: int, batch_size: int, flush_interval: float):
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.endpoint = f"{settings.BACKEND_URL}/api/logs"
+        self._entries: Deque[Dict[str, Any]] = deque()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+        # Metrics
+        self.sent = 0
+        self.dropped = 0
+        self.failed_batches = 0
+
+    def start(self) -> None:
+        """Start the flush task (also started lazily on first log)"""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._client = httpx.AsyncClient(timeout=5.0)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush what is queued and close the shared client"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client is not None:
+            while self._entries:
+                await self._flush()
+            await self._client.aclose()
+            self._client = None
+
+    def put(self, entry: Dict[str, Any]) -> None:
+        """Queue an entry without waiting on the network"""
+        if self._task is None or self._task.done():
+            self.start()
+
+        if len(self._entries) >= self.max_entries:
+            if entry.get("type") in PROGRESS_ONLY_TYPES:
+                self.dropped += 1
+                return
+            self._evict_one()
+
+        self._entries.append(entry)
+        if len(self._entries) >= self.batch_size:
+            self._wakeup.set()
+
+    def _evict_one(self) -> None:
+        for queued in self._entries:
+            if queued.get("type") in PROGRESS_ONLY_TYPES:
+                self._entries.remove(queued)
+                break
+        else:
+            self._entries.popleft()
+        self.dropped += 1
+
+    async def _flush(self) -> None:
+        batch = [self._entries.popleft() for _ in range(min(self.batch_size, len(self._entries)))]
+        if not batch:
+            return
+        try:
+            response = await self._client.post(self.endpoint, json={"entries": batch})
+            response.raise_for_status()
+            self.sent += len(batch)
+        except Exception as e:
+            # Don't let logging failures break the main flow
+            self.failed_batches += 1
+            print(f"[RealtimeLogger] Failed to send {len(batch)} log(s): {e}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._entries:
+                await self._flush()
+                if len(self._entries) < self.batch_size:
+                    break
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._entries),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "failed_batches": self.failed_batches,
+        }
+
+
+log_queue = LogQueue(
+    max_entries=settings.LOG_QUEUE_MAX,
+    batch_size=settings.LOG_BATCH_SIZE,
+    flush_interval=settings.LOG_FLUSH_INTERVAL_MS / 1000,
+)
+
+
 class RealtimeLogger:
     """Sends real-time log updates to the backend WebSocket server"""
 
     def __init__(self, session_id: str):
         self.session_id = session_id
-        self.backend_url = f"{settings.BACKEND_URL}/api/logs/{session_id}"
-        self._client = httpx.AsyncClient(timeout=5.0)
 
     async def log(self, step: str, message: str, log_type: str = "info", data: Optional[Any] = None):
-        """Send a log entry to the backend"""
-        try:
-            payload = {
-                "step": step,
-                "message": message,
-                "type": log_type,
-            }
-            if data is not None:
-                payload["data"] = data
-
-            await self._client.post(self.backend_url, json=payload)
-        except Exception as e:
-            # Don't let logging failures break the main flow
-            print(f"[RealtimeLogger] Failed to send log: {e}")
+        """Queue a log entry for the backend (returns immediately)"""
+        entry = {
+            "session_id": self.session_id,
+            "step": step,
+            "message": message,
+            "type": log_type,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+        if data is not None:
+            entry["data"] = data
+        log_queue.put(entry)
 
     async def file_detected(self, filename: str, detected_type: str, confidence: str):
         """Log file detection"""
@@ -96,5 +209,4 @@ class RealtimeLogger:
         )
 
     async def close(self):
-        """Close the HTTP client"""
-        await self._client.aclose()
+        """Nothing to release; entries are flushed by the shared queue"""
@@ -86,10 +86,10 @@ io.on('connection', (socket) => {
 });
 
 // Helper to emit logs to a session
-export function emitLog(sessionId: string, log: { step: string; message: string; type?: string; data?: any }) {
+export function emitLog(sessionId: string, log: { step: string; message: string; type?: string; data?: any; timestamp?: string }) {
   io.to(`session:${sessionId}`).emit('log', {
-    timestamp: new Date().toISOString(),
-    ...log
+    ...log,
+    timestamp: log.timestamp || new Date().toISOString()
   });
 }
 
@@ -101,6 +101,17 @@ app.post('/api/logs/:sessionId', express.json(), (req, res) => {
   res.json({ ok: true });
 });
 
+// Batched variant: the AI service flushes queued entries for many sessions at once
+app.post('/api/logs', express.json({ limit: '1mb' }), (req, res) => {
+  const entries: any[] = Array.isArray(req.body?.entries) ? req.body.entries : [];
+  for (const { session_id, step, message, type, data, timestamp } of entries) {
+    if (session_id) {
+      emitLog(session_id, { step, message, type, data, timestamp });
+    }
+  }
+  res.json({ ok: true, received: entries.length });
+});
+
 // Graceful shutdown
 process.on('SIGTERM', async () => {
   console.log('SIGTERM received, shutting down...');
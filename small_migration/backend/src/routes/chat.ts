@@ -48,7 +48,7 @@ router.post('/:sessionId/messages', async (req: Request, res: Response) => {
     // Reverse messages from desc to chronological order
     session.messages.reverse();
 
-    // Always send files to AI service so it has them even if uploaded mid-conversation
+    // Files are sent by content hash; the AI service asks for any it has not stored yet
     let files: Record<string, string> | undefined;
     if (session.files.length > 0) {
       const fileMap: Record<string, string> = {};
@@ -59,7 +59,7 @@ router.post('/:sessionId/messages', async (req: Request, res: Response) => {
       }
       if (Object.keys(fileMap).length > 0) {
         files = fileMap;
-        console.log(`[CHAT] Sending ${Object.keys(fileMap).length} files to AI service: ${Object.keys(fileMap).join(', ')}`);
+        console.log(`[CHAT] Referencing ${Object.keys(fileMap).length} files for AI service: ${Object.keys(fileMap).join(', ')}`);
       }
     }
 
@@ -73,9 +73,8 @@ router.post('/:sessionId/messages', async (req: Request, res: Response) => {
     const aiResponse = await sendToAIService({
       session_id: sessionId,
       message,
-      files,
       history
-    });
+    }, files);
 
     // Save assistant message
     const assistantMessage = await prisma.message.create({
@@ -1,11 +1,12 @@
 import axios from 'axios';
+import { createHash } from 'crypto';
 
 const AI_SERVICE_URL = process.env.AI_SERVICE_URL || 'http://localhost:8084';
 
 interface ChatRequest {
   session_id: string;
   message: string;
-  files?: Record<string, string>;
+  file_refs?: Record<string, string>;
   history?: Array<{ role: string; content: string }>;
 }
 
@@ -27,20 +28,63 @@ interface ChatResponse {
   };
 }
 
-export async function sendToAIService(request: ChatRequest): Promise<ChatResponse> {
+export function contentHash(content: string): string {
+  return createHash('sha256').update(content, 'utf8').digest('hex');
+}
+
+async function postChat(request: ChatRequest): Promise<ChatResponse> {
+  const response = await axios.post<ChatResponse>(
+    `${AI_SERVICE_URL}/ai/chat`,
+    request,
+    {
+      headers: {
+        'Content-Type': 'application/json'
+      },
+      timeout: 600000 // 10 minute timeout for AI processing (reasoning models with large files)
+    }
+  );
+  return response.data;
+}
+
+/**
+ * Send a chat turn with files referenced by content hash.
+ * The AI service answers 409 with the hashes it has not stored yet; only
+ * those files are uploaded before retrying, so unchanged files never travel twice.
+ */
+export async function sendToAIService(
+  request: ChatRequest,
+  files?: Record<string, string>
+): Promise<ChatResponse> {
+  const blobs: Record<string, string> = {};
+  if (files && Object.keys(files).length > 0) {
+    request.file_refs = {};
+    for (const [filename, content] of Object.entries(files)) {
+      const hash = contentHash(content);
+      request.file_refs[filename] = hash;
+      blobs[hash] = content;
+    }
+  }
+
   try {
-    const response = await axios.post<ChatResponse>(
-      `${AI_SERVICE_URL}/ai/chat`,
-      request,
-      {
-        headers: {
-          'Content-Type': 'application/json'
-        },
-        timeout: 600000 // 10 minute timeout for AI processing (reasoning models with large files)
+    try {
+      return await postChat(request);
+    } catch (error) {
+      const missing: string[] | undefined = axios.isAxiosError(error) && error.response?.status === 409
+        ? error.response.data?.detail?.missing
+        : undefined;
+      if (!missing) {
+        throw error;
       }
-    );
-
-    return response.data;
+      const upload: Record<string, string> = {};
+      for (const hash of missing) {
+        if (blobs[hash] !== undefined) {
+          upload[hash] = blobs[hash];
+        }
+      }
+      console.log(`[CHAT] Uploading ${Object.keys(upload).length} new file(s) to AI service`);
+      await axios.post(`${AI_SERVICE_URL}/ai/files`, { blobs: upload }, { timeout: 60000 });
+      return await postChat(request);
+    }
   } catch (error) {
     if (axios.isAxiosError(error)) {
       console.error('AI Service error:', error.response?.data || error.message);
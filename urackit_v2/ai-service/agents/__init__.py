@@ -7,7 +7,7 @@ Uses the OpenAI Agents SDK for tool calling and handoffs.
 
 import asyncio
 from functools import wraps
-from typing import Any, Callable, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
 
 
 def function_tool(func: Callable) -> Callable:
@@ -16,11 +16,17 @@ def function_tool(func: Callable) -> Callable:
     
     Preserves function metadata and marks it as callable by agents.
     The OpenAI Agents SDK will use the function's docstring as the tool description.
+    Coroutine functions stay coroutine functions so callers can await them.
     """
     
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        return func(*args, **kwargs)
+    if asyncio.iscoroutinefunction(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await func(*args, **kwargs)
+    else:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return func(*args, **kwargs)
     
     # Mark as a tool for agent discovery
     wrapper.name = getattr(func, "name", func.__name__)
@@ -122,6 +128,24 @@ class Runner:
         
         pipeline = AgentPipeline()
         return await pipeline.process(agent, text, context)
+    
+    @staticmethod
+    def run_streamed(
+        agent: Agent,
+        text: str,
+        session: Optional[Any] = None,
+        context: Optional[dict] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run the agent, yielding answer tokens as they are generated.
+        
+        Yields "delta" (answer text, not tool-round preamble) and "tool_call" events, then a single "done" event
+        carrying the AgentResult (see AgentPipeline.stream).
+        """
+        from .pipeline import AgentPipeline
+        
+        pipeline = AgentPipeline()
+        return pipeline.stream(agent, text, context)
 
 
 class Session:
@@ -5,31 +5,56 @@ Uses OpenAI's API for chat completions with tool calling.
 Manages agent handoffs and conversation flow.
 """
 
+import asyncio
+import inspect
 import json
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 
 from config import get_config
 
 logger = logging.getLogger(__name__)
 
+ERROR_MESSAGE = "I apologize, but I encountered an error. Please try again or say 'technician' to speak with a human."
+
+# One client per process so HTTP connections are reused across requests
+_client: Optional[AsyncOpenAI] = None
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """Get the shared async OpenAI client."""
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI(api_key=get_config().openai_api_key)
+    return _client
+
+
+async def close_openai_client() -> None:
+    """Close the shared async OpenAI client."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
 
 class AgentPipeline:
     """
     Orchestrates the multi-agent pipeline for IT support.
     
     Handles:
-    - Tool calling with OpenAI API
+    - Tool calling with OpenAI API (multiple rounds, up to max_steps)
     - Agent handoffs
     - Conversation context management
+    - Streaming of the final answer
     """
     
-    def __init__(self):
+    def __init__(self, max_steps: Optional[int] = None):
         config = get_config()
-        self.client = OpenAI(api_key=config.openai_api_key)
+        self.client = get_openai_client()
         self.model = config.openai_model
+        self.max_steps = max_steps or config.agent_max_steps
     
     async def process(
         self,
@@ -48,62 +73,128 @@ class AgentPipeline:
         Returns:
             AgentResult with the response
         """
+        result = None
+        async for event in self.stream(agent, user_input, context):
+            if event["type"] == "done":
+                result = event["result"]
+        return result
+    
+    async def stream(
+        self,
+        agent: Any,
+        user_input: str,
+        context: Optional[Dict] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process user input, yielding events as they happen.
+        
+        Every model round is streamed. Rounds that request tools run them
+        concurrently and loop. Answer text is yielded token by token as soon
+        as it arrives; a round whose first delta is a tool call is a tool
+        round, and any preamble text it carries is not yielded.
+        
+        Yields:
+            {"type": "delta", "content": str} for answer text
+            {"type": "tool_call", "name": str, "arguments": str} per tool call
+            {"type": "done", "result": AgentResult} once, last
+        """
         from agents import AgentResult
         
         context = context or {}
         messages = self._build_messages(agent, user_input, context)
         tools = self._build_tools(agent)
+        all_tool_calls: List[Dict] = []
+        output = ""
         
         try:
-            # Call OpenAI API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                tools=tools if tools else None,
-                tool_choice="auto" if tools else None,
-            )
-            
-            message = response.choices[0].message
-            
-            # Handle tool calls
-            if message.tool_calls:
-                tool_results = await self._execute_tool_calls(agent, message.tool_calls)
-                
-                # Add tool results to messages and get final response
-                messages.append(message)
-                for tool_call, result in zip(message.tool_calls, tool_results):
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "content": result,
-                    })
+            for step in range(self.max_steps + 1):
+                # Out of budget: ask for an answer with what we have
+                use_tools = bool(tools) and step < self.max_steps
                 
-                # Get final response after tool execution
-                final_response = self.client.chat.completions.create(
+                response = await self.client.chat.completions.create(
                     model=self.model,
                     messages=messages,
+                    tools=tools if use_tools else None,
+                    tool_choice="auto" if use_tools else None,
+                    stream=True,
                 )
                 
-                output = final_response.choices[0].message.content or ""
-            else:
-                output = message.content or ""
+                output = ""
+                # Decided by the round's first delta: answer text or a tool call
+                answering: Optional[bool] = None
+                pending: Dict[int, Dict] = {}
+                async for chunk in response:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    if answering is None and (delta.content or delta.tool_calls):
+                        answering = not delta.tool_calls
+                    if delta.content:
+                        output += delta.content
+                        if answering:
+                            yield {"type": "delta", "content": delta.content}
+                    for tc in delta.tool_calls or []:
+                        call = pending.setdefault(tc.index, {
+                            "id": "",
+                            "type": "function",
+                            "function": {"name": "", "arguments": ""},
+                        })
+                        if tc.id:
+                            call["id"] = tc.id
+                        if tc.function and tc.function.name:
+                            call["function"]["name"] += tc.function.name
+                        if tc.function and tc.function.arguments:
+                            call["function"]["arguments"] += tc.function.arguments
+                
+                if not pending:
+                    break
+                
+                tool_calls = [pending[i] for i in sorted(pending)]
+                all_tool_calls.extend(tool_calls)
+                for call in tool_calls:
+                    yield {
+                        "type": "tool_call",
+                        "name": call["function"]["name"],
+                        "arguments": call["function"]["arguments"],
+                    }
+                
+                tool_results = await self._execute_tool_calls(agent, tool_calls)
+                
+                messages.append({
+                    "role": "assistant",
+                    "content": output or None,
+                    "tool_calls": tool_calls,
+                })
+                for call, result in zip(tool_calls, tool_results):
+                    messages.append({
+                        "role": "tool",
+                        "tool_call_id": call["id"],
+                        "content": result,
+                    })
             
             # Check for handoff keywords
             handoff_to = self._check_handoff(agent, output)
             
-            return AgentResult(
-                output=output,
-                agent_name=agent.name,
-                tool_calls=[tc.model_dump() for tc in message.tool_calls] if message.tool_calls else [],
-                handoff_to=handoff_to,
-            )
+            yield {
+                "type": "done",
+                "result": AgentResult(
+                    output=output,
+                    agent_name=agent.name,
+                    tool_calls=all_tool_calls,
+                    handoff_to=handoff_to,
+                ),
+            }
             
         except Exception as e:
             logger.error(f"Agent pipeline error: {e}")
-            return AgentResult(
-                output=f"I apologize, but I encountered an error. Please try again or say 'technician' to speak with a human.",
-                agent_name=agent.name,
-            )
+            yield {
+                "type": "done",
+                "result": AgentResult(
+                    output=ERROR_MESSAGE,
+                    agent_name=agent.name,
+                    tool_calls=all_tool_calls,
+                ),
+            }
     
     def _build_messages(
         self,
@@ -138,7 +229,6 @@ class AgentPipeline:
                 continue
             
             # Get function signature for parameters
-            import inspect
             sig = inspect.signature(tool.__wrapped__ if hasattr(tool, "__wrapped__") else tool)
             
             properties = {}
@@ -184,27 +274,34 @@ class AgentPipeline:
     async def _execute_tool_calls(
         self,
         agent: Any,
-        tool_calls: List,
+        tool_calls: List[Dict],
     ) -> List[str]:
-        """Execute tool calls and return results."""
-        results = []
+        """Execute one round of tool calls concurrently; results keep call order."""
+        return await asyncio.gather(
+            *(self._execute_tool_call(agent, tool_call) for tool_call in tool_calls)
+        )
+    
+    async def _execute_tool_call(self, agent: Any, tool_call: Dict) -> str:
+        """Execute a single tool call and return its result as text."""
+        function_name = tool_call["function"]["name"]
         
-        for tool_call in tool_calls:
-            function_name = tool_call.function.name
-            function_args = json.loads(tool_call.function.arguments)
-            
-            tool = agent.get_tool_by_name(function_name)
-            if tool:
-                try:
-                    result = tool(**function_args)
-                    results.append(str(result))
-                except Exception as e:
-                    logger.error(f"Tool execution error: {e}")
-                    results.append(f"Error executing {function_name}: {str(e)}")
-            else:
-                results.append(f"Unknown tool: {function_name}")
+        tool = agent.get_tool_by_name(function_name)
+        if not tool:
+            return f"Unknown tool: {function_name}"
         
-        return results
+        try:
+            function_args = json.loads(tool_call["function"]["arguments"] or "{}")
+            if inspect.iscoroutinefunction(tool):
+                result = await tool(**function_args)
+            else:
+                # Sync tools (DB lookups) must not block the loop or the other calls
+                result = await asyncio.to_thread(tool, **function_args)
+            if inspect.isawaitable(result):
+                result = await result
+            return str(result)
+        except Exception as e:
+            logger.error(f"Tool execution error: {e}")
+            return f"Error executing {function_name}: {str(e)}"
     
     def _check_handoff(self, agent: Any, output: str) -> Optional[str]:
         """Check if the output indicates a handoff to another agent."""
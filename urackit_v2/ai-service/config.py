@@ -20,6 +20,7 @@ class Config:
     # OpenAI
     openai_api_key: str = field(default_factory=lambda: os.getenv("OPENAI_API_KEY", ""))
     openai_model: str = field(default_factory=lambda: os.getenv("OPENAI_MODEL", "gpt-4o"))
+    agent_max_steps: int = field(default_factory=lambda: int(os.getenv("AGENT_MAX_STEPS", "5")))
     openai_realtime_model: str = field(default_factory=lambda: os.getenv("OPENAI_REALTIME_MODEL", "gpt-4o-realtime-preview"))
     voice: str = field(default_factory=lambda: os.getenv("VOICE", "alloy"))
     
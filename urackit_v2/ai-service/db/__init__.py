@@ -2,7 +2,7 @@
 Database module for URackIT AI Service.
 """
 
-from .connection import SupabaseDB, get_db
+from .connection import SupabaseDB, AsyncSupabaseDB, get_db, get_async_db, close_async_db
 from .queries import *
 
-__all__ = ["SupabaseDB", "get_db"]
+__all__ = ["SupabaseDB", "AsyncSupabaseDB", "get_db", "get_async_db", "close_async_db"]
@@ -1,13 +1,18 @@
 """
 Supabase REST API Database Interface for URackIT AI Service.
 
-Provides a simple interface to interact with Supabase via REST API.
+Provides a simple interface to interact with Supabase via REST API:
+a blocking client for background jobs and an async, connection-pooled
+client for live voice tool calls.
 """
 
+import asyncio
 import os
 import logging
+import random
 from typing import Any, Dict, List, Optional
 
+import httpx
 import requests
 from dotenv import load_dotenv
 
@@ -16,6 +21,14 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 
 
+def _parse_content_range(value: Optional[str]) -> int:
+    """Total row count from a PostgREST Content-Range header ("0-24/3573" or "*/0")."""
+    if not value or "/" not in value:
+        return 0
+    total = value.rsplit("/", 1)[1]
+    return int(total) if total.isdigit() else 0
+
+
 class SupabaseDB:
     """Supabase REST API client for database operations."""
     
@@ -35,6 +48,8 @@ class SupabaseDB:
             "Content-Type": "application/json",
             "Prefer": "return=representation"
         }
+        # Reuse connections (keep-alive) across requests
+        self.session = requests.Session()
     
     def _get_endpoint(self, table: str) -> str:
         """Get the REST endpoint URL for a table."""
@@ -56,7 +71,7 @@ class SupabaseDB:
             headers["Prefer"] = prefer
         
         try:
-            response = requests.request(
+            response = self.session.request(
                 method=method,
                 url=url,
                 headers=headers,
@@ -126,12 +141,29 @@ class SupabaseDB:
             prefer="return=representation",
         )
     
+    def count(self, table: str, filters: Optional[Dict] = None) -> int:
+        """Count matching rows with a HEAD request (no rows are transferred)."""
+        headers = self.headers.copy()
+        headers["Prefer"] = "count=exact"
+        try:
+            response = self.session.head(
+                self._get_endpoint(table),
+                headers=headers,
+                params=filters,
+                timeout=30,
+            )
+            response.raise_for_status()
+            return _parse_content_range(response.headers.get("Content-Range"))
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Database request error: {e}")
+            raise
+    
     def rpc(self, function_name: str, params: Optional[Dict] = None) -> Any:
         """Call a PostgreSQL function via RPC."""
         url = f"{self.url}/rest/v1/rpc/{function_name}"
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 url,
                 headers=self.headers,
                 json=params or {},
@@ -147,8 +179,245 @@ class SupabaseDB:
             raise
 
 
+class AsyncSupabaseDB:
+    """
+    Async Supabase REST API client for latency-sensitive (voice) tool calls.
+
+    Keeps one pooled httpx.AsyncClient (HTTP/2 when available) so requests
+    reuse warm TLS connections. Every call runs under a deadline that covers
+    all retry attempts; transient failures are retried with full-jitter
+    exponential backoff while the deadline allows.
+    """
+
+    RETRY_STATUSES = {429, 502, 503, 504}
+    IDEMPOTENT_METHODS = {"GET", "HEAD", "PATCH", "DELETE"}
+
+    def __init__(self):
+        self.url = os.getenv("SUPABASE_URL", "").rstrip("/")
+        self.service_key = (
+            os.getenv("SUPABASE_SERVICE_ROLE_KEY", "") or 
+            os.getenv("SUPABASE_SERVICE_KEY", "")
+        )
+        
+        if not self.url or not self.service_key:
+            logger.warning("Supabase configuration incomplete. Set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY.")
+        
+        self.headers = {
+            "apikey": self.service_key,
+            "Authorization": f"Bearer {self.service_key}",
+            "Content-Type": "application/json",
+            "Prefer": "return=representation"
+        }
+
+        # Voice budgets: reads must answer well inside a conversational pause
+        self.read_deadline = float(os.getenv("SUPABASE_READ_DEADLINE", "0.8"))
+        self.write_deadline = float(os.getenv("SUPABASE_WRITE_DEADLINE", "2.0"))
+        self.max_retries = int(os.getenv("SUPABASE_MAX_RETRIES", "2"))
+        self.backoff_base = float(os.getenv("SUPABASE_BACKOFF_BASE", "0.05"))
+        self.backoff_cap = float(os.getenv("SUPABASE_BACKOFF_CAP", "0.25"))
+        self.pool_size = int(os.getenv("SUPABASE_POOL_SIZE", "20"))
+        self.http2 = os.getenv("SUPABASE_HTTP2", "true").lower() == "true"
+
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Create the shared pooled client on first use."""
+        if self._client is None or self._client.is_closed:
+            http2 = self.http2
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    logger.warning("h2 not installed; Supabase client falling back to HTTP/1.1")
+                    http2 = False
+            self._client = httpx.AsyncClient(
+                base_url=f"{self.url}/rest/v1",
+                headers=self.headers,
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size,
+                    keepalive_expiry=60.0,
+                ),
+                timeout=httpx.Timeout(self.write_deadline),
+            )
+        return self._client
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for a retry attempt."""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict] = None,
+        data: Optional[Dict | List] = None,
+        headers: Optional[Dict] = None,
+        deadline: Optional[float] = None,
+        idempotent: Optional[bool] = None,
+    ) -> httpx.Response:
+        """Send a request with a total deadline and jittered retries."""
+        client = self._get_client()
+        loop = asyncio.get_running_loop()
+        budget = deadline or (self.read_deadline if method in ("GET", "HEAD") else self.write_deadline)
+        expires_at = loop.time() + budget
+        if idempotent is None:
+            idempotent = method in self.IDEMPOTENT_METHODS
+
+        attempt = 0
+        while True:
+            remaining = expires_at - loop.time()
+            if remaining <= 0:
+                raise httpx.TimeoutException(f"Supabase {method} {path} exceeded {budget:.2f}s deadline")
+            try:
+                response = await client.request(
+                    method,
+                    path,
+                    params=params,
+                    json=data,
+                    headers=headers,
+                    timeout=httpx.Timeout(remaining),
+                )
+                if response.status_code in self.RETRY_STATUSES and idempotent and attempt < self.max_retries:
+                    raise httpx.HTTPStatusError(
+                        f"Retryable status {response.status_code}", request=response.request, response=response
+                    )
+                response.raise_for_status()
+                return response
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                # Connection-level failures never reached the server, so they are safe to retry
+                retryable = (
+                    isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+                    or (idempotent and isinstance(e, httpx.TransportError))
+                    or (idempotent and isinstance(e, httpx.HTTPStatusError)
+                        and e.response.status_code in self.RETRY_STATUSES)
+                )
+                delay = self._backoff(attempt)
+                if not retryable or attempt >= self.max_retries or loop.time() + delay >= expires_at:
+                    logger.error(f"Database request error: {e}")
+                    raise
+                attempt += 1
+                logger.warning(f"Supabase {method} {path} failed ({e}); retry {attempt} in {delay * 1000:.0f}ms")
+                await asyncio.sleep(delay)
+
+    async def _make_request(
+        self,
+        method: str,
+        table: str,
+        params: Optional[Dict] = None,
+        data: Optional[Dict | List] = None,
+        prefer: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ) -> List[Dict]:
+        """Make a request to the Supabase REST API."""
+        headers = {"Prefer": prefer} if prefer else None
+        response = await self._send(method, f"/{table}", params=params, data=data, headers=headers, deadline=deadline)
+        if response.content:
+            return response.json()
+        return []
+
+    async def select(
+        self,
+        table: str,
+        columns: str = "*",
+        filters: Optional[Dict] = None,
+        limit: Optional[int] = None,
+        order: Optional[str] = None,
+    ) -> List[Dict]:
+        """Select rows from a table."""
+        params = {"select": columns}
+        
+        if filters:
+            params.update(filters)
+        if limit:
+            params["limit"] = str(limit)
+        if order:
+            params["order"] = order
+        
+        return await self._make_request("GET", table, params=params)
+
+    async def insert(self, table: str, data: Dict | List[Dict]) -> List[Dict]:
+        """Insert one or more rows into a table."""
+        return await self._make_request(
+            "POST",
+            table,
+            data=data if isinstance(data, list) else [data],
+            prefer="return=representation",
+        )
+
+    async def insert_many(
+        self,
+        table: str,
+        rows: List[Dict],
+        on_conflict: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ) -> None:
+        """
+        Bulk insert rows in one request without returning them.
+
+        With on_conflict, rows whose key already exists are skipped, so a
+        retried batch does not fail on the rows that made it the first time.
+        """
+        prefer = "return=minimal"
+        params = None
+        if on_conflict:
+            prefer += ",resolution=ignore-duplicates"
+            params = {"on_conflict": on_conflict}
+        await self._make_request("POST", table, params=params, data=rows, prefer=prefer, deadline=deadline)
+
+    async def update(self, table: str, data: Dict, filters: Dict) -> List[Dict]:
+        """Update rows matching filters."""
+        return await self._make_request(
+            "PATCH",
+            table,
+            params=filters,
+            data=data,
+            prefer="return=representation",
+        )
+
+    async def delete(self, table: str, filters: Dict) -> List[Dict]:
+        """Delete rows matching filters."""
+        return await self._make_request(
+            "DELETE",
+            table,
+            params=filters,
+            prefer="return=representation",
+        )
+
+    async def count(self, table: str, filters: Optional[Dict] = None) -> int:
+        """Count matching rows with a HEAD request (no rows are transferred)."""
+        response = await self._send("HEAD", f"/{table}", params=filters, headers={"Prefer": "count=exact"})
+        return _parse_content_range(response.headers.get("Content-Range"))
+
+    async def rpc(
+        self,
+        function_name: str,
+        params: Optional[Dict] = None,
+        read_only: bool = False,
+    ) -> Any:
+        """Call a PostgreSQL function via RPC (read_only calls get the read deadline and retries)."""
+        response = await self._send(
+            "POST",
+            f"/rpc/{function_name}",
+            data=params or {},
+            deadline=self.read_deadline if read_only else None,
+            idempotent=read_only,
+        )
+        if response.content:
+            return response.json()
+        return None
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
 # Global database instance
 _db: Optional[SupabaseDB] = None
+_async_db: Optional[AsyncSupabaseDB] = None
 
 
 def get_db() -> SupabaseDB:
@@ -159,5 +428,19 @@ def get_db() -> SupabaseDB:
     return _db
 
 
+def get_async_db() -> AsyncSupabaseDB:
+    """Get the global async database instance."""
+    global _async_db
+    if _async_db is None:
+        _async_db = AsyncSupabaseDB()
+    return _async_db
+
+
+async def close_async_db() -> None:
+    """Close the global async client's connection pool."""
+    if _async_db is not None:
+        await _async_db.close()
+
+
 # Convenience alias
 db = get_db()
@@ -0,0 +1,50 @@
+-- Migration: Organization summary aggregate for the AI service
+-- Exposed through PostgREST as POST /rest/v1/rpc/get_organization_summary
+-- Used by db/queries.py:get_organization_summary so the voice agent gets
+-- device/contact/ticket counts in one round trip instead of downloading rows.
+
+-- Support the per-organization counts
+CREATE INDEX IF NOT EXISTS idx_devices_org_status
+    ON devices (organization_id, status);
+
+CREATE INDEX IF NOT EXISTS idx_support_tickets_org_status
+    ON support_tickets (organization_id, status_id);
+
+-- contacts is already covered by contacts_unique_email (organization_id, email)
+
+CREATE OR REPLACE FUNCTION get_organization_summary(p_organization_id INTEGER)
+RETURNS JSON
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT json_build_object(
+        'organization_id', o.organization_id,
+        'name', o.name,
+        'u_e_code', o.u_e_code,
+        'manager_name', m.full_name,
+        'device_count', (
+            SELECT COUNT(*) FROM devices d
+            WHERE d.organization_id = o.organization_id
+        ),
+        'online_device_count', (
+            SELECT COUNT(*) FROM devices d
+            WHERE d.organization_id = o.organization_id AND d.status = 'ONLINE'
+        ),
+        'contact_count', (
+            SELECT COUNT(*) FROM contacts c
+            WHERE c.organization_id = o.organization_id
+        ),
+        'open_ticket_count', (
+            SELECT COUNT(*) FROM support_tickets t
+            WHERE t.organization_id = o.organization_id AND t.status_id IN (1, 2, 3, 4)
+        )
+    )
+    FROM organizations o
+    LEFT JOIN account_managers m ON m.manager_id = o.manager_id
+    WHERE o.organization_id = p_organization_id;
+$$;
+
+GRANT EXECUTE ON FUNCTION get_organization_summary(INTEGER) TO service_role;
+
+-- Make the new function visible to PostgREST immediately
+NOTIFY pgrst, 'reload schema';
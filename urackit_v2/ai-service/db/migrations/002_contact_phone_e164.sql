@@ -0,0 +1,47 @@
+-- Migration: Normalized phone numbers for caller lookup
+-- find_contact_by_phone used leading-wildcard ILIKE filters, which cannot use
+-- a btree index. Contacts now carry an E.164 copy of their phone number that
+-- the AI service writes on create (db/phone.py:normalize_phone) and matches
+-- exactly on lookup.
+
+ALTER TABLE contacts ADD COLUMN IF NOT EXISTS phone_e164 VARCHAR(20);
+
+-- Mirrors db/phone.py:normalize_phone (default country code 1)
+CREATE OR REPLACE FUNCTION normalize_phone_e164(p_phone TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT CASE
+        WHEN btrim(p_phone) LIKE '+%' THEN
+            CASE WHEN length(d) BETWEEN 8 AND 15 THEN '+' || d END
+        WHEN length(d) = 10 THEN '+1' || d
+        WHEN length(d) BETWEEN 11 AND 15 THEN '+' || d
+    END
+    FROM (SELECT regexp_replace(coalesce(p_phone, ''), '\D', '', 'g') AS d) digits;
+$$;
+
+-- Keep the column in sync for writers that do not set it (e.g. the backend API)
+CREATE OR REPLACE FUNCTION contacts_set_phone_e164()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.phone_e164 := normalize_phone_e164(NEW.phone);
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_contacts_phone_e164 ON contacts;
+CREATE TRIGGER trg_contacts_phone_e164
+    BEFORE INSERT OR UPDATE OF phone ON contacts
+    FOR EACH ROW EXECUTE FUNCTION contacts_set_phone_e164();
+
+UPDATE contacts
+SET phone_e164 = normalize_phone_e164(phone)
+WHERE phone IS NOT NULL AND phone_e164 IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_contacts_phone_e164
+    ON contacts (phone_e164);
+
+NOTIFY pgrst, 'reload schema';
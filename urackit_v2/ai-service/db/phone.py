@@ -0,0 +1,83 @@
+"""
+Phone number normalization and recent-caller cache.
+
+Every phone number is stored and looked up in E.164 form (a phone_e164
+column) so caller lookups are exact-match index queries. The SQL side
+applies the same rules: urackit_v2/ai-service/db/migrations/002_contact_phone_e164.sql
+and normalize_phone_e164() in realestate_voice/db/schema.sql.
+
+realestate_voice/db/phone.py is a copy of this file (that service is built
+and deployed on its own); change both together.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+DEFAULT_COUNTRY_CODE = "1"
+
+
+def normalize_phone(phone: Optional[str], default_country_code: str = DEFAULT_COUNTRY_CODE) -> Optional[str]:
+    """
+    Convert a phone number to E.164 ("+15551234567").
+
+    10-digit numbers are treated as national numbers in the default country.
+    Returns None when the input cannot be a full phone number.
+    """
+    if not phone:
+        return None
+    digits = re.sub(r"\D", "", phone)
+    if phone.strip().startswith("+"):
+        return f"+{digits}" if 8 <= len(digits) <= 15 else None
+    if len(digits) == 10:
+        return f"+{default_country_code}{digits}"
+    if 11 <= len(digits) <= 15:
+        return f"+{digits}"
+    return None
+
+
+class RecentCallerCache:
+    """
+    Small thread-safe LRU of recent phone lookups.
+
+    Misses are cached too, but only for miss_ttl_seconds: a caller created
+    elsewhere (dashboard, another instance) must stop looking unknown quickly.
+    Creates in this process also call invalidate().
+    """
+
+    def __init__(self, maxsize: int = 256, ttl_seconds: float = 300.0, miss_ttl_seconds: float = 10.0):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.miss_ttl_seconds = miss_ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (hit, value) for a normalized phone number."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if time.monotonic() > expires_at:
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def put(self, key: str, value: Any) -> None:
+        """Cache a lookup result; empty results (misses) expire after miss_ttl_seconds."""
+        ttl = self.ttl_seconds if value else self.miss_ttl_seconds
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Optional[str]) -> None:
+        if not key:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
@@ -3,39 +3,93 @@ Database queries for URackIT AI Service.
 
 Provides function tools for AI agents to interact with the database.
 All functions are decorated with @function_tool to make them callable by agents.
+Database tools are async and share the pooled AsyncSupabaseDB client, so
+voice tool calls run directly on the event loop without a thread hop.
 """
 
+import asyncio
 from datetime import datetime
 from typing import Optional
 import logging
+import httpx
 import requests
 
 from agents import function_tool
-from .connection import get_db
+from .connection import get_async_db
+from .phone import normalize_phone, RecentCallerCache
 
 logger = logging.getLogger(__name__)
 
 # Get database instance
-db = get_db()
+db = get_async_db()
+
+# Recent caller lookups keyed by E.164 number (callers repeat lookups within a call)
+_recent_callers = RecentCallerCache()
 
 
 def _format_request_error(err: Exception) -> str:
-    """Return user-friendly message from a requests error."""
+    """Return user-friendly message from a requests/httpx error."""
     body = ""
-    if isinstance(err, requests.exceptions.RequestException) and err.response is not None:
+    response = None
+    if isinstance(err, requests.exceptions.RequestException):
+        response = err.response
+    elif isinstance(err, httpx.HTTPStatusError):
+        response = err.response
+    if response is not None:
         try:
-            body = err.response.text or ""
+            body = response.text or ""
         except Exception:
             body = ""
     return body or str(err)
 
 
+# Select lists shared by the caller lookup tools and the caller-context prefetch
+CONTACT_SELECT = "contact_id,organization_id,full_name,email,phone,organization:organization_id(name,u_e_code)"
+CONTACT_DEVICES_SELECT = "device:device_id(device_id,asset_name,status,host_name)"
+CONTACT_TICKETS_SELECT = "ticket_id,subject,status_id,status:status_id(name),priority:priority_id(name),created_at"
+
+
+def format_contact(contact: dict) -> str:
+    """Render a contact row (with embedded organization) as a tool answer."""
+    org = contact.get("organization", {}) or {}
+    return (
+        f"Contact found: {contact.get('full_name')}\n"
+        f"Organization: {org.get('name', 'N/A')}\n"
+        f"Phone: {contact.get('phone')}\n"
+        f"Email: {contact.get('email', 'N/A')}\n"
+        f"contact_id: {contact.get('contact_id')}\n"
+        f"organization_id: {contact.get('organization_id')}"
+    )
+
+
+def format_contact_devices(contact_id: int, rows: list) -> str:
+    """Render contact_devices rows as a tool answer."""
+    if not rows:
+        return f"No devices assigned to contact {contact_id}"
+    devices = [r.get("device", {}) for r in rows if r.get("device")]
+    result = f"Found {len(devices)} device(s):\n"
+    for d in devices:
+        result += f"- {d.get('asset_name')} ({d.get('status')}) - device_id: {d.get('device_id')}\n"
+    return result
+
+
+def format_contact_tickets(contact_id: int, rows: list) -> str:
+    """Render support_tickets rows as a tool answer."""
+    if not rows:
+        return f"No tickets found for contact {contact_id}"
+    result = f"Found {len(rows)} ticket(s):\n"
+    for t in rows:
+        status = t.get("status", {}) or {}
+        result += f"- #{t.get('ticket_id')}: {t.get('subject')} [{status.get('name')}]\n"
+    return result
+
+
 # ============================================
 # Organization Management
 # ============================================
 
 @function_tool
-def find_organization_by_ue_code(u_e_code: int) -> str:
+async def find_organization_by_ue_code(u_e_code: int) -> str:
     """
     Look up an organization by its U&E code (Unique Enterprise Code).
     This is the PRIMARY method to identify callers - always ask for U&E code first.
@@ -58,7 +112,7 @@ def find_organization_by_ue_code(u_e_code: int) -> str:
             "u_e_code": f"eq.{u_e_code}",
             "select": "organization_id,name,u_e_code,manager:manager_id(full_name,email,phone)"
         }
-        rows = db._make_request("GET", "organizations", params=params)
+        rows = await db._make_request("GET", "organizations", params=params)
         
         if not rows:
             return f"No organization found with U&E code: {u_e_code}. Please ask the caller to confirm their code."
@@ -78,7 +132,7 @@ def find_organization_by_ue_code(u_e_code: int) -> str:
 
 
 @function_tool
-def find_organization_by_name(name: str) -> str:
+async def find_organization_by_name(name: str) -> str:
     """
     Look up an organization by name.
     """
@@ -91,7 +145,7 @@ def find_organization_by_name(name: str) -> str:
             "select": "organization_id,name,u_e_code,manager:manager_id(full_name,email,phone)",
             "limit": "5"
         }
-        rows = db._make_request("GET", "organizations", params=params)
+        rows = await db._make_request("GET", "organizations", params=params)
         
         if not rows:
             return f"No organization found with name: {name}"
@@ -107,7 +161,7 @@ def find_organization_by_name(name: str) -> str:
 
 
 @function_tool
-def create_organization(name: str, u_e_code: int) -> str:
+async def create_organization(name: str, u_e_code: int) -> str:
     """
     Create a new organization.
     
@@ -123,7 +177,7 @@ def create_organization(name: str, u_e_code: int) -> str:
             "name": name.strip(),
             "u_e_code": u_e_code,
         }
-        result = db.insert("organizations", org_data)
+        result = await db.insert("organizations", org_data)
         if result:
             org_id = result[0].get("organization_id")
             return f"Organization created successfully. organization_id: {org_id}"
@@ -136,8 +190,33 @@ def create_organization(name: str, u_e_code: int) -> str:
 # Contact Management
 # ============================================
 
+async def lookup_contact_by_phone(phone: str) -> Optional[dict]:
+    """
+    Return the contact row for a phone number, or None.
+
+    Exact match on the indexed contacts.phone_e164 column, with an in-process
+    LRU of recent callers in front of it.
+    """
+    phone_e164 = normalize_phone(phone)
+    if not phone_e164:
+        return None
+
+    hit, contact = _recent_callers.get(phone_e164)
+    if hit:
+        return contact
+
+    rows = await db._make_request("GET", "contacts", params={
+        "phone_e164": f"eq.{phone_e164}",
+        "select": CONTACT_SELECT,
+        "limit": "1",
+    })
+    contact = rows[0] if rows else None
+    _recent_callers.put(phone_e164, contact)
+    return contact
+
+
 @function_tool
-def find_contact_by_phone(phone: str) -> str:
+async def find_contact_by_phone(phone: str) -> str:
     """
     Look up a contact by their phone number.
     """
@@ -145,34 +224,18 @@ def find_contact_by_phone(phone: str) -> str:
         return "Phone number is required."
     
     try:
-        clean_phone = phone.strip().replace("-", "").replace("(", "").replace(")", "").replace(" ", "")
+        contact = await lookup_contact_by_phone(phone)
         
-        params = {
-            "or": f"(phone.ilike.*{clean_phone}*,phone.ilike.*{phone.strip()}*)",
-            "select": "contact_id,organization_id,full_name,email,phone,organization:organization_id(name,u_e_code)"
-        }
-        rows = db._make_request("GET", "contacts", params=params)
-        
-        if not rows:
+        if not contact:
             return f"No contact found with phone: {phone}"
         
-        contact = rows[0]
-        org = contact.get("organization", {}) or {}
-        
-        return (
-            f"Contact found: {contact.get('full_name')}\n"
-            f"Organization: {org.get('name', 'N/A')}\n"
-            f"Phone: {contact.get('phone')}\n"
-            f"Email: {contact.get('email', 'N/A')}\n"
-            f"contact_id: {contact.get('contact_id')}\n"
-            f"organization_id: {contact.get('organization_id')}"
-        )
+        return format_contact(contact)
     except Exception as e:
         return f"Error looking up contact: {_format_request_error(e)}"
 
 
 @function_tool
-def create_contact(
+async def create_contact(
     full_name: str,
     organization_id: int,
     email: str = "",
@@ -201,10 +264,13 @@ def create_contact(
         }
         if email.strip():
             contact_data["email"] = email.strip()
+        phone_e164 = normalize_phone(phone)
         if phone.strip():
             contact_data["phone"] = phone.strip()
+            contact_data["phone_e164"] = phone_e164
 
-        result = db.insert("contacts", contact_data)
+        result = await db.insert("contacts", contact_data)
+        _recent_callers.invalidate(phone_e164)
         if result:
             contact = result[0]
             return (
@@ -218,7 +284,7 @@ def create_contact(
 
 
 @function_tool
-def get_contact_devices(contact_id: int) -> str:
+async def get_contact_devices(contact_id: int) -> str:
     """
     Get all devices assigned to a contact.
     """
@@ -226,19 +292,10 @@ def get_contact_devices(contact_id: int) -> str:
         params = {
             "contact_id": f"eq.{contact_id}",
             "unassigned_at": "is.null",
-            "select": "device:device_id(device_id,asset_name,status,host_name)"
+            "select": CONTACT_DEVICES_SELECT
         }
-        rows = db._make_request("GET", "contact_devices", params=params)
-        
-        if not rows:
-            return f"No devices assigned to contact {contact_id}"
-        
-        devices = [r.get("device", {}) for r in rows if r.get("device")]
-        result = f"Found {len(devices)} device(s):\n"
-        for d in devices:
-            result += f"- {d.get('asset_name')} ({d.get('status')}) - device_id: {d.get('device_id')}\n"
-        
-        return result
+        rows = await db._make_request("GET", "contact_devices", params=params)
+        return format_contact_devices(contact_id, rows)
     except Exception as e:
         return f"Error getting devices: {_format_request_error(e)}"
 
@@ -248,7 +305,7 @@ def get_contact_devices(contact_id: int) -> str:
 # ============================================
 
 @function_tool
-def find_device_by_name(asset_name: str) -> str:
+async def find_device_by_name(asset_name: str) -> str:
     """
     Look up a device by its asset name.
     """
@@ -257,7 +314,7 @@ def find_device_by_name(asset_name: str) -> str:
             "asset_name": f"ilike.*{asset_name.strip()}*",
             "select": "device_id,asset_name,status,host_name,public_ip,organization:organization_id(name)"
         }
-        rows = db._make_request("GET", "devices", params=params)
+        rows = await db._make_request("GET", "devices", params=params)
         
         if not rows:
             return f"No device found with name: {asset_name}"
@@ -278,7 +335,7 @@ def find_device_by_name(asset_name: str) -> str:
 
 
 @function_tool
-def get_device_status(device_id: int) -> str:
+async def get_device_status(device_id: int) -> str:
     """
     Get the current status and details of a device.
     """
@@ -287,7 +344,7 @@ def get_device_status(device_id: int) -> str:
             "device_id": f"eq.{device_id}",
             "select": "*"
         }
-        rows = db._make_request("GET", "devices", params=params)
+        rows = await db._make_request("GET", "devices", params=params)
         
         if not rows:
             return f"Device {device_id} not found."
@@ -306,7 +363,7 @@ def get_device_status(device_id: int) -> str:
 
 
 @function_tool
-def get_device_details(device_id: int) -> str:
+async def get_device_details(device_id: int) -> str:
     """
     Get full details of a device including hardware specs.
     """
@@ -315,7 +372,7 @@ def get_device_details(device_id: int) -> str:
             "device_id": f"eq.{device_id}",
             "select": "*,organization:organization_id(name),location:location_id(name),os:os_id(name)"
         }
-        rows = db._make_request("GET", "devices", params=params)
+        rows = await db._make_request("GET", "devices", params=params)
 
         if not rows:
             return f"Device {device_id} not found."
@@ -344,7 +401,7 @@ def get_device_details(device_id: int) -> str:
 
 
 @function_tool
-def get_organization_devices(organization_id: int) -> str:
+async def get_organization_devices(organization_id: int) -> str:
     """
     Get ALL devices for an organization.
     Use this when user asks about devices for their organization.
@@ -355,7 +412,7 @@ def get_organization_devices(organization_id: int) -> str:
             "select": "device_id,asset_name,status,host_name,location:location_id(name)",
             "order": "status.desc,asset_name.asc"
         }
-        rows = db._make_request("GET", "devices", params=params)
+        rows = await db._make_request("GET", "devices", params=params)
         
         if not rows:
             return f"No devices found for organization {organization_id}"
@@ -379,7 +436,7 @@ def get_organization_devices(organization_id: int) -> str:
 # ============================================
 
 @function_tool
-def create_ticket(
+async def create_ticket(
     subject: str,
     description: str,
     contact_id: int,
@@ -407,7 +464,7 @@ def create_ticket(
         # Get organization from contact if not provided
         if not organization_id:
             params = {"contact_id": f"eq.{contact_id}", "select": "organization_id"}
-            contacts = db._make_request("GET", "contacts", params=params)
+            contacts = await db._make_request("GET", "contacts", params=params)
             if contacts:
                 organization_id = contacts[0].get("organization_id")
         
@@ -430,7 +487,7 @@ def create_ticket(
         if device_id:
             ticket_data["device_id"] = device_id
         
-        result = db.insert("support_tickets", ticket_data)
+        result = await db.insert("support_tickets", ticket_data)
         if result:
             ticket = result[0]
             return f"Ticket created successfully. Ticket ID: {ticket.get('ticket_id')}"
@@ -440,7 +497,7 @@ def create_ticket(
 
 
 @function_tool
-def lookup_ticket(ticket_id: int) -> str:
+async def lookup_ticket(ticket_id: int) -> str:
     """
     Look up a ticket by its ID.
     """
@@ -449,7 +506,7 @@ def lookup_ticket(ticket_id: int) -> str:
             "ticket_id": f"eq.{ticket_id}",
             "select": "*,contact:contact_id(full_name,phone),organization:organization_id(name),status:status_id(name),priority:priority_id(name)"
         }
-        rows = db._make_request("GET", "support_tickets", params=params)
+        rows = await db._make_request("GET", "support_tickets", params=params)
         
         if not rows:
             return f"Ticket {ticket_id} not found."
@@ -475,35 +532,25 @@ def lookup_ticket(ticket_id: int) -> str:
 
 
 @function_tool
-def get_tickets_by_contact(contact_id: int) -> str:
+async def get_tickets_by_contact(contact_id: int) -> str:
     """
     Get all tickets for a specific contact.
     """
     try:
         params = {
             "contact_id": f"eq.{contact_id}",
-            "select": "ticket_id,subject,status:status_id(name),priority:priority_id(name),created_at",
+            "select": CONTACT_TICKETS_SELECT,
             "order": "created_at.desc",
             "limit": "10"
         }
-        rows = db._make_request("GET", "support_tickets", params=params)
-        
-        if not rows:
-            return f"No tickets found for contact {contact_id}"
-        
-        result = f"Found {len(rows)} ticket(s):\n"
-        for t in rows:
-            status = t.get("status", {}) or {}
-            priority = t.get("priority", {}) or {}
-            result += f"- #{t.get('ticket_id')}: {t.get('subject')} [{status.get('name')}]\n"
-        
-        return result
+        rows = await db._make_request("GET", "support_tickets", params=params)
+        return format_contact_tickets(contact_id, rows)
     except Exception as e:
         return f"Error getting tickets: {_format_request_error(e)}"
 
 
 @function_tool
-def get_tickets_by_organization(organization_id: int) -> str:
+async def get_tickets_by_organization(organization_id: int) -> str:
     """
     Get all open tickets for an organization.
     """
@@ -515,7 +562,7 @@ def get_tickets_by_organization(organization_id: int) -> str:
             "order": "created_at.desc",
             "limit": "20"
         }
-        rows = db._make_request("GET", "support_tickets", params=params)
+        rows = await db._make_request("GET", "support_tickets", params=params)
         
         if not rows:
             return f"No open tickets for organization {organization_id}"
@@ -532,7 +579,7 @@ def get_tickets_by_organization(organization_id: int) -> str:
 
 
 @function_tool
-def update_ticket_status(ticket_id: int, status: str) -> str:
+async def update_ticket_status(ticket_id: int, status: str) -> str:
     """
     Update the status of a ticket.
     
@@ -558,7 +605,7 @@ def update_ticket_status(ticket_id: int, status: str) -> str:
         if status_id in [5, 6]:
             update_data["closed_at"] = datetime.utcnow().isoformat()
         
-        result = db.update("support_tickets", update_data, {"ticket_id": f"eq.{ticket_id}"})
+        result = await db.update("support_tickets", update_data, {"ticket_id": f"eq.{ticket_id}"})
         if result:
             return f"Ticket {ticket_id} status updated to: {status}"
         return f"Failed to update ticket {ticket_id}"
@@ -567,7 +614,7 @@ def update_ticket_status(ticket_id: int, status: str) -> str:
 
 
 @function_tool
-def add_ticket_message(ticket_id: int, message: str) -> str:
+async def add_ticket_message(ticket_id: int, message: str) -> str:
     """
     Add a message/note to a ticket.
     """
@@ -582,7 +629,7 @@ def add_ticket_message(ticket_id: int, message: str) -> str:
             "sender_agent_id": 1,  # Bot agent
         }
         
-        result = db.insert("ticket_messages", message_data)
+        result = await db.insert("ticket_messages", message_data)
         if result:
             return f"Message added to ticket {ticket_id}"
         return "Failed to add message."
@@ -591,7 +638,7 @@ def add_ticket_message(ticket_id: int, message: str) -> str:
 
 
 @function_tool
-def escalate_ticket(ticket_id: int, reason: str, to_human: bool = True) -> str:
+async def escalate_ticket(ticket_id: int, reason: str, to_human: bool = True) -> str:
     """
     Escalate a ticket and mark for human agent.
     
@@ -606,14 +653,14 @@ def escalate_ticket(ticket_id: int, reason: str, to_human: bool = True) -> str:
             "requires_human_agent": to_human,
             "updated_at": datetime.utcnow().isoformat()
         }
-        db.update("support_tickets", update_data, {"ticket_id": f"eq.{ticket_id}"})
+        await db.update("support_tickets", update_data, {"ticket_id": f"eq.{ticket_id}"})
         
         escalation_data = {
             "ticket_id": ticket_id,
             "from_agent_id": 1,
             "reason": reason,
         }
-        db.insert("ticket_escalations", escalation_data)
+        await db.insert("ticket_escalations", escalation_data)
         
         return f"Ticket {ticket_id} escalated. Reason: {reason}"
     except Exception as e:
@@ -621,10 +668,10 @@ def escalate_ticket(ticket_id: int, reason: str, to_human: bool = True) -> str:
 
 
 @function_tool
-def get_ticket_statuses() -> str:
+async def get_ticket_statuses() -> str:
     """Get all available ticket statuses."""
     try:
-        rows = db._make_request("GET", "ticket_statuses", params={"select": "*"})
+        rows = await db._make_request("GET", "ticket_statuses", params={"select": "*"})
         if not rows:
             return "No statuses found."
         result = "Available statuses:\n"
@@ -636,10 +683,10 @@ def get_ticket_statuses() -> str:
 
 
 @function_tool
-def get_ticket_priorities() -> str:
+async def get_ticket_priorities() -> str:
     """Get all available ticket priorities."""
     try:
-        rows = db._make_request("GET", "ticket_priorities", params={"select": "*"})
+        rows = await db._make_request("GET", "ticket_priorities", params={"select": "*"})
         if not rows:
             return "No priorities found."
         result = "Available priorities:\n"
@@ -655,7 +702,7 @@ def get_ticket_priorities() -> str:
 # ============================================
 
 @function_tool
-def lookup_organization_data(
+async def lookup_organization_data(
     organization_id: int,
     query_type: str,
     search_term: str = "",
@@ -675,25 +722,25 @@ def lookup_organization_data(
     
     try:
         if query_type == "devices":
-            return get_organization_devices(organization_id)
+            return await get_organization_devices(organization_id)
         
         elif query_type == "locations":
-            return get_organization_locations(organization_id)
+            return await get_organization_locations(organization_id)
         
         elif query_type == "contacts":
-            return get_organization_contacts(organization_id)
+            return await get_organization_contacts(organization_id)
         
         elif query_type == "tickets":
-            return get_tickets_by_organization(organization_id)
+            return await get_tickets_by_organization(organization_id)
         
         elif query_type == "summary":
-            return get_organization_summary(organization_id)
+            return await get_organization_summary(organization_id)
         
         elif query_type == "find_device" and search_term:
-            return get_device_by_name_for_org(search_term, organization_id)
+            return await get_device_by_name_for_org(search_term, organization_id)
         
         elif query_type == "find_contact" and search_term:
-            return get_contact_by_name_for_org(search_term, organization_id)
+            return await get_contact_by_name_for_org(search_term, organization_id)
         
         else:
             return f"Unknown query type: {query_type}. Use: devices, locations, contacts, tickets, summary"
@@ -703,14 +750,14 @@ def lookup_organization_data(
 
 
 @function_tool
-def get_organization_locations(organization_id: int) -> str:
+async def get_organization_locations(organization_id: int) -> str:
     """Get all locations for an organization."""
     try:
         params = {
             "organization_id": f"eq.{organization_id}",
             "select": "location_id,name,location_type"
         }
-        rows = db._make_request("GET", "locations", params=params)
+        rows = await db._make_request("GET", "locations", params=params)
         
         if not rows:
             return f"No locations found for organization {organization_id}"
@@ -724,14 +771,14 @@ def get_organization_locations(organization_id: int) -> str:
 
 
 @function_tool
-def get_organization_contacts(organization_id: int) -> str:
+async def get_organization_contacts(organization_id: int) -> str:
     """Get all contacts for an organization."""
     try:
         params = {
             "organization_id": f"eq.{organization_id}",
             "select": "contact_id,full_name,email,phone"
         }
-        rows = db._make_request("GET", "contacts", params=params)
+        rows = await db._make_request("GET", "contacts", params=params)
         
         if not rows:
             return f"No contacts found for organization {organization_id}"
@@ -745,56 +792,67 @@ def get_organization_contacts(organization_id: int) -> str:
 
 
 @function_tool
-def get_organization_summary(organization_id: int) -> str:
+async def get_organization_summary(organization_id: int) -> str:
     """Get a summary overview of an organization."""
     try:
-        # Get organization details
-        org_rows = db._make_request("GET", "organizations", params={
-            "organization_id": f"eq.{organization_id}",
-            "select": "name,u_e_code,manager:manager_id(full_name)"
-        })
-        
-        org = org_rows[0] if org_rows else {}
-        manager = org.get("manager", {}) or {}
-        
-        # Count devices
-        devices = db._make_request("GET", "devices", params={
-            "organization_id": f"eq.{organization_id}",
-            "select": "status"
-        })
-        device_count = len(devices)
-        online_count = sum(1 for d in devices if d.get("status") == "ONLINE")
-        
-        # Count contacts
-        contacts = db._make_request("GET", "contacts", params={
-            "organization_id": f"eq.{organization_id}",
-            "select": "contact_id"
-        })
-        contact_count = len(contacts)
-        
-        # Count open tickets
-        tickets = db._make_request("GET", "support_tickets", params={
-            "organization_id": f"eq.{organization_id}",
-            "status_id": "in.(1,2,3,4)",
-            "select": "ticket_id"
-        })
-        ticket_count = len(tickets)
-        
+        try:
+            # One round trip: counts are aggregated server-side (db/migrations/001_organization_summary.sql)
+            summary = await db.rpc(
+                "get_organization_summary",
+                {"p_organization_id": organization_id},
+                read_only=True,
+            )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 404:
+                raise
+            logger.warning("get_organization_summary RPC not installed; falling back to count queries")
+            summary = await _organization_summary_from_counts(organization_id)
+
+        summary = summary or {}
+        device_count = summary.get("device_count") or 0
+        online_count = summary.get("online_device_count") or 0
+
         return (
             f"=== Organization Summary ===\n"
-            f"Name: {org.get('name', 'Unknown')}\n"
-            f"U&E Code: {org.get('u_e_code', 'N/A')}\n"
-            f"Account Manager: {manager.get('full_name', 'Not Assigned')}\n\n"
+            f"Name: {summary.get('name') or 'Unknown'}\n"
+            f"U&E Code: {summary.get('u_e_code') or 'N/A'}\n"
+            f"Account Manager: {summary.get('manager_name') or 'Not Assigned'}\n\n"
             f"Devices: {device_count} ({online_count} online, {device_count - online_count} offline)\n"
-            f"Contacts: {contact_count}\n"
-            f"Open Tickets: {ticket_count}"
+            f"Contacts: {summary.get('contact_count') or 0}\n"
+            f"Open Tickets: {summary.get('open_ticket_count') or 0}"
         )
     except Exception as e:
         return f"Error: {_format_request_error(e)}"
 
 
+async def _organization_summary_from_counts(organization_id: int) -> dict:
+    """Build the organization summary with concurrent count-only requests."""
+    org_filter = {"organization_id": f"eq.{organization_id}"}
+    org_rows, device_count, online_count, contact_count, ticket_count = await asyncio.gather(
+        db._make_request("GET", "organizations", params={
+            **org_filter,
+            "select": "name,u_e_code,manager:manager_id(full_name)"
+        }),
+        db.count("devices", org_filter),
+        db.count("devices", {**org_filter, "status": "eq.ONLINE"}),
+        db.count("contacts", org_filter),
+        db.count("support_tickets", {**org_filter, "status_id": "in.(1,2,3,4)"}),
+    )
+    org = org_rows[0] if org_rows else {}
+    manager = org.get("manager", {}) or {}
+    return {
+        "name": org.get("name"),
+        "u_e_code": org.get("u_e_code"),
+        "manager_name": manager.get("full_name"),
+        "device_count": device_count,
+        "online_device_count": online_count,
+        "contact_count": contact_count,
+        "open_ticket_count": ticket_count,
+    }
+
+
 @function_tool
-def get_device_by_name_for_org(asset_name: str, organization_id: int) -> str:
+async def get_device_by_name_for_org(asset_name: str, organization_id: int) -> str:
     """Find a device by name within an organization."""
     try:
         params = {
@@ -802,7 +860,7 @@ def get_device_by_name_for_org(asset_name: str, organization_id: int) -> str:
             "asset_name": f"ilike.*{asset_name.strip()}*",
             "select": "device_id,asset_name,status,host_name,public_ip"
         }
-        rows = db._make_request("GET", "devices", params=params)
+        rows = await db._make_request("GET", "devices", params=params)
         
         if not rows:
             return f"No device found matching '{asset_name}' in this organization"
@@ -816,7 +874,7 @@ def get_device_by_name_for_org(asset_name: str, organization_id: int) -> str:
 
 
 @function_tool
-def get_contact_by_name_for_org(name: str, organization_id: int) -> str:
+async def get_contact_by_name_for_org(name: str, organization_id: int) -> str:
     """Find a contact by name within an organization."""
     try:
         params = {
@@ -824,7 +882,7 @@ def get_contact_by_name_for_org(name: str, organization_id: int) -> str:
             "full_name": f"ilike.*{name.strip()}*",
             "select": "contact_id,full_name,email,phone"
         }
-        rows = db._make_request("GET", "contacts", params=params)
+        rows = await db._make_request("GET", "contacts", params=params)
         
         if not rows:
             return f"No contact found matching '{name}' in this organization"
@@ -838,14 +896,14 @@ def get_contact_by_name_for_org(name: str, organization_id: int) -> str:
 
 
 @function_tool
-def get_account_manager(organization_id: int) -> str:
+async def get_account_manager(organization_id: int) -> str:
     """Get the account manager for an organization."""
     try:
         params = {
             "organization_id": f"eq.{organization_id}",
             "select": "manager:manager_id(full_name,email,phone)"
         }
-        rows = db._make_request("GET", "organizations", params=params)
+        rows = await db._make_request("GET", "organizations", params=params)
         
         if not rows:
             return f"Organization {organization_id} not found"
@@ -5,6 +5,8 @@ Main entry point for the AI service API.
 Provides REST endpoints for chat, voice, and agent interactions.
 """
 
+import asyncio
+import json
 import logging
 import uuid
 from datetime import datetime
@@ -12,10 +14,13 @@ from typing import Any, Dict, List, Optional
 
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Body
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from config import get_config
 from agents import Runner
+from agents.pipeline import close_openai_client
+from db.connection import close_async_db
 from app_agents import triage_agent
 from memory import get_memory, clear_memory
 from prompt_scripts import UE_OPENING_GREETING_TEXT
@@ -54,6 +59,13 @@ app.add_middleware(
 )
 
 
+@app.on_event("shutdown")
+async def shutdown_db():
+    """Close the pooled Supabase and OpenAI clients."""
+    await close_async_db()
+    await close_openai_client()
+
+
 # ============================================
 # Request/Response Models
 # ============================================
@@ -63,6 +75,7 @@ class ChatRequest(BaseModel):
     message: str = Field(..., description="User message")
     session_id: Optional[str] = Field(None, description="Session ID for conversation continuity")
     context: Optional[Dict[str, Any]] = Field(None, description="Additional context (organization_id, contact_id, etc.)")
+    stream: bool = Field(False, description="Stream the answer as server-sent events")
 
 
 class ChatResponse(BaseModel):
@@ -142,6 +155,13 @@ async def chat(request: ChatRequest):
     # Add user message to memory
     memory.add_turn("user", request.message)
     
+    if request.stream:
+        return StreamingResponse(
+            _stream_chat(session_id, request.message, context),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    
     try:
         # Run the agent pipeline
         result = await Runner.run(
@@ -166,6 +186,35 @@ async def chat(request: ChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _stream_chat(session_id: str, message: str, context: Dict[str, Any]):
+    """
+    Server-sent events for a streamed /api/chat request.
+    
+    Emits "delta" events with answer tokens, "tool_call" events, and a final
+    "response" event shaped like ChatResponse.
+    """
+    memory = get_memory(session_id)
+    try:
+        async for event in Runner.run_streamed(triage_agent, message, context=context):
+            if event["type"] == "done":
+                result = event["result"]
+                memory.add_turn("assistant", result.final_output)
+                payload = ChatResponse(
+                    response=result.final_output,
+                    session_id=session_id,
+                    agent_name=result.agent_name,
+                    tool_calls=result.tool_calls,
+                    context=memory.get_all_context(),
+                ).model_dump()
+                payload["type"] = "response"
+            else:
+                payload = event
+            yield f"data: {json.dumps(payload, default=str)}\n\n"
+    except Exception as e:
+        logger.error(f"Chat stream error: {e}")
+        yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+
+
 @app.post("/api/chat/start")
 async def start_session():
     """
@@ -264,12 +313,17 @@ async def websocket_chat(websocket: WebSocket, session_id: str):
             memory.add_turn("user", message)
             
             try:
-                # Run agent
-                result = await Runner.run(
+                # Run agent, forwarding answer tokens as they arrive
+                result = None
+                async for event in Runner.run_streamed(
                     triage_agent,
                     message,
                     context=memory.get_all_context(),
-                )
+                ):
+                    if event["type"] == "done":
+                        result = event["result"]
+                    else:
+                        await websocket.send_json(event)
                 
                 # Add response
                 memory.add_turn("assistant", result.final_output)
@@ -371,14 +425,14 @@ async def get_agent_tools(agent_name: str):
 async def knowledge_stats():
     """Get knowledge base statistics."""
     from memory.knowledge_base import get_knowledge_base_stats
-    return get_knowledge_base_stats()
+    return await asyncio.to_thread(get_knowledge_base_stats)
 
 
 @app.post("/api/knowledge/reload")
 async def reload_knowledge():
     """Reload the knowledge base from file."""
     from memory.knowledge_base import reload_knowledge_base
-    result = reload_knowledge_base()
+    result = await asyncio.to_thread(reload_knowledge_base)
     return {"status": result}
 
 
@@ -386,7 +440,7 @@ async def reload_knowledge():
 async def search_knowledge(query: str, top_k: int = 4):
     """Search the knowledge base."""
     from memory.knowledge_base import lookup_support_info
-    result = lookup_support_info(query, top_k)
+    result = await lookup_support_info(query, top_k)
     return {"query": query, "results": result}
 
 
@@ -540,6 +594,9 @@ try:
         create_app as create_sip_app,
     )
     from sip_integration.session_manager import init_session_manager, get_session_manager
+    from sip_integration.live_events import get_live_event_stream
+    from sip_integration.call_log_writer import get_call_log_writer
+    from sip_integration.twilio_provider import close_twilio_rest_client
     from sip_integration.config import get_config as get_sip_config
     from sip_integration.twilio_provider import create_twilio_provider
     from sip_integration.media_stream import MediaStreamHandler
@@ -566,6 +623,7 @@ try:
     async def shutdown_sip():
         session_manager = get_session_manager()
         await session_manager.stop()
+        await close_twilio_rest_client()
         logger.info("SIP session manager stopped")
     
     @app.post("/twilio")
@@ -765,81 +823,20 @@ try:
     
     @app.get("/api/live-sessions")
     async def get_live_sessions():
-        """Get all active live call sessions with their details."""
-        import time
-        from datetime import datetime
-        
-        session_manager = get_session_manager()
-        sessions = session_manager.get_all_sessions()
-        
-        calls = []
-        agents_set = set()
-        total_duration = 0
-        inbound_count = 0
-        outbound_count = 0
-        
-        for session in sessions:
-            duration = int(time.time() - session.created_at)
-            total_duration += duration
-            
-            direction = session.call_info.direction or "inbound"
-            if direction == "inbound":
-                inbound_count += 1
-            else:
-                outbound_count += 1
-            
-            if session.agent_type:
-                agents_set.add(session.agent_type)
-            
-            # Build transcript entries
-            transcript = []
-            for msg in session.conversation_history:
-                transcript.append({
-                    "role": msg.get("role", "assistant"),
-                    "content": msg.get("content", ""),
-                    "timestamp": msg.get("timestamp", datetime.utcnow().isoformat())
-                })
-            
-            # Build agent history
-            agent_history = []
-            current_agent = session.agent_type or "triage_agent"
-            agent_history.append({
-                "agentName": current_agent,
-                "action": "Started conversation",
-                "timestamp": datetime.utcfromtimestamp(session.created_at).isoformat()
-            })
-            
-            calls.append({
-                "callSid": session.call_info.call_sid,
-                "from": session.call_info.from_number,
-                "to": session.call_info.to_number,
-                "direction": direction,
-                "status": "in-progress",
-                "startTime": datetime.utcfromtimestamp(session.created_at).isoformat(),
-                "duration": duration,
-                "callerName": session.caller_name,
-                "companyName": session.company_name,
-                "currentAgent": current_agent,
-                "transcript": transcript,
-                "agentHistory": agent_history,
-                "sentiment": "neutral",
-                "ticketCreated": session.ticket_created,
-                "escalated": session.escalated
-            })
-        
-        # Calculate metrics
-        avg_duration = total_duration // len(sessions) if sessions else 0
-        
-        return {
-            "calls": calls,
-            "metrics": {
-                "activeCalls": len(sessions),
-                "inbound": inbound_count,
-                "outbound": outbound_count,
-                "avgDuration": avg_duration,
-                "activeAgents": list(agents_set)
-            }
-        }
+        """Get all active live call sessions with their details (tagged with the event seq)."""
+        get_session_manager()  # registers the snapshot provider
+        return get_live_event_stream().snapshot()
+    
+    @app.get("/api/live-sessions/events")
+    async def get_live_session_events(since: int = 0, epoch: Optional[str] = None):
+        """Replay live call events after `since`, or a snapshot if they are no longer retained or `epoch` is stale."""
+        get_session_manager()
+        return get_live_event_stream().resync(since, epoch)
+    
+    @app.get("/api/call-logs/stats")
+    async def get_call_log_stats():
+        """Write-behind call log backlog and write lag."""
+        return await get_call_log_writer().get_stats()
     
     logger.info("SIP/Voice integration routes loaded")
     
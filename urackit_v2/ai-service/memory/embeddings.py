@@ -0,0 +1,186 @@
+"""
+Embedding service for the knowledge base.
+
+Wraps Chroma's local ONNX MiniLM embedding function so lookups never embed
+on the event loop:
+
+- Concurrent queries (many voice sessions asking at once) are collected for
+  a few milliseconds and embedded as one ONNX batch on a dedicated worker
+  thread.
+- Query embeddings are cached (LRU) and identical in-flight queries share
+  one computation.
+- Document embedding for (re)indexing runs on the same worker, so index
+  builds and live queries never run ONNX sessions concurrently.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from stats_utils import percentile
+
+logger = logging.getLogger(__name__)
+
+Embedding = List[float]
+
+
+def _normalize_query(text: str) -> str:
+    # MiniLM-L6 is uncased, so case and spacing do not change the embedding
+    return " ".join(text.split()).lower()
+
+
+def _rows(embeddings) -> List[Embedding]:
+    return [row.tolist() if hasattr(row, "tolist") else list(row) for row in embeddings]
+
+
+class EmbeddingService:
+    """Batched, cached embeddings computed off the event loop."""
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], Sequence],
+        max_batch: int = 32,
+        batch_window_ms: float = 5.0,
+        cache_size: int = 2048,
+    ):
+        self._embed_fn = embed_fn
+        self.max_batch = max_batch
+        self.batch_window = batch_window_ms / 1000
+        self.cache_size = cache_size
+
+        # One worker: ONNX Runtime already uses several threads per call
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kb-embed")
+        self._cache: "OrderedDict[str, Embedding]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+        # Metrics
+        self.requests = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.embedded_queries = 0
+        self.embedded_documents = 0
+        self._batch_ms: Deque[float] = deque(maxlen=500)
+
+    @property
+    def embedding_function(self):
+        """The underlying embedding function (also handed to Chroma)."""
+        return self._embed_fn
+
+    async def embed_query(self, text: str) -> Embedding:
+        """Embedding for one search query."""
+        self.requests += 1
+        key = _normalize_query(text)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return cached
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[key] = future
+        self._pending.append((key, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        if self._pending:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window, self._flush)
+        if batch:
+            asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        keys = [key for key, _ in batch]
+        started = time.perf_counter()
+        try:
+            vectors = await asyncio.get_running_loop().run_in_executor(
+                self._executor, lambda: _rows(self._embed_fn(keys))
+            )
+        except Exception as e:
+            for key, future in batch:
+                self._inflight.pop(key, None)
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.embedded_queries += len(keys)
+        self._batch_ms.append((time.perf_counter() - started) * 1000)
+        for (key, future), vector in zip(batch, vectors):
+            self._remember(key, vector)
+            self._inflight.pop(key, None)
+            if not future.done():
+                future.set_result(vector)
+
+    def _remember(self, key: str, vector: Embedding) -> None:
+        self._cache[key] = vector
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def embed_documents(self, texts: List[str]) -> List[Embedding]:
+        """Embed documents for indexing (blocking; runs on the embedding worker)."""
+        if not texts:
+            return []
+        vectors = self._executor.submit(lambda: _rows(self._embed_fn(texts))).result()
+        self.embedded_documents += len(texts)
+        return vectors
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+    def get_stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "cache_hit_rate": round(self.cache_hits / self.requests, 3) if self.requests else 0.0,
+            "coalesced": self.coalesced,
+            "cache_size": len(self._cache),
+            "batches": self.batches,
+            "avg_batch_size": round(self.embedded_queries / self.batches, 2) if self.batches else 0.0,
+            "batch_ms_p50": round(percentile(self._batch_ms, 0.50), 2),
+            "batch_ms_p95": round(percentile(self._batch_ms, 0.95), 2),
+            "embedded_documents": self.embedded_documents,
+        }
+
+
+_service: Optional[EmbeddingService] = None
+
+
+def get_embedding_service() -> Optional[EmbeddingService]:
+    """Shared service around Chroma's default (ONNX MiniLM) embedding function."""
+    global _service
+    if _service is None:
+        try:
+            from chromadb.utils import embedding_functions
+        except ImportError:
+            return None
+        _service = EmbeddingService(
+            embedding_functions.DefaultEmbeddingFunction(),
+            max_batch=int(os.getenv("KB_EMBED_MAX_BATCH", "32")),
+            batch_window_ms=float(os.getenv("KB_EMBED_BATCH_WINDOW_MS", "5")),
+            cache_size=int(os.getenv("KB_QUERY_CACHE_SIZE", "2048")),
+        )
+    return _service
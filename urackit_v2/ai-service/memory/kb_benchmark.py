@@ -0,0 +1,125 @@
+"""
+Knowledge base lookup latency benchmark.
+
+Simulates concurrent voice sessions calling lookup_support_info and reports
+p50/p95/max latency for cold (first-seen) and repeated questions.
+
+Usage:
+    python -m memory.kb_benchmark --sessions 50 --queries 10
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, List
+
+from stats_utils import summarize
+
+from .embeddings import get_embedding_service
+from .knowledge_base import _ensure_collection, get_knowledge_base_stats, lookup_support_info
+
+QUESTIONS = [
+    "My printer is showing offline",
+    "How do I reset my email password?",
+    "The internet is really slow today",
+    "My computer will not turn on",
+    "I can't connect to the VPN",
+    "Outlook keeps asking for my password",
+    "The desk phone has no dial tone",
+    "I think I clicked a phishing link",
+    "How do I map a network drive?",
+    "Wi-Fi keeps disconnecting",
+    "Printer is jammed",
+    "My screen is flickering",
+    "How do I set up multi-factor authentication?",
+    "Voicemail is not working",
+    "The computer is running very slow",
+    "I can't send large attachments",
+]
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    stats = summarize(values)
+    return {"n": len(values), "p50_ms": stats["p50"], "p95_ms": stats["p95"], "max_ms": stats["max"]}
+
+
+async def _session(session_id: int, queries: int, think_ms: float, seen: set, cold: List[float], warm: List[float]):
+    rng = random.Random(session_id)
+    for _ in range(queries):
+        # Mix repeated phrasings with unique ones so both paths are measured
+        question = rng.choice(QUESTIONS)
+        if rng.random() < 0.5:
+            question = f"{question} (session {session_id} #{rng.randint(0, 9999)})"
+
+        key = " ".join(question.split()).lower()
+        bucket = warm if key in seen else cold
+        seen.add(key)
+
+        started = time.perf_counter()
+        await lookup_support_info(question)
+        bucket.append((time.perf_counter() - started) * 1000)
+
+        if think_ms:
+            await asyncio.sleep(rng.uniform(0, think_ms) / 1000)
+
+
+async def run(sessions: int, queries: int, think_ms: float) -> Dict:
+    """Run the benchmark and return latency stats."""
+    await asyncio.to_thread(_ensure_collection)
+
+    seen: set = set()
+    cold: List[float] = []
+    warm: List[float] = []
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _session(i, queries, think_ms, seen, cold, warm) for i in range(sessions)
+    ))
+    elapsed = time.perf_counter() - started
+
+    service = get_embedding_service()
+    kb_stats = get_knowledge_base_stats()
+    return {
+        "sessions": sessions,
+        "lookups": len(cold) + len(warm),
+        "elapsed_s": round(elapsed, 2),
+        "cold": _summary(cold),
+        "repeated": _summary(warm),
+        "all": _summary(cold + warm),
+        "embeddings": service.get_stats() if service else None,
+        "answer_cache": kb_stats.get("answer_cache"),
+        "index": kb_stats.get("last_sync"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Knowledge base lookup latency benchmark")
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent voice sessions")
+    parser.add_argument("--queries", type=int, default=10, help="Lookups per session")
+    parser.add_argument("--think-ms", type=float, default=200.0, help="Max pause between lookups")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.sessions, args.queries, args.think_ms))
+
+    print(f"{result['lookups']} lookups across {result['sessions']} sessions in {result['elapsed_s']}s")
+    for label in ("cold", "repeated", "all"):
+        stats = result[label]
+        print(f"  {label:<9} n={stats['n']:<5} p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms max={stats['max_ms']}ms")
+    if result["embeddings"]:
+        emb = result["embeddings"]
+        print(
+            f"  embeddings: batches={emb['batches']} avg_batch={emb['avg_batch_size']} "
+            f"cache_hit_rate={emb['cache_hit_rate']} coalesced={emb['coalesced']}"
+        )
+    if result["answer_cache"]:
+        cache = result["answer_cache"]
+        print(
+            f"  answer cache: hit_rate={cache['hit_rate']} "
+            f"saved={cache['latency_saved_ms']}ms ({cache['avg_saved_ms_per_hit']}ms/hit)"
+        )
+    print(f"  index: {result['index']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,43 @@
 """
 Knowledge base module for URackIT AI Service.
 
-Provides semantic search over the knowledge text file using ChromaDB.
+Provides semantic search over the knowledge text file using ChromaDB
+(persistent HNSW index) with local ONNX MiniLM embeddings.
+
+Chunks follow the file's sections and paragraphs and are stored under the
+hash of their text, so re-indexing after an edit only embeds the chunks
+that changed. Query embedding and index search run off the event loop
+(see embeddings.py), and results for recently asked questions are reused
+for close paraphrases (semantic answer cache).
 """
 
-import os
+import asyncio
+import hashlib
 import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from agents import function_tool
 
+from .embeddings import get_embedding_service
+
 logger = logging.getLogger(__name__)
 
 # Try to import ChromaDB
 try:
     import chromadb
+    import numpy as np
     from chromadb.utils import embedding_functions
     CHROMADB_AVAILABLE = True
 except ImportError:
     chromadb = None
+    np = None
     embedding_functions = None
     CHROMADB_AVAILABLE = False
     logger.warning("ChromaDB not installed. Knowledge base features disabled.")
@@ -30,132 +48,388 @@ _DATA_FILE = _BASE_DIR / "urackit_knowledge.txt"
 _CHROMA_PATH = Path(__file__).resolve().parent / "chroma_store"
 _COLLECTION_NAME = "urackit_docs"
 
+# Sections in the knowledge file are separated by rows of dashes
+_SECTION_RULE = re.compile(r"^-{10,}\s*$", re.MULTILINE)
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
 _client = None
 _collection = None
+_index_lock = threading.Lock()
+_indexed_signature: Optional[Tuple[int, int]] = None
+_chunk_count = 0
+_last_sync: Dict[str, int] = {}
+
+
+@dataclass
+class _CachedAnswer:
+    vector: "np.ndarray"
+    top_k: int
+    answer: str
+    created_at: float
+    lookup_ms: float
+
+
+class SemanticAnswerCache:
+    """
+    Recent lookup results keyed by query embedding.
+
+    A question whose embedding is at least min_similarity (cosine) to a
+    cached one with the same top_k gets the cached chunk set back without
+    an index query. Entries expire after ttl_seconds and the least recently
+    used are evicted past max_entries. Everything is cleared when the index
+    changes.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 1800.0, min_similarity: float = 0.92):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.min_similarity = min_similarity
+
+        self._entries: "OrderedDict[int, _CachedAnswer]" = OrderedDict()
+        self._next_id = 0
+        self._matrix = None
+        self._matrix_ids: List[int] = []
+        # Invalidation runs on the indexing thread, lookups on the event loop
+        self._lock = threading.Lock()
+        # Bumped on invalidation so lookups that started earlier don't store stale results
+        self.generation = 0
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+        self.invalidations = 0
+        self.latency_saved_ms = 0.0
+
+    @staticmethod
+    def _unit(embedding) -> "np.ndarray":
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def _drop(self, entry_id: int) -> None:
+        self._entries.pop(entry_id, None)
+        self._matrix = None
+
+    def _purge_expired(self, now: float) -> None:
+        cutoff = now - self.ttl_seconds
+        for entry_id in [i for i, e in self._entries.items() if e.created_at < cutoff]:
+            self._drop(entry_id)
+            self.expired += 1
+
+    def get(self, embedding, top_k: int) -> Optional[_CachedAnswer]:
+        """Closest cached answer for this query embedding, if similar enough."""
+        with self._lock:
+            return self._get(embedding, top_k)
+
+    def _get(self, embedding, top_k: int) -> Optional[_CachedAnswer]:
+        self._purge_expired(time.monotonic())
+        if not self._entries:
+            self.misses += 1
+            return None
+
+        if self._matrix is None:
+            self._matrix_ids = list(self._entries.keys())
+            self._matrix = np.stack([self._entries[i].vector for i in self._matrix_ids])
 
+        scores = self._matrix @ self._unit(embedding)
+        for index in np.argsort(scores)[::-1]:
+            if scores[index] < self.min_similarity:
+                break
+            entry_id = self._matrix_ids[index]
+            entry = self._entries[entry_id]
+            if entry.top_k == top_k:
+                self._entries.move_to_end(entry_id)
+                self.hits += 1
+                return entry
 
-def _split_text(text: str, chunk_size: int = 600, overlap: int = 120) -> List[str]:
-    """Split text into overlapping chunks for embedding."""
+        self.misses += 1
+        return None
+
+    def put(self, embedding, top_k: int, answer: str, lookup_ms: float, generation: int) -> None:
+        with self._lock:
+            if generation != self.generation or self.max_entries <= 0:
+                return
+            self._entries[self._next_id] = _CachedAnswer(
+                vector=self._unit(embedding),
+                top_k=top_k,
+                answer=answer,
+                created_at=time.monotonic(),
+                lookup_ms=lookup_ms,
+            )
+            self._next_id += 1
+            self._matrix = None
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+
+    def record_saving(self, saved_ms: float) -> None:
+        self.latency_saved_ms += max(0.0, saved_ms)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+            self.generation += 1
+            self.invalidations += 1
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "latency_saved_ms": round(self.latency_saved_ms, 1),
+            "avg_saved_ms_per_hit": round(self.latency_saved_ms / self.hits, 2) if self.hits else 0.0,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "invalidations": self.invalidations,
+            "min_similarity": self.min_similarity,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+_answer_cache = SemanticAnswerCache(
+    max_entries=int(os.getenv("KB_ANSWER_CACHE_SIZE", "256")),
+    ttl_seconds=float(os.getenv("KB_ANSWER_CACHE_TTL_SECONDS", "1800")),
+    min_similarity=float(os.getenv("KB_ANSWER_CACHE_MIN_SIMILARITY", "0.92")),
+)
+
+
+def _pieces(paragraph: str, chunk_size: int) -> List[str]:
+    """Break an over-long paragraph on lines, then sentences, then hard wraps."""
+    if len(paragraph) <= chunk_size:
+        return [paragraph]
+
+    units: List[str] = []
+    for line in paragraph.splitlines():
+        if len(line) <= chunk_size:
+            units.append(line)
+            continue
+        for sentence in _SENTENCE_END.split(line):
+            while len(sentence) > chunk_size:
+                units.append(sentence[:chunk_size])
+                sentence = sentence[chunk_size:]
+            if sentence:
+                units.append(sentence)
+
+    pieces: List[str] = []
+    current = ""
+    for unit in units:
+        if current and len(current) + len(unit) + 1 > chunk_size:
+            pieces.append(current)
+            current = unit
+        else:
+            current = f"{current}\n{unit}" if current else unit
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _split_text(text: str, chunk_size: int = 600) -> List[str]:
+    """
+    Split text into chunks along section and paragraph boundaries.
+
+    Paragraphs are packed up to chunk_size and every chunk carries its
+    section title, so an edit only changes the chunks around it.
+    """
     chunks: List[str] = []
-    start = 0
-    length = len(text)
-    
-    while start < length:
-        end = min(start + chunk_size, length)
-        chunk = text[start:end].strip()
-        if chunk:
-            chunks.append(chunk)
-        if end == length:
-            break
-        start = end - overlap
-        if start < 0:
-            start = 0
-    
+
+    for section in _SECTION_RULE.split(text):
+        section = section.strip()
+        if not section:
+            continue
+
+        first_line = section.splitlines()[0].strip()
+        title = first_line if first_line.isupper() and len(first_line) <= 80 else None
+
+        current: List[str] = []
+        size = 0
+
+        def emit():
+            body = "\n\n".join(current)
+            if title and not body.startswith(title):
+                body = f"{title}\n{body}"
+            chunks.append(body)
+
+        for paragraph in _PARAGRAPH_BREAK.split(section):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            for piece in _pieces(paragraph, chunk_size):
+                if current and size + len(piece) + 2 > chunk_size:
+                    emit()
+                    current, size = [], 0
+                current.append(piece)
+                size += len(piece) + 2
+        if current:
+            emit()
+
     return chunks
 
 
-def _ensure_collection():
-    """Initialize ChromaDB collection with knowledge base content."""
-    global _client, _collection
-    
-    if not CHROMADB_AVAILABLE:
-        return None
-    
+def _chunk_id(chunk: str) -> str:
+    return f"{_COLLECTION_NAME}-{hashlib.sha256(chunk.encode('utf-8')).hexdigest()[:24]}"
+
+
+def _file_signature() -> Optional[Tuple[int, int]]:
     try:
-        _CHROMA_PATH.mkdir(parents=True, exist_ok=True)
-        
-        if _client is None:
-            _client = chromadb.PersistentClient(path=str(_CHROMA_PATH))
-        
-        if _collection is None:
-            embedding_fn = embedding_functions.DefaultEmbeddingFunction()
-            _collection = _client.get_or_create_collection(
-                name=_COLLECTION_NAME,
-                embedding_function=embedding_fn,
-            )
-        
-        # Load knowledge base if exists and collection is empty
-        if _DATA_FILE.exists() and _collection.count() == 0:
-            with _DATA_FILE.open("r", encoding="utf-8") as f:
-                raw_text = f.read()
-            
-            chunks = _split_text(raw_text)
-            if chunks:
-                ids = [f"{_COLLECTION_NAME}-{idx}" for idx in range(len(chunks))]
-                _collection.upsert(ids=ids, documents=chunks)
-                logger.info(f"Loaded {len(chunks)} chunks into knowledge base")
-        
-        return _collection
-    except Exception as e:
-        logger.error(f"Error initializing knowledge base: {e}")
+        stat = _DATA_FILE.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _sync_index(collection) -> Dict[str, int]:
+    """Bring the index in line with the knowledge file, embedding only new chunks."""
+    global _chunk_count
+
+    with _DATA_FILE.open("r", encoding="utf-8") as f:
+        raw_text = f.read()
+
+    wanted: Dict[str, str] = {}
+    for chunk in _split_text(raw_text):
+        wanted.setdefault(_chunk_id(chunk), chunk)
+
+    existing = set(collection.get(include=[])["ids"])
+    stale = sorted(existing - wanted.keys())
+    new_ids = [chunk_id for chunk_id in wanted if chunk_id not in existing]
+
+    if stale:
+        collection.delete(ids=stale)
+    if new_ids:
+        documents = [wanted[chunk_id] for chunk_id in new_ids]
+        service = get_embedding_service()
+        if service is not None:
+            collection.add(ids=new_ids, documents=documents, embeddings=service.embed_documents(documents))
+        else:
+            collection.add(ids=new_ids, documents=documents)
+
+    _chunk_count = len(wanted)
+    stats = {
+        "chunks": len(wanted),
+        "added": len(new_ids),
+        "removed": len(stale),
+        "unchanged": len(wanted) - len(new_ids),
+    }
+    if new_ids or stale:
+        logger.info(f"Knowledge base re-indexed: {stats}")
+    return stats
+
+
+def _ensure_collection(force: bool = False):
+    """Initialize the ChromaDB collection and re-index if the knowledge file changed."""
+    global _client, _collection, _indexed_signature, _last_sync
+
+    if not CHROMADB_AVAILABLE:
         return None
 
+    with _index_lock:
+        try:
+            if _client is None:
+                _CHROMA_PATH.mkdir(parents=True, exist_ok=True)
+                _client = chromadb.PersistentClient(path=str(_CHROMA_PATH))
+
+            if _collection is None:
+                service = get_embedding_service()
+                embedding_fn = service.embedding_function if service else embedding_functions.DefaultEmbeddingFunction()
+                _collection = _client.get_or_create_collection(
+                    name=_COLLECTION_NAME,
+                    embedding_function=embedding_fn,
+                )
+
+            signature = _file_signature()
+            if signature is not None and (force or signature != _indexed_signature):
+                _last_sync = _sync_index(_collection)
+                _indexed_signature = signature
+                if _last_sync["added"] or _last_sync["removed"]:
+                    _answer_cache.invalidate()
+
+            return _collection
+        except Exception as e:
+            logger.error(f"Error initializing knowledge base: {e}")
+            return None
+
+
+def _index_current() -> bool:
+    return _collection is not None and _file_signature() == _indexed_signature
+
 
 def reload_knowledge_base() -> str:
-    """Reload the knowledge base from the text file."""
-    global _collection
-    
+    """Re-index the knowledge base from the text file (only changed chunks are embedded)."""
     if not CHROMADB_AVAILABLE:
         return "ChromaDB not installed"
-    
+
+    if not _DATA_FILE.exists():
+        return f"Knowledge file not found: {_DATA_FILE}"
+
     try:
-        if _client is None:
-            _ensure_collection()
-        
-        if _collection is not None:
-            # Clear existing data
-            _collection.delete(where={})
-        
-        if not _DATA_FILE.exists():
-            return f"Knowledge file not found: {_DATA_FILE}"
-        
-        with _DATA_FILE.open("r", encoding="utf-8") as f:
-            raw_text = f.read()
-        
-        chunks = _split_text(raw_text)
-        if chunks:
-            ids = [f"{_COLLECTION_NAME}-{idx}" for idx in range(len(chunks))]
-            _collection.upsert(ids=ids, documents=chunks)
-        
-        return f"Reloaded {len(chunks)} chunks into knowledge base"
+        # Cached chunk sets may no longer match the index, even if the sync fails midway
+        _answer_cache.invalidate()
+        if _ensure_collection(force=True) is None:
+            return "Error reloading: knowledge base unavailable"
+        return (
+            f"Reloaded {_last_sync['chunks']} chunks into knowledge base "
+            f"({_last_sync['added']} added, {_last_sync['removed']} removed, "
+            f"{_last_sync['unchanged']} unchanged)"
+        )
     except Exception as e:
         return f"Error reloading: {e}"
 
 
 @function_tool
-def lookup_support_info(question: str, top_k: int = 4) -> str:
+async def lookup_support_info(question: str, top_k: int = 4) -> str:
     """
     Retrieve IT support information using a local ChromaDB index.
     Use this to find troubleshooting steps, procedures, and support information.
-    
+
     Args:
         question: The question or topic to search for
         top_k: Number of results to return (default 4)
-    
+
     Returns:
         Relevant support information from the knowledge base
     """
-    collection = _ensure_collection()
-    
+    collection = _collection if _index_current() else await asyncio.to_thread(_ensure_collection)
+
     if not CHROMADB_AVAILABLE or collection is None:
         return (
             "Knowledge base unavailable. Please install the 'chromadb' package and "
             "ensure urackit_knowledge.txt is present."
         )
-    
-    if collection.count() == 0:
+
+    if _chunk_count == 0:
         return "Knowledge base is empty. No documents have been loaded."
-    
+
     try:
-        result = collection.query(query_texts=[question], n_results=top_k)
+        started = time.perf_counter()
+        n_results = max(1, min(top_k, _chunk_count))
+        service = get_embedding_service()
+        embedding = None
+        if service is not None:
+            embedding = await service.embed_query(question)
+            cached = _answer_cache.get(embedding, n_results)
+            if cached is not None:
+                _answer_cache.record_saving(cached.lookup_ms - (time.perf_counter() - started) * 1000)
+                return cached.answer
+            generation = _answer_cache.generation
+            result = await asyncio.to_thread(collection.query, query_embeddings=[embedding], n_results=n_results)
+        else:
+            result = await asyncio.to_thread(collection.query, query_texts=[question], n_results=n_results)
         documents = result.get("documents") or []
-        
+
         if not documents or not documents[0]:
             return "No relevant information found in the knowledge base."
-        
+
         # Combine results
         combined = "\n\n---\n\n".join(documents[0])
-        return f"Knowledge Base Results:\n\n{combined}"
+        answer = f"Knowledge Base Results:\n\n{combined}"
+        if embedding is not None:
+            _answer_cache.put(embedding, n_results, answer, (time.perf_counter() - started) * 1000, generation)
+        return answer
     except Exception as e:
         logger.error(f"Knowledge base query error: {e}")
         return f"Error searching knowledge base: {e}"
@@ -164,13 +438,17 @@ def lookup_support_info(question: str, top_k: int = 4) -> str:
 def get_knowledge_base_stats() -> dict:
     """Get statistics about the knowledge base."""
     collection = _ensure_collection()
-    
+
     if not CHROMADB_AVAILABLE or collection is None:
         return {"available": False, "count": 0}
-    
+
+    service = get_embedding_service()
     return {
         "available": True,
         "count": collection.count(),
         "file_exists": _DATA_FILE.exists(),
         "file_path": str(_DATA_FILE),
+        "last_sync": _last_sync,
+        "embeddings": service.get_stats() if service else None,
+        "answer_cache": _answer_cache.get_stats(),
     }
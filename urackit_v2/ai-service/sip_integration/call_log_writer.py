@@ -0,0 +1,443 @@
+"""
+Write-behind persistence for call logs.
+
+Ending a session used to insert its call_logs, ai_usage_logs and
+agent_interactions rows directly, so a slow Supabase stalled the event loop
+that every other live call runs on. Rows are now appended to a local SQLite
+spool (one small local transaction per session) and a background flusher
+bulk-inserts them, many sessions per request, in table order:
+
+    call_logs -> ai_usage_logs -> agent_interactions
+
+Failed rows are retried with exponential backoff and survive restarts;
+rows that keep failing are marked dead and kept in the spool for
+inspection. Backlog and write-lag metrics are exposed via get_stats().
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+import httpx
+
+from stats_utils import percentile
+from .config import get_config
+
+logger = logging.getLogger(__name__)
+
+# Parents first: dependent rows reference call_logs.call_id
+TABLE_ORDER = ("call_logs", "ai_usage_logs", "agent_interactions")
+
+# Tables with a natural key can be retried with ON CONFLICT DO NOTHING
+CONFLICT_KEYS = {"call_logs": "call_id"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS spool (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tbl TEXT NOT NULL,
+    call_id TEXT,
+    payload TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    dead INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS spool_due ON spool (dead, next_attempt_at, id);
+CREATE INDEX IF NOT EXISTS spool_call ON spool (call_id, tbl);
+"""
+
+
+class SpooledRow:
+    """A spooled row awaiting insert."""
+
+    __slots__ = ("id", "table", "call_id", "payload", "enqueued_at", "attempts")
+
+    def __init__(self, id: int, table: str, call_id: Optional[str], payload: str, enqueued_at: float, attempts: int):
+        self.id = id
+        self.table = table
+        self.call_id = call_id
+        self.payload = payload
+        self.enqueued_at = enqueued_at
+        self.attempts = attempts
+
+
+class CallLogWriter:
+    """Durable write-behind queue in front of the Supabase call log tables."""
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_attempts: int = 20,
+        drain_seconds: float = 5.0,
+        backoff_base: float = 1.0,
+        backoff_cap: float = 300.0,
+        request_deadline: float = 10.0,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.drain_seconds = drain_seconds
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.request_deadline = request_deadline
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        # Metrics
+        self.enqueued_rows = 0
+        self.written_rows = 0
+        self.requests = 0
+        self.failed_requests = 0
+        self.dead_rows = 0
+        self.last_flush_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._lags: Deque[float] = deque(maxlen=1000)
+
+    # ------------------------------------------------------------------
+    # Spool (blocking; always called through asyncio.to_thread)
+    # ------------------------------------------------------------------
+
+    def _open(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _insert(self, rows: List[Tuple[str, Dict[str, Any]]]) -> None:
+        now = time.time()
+        with self._db_lock:
+            conn = self._open()
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany(
+                    "INSERT INTO spool (tbl, call_id, payload, enqueued_at) VALUES (?, ?, ?, ?)",
+                    [(table, row.get("call_id"), json.dumps(row, default=str), now) for table, row in rows],
+                )
+
+    def _due(self, now: float, limit: int) -> List[SpooledRow]:
+        # Dependent rows wait while their call_logs row is backing off
+        with self._db_lock:
+            cursor = self._open().execute(
+                "SELECT id, tbl, call_id, payload, enqueued_at, attempts FROM spool AS s "
+                "WHERE dead = 0 AND next_attempt_at <= ? AND NOT (tbl != 'call_logs' AND EXISTS ("
+                "    SELECT 1 FROM spool AS p WHERE p.call_id = s.call_id AND p.tbl = 'call_logs' "
+                "    AND p.dead = 0 AND p.next_attempt_at > ?)) "
+                "ORDER BY id LIMIT ?",
+                (now, now, limit),
+            )
+            return [SpooledRow(*values) for values in cursor.fetchall()]
+
+    def _delete(self, ids: List[int]) -> None:
+        with self._db_lock:
+            conn = self._open()
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany("DELETE FROM spool WHERE id = ?", [(i,) for i in ids])
+
+    def _reschedule(self, rows: List[SpooledRow], error: str, now: float) -> int:
+        """Count a failed attempt and schedule the retry; returns how many rows went dead."""
+        updates = []
+        parked_calls = []
+        for row in rows:
+            attempts = row.attempts + 1
+            is_dead = attempts >= self.max_attempts
+            retry_at = now + self._backoff(attempts)
+            updates.append((attempts, retry_at, error[:500], int(is_dead), row.id))
+            if is_dead and row.table == "call_logs":
+                parked_calls.append(("call_logs row parked", row.call_id))
+        with self._db_lock:
+            conn = self._open()
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany(
+                    "UPDATE spool SET attempts = ?, next_attempt_at = ?, last_error = ?, dead = ? WHERE id = ?",
+                    updates,
+                )
+                # Dependents of a parked call_logs row would only fail on the foreign key
+                conn.executemany(
+                    "UPDATE spool SET dead = 1, last_error = ? WHERE call_id = ? AND tbl != 'call_logs'",
+                    parked_calls,
+                )
+        return sum(update[3] for update in updates)
+
+    def _spool_stats(self) -> Dict[str, Any]:
+        with self._db_lock:
+            pending, oldest, calls = self._open().execute(
+                "SELECT COUNT(*), MIN(enqueued_at), COUNT(DISTINCT call_id) FROM spool WHERE dead = 0"
+            ).fetchone()
+            dead = self._open().execute("SELECT COUNT(*) FROM spool WHERE dead = 1").fetchone()[0]
+        return {"pending": pending, "pending_calls": calls, "oldest": oldest, "dead": dead}
+
+    def _close(self) -> None:
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _backoff(self, attempts: int) -> float:
+        """Jittered exponential backoff before the next attempt."""
+        delay = min(self.backoff_cap, self.backoff_base * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Open the spool and start flushing (including rows left by a previous run)."""
+        if self._task is not None and not self._task.done():
+            return
+        await asyncio.to_thread(self._open)
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Call log writer started (spool: {self.path})")
+
+    async def enqueue(self, rows: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Spool one session's (table, row) pairs; returns once they are on local disk."""
+        if not rows:
+            return
+        try:
+            await asyncio.to_thread(self._insert, rows)
+        except Exception as e:
+            # Spool unusable (disk full, permissions): write through instead of losing the call
+            logger.error(f"Call log spool write failed, inserting directly: {e}")
+            await self._write_through(rows)
+            return
+
+        self.enqueued_rows += len(rows)
+        await self.start()
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        """Stop the flusher after a bounded drain; anything left stays spooled for next start."""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+
+            try:
+                await asyncio.wait_for(self._drain(), timeout=self.drain_seconds)
+            except asyncio.TimeoutError:
+                logger.warning("Call log drain timed out; remaining rows stay in the spool")
+            except Exception as e:
+                logger.error(f"Call log drain failed: {e}")
+
+        await asyncio.to_thread(self._close)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Backlog and write-lag metrics."""
+        spool = await asyncio.to_thread(self._spool_stats)
+        now = time.time()
+        lags = list(self._lags)
+
+        return {
+            "backlog_rows": spool["pending"],
+            "backlog_calls": spool["pending_calls"],
+            "dead_rows": spool["dead"],
+            "oldest_pending_age_seconds": round(now - spool["oldest"], 3) if spool["oldest"] else 0.0,
+            "write_lag_p50_seconds": round(percentile(lags, 0.50), 3) if lags else None,
+            "write_lag_p95_seconds": round(percentile(lags, 0.95), 3) if lags else None,
+            "write_lag_max_seconds": round(max(lags), 3) if lags else None,
+            "enqueued_rows": self.enqueued_rows,
+            "written_rows": self.written_rows,
+            "requests": self.requests,
+            "failed_requests": self.failed_requests,
+            "last_flush_age_seconds": round(now - self.last_flush_at, 3) if self.last_flush_at else None,
+            "last_error": self.last_error,
+        }
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                handled = await self._flush_once()
+            except Exception as e:
+                logger.error(f"Call log flush failed: {e}")
+                handled = 0
+
+            # A full batch means more rows are probably waiting
+            if handled >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _drain(self) -> None:
+        while await self._flush_once() > 0:
+            pass
+
+    async def _flush_once(self) -> int:
+        """Insert one batch of due rows; returns how many rows were handled."""
+        now = time.time()
+        rows = await asyncio.to_thread(self._due, now, self.batch_size)
+        if not rows:
+            return 0
+
+        by_table: Dict[str, List[SpooledRow]] = {}
+        for row in rows:
+            by_table.setdefault(row.table, []).append(row)
+        tables = [t for t in TABLE_ORDER if t in by_table] + [t for t in by_table if t not in TABLE_ORDER]
+
+        failed_calls: Set[str] = set()
+        for table in tables:
+            # Rows whose call_logs row just failed are left for the parent's retry
+            ready = [row for row in by_table[table] if row.call_id not in failed_calls]
+            failed_calls.update(await self._write_table(table, ready, now))
+
+        self.last_flush_at = time.time()
+        return len(rows)
+
+    async def _write_table(self, table: str, rows: List[SpooledRow], now: float) -> Set[str]:
+        """Insert rows for one table; returns the call_ids of rows that failed."""
+        if not rows:
+            return set()
+
+        from db.connection import get_async_db
+        db = get_async_db()
+        on_conflict = CONFLICT_KEYS.get(table)
+
+        try:
+            if on_conflict is None:
+                rows = await self._skip_written(db, table, rows)
+                if not rows:
+                    return set()
+            self.requests += 1
+            await db.insert_many(
+                table,
+                [json.loads(row.payload) for row in rows],
+                on_conflict=on_conflict,
+                deadline=self.request_deadline,
+            )
+        except Exception as e:
+            self.failed_requests += 1
+            self.last_error = f"{table}: {e}"
+            if len(rows) > 1 and _is_client_error(e):
+                # A bad row rejects the whole batch; retry one by one to isolate it
+                return await self._write_rows_individually(db, table, rows, now)
+            logger.warning(f"Call log insert into {table} failed for {len(rows)} rows: {e}")
+            return await self._fail(rows, f"{table}: {e}", now)
+
+        await self._done(rows)
+        return set()
+
+    async def _write_rows_individually(self, db, table: str, rows: List[SpooledRow], now: float) -> Set[str]:
+        failed: Set[str] = set()
+        for row in rows:
+            try:
+                self.requests += 1
+                await db.insert_many(
+                    table,
+                    [json.loads(row.payload)],
+                    on_conflict=CONFLICT_KEYS.get(table),
+                    deadline=self.request_deadline,
+                )
+            except Exception as e:
+                self.failed_requests += 1
+                logger.warning(f"Call log row {row.id} rejected by {table}: {e}")
+                failed.update(await self._fail([row], f"{table}: {e}", now))
+                continue
+            await self._done([row])
+        return failed
+
+    async def _skip_written(self, db, table: str, rows: List[SpooledRow]) -> List[SpooledRow]:
+        """
+        Drop retried rows that already reached a table without a natural key.
+
+        A request that timed out may still have committed; without this check
+        its retry would duplicate the row.
+        """
+        retried = {row.call_id for row in rows if row.attempts > 0 and row.call_id}
+        if not retried:
+            return rows
+        existing = await db.select(
+            table,
+            columns="call_id",
+            filters={"call_id": f"in.({','.join(sorted(retried))})"},
+        )
+        written = {r.get("call_id") for r in existing}
+        if not written:
+            return rows
+        duplicates = [row for row in rows if row.attempts > 0 and row.call_id in written]
+        await self._done(duplicates)
+        return [row for row in rows if not (row.attempts > 0 and row.call_id in written)]
+
+    async def _done(self, rows: List[SpooledRow]) -> None:
+        await asyncio.to_thread(self._delete, [row.id for row in rows])
+        now = time.time()
+        self.written_rows += len(rows)
+        self._lags.extend(now - row.enqueued_at for row in rows)
+
+    async def _fail(self, rows: List[SpooledRow], error: str, now: float) -> Set[str]:
+        dead = await asyncio.to_thread(self._reschedule, rows, error, now)
+        if dead:
+            self.dead_rows += dead
+            logger.error(f"{dead} call log rows exceeded {self.max_attempts} attempts and were parked: {error}")
+        return {row.call_id for row in rows if row.call_id}
+
+    async def _write_through(self, rows: List[Tuple[str, Dict[str, Any]]]) -> None:
+        from db.connection import get_async_db
+        db = get_async_db()
+        order = {table: i for i, table in enumerate(TABLE_ORDER)}
+        for table, row in sorted(rows, key=lambda item: order.get(item[0], len(order))):
+            try:
+                await db.insert_many(table, [row], on_conflict=CONFLICT_KEYS.get(table), deadline=self.request_deadline)
+                self.written_rows += 1
+            except Exception as e:
+                logger.error(f"Failed to save {table} row: {e}")
+
+
+def _is_client_error(error: Exception) -> bool:
+    """A 4xx other than timeout/rate limit means the payload itself was rejected."""
+    return (
+        isinstance(error, httpx.HTTPStatusError)
+        and 400 <= error.response.status_code < 500
+        and error.response.status_code not in (408, 429)
+    )
+
+
+# Global instance
+_writer: Optional[CallLogWriter] = None
+
+
+def get_call_log_writer() -> CallLogWriter:
+    """Get the global call log writer."""
+    global _writer
+    if _writer is None:
+        config = get_config()
+        _writer = CallLogWriter(
+            path=config.call_log_spool_path,
+            batch_size=config.call_log_batch_size,
+            flush_interval=config.call_log_flush_interval,
+            max_attempts=config.call_log_max_attempts,
+            drain_seconds=config.call_log_drain_seconds,
+        )
+    return _writer
@@ -0,0 +1,181 @@
+"""
+Caller context prefetch for voice sessions.
+
+Resolves who is calling (contact, organization, assigned devices and open
+tickets) from the caller ID while the OpenAI Realtime handshake is still in
+flight, so the first lookups of the call are answered from memory instead of
+a fresh database round trip.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from db import get_async_db
+from db.phone import normalize_phone
+from db.queries import (
+    CONTACT_DEVICES_SELECT,
+    CONTACT_TICKETS_SELECT,
+    format_contact,
+    format_contact_devices,
+    format_contact_tickets,
+    lookup_contact_by_phone,
+)
+
+logger = logging.getLogger(__name__)
+
+# Ticket statuses treated as "open" (matches get_tickets_by_organization)
+OPEN_TICKET_STATUS_IDS = {1, 2, 3, 4}
+
+# Tools whose side effects make the cached ticket list stale
+TICKET_WRITE_TOOLS = {"create_ticket", "update_ticket_status", "escalate_ticket"}
+
+# Tools that invalidate some part of the context
+INVALIDATING_TOOLS = TICKET_WRITE_TOOLS | {"create_contact"}
+
+# Lookup tools answer_tool() can serve from the prefetched data
+CONTEXT_TOOLS = {"find_contact_by_phone", "get_contact_devices", "get_tickets_by_contact"}
+
+
+def _same_number(a: Optional[str], b: Optional[str]) -> bool:
+    """True when two phone numbers normalize to the same E.164 number."""
+    a, b = normalize_phone(a), normalize_phone(b)
+    return a is not None and a == b
+
+
+@dataclass
+class CallerContext:
+    """Everything known about the caller before the conversation starts."""
+
+    phone: str
+    resolved: bool = False
+    contact: Optional[Dict[str, Any]] = None
+    devices: Optional[List[Dict[str, Any]]] = None
+    tickets: Optional[List[Dict[str, Any]]] = None
+    fetch_ms: float = 0.0
+    fetched_at: float = field(default_factory=time.time)
+
+    @property
+    def contact_id(self) -> Optional[int]:
+        return self.contact.get("contact_id") if self.contact else None
+
+    @property
+    def organization(self) -> Dict[str, Any]:
+        return (self.contact or {}).get("organization") or {}
+
+    @property
+    def open_tickets(self) -> List[Dict[str, Any]]:
+        return [t for t in self.tickets or [] if t.get("status_id") in OPEN_TICKET_STATUS_IDS]
+
+    def _is_caller(self, contact_id: Any) -> bool:
+        try:
+            return self.contact_id is not None and int(contact_id) == self.contact_id
+        except (TypeError, ValueError):
+            return False
+
+    def answer_tool(self, name: str, arguments: Dict[str, Any]) -> Optional[str]:
+        """
+        Answer a caller lookup tool from the prefetched data.
+
+        Returns None when the call is not about this caller or the data was not
+        loaded, so the caller falls through to the real tool.
+        """
+        if name == "find_contact_by_phone":
+            if self.resolved and _same_number(arguments.get("phone"), self.phone):
+                if self.contact:
+                    return format_contact(self.contact)
+                return f"No contact found with phone: {arguments.get('phone')}"
+        elif name == "get_contact_devices":
+            if self.devices is not None and self._is_caller(arguments.get("contact_id")):
+                return format_contact_devices(self.contact_id, self.devices)
+        elif name == "get_tickets_by_contact":
+            if self.tickets is not None and self._is_caller(arguments.get("contact_id")):
+                return format_contact_tickets(self.contact_id, self.tickets)
+        return None
+
+    def invalidate_for_tool(self, name: str) -> None:
+        """Drop cached data that a write tool may have changed."""
+        if name in TICKET_WRITE_TOOLS:
+            self.tickets = None
+        elif name == "create_contact":
+            self.resolved = False
+
+    def summary(self) -> Optional[str]:
+        """Short caller-ID note for the model, or None if the caller is unknown."""
+        if not self.contact:
+            return None
+        org = self.organization
+        lines = [
+            f"Caller ID matches contact {self.contact.get('full_name')} "
+            f"(contact_id: {self.contact_id}) at {org.get('name', 'N/A')} "
+            f"(organization_id: {self.contact.get('organization_id')}).",
+        ]
+        if self.devices:
+            names = [r["device"].get("asset_name") for r in self.devices if r.get("device")]
+            lines.append(f"Assigned devices: {', '.join(n for n in names if n)}.")
+        open_tickets = self.open_tickets
+        if open_tickets:
+            lines.append(
+                "Open tickets: "
+                + ", ".join(f"#{t.get('ticket_id')} {t.get('subject')}" for t in open_tickets)
+                + "."
+            )
+        lines.append("Still follow the normal call flow and verify the U&E code before using this.")
+        return " ".join(lines)
+
+
+async def prefetch_caller_context(phone: str) -> CallerContext:
+    """
+    Resolve the caller's contact, then their devices and recent tickets in parallel.
+
+    Failures are logged and leave the corresponding field as None, which makes
+    the tools fall back to live queries.
+    """
+    started = time.perf_counter()
+    context = CallerContext(phone=phone)
+    if not normalize_phone(phone):
+        return context
+
+    db = get_async_db()
+    try:
+        contact = await lookup_contact_by_phone(phone)
+    except Exception as e:
+        logger.warning(f"Caller context lookup failed for {phone}: {e}")
+        return context
+
+    context.resolved = True
+    if contact:
+        context.contact = contact
+        contact_id = context.contact_id
+        devices, tickets = await asyncio.gather(
+            db._make_request("GET", "contact_devices", params={
+                "contact_id": f"eq.{contact_id}",
+                "unassigned_at": "is.null",
+                "select": CONTACT_DEVICES_SELECT,
+            }),
+            db._make_request("GET", "support_tickets", params={
+                "contact_id": f"eq.{contact_id}",
+                "select": CONTACT_TICKETS_SELECT,
+                "order": "created_at.desc",
+                "limit": "10",
+            }),
+            return_exceptions=True,
+        )
+        if isinstance(devices, Exception):
+            logger.warning(f"Caller context device lookup failed: {devices}")
+        else:
+            context.devices = devices
+        if isinstance(tickets, Exception):
+            logger.warning(f"Caller context ticket lookup failed: {tickets}")
+        else:
+            context.tickets = tickets
+
+    context.fetch_ms = (time.perf_counter() - started) * 1000
+    logger.info(
+        f"Caller context for {phone}: "
+        f"{'contact ' + str(context.contact_id) if context.contact else 'unknown caller'} "
+        f"({context.fetch_ms:.0f}ms)"
+    )
+    return context
@@ -27,6 +27,7 @@ class SIPConfig:
     twilio_twiml_app_sid: str = field(default_factory=lambda: os.getenv("TWILIO_TWIML_APP_SID", ""))
     twilio_api_key_sid: str = field(default_factory=lambda: os.getenv("TWILIO_API_KEY_SID", ""))
     twilio_api_key_secret: str = field(default_factory=lambda: os.getenv("TWILIO_API_KEY_SECRET", ""))
+    twilio_rest_timeout: float = field(default_factory=lambda: float(os.getenv("TWILIO_REST_TIMEOUT", "10")))
     
     # Server Settings
     webhook_host: str = field(default_factory=lambda: os.getenv("WEBHOOK_HOST", "0.0.0.0"))
@@ -38,6 +39,26 @@ class SIPConfig:
     input_audio_format: str = "g711_ulaw"  # Twilio uses G.711 μ-law
     output_audio_format: str = "g711_ulaw"
     
+    # Outbound playout buffer (frames are realtime audio deltas)
+    playout_max_frames: int = field(default_factory=lambda: int(os.getenv("PLAYOUT_MAX_FRAMES", "200")))
+    playout_max_batch: int = field(default_factory=lambda: int(os.getenv("PLAYOUT_MAX_BATCH", "8")))
+    playout_put_timeout: float = field(default_factory=lambda: float(os.getenv("PLAYOUT_PUT_TIMEOUT", "0.2")))
+    # Upper bound on waiting for Twilio to confirm playback (mark) before hangup/transfer
+    playout_mark_timeout: float = field(default_factory=lambda: float(os.getenv("PLAYOUT_MARK_TIMEOUT", "10")))
+    
+    # Live calls event stream (dashboard)
+    live_events_coalesce_ms: int = field(default_factory=lambda: int(os.getenv("LIVE_EVENTS_COALESCE_MS", "250")))
+    live_events_max_batch: int = field(default_factory=lambda: int(os.getenv("LIVE_EVENTS_MAX_BATCH", "200")))
+    live_events_retain: int = field(default_factory=lambda: int(os.getenv("LIVE_EVENTS_RETAIN", "2000")))
+    live_snapshot_interval_seconds: float = field(default_factory=lambda: float(os.getenv("LIVE_SNAPSHOT_INTERVAL_SECONDS", "30")))
+
+    # Call log write-behind spool (persisted after the call, off the hangup path)
+    call_log_spool_path: str = field(default_factory=lambda: os.getenv("CALL_LOG_SPOOL_PATH", "spool/call_logs.db"))
+    call_log_batch_size: int = field(default_factory=lambda: int(os.getenv("CALL_LOG_BATCH_SIZE", "100")))
+    call_log_flush_interval: float = field(default_factory=lambda: float(os.getenv("CALL_LOG_FLUSH_INTERVAL", "1.0")))
+    call_log_max_attempts: int = field(default_factory=lambda: int(os.getenv("CALL_LOG_MAX_ATTEMPTS", "20")))
+    call_log_drain_seconds: float = field(default_factory=lambda: float(os.getenv("CALL_LOG_DRAIN_SECONDS", "5")))
+
     # Session Settings
     session_timeout_seconds: int = 600  # 10 minutes
     max_concurrent_sessions: int = 100
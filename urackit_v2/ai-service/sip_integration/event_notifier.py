@@ -39,18 +39,37 @@ class EventNotifier:
         if self._session and not self._session.closed:
             await self._session.close()
     
-    async def push_live_calls_update(self, calls: List[Dict], metrics: Dict):
-        """Push full live calls update to backend."""
+    async def push_live_events(self, events: List[Dict]) -> bool:
+        """Push a batch of sequence-numbered live call events to backend."""
+        try:
+            session = await self._get_session()
+            async with session.post(
+                f"{self.backend_url}/v2/api/calls/live/events",
+                json={"events": events},
+            ) as response:
+                if response.status != 200 and response.status != 201:
+                    logger.warning(f"Failed to push live call events: {response.status}")
+                    return False
+                return True
+        except Exception as e:
+            logger.debug(f"Could not push live call events: {e}")
+            return False
+    
+    async def push_live_snapshot(self, snapshot: Dict) -> bool:
+        """Push a snapshot of all active calls (tagged with its epoch and seq) to backend."""
         try:
             session = await self._get_session()
             async with session.post(
                 f"{self.backend_url}/v2/api/calls/live/update",
-                json={"calls": calls, "metrics": metrics},
+                json=snapshot,
             ) as response:
                 if response.status != 200 and response.status != 201:
-                    logger.warning(f"Failed to push live calls update: {response.status}")
+                    logger.warning(f"Failed to push live calls snapshot: {response.status}")
+                    return False
+                return True
         except Exception as e:
-            logger.debug(f"Could not push live calls update: {e}")
+            logger.debug(f"Could not push live calls snapshot: {e}")
+            return False
     
     async def notify_call_start(self, call_data: Dict):
         """Notify backend when a new call starts."""
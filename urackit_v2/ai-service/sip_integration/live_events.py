@@ -0,0 +1,246 @@
+"""
+Sequence-numbered live-calls event stream for the dashboard.
+
+Instead of rebuilding every active call (with its full transcript) and
+POSTing the whole list on each utterance, the voice service publishes small
+append-only events:
+
+    call_started, transcript_appended, tool_called, agent_changed, call_ended
+
+Each event carries a monotonically increasing `seq`. Events published in
+quick succession are coalesced into one batched POST, so dashboard traffic
+is proportional to new data. A snapshot of all active calls (tagged with
+the seq it reflects) is pushed periodically and after a failed post, and
+recent events are kept in memory so a consumer that missed some can replay
+from its last seq or fall back to the snapshot.
+
+Seqs restart at 1 with each process, so every event, snapshot and resync
+response also carries a random stream `epoch`; a consumer that sees a new
+epoch must drop its last seq and take a fresh snapshot.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from .config import get_config
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = (
+    "call_started",
+    "transcript_appended",
+    "tool_called",
+    "agent_changed",
+    "call_ended",
+)
+
+
+class LiveCallEventStream:
+    """Append-only event log with coalesced delivery to the backend."""
+
+    def __init__(
+        self,
+        coalesce_ms: int = 250,
+        max_batch: int = 200,
+        retain: int = 2000,
+        snapshot_interval: float = 30.0,
+    ):
+        self.coalesce_seconds = coalesce_ms / 1000
+        self.max_batch = max_batch
+        self.snapshot_interval = snapshot_interval
+
+        self.epoch = uuid.uuid4().hex
+        self._seq = 0
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=retain)
+        self._pending: List[Dict[str, Any]] = []
+        self._snapshot_provider: Optional[Callable[[], Dict[str, Any]]] = None
+        self._last_snapshot_seq = 0
+        self._last_snapshot_at = 0.0
+        self._needs_snapshot = False
+        self._stopping = False
+
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.published = 0
+        self.posts = 0
+        self.failed_posts = 0
+        self.snapshots = 0
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    def set_snapshot_provider(self, provider: Callable[[], Dict[str, Any]]) -> None:
+        """Register the function that returns {"calls": [...], "metrics": {...}}."""
+        self._snapshot_provider = provider
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+
+    def publish(
+        self,
+        event_type: str,
+        call_sid: str,
+        session_id: str,
+        data: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Append an event and schedule delivery; never waits on the network."""
+        if event_type not in EVENT_TYPES:
+            raise ValueError(f"Unknown live call event: {event_type}")
+
+        self._seq += 1
+        event = {
+            "epoch": self.epoch,
+            "seq": self._seq,
+            "type": event_type,
+            "callSid": call_sid,
+            "sessionId": session_id,
+            "timestamp": datetime.utcnow().isoformat(),
+            "data": data or {},
+        }
+        self._events.append(event)
+        self._pending.append(event)
+        self.published += 1
+
+        self._ensure_running()
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return event
+
+    def events_since(self, seq: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Events after `seq`, or None when a snapshot is needed: some were
+        already evicted, or `seq` is ahead of this stream (it came from
+        another process).
+        """
+        if seq > self._seq:
+            return None
+        if seq == self._seq:
+            return []
+        oldest = self._events[0]["seq"] if self._events else self._seq + 1
+        if seq + 1 < oldest:
+            return None
+        return [e for e in self._events if e["seq"] > seq]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All active calls plus the epoch and seq they reflect."""
+        state = self._snapshot_provider() if self._snapshot_provider else {"calls": [], "metrics": {}}
+        return {"epoch": self.epoch, "seq": self._seq, **state}
+
+    def resync(self, since: int, epoch: Optional[str] = None) -> Dict[str, Any]:
+        """Replay from `since` when possible, otherwise return a snapshot."""
+        events = None if epoch and epoch != self.epoch else self.events_since(since)
+        if events is None:
+            return {"resync": True, "epoch": self.epoch, "snapshot": self.snapshot()}
+        return {"resync": False, "epoch": self.epoch, "seq": self._seq, "events": events}
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+
+    def _ensure_running(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Deliver pending events and stop the background task."""
+        if self._task is not None:
+            # Signal rather than cancel: a cancel racing the wakeup can be
+            # swallowed by wait_for and leave the loop running
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+            self._stopping = False
+        while self._pending:
+            await self._flush_events()
+
+    async def _flush_events(self) -> None:
+        from .event_notifier import get_event_notifier
+
+        batch = self._pending[:self.max_batch]
+        del self._pending[:len(batch)]
+        ok = await get_event_notifier().push_live_events(batch)
+        self.posts += 1
+        if not ok:
+            # Consumers now have a gap; the next snapshot lets them catch up
+            self.failed_posts += 1
+            self._needs_snapshot = True
+
+    async def _push_snapshot(self) -> None:
+        from .event_notifier import get_event_notifier
+
+        snapshot = self.snapshot()
+        ok = await get_event_notifier().push_live_snapshot(snapshot)
+        self._last_snapshot_at = time.monotonic()
+        if ok:
+            self.snapshots += 1
+            self._last_snapshot_seq = snapshot["seq"]
+            self._needs_snapshot = False
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.snapshot_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._stopping:
+                break
+
+            try:
+                if self._pending:
+                    # Let a burst of events accumulate into one post
+                    await asyncio.sleep(self.coalesce_seconds)
+                    while self._pending:
+                        await self._flush_events()
+
+                snapshot_due = time.monotonic() - self._last_snapshot_at >= self.snapshot_interval
+                if self._needs_snapshot or (snapshot_due and self._seq != self._last_snapshot_seq):
+                    await self._push_snapshot()
+            except Exception as e:
+                logger.debug(f"Live call event delivery failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "epoch": self.epoch,
+            "seq": self._seq,
+            "retained": len(self._events),
+            "pending": len(self._pending),
+            "published": self.published,
+            "posts": self.posts,
+            "failed_posts": self.failed_posts,
+            "snapshots": self.snapshots,
+        }
+
+
+# Global instance
+_stream: Optional[LiveCallEventStream] = None
+
+
+def get_live_event_stream() -> LiveCallEventStream:
+    """Get the global live call event stream."""
+    global _stream
+    if _stream is None:
+        config = get_config()
+        _stream = LiveCallEventStream(
+            coalesce_ms=config.live_events_coalesce_ms,
+            max_batch=config.live_events_max_batch,
+            retain=config.live_events_retain,
+            snapshot_interval=config.live_snapshot_interval_seconds,
+        )
+    return _stream
@@ -8,13 +8,17 @@ import asyncio
 import base64
 import json
 import logging
-from typing import Any, Dict, Optional
+import time
+from typing import Any, Dict, Optional, Tuple
 from fastapi import WebSocket, WebSocketDisconnect
 
 from .interfaces import AudioChunk, AudioFormat, CallState
 from .session_manager import VoiceSession, get_session_manager
 from .openai_realtime import OpenAIRealtimeConnection, create_realtime_connection
 from .agent_adapter import create_agent_adapter
+from .caller_context import CONTEXT_TOOLS, INVALIDATING_TOOLS, prefetch_caller_context
+from .playout_buffer import PlayoutBuffer
+from .twilio_provider import get_twilio_rest_client
 from .config import get_config
 
 logger = logging.getLogger(__name__)
@@ -64,6 +68,29 @@ class MediaStreamHandler:
         
         # Flag to track when AI is speaking (to avoid echo)
         self._ai_is_speaking = False
+        
+        # Relay mode: forward base64 payloads untouched when both legs are G.711 μ-law
+        self._passthrough = False
+        
+        # Outbound audio goes through a bounded buffer with one ordered sender task.
+        # Unpadded base64 strings concatenate into valid base64, so a batch
+        # ends at the first padded payload.
+        self._playout = PlayoutBuffer(
+            self._send_audio_batch,
+            max_frames=self.config.playout_max_frames,
+            max_batch=self.config.playout_max_batch,
+            put_timeout=self.config.playout_put_timeout,
+            can_join=lambda payload: not payload.endswith("="),
+            name=session.session_id,
+        )
+        self._media_prefix = ""
+        
+        # Playout position from Twilio mark echoes: a mark comes back once
+        # every frame sent before it has been played to the caller
+        self._marks: Dict[str, Tuple[asyncio.Future, float]] = {}
+        self._mark_seq = 0
+        self._audio_seconds_sent = 0.0
+        self._audio_seconds_played = 0.0
     
     async def handle(self) -> None:
         """Main handler for the WebSocket connection."""
@@ -102,7 +129,9 @@ class MediaStreamHandler:
             self.openai_connection = self.session.realtime_connection
             
             # Update callbacks to use this websocket for audio output
+            self._passthrough = self.openai_connection.is_g711_passthrough
             self.openai_connection.set_audio_callback(self._on_openai_audio)
+            self.openai_connection.set_audio_b64_callback(self._on_openai_audio_b64 if self._passthrough else None)
             self.openai_connection.set_text_callback(self._on_openai_text)
             self.openai_connection.set_function_callback(self._on_openai_function)
             self.openai_connection.set_interrupt_callback(self._on_user_interrupt)
@@ -114,6 +143,13 @@ class MediaStreamHandler:
             logger.info("Conference stream ready - AI can hear and respond with tools")
             return
         
+        # Look up the caller while the Realtime handshake is in flight
+        caller_phone = self.session.call_info.from_number if self.session.call_info else None
+        if caller_phone and self.session.caller_context_task is None:
+            self.session.caller_context_task = asyncio.create_task(
+                prefetch_caller_context(caller_phone)
+            )
+        
         # Get tools schema from agent adapter
         tools = self.agent_adapter.get_tools_schema()
         
@@ -127,7 +163,10 @@ class MediaStreamHandler:
         )
         
         # Set up callbacks
+        self._passthrough = self.openai_connection.is_g711_passthrough
         self.openai_connection.set_audio_callback(self._on_openai_audio)
+        if self._passthrough:
+            self.openai_connection.set_audio_b64_callback(self._on_openai_audio_b64)
         self.openai_connection.set_text_callback(self._on_openai_text)
         self.openai_connection.set_function_callback(self._on_openai_function)
         self.openai_connection.set_interrupt_callback(self._on_user_interrupt)
@@ -158,6 +197,7 @@ class MediaStreamHandler:
                 # Stream started - capture stream SID
                 start_data = data.get("start", {})
                 self.stream_sid = start_data.get("streamSid")
+                self._start_audio_sender()
                 
                 # Set call start time for grace period
                 import time
@@ -181,7 +221,11 @@ class MediaStreamHandler:
                     logger.info(f"Triggering AI greeting for caller: {caller_phone}")
                     # Small delay to ensure Twilio stream is fully ready
                     await asyncio.sleep(0.5)
-                    await self.openai_connection.start_greeting(caller_phone=caller_phone)
+                    caller_context = await self._get_caller_context(timeout=0.5)
+                    await self.openai_connection.start_greeting(
+                        caller_phone=caller_phone,
+                        caller_context=caller_context.summary() if caller_context else None,
+                    )
                     logger.info("AI greeting triggered successfully")
             
             elif event_type == "media":
@@ -190,20 +234,19 @@ class MediaStreamHandler:
                 payload = media_data.get("payload", "")
                 
                 if payload and self.openai_connection:
-                    # Skip sending audio if AI is currently speaking to avoid echo
-                    # The VAD will handle interruptions properly
-                    if self._ai_is_speaking:
-                        # Still send audio but OpenAI's VAD will handle echo cancellation
-                        pass
-                    
-                    # Decode base64 audio and send to OpenAI
-                    audio_bytes = base64.b64decode(payload)
-                    chunk = AudioChunk(
-                        data=audio_bytes,
-                        format=AudioFormat.G711_ULAW,
-                        timestamp=float(media_data.get("timestamp", 0))
-                    )
-                    await self.openai_connection.send_audio(chunk)
+                    # AI may be speaking here; OpenAI's VAD handles echo cancellation
+                    if self._passthrough:
+                        # Same codec on both legs - forward the payload untouched
+                        await self.openai_connection.send_audio_b64(payload)
+                    else:
+                        # Decode base64 audio and send to OpenAI
+                        audio_bytes = base64.b64decode(payload)
+                        chunk = AudioChunk(
+                            data=audio_bytes,
+                            format=AudioFormat.G711_ULAW,
+                            timestamp=float(media_data.get("timestamp", 0))
+                        )
+                        await self.openai_connection.send_audio(chunk)
             
             elif event_type == "stop":
                 logger.info("Twilio media stream stopped")
@@ -213,6 +256,7 @@ class MediaStreamHandler:
                 # Audio playback marker
                 mark_name = data.get("mark", {}).get("name")
                 logger.debug(f"Playback mark: {mark_name}")
+                self._on_mark(mark_name)
             
             else:
                 logger.debug(f"Unhandled Twilio event: {event_type}")
@@ -224,39 +268,93 @@ class MediaStreamHandler:
     
     def _on_openai_audio(self, chunk: AudioChunk) -> None:
         """Callback when audio is received from OpenAI."""
+        if chunk.data and self._can_play_audio():
+            self._playout.put_nowait(base64.b64encode(chunk.data).decode("utf-8"))
+    
+    async def _on_openai_audio_b64(self, payload: str) -> None:
+        """Callback with a raw base64 audio delta from OpenAI (relay mode)."""
+        if self._can_play_audio():
+            # Waits briefly when Twilio is slow, pushing back on the OpenAI reader
+            await self._playout.put(payload)
+    
+    def _can_play_audio(self) -> bool:
         if not self._running or not self.stream_sid:
+            return False
+        # In conference mode, stream is receive-only - audio is handled via text-to-speech
+        return not self.session.in_conference
+    
+    def _start_audio_sender(self) -> None:
+        """Start the ordered outbound audio sender once the stream SID is known."""
+        self._media_prefix = '{"event":"media","streamSid":' + json.dumps(self.stream_sid) + ',"media":{"payload":"'
+        if not self.is_conference_stream:
+            self.session.playout_buffer = self._playout
+        self._playout.start()
+    
+    async def _send_audio_batch(self, payloads: list) -> None:
+        """Send a batch of base64 μ-law payloads to Twilio as one media message."""
+        await self.websocket.send_text(self._media_prefix + "".join(payloads) + '"}}')
+        # 8 kHz μ-law: one byte per sample, 3 bytes per 4 base64 chars
+        self._audio_seconds_sent += sum(len(p) for p in payloads) * 3 / 4 / 8000
+    
+    async def _send_mark(self, prefix: str) -> asyncio.Future:
+        """Queue a mark behind the audio already sent; the future resolves when Twilio plays up to it."""
+        self._mark_seq += 1
+        name = f"{prefix}-{self._mark_seq}"
+        future = asyncio.get_running_loop().create_future()
+        self._marks[name] = (future, self._audio_seconds_sent)
+        await self.websocket.send_text(json.dumps({
+            "event": "mark",
+            "streamSid": self.stream_sid,
+            "mark": {"name": name},
+        }))
+        return future
+    
+    def _on_mark(self, name: Optional[str]) -> None:
+        """Twilio echoes marks in order (also early on clear), so earlier marks are done too."""
+        entry = self._marks.get(name)
+        if entry is None:
             return
-        
-        # In conference mode, stream is receive-only - can't send audio this way
-        if self.session.in_conference:
-            return  # Audio is handled via text-to-speech in conference
-        
-        if chunk.data:
-            asyncio.create_task(self._send_audio_to_twilio(chunk.data))
+        position = entry[1]
+        for mark_name, (future, mark_position) in list(self._marks.items()):
+            if mark_position <= position:
+                del self._marks[mark_name]
+                if not future.done():
+                    future.set_result(mark_name)
+        self._audio_seconds_played = max(self._audio_seconds_played, position)
     
-    async def _send_audio_to_twilio(self, audio_data: bytes) -> None:
-        """Send audio data to Twilio WebSocket."""
-        try:
-            audio_b64 = base64.b64encode(audio_data).decode("utf-8")
-            
-            message = {
-                "event": "media",
-                "streamSid": self.stream_sid,
-                "media": {
-                    "payload": audio_b64
-                }
-            }
-            
-            await self.websocket.send_text(json.dumps(message))
+    async def _wait_for_playout(self) -> float:
+        """
+        Wait until the caller has heard everything queued so far; returns seconds waited.
         
+        Drains the playout buffer, sends a mark behind the last frame and waits
+        for Twilio to echo it. The wait is bounded by the unplayed audio
+        duration (plus slack) and PLAYOUT_MARK_TIMEOUT.
+        """
+        started = time.monotonic()
+        if not self.stream_sid or not self._running:
+            return 0.0
+        cap = self.config.playout_mark_timeout
+        if not await self._playout.drain(timeout=cap):
+            logger.warning(f"Playout buffer did not drain within {cap}s")
+        unplayed = max(0.0, self._audio_seconds_sent - self._audio_seconds_played)
+        try:
+            future = await self._send_mark("playout")
+            remaining = cap - (time.monotonic() - started)
+            await asyncio.wait_for(future, timeout=max(0.0, min(remaining, unplayed + 1.0)))
+        except asyncio.TimeoutError:
+            logger.warning(f"No playback mark from Twilio after {time.monotonic() - started:.1f}s")
         except Exception as e:
-            logger.error(f"Error sending audio to Twilio: {e}")
+            logger.warning(f"Could not track playout with a mark: {e}")
+        return time.monotonic() - started
     
     async def _clear_twilio_audio(self) -> None:
         """Clear Twilio's audio buffer to stop playback immediately."""
         if not self.stream_sid:
             return
         
+        dropped = self._playout.clear()
+        if dropped:
+            logger.debug(f"Dropped {dropped} queued audio frames on barge-in")
         try:
             message = {
                 "event": "clear",
@@ -312,14 +410,13 @@ class MediaStreamHandler:
             return
         
         try:
-            from twilio.rest import Client
             import urllib.parse
             
             config = get_config()
-            client = Client(config.twilio_account_sid, config.twilio_auth_token)
+            client = get_twilio_rest_client()
             
             # Find the conference
-            conferences = client.conferences.list(
+            conferences = await client.conferences.list_async(
                 friendly_name=self.session.conference_name,
                 status='in-progress',
                 limit=1
@@ -339,7 +436,7 @@ class MediaStreamHandler:
             announce_url = f"{base_url}/conference-announce/{self.session.session_id}?text={encoded_text}"
             
             # Update conference to play announcement to all participants
-            client.conferences(conf_sid).update(
+            await client.conferences(conf_sid).update_async(
                 announce_url=announce_url,
                 announce_method='POST'
             )
@@ -357,10 +454,61 @@ class MediaStreamHandler:
         result = asyncio.create_task(self._execute_tool(name, arguments))
         return result
     
+    def _loaded_caller_context(self):
+        """Return the prefetched caller context if it has already landed (never waits)."""
+        task = self.session.caller_context_task
+        if self.session.caller_context is None and task is not None and task.done():
+            self.session.caller_context_task = None
+            if task.cancelled():
+                return None
+            if task.exception() is not None:
+                logger.warning(f"Caller context prefetch failed: {task.exception()}")
+                return None
+            context = task.result()
+            # Writes that ran while the prefetch was in flight may postdate its data
+            for name in self.session.caller_context_stale_tools:
+                context.invalidate_for_tool(name)
+            self.session.caller_context_stale_tools.clear()
+            self.session.caller_context = context
+        return self.session.caller_context
+    
+    async def _get_caller_context(self, timeout: float = 2.0):
+        """Return the prefetched caller context, waiting briefly if still loading."""
+        task = self.session.caller_context_task
+        if self.session.caller_context is None and task is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.info("Caller context not ready yet, using live lookups")
+            except Exception:
+                pass  # Logged by _loaded_caller_context
+        return self._loaded_caller_context()
+    
+    def _invalidate_caller_context(self, name: str) -> None:
+        """Drop prefetched data a write tool may have changed, now or once the prefetch lands."""
+        if name not in INVALIDATING_TOOLS:
+            return
+        caller_context = self._loaded_caller_context()
+        if caller_context is not None:
+            caller_context.invalidate_for_tool(name)
+        elif self.session.caller_context_task is not None:
+            self.session.caller_context_stale_tools.add(name)
+    
     async def _execute_tool(self, name: str, arguments: Dict[str, Any]) -> str:
         """Execute a tool and track the result."""
         try:
-            result = await self.agent_adapter.execute_tool(name, arguments)
+            # Only caller lookups are worth waiting for the prefetch; everything
+            # else (writes, transfer, hang-up) runs immediately
+            if name in CONTEXT_TOOLS:
+                caller_context = await self._get_caller_context()
+            else:
+                caller_context = self._loaded_caller_context()
+            result = caller_context.answer_tool(name, arguments) if caller_context else None
+            if result is not None:
+                logger.info(f"Answered {name} from prefetched caller context")
+            else:
+                result = await self.agent_adapter.execute_tool(name, arguments)
+                self._invalidate_caller_context(name)
             result_str = str(result)
             
             # Check if this is a transfer request (handle both | and : separators)
@@ -368,7 +516,8 @@ class MediaStreamHandler:
                 reason = result_str.replace("TRANSFER_TO_HUMAN|", "").replace("TRANSFER_TO_HUMAN:", "").strip()
                 logger.info(f"Transfer to human requested: {reason}")
                 # Initiate transfer in background
-                asyncio.create_task(self._initiate_transfer(reason))
+                after_response = self.openai_connection.responses_created if self.openai_connection else None
+                asyncio.create_task(self._initiate_transfer(reason, after_response))
                 result_str = "Transferring you to a human agent now. Please hold."
 
             # Check if this is a hangup request
@@ -376,8 +525,9 @@ class MediaStreamHandler:
                 reason = result_str.replace("HANG_UP_CALL|", "").replace("HANG_UP_CALL:", "").strip()
                 logger.info(f"Hang up call requested: {reason}")
 
-                # Initiate hangup in background (will wait for AI to finish speaking)
-                asyncio.create_task(self._initiate_hangup(reason))
+                # Initiate hangup in background (waits for the AI's goodbye to be played)
+                after_response = self.openai_connection.responses_created if self.openai_connection else None
+                asyncio.create_task(self._initiate_hangup(reason, after_response))
 
                 result_str = "Call ending."
 
@@ -388,7 +538,7 @@ class MediaStreamHandler:
             self.session.add_tool_call(name, arguments, error_msg, success=False)
             return error_msg
     
-    async def _initiate_transfer(self, reason: str) -> None:
+    async def _initiate_transfer(self, reason: str, after_response: Optional[int] = None) -> None:
         """
         Add human agent to the call while AI stays connected with bidirectional audio.
         
@@ -400,9 +550,7 @@ class MediaStreamHandler:
         Reference: https://www.twilio.com/en-us/blog/developers/tutorials/product/connect-twiml-app-twilio-conference
         """
         try:
-            from twilio.rest import Client
             import urllib.parse
-            import time
             
             transfer_start_time = time.time()
             
@@ -431,16 +579,18 @@ class MediaStreamHandler:
                 await self.openai_connection.update_for_silent_mode()
                 logger.info("   ✅ OpenAI session updated for silent listening mode")
             
-            # Wait a moment to let the AI finish speaking
-            logger.info("   ⏳ Waiting 1 second for AI to finish speaking...")
-            await asyncio.sleep(1)
+            # Let the caller hear "transferring you" before the call is moved
+            logger.info("   ⏳ Waiting for AI to finish speaking...")
+            if self.openai_connection and after_response is not None:
+                await self.openai_connection.wait_for_response_after(after_response, timeout=15.0)
+            playout_wait = await self._wait_for_playout()
+            logger.info(f"   ✅ Playback complete ({playout_wait:.2f}s)")
             
-            # Create Twilio client
+            # Shared async Twilio client
             logger.info("-" * 40)
             logger.info("📢 STEP 2: Creating Conference Room")
             logger.info("-" * 40)
-            client = Client(config.twilio_account_sid, config.twilio_auth_token)
-            logger.info("   ✅ Twilio client initialized")
+            client = get_twilio_rest_client()
             
             # Create a unique conference name for this call
             conference_name = f"support-{call_sid[-8:]}"
@@ -473,7 +623,7 @@ class MediaStreamHandler:
     </Dial>
 </Response>'''
             
-            client.calls(call_sid).update(twiml=twiml_caller)
+            await client.calls(call_sid).update_async(twiml=twiml_caller)
             logger.info(f"   ✅ Caller joining conference {conference_name}")
             logger.info(f"   ℹ️  Conference settings: beep=false, record=record-from-start")
             logger.info(f"   ℹ️  Caller will hear: 'Connecting you to a technician...'")
@@ -487,7 +637,7 @@ class MediaStreamHandler:
             
             logger.info(f"   📞 Dialing {human_agent_phone} from {config.twilio_phone_number}")
             
-            outbound_call = client.calls.create(
+            outbound_call = await client.calls.create_async(
                 to=human_agent_phone,
                 from_=config.twilio_phone_number,
                 twiml=f'''<Response>
@@ -524,7 +674,7 @@ class MediaStreamHandler:
                 await asyncio.sleep(retry_delay)
                 logger.info(f"   🔍 Looking up conference SID (attempt {attempt}/{max_retries})...")
                 
-                conferences = client.conferences.list(
+                conferences = await client.conferences.list_async(
                     friendly_name=conference_name,
                     status='in-progress',
                     limit=1
@@ -553,7 +703,7 @@ class MediaStreamHandler:
                         'conference_name': conference_name
                     })
                     
-                    participant = client.conferences(conf_sid).participants.create(
+                    participant = await client.conferences(conf_sid).participants.create_async(
                         from_=config.twilio_phone_number,
                         to=f"app:{twiml_app_sid}?{params}",
                         early_media=True,
@@ -597,16 +747,17 @@ class MediaStreamHandler:
             self._silent_mode = False  # Revert to normal mode on failure
             logger.info("   ℹ️  Reverted to normal AI mode")
 
-    async def _initiate_hangup(self, reason: str) -> None:
+    async def _initiate_hangup(self, reason: str, after_response: Optional[int] = None) -> None:
         """
         End the call gracefully using Twilio API.
 
         This is called when the AI determines the conversation is complete
         (e.g., caller says goodbye, issue resolved, verification failed).
+        The call is released as soon as Twilio confirms the goodbye has been
+        played (mark echo) rather than after a fixed delay.
         """
+        self.session.hangup_requested_at = time.time()
         try:
-            from twilio.rest import Client
-
             logger.info("=" * 60)
             logger.info("📞 HANGING UP CALL")
             logger.info("=" * 60)
@@ -615,21 +766,27 @@ class MediaStreamHandler:
             logger.info(f"📞 Call SID: {self.session.call_info.call_sid}")
             logger.info(f"📱 Call Source: {self.session.call_source}")
 
-            # Wait for the AI to finish speaking (response.done event)
+            # Wait for the AI to finish its reply to the hang_up tool result
             logger.info("   ⏳ Waiting for AI response.done...")
-
+            started = time.monotonic()
             if self.openai_connection:
-                # Wait for OpenAI to signal response is complete
-                completed = await self.openai_connection.wait_for_response_done(timeout=15.0)
+                if after_response is not None:
+                    completed = await self.openai_connection.wait_for_response_after(after_response, timeout=15.0)
+                else:
+                    completed = await self.openai_connection.wait_for_response_done(timeout=15.0)
                 if completed:
                     logger.info("   ✅ AI response.done received")
                 else:
-                    logger.warning("   ⚠️ Timeout waiting for response.done")
+                    logger.warning("   ⚠️ No AI response.done before timeout")
+            response_wait = time.monotonic() - started
 
-            # Buffer for Twilio to finish playing audio (server sends audio faster than realtime)
-            # The goodbye message is ~5-6 seconds, so we need adequate buffer
-            await asyncio.sleep(6.0)
-            logger.info("   ✅ Audio playback buffer complete")
+            # Server sends audio faster than realtime; wait for Twilio to actually play it
+            playout_wait = await self._wait_for_playout()
+            logger.info(f"   ✅ Audio playback complete ({playout_wait:.2f}s after response.done)")
+            self.session.hangup_timings = {
+                "response_wait": round(response_wait, 3),
+                "playout_wait": round(playout_wait, 3),
+            }
 
             # Only use Twilio API for Twilio calls (not WebRTC)
             if self.session.call_source == "webrtc":
@@ -637,14 +794,12 @@ class MediaStreamHandler:
                 self._running = False
                 return
 
-            config = get_config()
             call_sid = self.session.call_info.call_sid
 
-            # Use Twilio API to end the call
-            client = Client(config.twilio_account_sid, config.twilio_auth_token)
-
             # Update the call status to 'completed' to hang up
-            call = client.calls(call_sid).update(status='completed')
+            started = time.monotonic()
+            call = await get_twilio_rest_client().calls(call_sid).update_async(status='completed')
+            self.session.hangup_timings["api"] = round(time.monotonic() - started, 3)
 
             logger.info("   ✅ Call ended successfully via Twilio API")
             logger.info(f"   📞 Final call status: {call.status}")
@@ -700,6 +855,14 @@ class MediaStreamHandler:
         """Cleanup resources when connection ends."""
         self._running = False
         
+        await self._playout.stop()
+        
+        # Nothing more will be played; release anyone waiting on a mark
+        for future, _ in self._marks.values():
+            if not future.done():
+                future.set_result(None)
+        self._marks.clear()
+        
         # For conference streams, don't disconnect OpenAI - the main stream owns it
         if self.is_conference_stream:
             logger.info(f"Conference stream cleaned up for session {self.session.session_id}")
@@ -714,6 +877,9 @@ class MediaStreamHandler:
             await self.openai_connection.disconnect()
             self.openai_connection = None
         
+        if self.session.caller_context_task and not self.session.caller_context_task.done():
+            self.session.caller_context_task.cancel()
+        
         # End the session in session manager (this saves to DB and notifies backend)
         try:
             session_manager = get_session_manager()
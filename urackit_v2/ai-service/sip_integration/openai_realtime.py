@@ -4,6 +4,7 @@ OpenAI Realtime API connection handler for U Rack IT.
 
 import asyncio
 import base64
+import inspect
 import json
 import logging
 from typing import Any, Callable, Dict, Optional
@@ -41,6 +42,7 @@ class OpenAIRealtimeConnection(IRealtimeConnection):
         
         # Callbacks
         self._audio_callback: Optional[Callable[[AudioChunk], None]] = None
+        self._audio_b64_callback: Optional[Callable[[str], Any]] = None  # Raw base64 deltas (relay mode)
         self._text_callback: Optional[Callable[[str, str], None]] = None
         self._function_callback: Optional[Callable[[str, Dict[str, Any]], Any]] = None
         self._interrupt_callback: Optional[Callable[[], None]] = None
@@ -64,6 +66,10 @@ class OpenAIRealtimeConnection(IRealtimeConnection):
         # Event to signal response is complete (for waiting on AI to finish speaking)
         self._response_done = asyncio.Event()
         self._response_done.set()  # Start as "done" (no response in progress)
+        
+        # Count of response.created events, so callers can wait for a reply that has not started yet
+        self._responses_created = 0
+        self._response_started = asyncio.Event()
     
     async def connect(self, session_id: str) -> bool:
         logger.info(f"Attempting to connect to OpenAI Realtime WebSocket for session {session_id}")
@@ -202,6 +208,17 @@ Remember: You are a background assistant. The human technician is leading the ca
         if audio.is_final:
             await self._send_event({"type": "input_audio_buffer.commit"})
     
+    @property
+    def is_g711_passthrough(self) -> bool:
+        """True when both directions use G.711 μ-law, so Twilio payloads can be relayed as-is."""
+        return self.input_audio_format == self.output_audio_format == AudioFormat.G711_ULAW.value
+    
+    async def send_audio_b64(self, payload: str) -> None:
+        """Append already base64-encoded audio without decoding it (relay mode)."""
+        if not self._is_connected or not self._ws:
+            return
+        await self._ws.send('{"type":"input_audio_buffer.append","audio":' + json.dumps(payload) + '}')
+    
     async def send_text(self, text: str) -> None:
         """Send text input to OpenAI Realtime API."""
         if not self._is_connected or not self._ws:
@@ -225,10 +242,11 @@ Remember: You are a background assistant. The human technician is leading the ca
         await self._send_event(event)
         await self._send_event({"type": "response.create"})
 
-    async def start_greeting(self, caller_phone: str = None) -> None:
+    async def start_greeting(self, caller_phone: str = None, caller_context: str = None) -> None:
         """Trigger the assistant to greet immediately after connect.
 
         If caller_phone is provided, inject it as context so AI can look up the caller.
+        caller_context is an optional prefetched caller-ID summary passed along with it.
         """
         logger.info(f"start_greeting called - connected: {self._is_connected}, greeting_sent: {self._greeting_sent}")
 
@@ -250,6 +268,12 @@ Remember: You are a background assistant. The human technician is leading the ca
 
         self._greeting_sent = True
 
+        greeting_prompt = "[SYSTEM: A caller just connected. Say your opening greeting now and wait for their response.]"
+        if caller_phone:
+            greeting_prompt += f"\n[SYSTEM: Caller phone: {caller_phone}.]"
+        if caller_context:
+            greeting_prompt += f"\n[SYSTEM: {caller_context}]"
+
         # Step 1: Add a user message to prompt the greeting
         # This creates a conversation item that tells the model to start
         user_prompt_event = {
@@ -260,7 +284,7 @@ Remember: You are a background assistant. The human technician is leading the ca
                 "content": [
                     {
                         "type": "input_text",
-                        "text": "[SYSTEM: A caller just connected. Say your opening greeting now and wait for their response.]"
+                        "text": greeting_prompt
                     }
                 ]
             }
@@ -282,6 +306,14 @@ Remember: You are a background assistant. The human technician is leading the ca
         """Set callback for receiving audio from AI."""
         self._audio_callback = callback
     
+    def set_audio_b64_callback(self, callback: Optional[Callable[[str], Any]]) -> None:
+        """Set callback for receiving AI audio as the raw base64 delta (skips AudioChunk decoding).
+
+        The callback may be a coroutine function; it is awaited so a full
+        playout buffer slows down the receive loop (backpressure).
+        """
+        self._audio_b64_callback = callback
+    
     def set_text_callback(self, callback: Callable[[str, str], None]) -> None:
         """Set callback for receiving text transcription."""
         self._text_callback = callback
@@ -319,6 +351,36 @@ Remember: You are a background assistant. The human technician is leading the ca
             logger.warning(f"Timeout waiting for response.done after {timeout}s")
             return False
 
+    @property
+    def responses_created(self) -> int:
+        """Number of responses started so far on this connection."""
+        return self._responses_created
+
+    async def wait_for_response_after(self, count: int, start_timeout: float = 3.0, timeout: float = 15.0) -> bool:
+        """Wait for a response started after `count` responses (e.g. the reply to a tool result) to complete.
+
+        Args:
+            count: responses_created before the reply was requested
+            start_timeout: Seconds to wait for the reply to start
+            timeout: Seconds to wait for it to complete once started
+
+        Returns:
+            True if a later response completed, False if none started or it timed out
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + start_timeout
+        while self._responses_created <= count:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                logger.info(f"No response started within {start_timeout}s")
+                return False
+            self._response_started.clear()
+            try:
+                await asyncio.wait_for(self._response_started.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+        return await self.wait_for_response_done(timeout=timeout)
+
     async def cancel_response(self) -> None:
         """Cancel the current response being generated by OpenAI."""
         if not self._is_connected or not self._ws:
@@ -348,17 +410,22 @@ Remember: You are a background assistant. The human technician is leading the ca
     async def _send_event(self, event: dict) -> None:
         """Send an event to OpenAI with debug logging."""
         if self._ws:
-            logger.debug(f"Sending event to OpenAI: {json.dumps(event)}")
-            await self._ws.send(json.dumps(event))
+            message = json.dumps(event)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Sending event to OpenAI: {message}")
+            await self._ws.send(message)
     
     async def _receive_loop(self) -> None:
         """Background loop for receiving messages from OpenAI with debug logging."""
         try:
+            debug = logger.isEnabledFor(logging.DEBUG)
             async for message in self._ws:
-                logger.debug(f"Received raw message from OpenAI: {message}")
+                if debug:
+                    logger.debug(f"Received raw message from OpenAI: {message}")
                 try:
                     event = json.loads(message)
-                    logger.debug(f"Parsed event from OpenAI: {event}")
+                    if debug:
+                        logger.debug(f"Parsed event from OpenAI: {event}")
                     await self._handle_event(event)
                 except json.JSONDecodeError:
                     logger.error(f"Invalid JSON from OpenAI: {message}")
@@ -459,7 +526,11 @@ Remember: You are a background assistant. The human technician is leading the ca
             self._is_responding = True
 
             audio_b64 = event.get("delta", "")
-            if audio_b64 and self._audio_callback:
+            if audio_b64 and self._audio_b64_callback:
+                result = self._audio_b64_callback(audio_b64)
+                if inspect.isawaitable(result):
+                    await result
+            elif audio_b64 and self._audio_callback:
                 audio_bytes = base64.b64decode(audio_b64)
                 chunk = AudioChunk(
                     data=audio_bytes,
@@ -471,6 +542,8 @@ Remember: You are a background assistant. The human technician is leading the ca
         elif event_type == "response.created":
             self._is_responding = True
             self._response_done.clear()  # Response started, not done yet
+            self._responses_created += 1
+            self._response_started.set()
             self._current_response_id = event.get("response", {}).get("id")
             if self._speaking_callback:
                 self._speaking_callback(True)
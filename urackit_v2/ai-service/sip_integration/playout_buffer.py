@@ -0,0 +1,210 @@
+"""
+Bounded playout buffer for outbound call audio.
+
+Sits between the realtime voice model (producer) and the Twilio WebSocket
+(consumer). A single sender task drains frames in order, so a slow socket
+pushes back on the producer instead of growing memory, and queued audio can
+be dropped in one step when the caller barges in.
+
+realestate_voice/xai_integration/playout_buffer.py is a copy of this file
+(that service is built and deployed on its own); change both together.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from stats_utils import summarize
+
+logger = logging.getLogger(__name__)
+
+
+class PlayoutBuffer:
+    """
+    Bounded FIFO of outbound audio frames with one ordered sender task.
+
+    - put() waits up to put_timeout for space (backpressure); if the socket
+      is still stalled the oldest frame is dropped to keep latency bounded.
+    - clear() drops everything queued (barge-in).
+    - Consecutive frames are handed to `send` as one batch when `can_join`
+      allows it, up to max_batch frames.
+
+    Metrics cover queue depth, per-send latency, time spent queued and
+    RFC 3550 style inter-frame jitter (send spacing vs. arrival spacing).
+    """
+
+    def __init__(
+        self,
+        send: Callable[[List[Any]], Awaitable[None]],
+        max_frames: int = 200,
+        max_batch: int = 8,
+        put_timeout: float = 0.2,
+        can_join: Optional[Callable[[Any], bool]] = None,
+        name: str = "",
+        sample_size: int = 500,
+    ):
+        self._send = send
+        self.max_frames = max_frames
+        self.max_batch = max_batch
+        self.put_timeout = put_timeout
+        self._can_join = can_join or (lambda frame: True)
+        self.name = name
+
+        self._frames: Deque[Tuple[Any, float]] = deque()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._sending = False
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self._send_ms: Deque[float] = deque(maxlen=sample_size)
+        self._queued_ms: Deque[float] = deque(maxlen=sample_size)
+        self.frames_in = 0
+        self.frames_sent = 0
+        self.batches_sent = 0
+        self.dropped_overflow = 0
+        self.dropped_barge_in = 0
+        self.backpressure_waits = 0
+        self.send_errors = 0
+        self.peak_depth = 0
+        self.jitter_ms = 0.0
+        self._last_arrival: Optional[float] = None
+        self._last_sent: Optional[float] = None
+
+    @property
+    def depth(self) -> int:
+        return len(self._frames)
+
+    def _update_events(self) -> None:
+        if self._frames:
+            self._not_empty.set()
+            self._idle.clear()
+        else:
+            self._not_empty.clear()
+            if not self._sending:
+                self._idle.set()
+        if len(self._frames) < self.max_frames:
+            self._not_full.set()
+        else:
+            self._not_full.clear()
+
+    def put_nowait(self, frame: Any) -> None:
+        """Queue a frame, dropping the oldest one if the buffer is full."""
+        if len(self._frames) >= self.max_frames:
+            self._frames.popleft()
+            self.dropped_overflow += 1
+        self._frames.append((frame, time.monotonic()))
+        self.frames_in += 1
+        self.peak_depth = max(self.peak_depth, len(self._frames))
+        self._update_events()
+
+    async def put(self, frame: Any) -> None:
+        """Queue a frame, waiting briefly for space when the buffer is full."""
+        if len(self._frames) >= self.max_frames:
+            self.backpressure_waits += 1
+            try:
+                await asyncio.wait_for(self._not_full.wait(), timeout=self.put_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Playout buffer {self.name} full for {self.put_timeout}s, dropping oldest frame")
+        self.put_nowait(frame)
+
+    def clear(self) -> int:
+        """Drop all queued frames (barge-in). Returns how many were dropped."""
+        dropped = len(self._frames)
+        self._frames.clear()
+        self.dropped_barge_in += dropped
+        # Spacing across a barge-in is not jitter
+        self._last_arrival = None
+        self._last_sent = None
+        self._update_events()
+        return dropped
+
+    def start(self) -> None:
+        """Start the sender task (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def drain(self, timeout: float) -> bool:
+        """Wait until every queued frame has been handed to the socket. False on timeout."""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def stop(self) -> None:
+        """Stop the sender task; queued frames are discarded."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def _next_batch(self) -> Tuple[List[Any], List[float]]:
+        frame, arrived = self._frames.popleft()
+        frames, arrivals = [frame], [arrived]
+        while self._frames and len(frames) < self.max_batch and self._can_join(frame):
+            frame, arrived = self._frames.popleft()
+            frames.append(frame)
+            arrivals.append(arrived)
+        self._update_events()
+        return frames, arrivals
+
+    async def _run(self) -> None:
+        while True:
+            await self._not_empty.wait()
+            if not self._frames:
+                continue
+            self._sending = True
+            frames, arrivals = self._next_batch()
+            started = time.monotonic()
+            try:
+                await self._send(frames)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.send_errors += 1
+                logger.error(f"Playout buffer {self.name} send failed: {e}")
+                continue
+            finally:
+                self._sending = False
+                self._update_events()
+            sent = time.monotonic()
+            self._record(arrivals, started, sent)
+
+    def _record(self, arrivals: List[float], started: float, sent: float) -> None:
+        self.batches_sent += 1
+        self.frames_sent += len(arrivals)
+        self._send_ms.append((sent - started) * 1000)
+        for arrived in arrivals:
+            self._queued_ms.append((started - arrived) * 1000)
+        arrived = arrivals[-1]
+        if self._last_arrival is not None and self._last_sent is not None:
+            delta = (sent - self._last_sent) - (arrived - self._last_arrival)
+            self.jitter_ms += (abs(delta) * 1000 - self.jitter_ms) / 16
+        self._last_arrival, self._last_sent = arrived, sent
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current depth plus send latency, queueing delay and jitter (ms)."""
+        return {
+            "depth": len(self._frames),
+            "max_frames": self.max_frames,
+            "peak_depth": self.peak_depth,
+            "frames_in": self.frames_in,
+            "frames_sent": self.frames_sent,
+            "batches_sent": self.batches_sent,
+            "dropped_overflow": self.dropped_overflow,
+            "dropped_barge_in": self.dropped_barge_in,
+            "backpressure_waits": self.backpressure_waits,
+            "send_errors": self.send_errors,
+            "send_latency_ms": summarize(self._send_ms),
+            "queue_delay_ms": summarize(self._queued_ms),
+            "jitter_ms": round(self.jitter_ms, 2),
+        }
@@ -9,12 +9,16 @@ import uuid
 import os
 import json
 import requests
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
 from datetime import datetime
 
+from stats_utils import summarize
 from .interfaces import ISessionManager, CallInfo, CallState
 from .config import get_config
+from .live_events import get_live_event_stream
+from .call_log_writer import get_call_log_writer
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +47,19 @@ class VoiceSession:
     callback_number: Optional[str] = None
     device_type: Optional[str] = None
     
+    # Caller context prefetched from caller ID (see caller_context.py)
+    caller_context: Optional[Any] = None
+    caller_context_task: Optional[asyncio.Task] = None
+    # Write tools that ran while the prefetch was in flight; applied when it lands
+    caller_context_stale_tools: Set[str] = field(default_factory=set)
+    
+    # Outbound audio buffer (see playout_buffer.py), exposed for metrics
+    playout_buffer: Optional[Any] = None
+    
+    # When the AI decided to hang up, and where the wait before release went
+    hangup_requested_at: Optional[float] = None
+    hangup_timings: Dict[str, float] = field(default_factory=dict)
+    
     # Call source: 'twilio' (PSTN via Twilio) or 'webrtc' (browser-based)
     call_source: str = "twilio"  # Default to twilio for backwards compatibility
     
@@ -142,14 +159,19 @@ class VoiceSession:
         })
         self.touch()
     
+    def publish_event(self, event_type: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """Publish a live call event for this session to the dashboard stream."""
+        get_live_event_stream().publish(event_type, self.call_info.call_sid, self.session_id, data)
+    
     def add_tool_call(self, name: str, arguments: Dict[str, Any], result: Any, success: bool) -> None:
         """Record a tool/function call made during the session."""
+        timestamp = datetime.utcnow().isoformat()
         self.tool_calls.append({
             "name": name,
             "arguments": arguments,
             "result": result,
             "success": success,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": timestamp
         })
         
         # Track ticket creation and escalation
@@ -159,18 +181,34 @@ class VoiceSession:
             self.escalated = True
             self.ai_resolution = False
         
+        self.publish_event("tool_called", {
+            "name": name,
+            "args": arguments,
+            "result": str(result)[:100],
+            "success": success,
+            "timestamp": timestamp,
+            "ticketCreated": self.ticket_created,
+            "escalated": self.escalated,
+        })
         self.touch()
     
     def add_agent_handoff(self, from_agent: str, to_agent: str, reason: Optional[str] = None) -> None:
         """Record an agent-to-agent handoff."""
+        timestamp = datetime.utcnow().isoformat()
         self.agent_handoffs.append({
             "from_agent": from_agent,
             "to_agent": to_agent,
             "reason": reason,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": timestamp
         })
         # Update current agent type
         self.agent_type = to_agent
+        self.publish_event("agent_changed", {
+            "fromAgent": from_agent,
+            "toAgent": to_agent,
+            "reason": reason,
+            "timestamp": timestamp,
+        })
         self.touch()
 
 
@@ -185,6 +223,12 @@ class VoiceSessionManager(ISessionManager):
         self._sessions: Dict[str, VoiceSession] = {}
         self._lock = asyncio.Lock()
         
+        # Seconds each AI-ended call kept its slot after the hangup decision
+        self._slot_hold_seconds: Deque[float] = deque(maxlen=500)
+        
+        # Dashboard event stream snapshots are built from the active sessions
+        get_live_event_stream().set_snapshot_provider(self.build_live_snapshot)
+        
         # Cleanup task
         self._cleanup_task: Optional[asyncio.Task] = None
         self._running = False
@@ -196,6 +240,9 @@ class VoiceSessionManager(ISessionManager):
         
         self._running = True
         self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+        
+        # Resumes flushing any call logs spooled before a restart
+        await get_call_log_writer().start()
         logger.info("VoiceSessionManager started")
     
     async def stop(self) -> None:
@@ -217,6 +264,9 @@ class VoiceSessionManager(ISessionManager):
         for session_id in session_ids:
             await self.end_session(session_id)
         
+        await get_live_event_stream().stop()
+        await get_call_log_writer().stop()
+        
         logger.info("VoiceSessionManager stopped")
     
     async def create_session(self, call_info: CallInfo, call_source: str = "twilio") -> str:
@@ -250,8 +300,8 @@ class VoiceSessionManager(ISessionManager):
             
             logger.info(f"Created session {session_id} for call {call_info.call_sid} (source: {call_source})")
             
-            # Notify backend of new call
-            await self._notify_call_update()
+            # Notify dashboards of the new call
+            session.publish_event("call_started", self._live_call_payload(session, include_history=False))
             
             return session_id
     
@@ -275,8 +325,15 @@ class VoiceSessionManager(ISessionManager):
             session = self._sessions.pop(session_id, None)
         
         if session:
-            # Notify backend of call end
-            await self._notify_call_end(session.call_info.call_sid)
+            ended = {"duration": int(time.time() - session.created_at)}
+            if session.hangup_requested_at:
+                slot_hold = time.time() - session.hangup_requested_at
+                self._slot_hold_seconds.append(slot_hold)
+                ended["slotHoldSeconds"] = round(slot_hold, 2)
+                logger.info(f"Session {session_id} held its slot {slot_hold:.2f}s after hangup {session.hangup_timings}")
+            
+            # Notify dashboards of call end
+            session.publish_event("call_ended", ended)
             
             # Save call log to database
             await self._save_call_log(session)
@@ -289,145 +346,124 @@ class VoiceSessionManager(ISessionManager):
                     logger.error(f"Error disconnecting realtime: {e}")
             
             logger.info(f"Ended session {session_id}, duration: {time.time() - session.created_at:.1f}s")
-            
-            # Push updated live calls list (with this call removed)
-            await self._notify_call_update()
     
     async def _save_call_log(self, session: VoiceSession) -> None:
-        """Save call log and transcript to database."""
+        """Spool the call's rows; the write-behind writer inserts them off the hangup path."""
         try:
-            from db.connection import SupabaseDB
-            db = SupabaseDB()
-            
-            duration = int(time.time() - session.created_at)
-            
-            # Build transcript from conversation history
-            transcript_parts = []
-            for msg in session.conversation_history:
-                role = msg.get('role', 'unknown')
-                content = msg.get('content', '')
-                transcript_parts.append(f"[{role}]: {content}")
-            transcript = "\n".join(transcript_parts)
-            
-            # Build call summary
-            summary_parts = []
-            if session.caller_name:
-                summary_parts.append(f"Caller: {session.caller_name}")
-            if session.company_name:
-                summary_parts.append(f"Company: {session.company_name}")
-            if session.device_type:
-                summary_parts.append(f"Device: {session.device_type}")
-            if session.ticket_created:
-                summary_parts.append("Ticket created")
-            if session.escalated:
-                summary_parts.append("Escalated")
-            summary_parts.append(f"Duration: {duration}s")
-            summary_parts.append(f"Messages: {len(session.conversation_history)}")
-            call_summary = " | ".join(summary_parts) if summary_parts else None
-            
-            # Determine AI resolution (resolved if not escalated and had conversation)
-            ai_resolution = not session.escalated and len(session.conversation_history) > 0
-            
-            # Generate a unique call_id (required primary key)
-            call_id = str(uuid.uuid4())
-            
-            # Insert call log with all fields
-            call_log_data = {
+            rows = self._build_call_log_rows(session)
+            await get_call_log_writer().enqueue(rows)
+            logger.info(f"Queued call log for session {session.session_id}: call_id={rows[0][1]['call_id']}")
+        except Exception as e:
+            logger.error(f"Failed to save call log for session {session.session_id}: {e}")
+    
+    def _build_call_log_rows(self, session: VoiceSession) -> List[Tuple[str, Dict[str, Any]]]:
+        """Build the call_logs, ai_usage_logs and agent_interactions rows for a finished call."""
+        duration = int(time.time() - session.created_at)
+        
+        # Build transcript from conversation history
+        transcript_parts = []
+        for msg in session.conversation_history:
+            role = msg.get('role', 'unknown')
+            content = msg.get('content', '')
+            transcript_parts.append(f"[{role}]: {content}")
+        transcript = "\n".join(transcript_parts)
+        
+        # Build call summary
+        summary_parts = []
+        if session.caller_name:
+            summary_parts.append(f"Caller: {session.caller_name}")
+        if session.company_name:
+            summary_parts.append(f"Company: {session.company_name}")
+        if session.device_type:
+            summary_parts.append(f"Device: {session.device_type}")
+        if session.ticket_created:
+            summary_parts.append("Ticket created")
+        if session.escalated:
+            summary_parts.append("Escalated")
+        summary_parts.append(f"Duration: {duration}s")
+        summary_parts.append(f"Messages: {len(session.conversation_history)}")
+        call_summary = " | ".join(summary_parts) if summary_parts else None
+        
+        # Determine AI resolution (resolved if not escalated and had conversation)
+        ai_resolution = not session.escalated and len(session.conversation_history) > 0
+        
+        # Generate a unique call_id (required primary key)
+        call_id = str(uuid.uuid4())
+        started_at = datetime.utcfromtimestamp(session.created_at).isoformat()
+        ended_at = datetime.utcnow().isoformat()
+        
+        rows: List[Tuple[str, Dict[str, Any]]] = [("call_logs", {
+            "call_id": call_id,
+            "session_id": session.session_id,
+            "call_sid": session.call_info.call_sid,
+            "from_number": session.call_info.from_number,
+            "to_number": session.call_info.to_number,
+            "direction": session.call_info.direction or "inbound",
+            "call_source": session.call_source,  # 'twilio' or 'webrtc'
+            "status": "completed",
+            "duration_seconds": duration,
+            "transcript": transcript if transcript else None,
+            "call_summary": call_summary,
+            "caller_name": session.caller_name,
+            "company_name": session.company_name,
+            "ai_resolution": ai_resolution,
+            "was_resolved": ai_resolution,
+            "escalated": session.escalated,
+            "was_escalated": session.escalated,
+            "escalated_to": "human_agent" if session.escalated else None,
+            "ticket_created": session.ticket_created,
+            "agent_type": session.agent_type,
+            "started_at": started_at,
+            "ended_at": ended_at,
+        })]
+        
+        # AI usage log if tokens were used
+        if session.total_tokens > 0:
+            # Use realtime model for voice sessions
+            model = getattr(get_config(), "openai_realtime_model", "gpt-realtime-2025-08-28")
+            rows.append(("ai_usage_logs", {
                 "call_id": call_id,
-                "session_id": session.session_id,
                 "call_sid": session.call_info.call_sid,
-                "from_number": session.call_info.from_number,
-                "to_number": session.call_info.to_number,
-                "direction": session.call_info.direction or "inbound",
-                "call_source": session.call_source,  # 'twilio' or 'webrtc'
-                "status": "completed",
-                "duration_seconds": duration,
-                "transcript": transcript if transcript else None,
-                "call_summary": call_summary,
-                "caller_name": session.caller_name,
-                "company_name": session.company_name,
-                "ai_resolution": ai_resolution,
-                "was_resolved": ai_resolution,
-                "escalated": session.escalated,
-                "was_escalated": session.escalated,
-                "escalated_to": "human_agent" if session.escalated else None,
-                "ticket_created": session.ticket_created,
+                "session_id": session.session_id,
+                "model": model,
+                "input_tokens": session.input_tokens,
+                "output_tokens": session.output_tokens,
+                "total_tokens": session.total_tokens,
+                "cost_usd": session.ai_cost_usd,
+                "response_time_ms": 0,
                 "agent_type": session.agent_type,
-                "started_at": datetime.utcfromtimestamp(session.created_at).isoformat(),
-                "ended_at": datetime.utcnow().isoformat()
-            }
-            
-            result = db.insert("call_logs", call_log_data)
-            logger.info(f"Saved call log for session {session.session_id}: call_id={call_id}")
-            
-            # Save AI usage log if tokens were used
-            if session.total_tokens > 0:
-                try:
-                    from .config import get_config
-                    config = get_config()
-                    # Use realtime model for voice sessions
-                    model = getattr(config, "openai_realtime_model", "gpt-realtime-2025-08-28")
-                    ai_log_data = {
-                        "call_id": call_id,
-                        "call_sid": session.call_info.call_sid,
-                        "session_id": session.session_id,
-                        "model": model,
-                        "input_tokens": session.input_tokens,
-                        "output_tokens": session.output_tokens,
-                        "total_tokens": session.total_tokens,
-                        "cost_usd": session.ai_cost_usd,
-                        "response_time_ms": 0,
-                        "agent_type": session.agent_type
-                    }
-                    db.insert("ai_usage_logs", ai_log_data)
-                    logger.info(f"Saved AI usage log: {session.total_tokens} tokens for model {model}")
-                except Exception as e:
-                    logger.error(f"Failed to save AI usage log: {e}")
-            
-            # Save agent_interactions with tool calls data
-            try:
-                import json as json_module
-                
-                # Count successful and failed tool calls
-                successful_tools = [tc for tc in session.tool_calls if tc.get("success", False)]
-                failed_tools = [tc for tc in session.tool_calls if not tc.get("success", False)]
-                
-                # Check if any tool call was a handoff
-                was_handoff = session.escalated or any(
-                    tc.get("name") in ("transfer_to_human", "escalate_ticket", "escalate_to_human")
-                    for tc in session.tool_calls
-                )
-                
-                # Get handoff destination if applicable
-                handoff_to = None
-                if was_handoff:
-                    for tc in session.tool_calls:
-                        if tc.get("name") in ("transfer_to_human", "escalate_ticket", "escalate_to_human"):
-                            handoff_to = tc.get("arguments", {}).get("reason", "human_agent")
-                            break
-                
-                interaction_data = {
-                    "call_id": call_id,
-                    "session_id": session.session_id,
-                    "agent_type": session.agent_type,
-                    "agent_name": session.agent_type,
-                    "started_at": datetime.utcfromtimestamp(session.created_at).isoformat(),
-                    "ended_at": datetime.utcnow().isoformat(),
-                    "duration_ms": duration * 1000,
-                    "turn_count": len(session.conversation_history),
-                    "tools_called": json_module.dumps(session.tool_calls) if session.tool_calls else "[]",
-                    "tool_call_count": len(session.tool_calls),
-                    "failed_tool_calls": len(failed_tools),
-                    "was_handoff": was_handoff,
-                    "handoff_to": handoff_to
-                }
-                db.insert("agent_interactions", interaction_data)
-                logger.info(f"Saved agent interaction: {len(session.tool_calls)} tool calls, handoff={was_handoff}")
-            except Exception as e:
-                logger.error(f"Failed to save agent interaction: {e}")
-            
-        except Exception as e:
-            logger.error(f"Failed to save call log for session {session.session_id}: {e}")
+            }))
+        
+        # Agent interaction with tool calls data
+        failed_tools = [tc for tc in session.tool_calls if not tc.get("success", False)]
+        handoff_tools = ("transfer_to_human", "escalate_ticket", "escalate_to_human")
+        
+        # Check if any tool call was a handoff, and where it went
+        was_handoff = session.escalated or any(tc.get("name") in handoff_tools for tc in session.tool_calls)
+        handoff_to = None
+        if was_handoff:
+            for tc in session.tool_calls:
+                if tc.get("name") in handoff_tools:
+                    handoff_to = tc.get("arguments", {}).get("reason", "human_agent")
+                    break
+        
+        rows.append(("agent_interactions", {
+            "call_id": call_id,
+            "session_id": session.session_id,
+            "agent_type": session.agent_type,
+            "agent_name": session.agent_type,
+            "started_at": started_at,
+            "ended_at": ended_at,
+            "duration_ms": duration * 1000,
+            "turn_count": len(session.conversation_history),
+            "tools_called": json.dumps(session.tool_calls) if session.tool_calls else "[]",
+            "tool_call_count": len(session.tool_calls),
+            "failed_tool_calls": len(failed_tools),
+            "was_handoff": was_handoff,
+            "handoff_to": handoff_to,
+        }))
+        
+        return rows
     
     async def cleanup_expired_sessions(self) -> int:
         """Clean up expired sessions and return count."""
@@ -443,6 +479,8 @@ class VoiceSessionManager(ISessionManager):
         
         for session_id in expired:
             session = self._sessions.pop(session_id, None)
+            if session:
+                session.publish_event("call_ended", {"duration": int(time.time() - session.created_at), "expired": True})
             if session and session.realtime_connection:
                 try:
                     await session.realtime_connection.disconnect()
@@ -454,43 +492,82 @@ class VoiceSessionManager(ISessionManager):
         
         return len(expired)
     
-    async def _notify_call_update(self) -> None:
-        """Notify backend of live calls update for WebSocket broadcast."""
-        try:
-            from .event_notifier import get_event_notifier
-            notifier = get_event_notifier()
-            
-            calls, metrics = self._build_live_calls_data()
-            await notifier.push_live_calls_update(calls, metrics)
-        except Exception as e:
-            logger.debug(f"Could not notify call update: {e}")
-    
-    async def _notify_call_end(self, call_sid: str) -> None:
-        """Notify backend when a call ends."""
-        try:
-            from .event_notifier import get_event_notifier
-            notifier = get_event_notifier()
-            await notifier.notify_call_end(call_sid)
-        except Exception as e:
-            logger.debug(f"Could not notify call end: {e}")
-    
     async def notify_transcript_update(self, session_id: str, role: str, content: str) -> None:
-        """Notify backend of new transcript entry and push full update."""
-        try:
-            from .event_notifier import get_event_notifier
-            notifier = get_event_notifier()
-            await notifier.notify_transcript(session_id, role, content)
-            
-            # Also push full live calls update for the dashboard
-            calls, metrics = self._build_live_calls_data()
-            await notifier.push_live_calls_update(calls, metrics)
-        except Exception as e:
-            logger.debug(f"Could not notify transcript update: {e}")
+        """Publish a transcript_appended event (only the new utterance) for dashboards."""
+        session = self._sessions.get(session_id)
+        if session is None:
+            return
+        session.publish_event("transcript_appended", {
+            "role": role,
+            "content": content,
+            "timestamp": datetime.utcnow().isoformat(),
+        })
     
-    def _build_live_calls_data(self) -> tuple:
-        """Build the live calls data for WebSocket broadcast."""
-        from datetime import datetime
+    def _live_call_payload(self, session: VoiceSession, include_history: bool = True) -> Dict[str, Any]:
+        """Dashboard representation of one active call."""
+        direction = session.call_info.direction or "inbound"
+        current_agent = session.agent_type or "triage_agent"
+        started_at = datetime.utcfromtimestamp(session.created_at).isoformat()
+        
+        call = {
+            "callSid": session.call_info.call_sid,
+            "sessionId": session.session_id,
+            "from": session.call_info.from_number,
+            "to": session.call_info.to_number,
+            "direction": direction,
+            "status": "in-progress",
+            "startTime": started_at,
+            "startedAt": started_at,
+            "duration": int(time.time() - session.created_at),
+            "callerName": session.caller_name,
+            "companyName": session.company_name,
+            "currentAgent": current_agent,
+            "agentType": current_agent,
+            "sentiment": "neutral",
+            "ticketCreated": session.ticket_created,
+            "escalated": session.escalated,
+            "aiResolution": session.ai_resolution
+        }
+        if not include_history:
+            return call
         
+        # Build agent history
+        agent_history = [{
+            "agentName": session.agent_handoffs[0]["from_agent"] if session.agent_handoffs else current_agent,
+            "action": "Started conversation",
+            "timestamp": started_at
+        }]
+        for handoff in session.agent_handoffs:
+            agent_history.append({
+                "agentName": handoff["to_agent"],
+                "action": f"Handoff from {handoff['from_agent']}",
+                "timestamp": handoff["timestamp"]
+            })
+        
+        call["transcript"] = [
+            {
+                "role": msg.get("role", "assistant"),
+                "content": msg.get("content", ""),
+                "timestamp": msg.get("timestamp")
+            }
+            for msg in session.conversation_history
+        ]
+        call["agentHistory"] = agent_history
+        call["toolCalls"] = [
+            {
+                "name": tc.get("name", "unknown"),
+                "args": tc.get("arguments", {}),
+                "result": str(tc.get("result", ""))[:100],
+                "success": tc.get("success", False),
+                "timestamp": tc.get("timestamp")
+            }
+            for tc in session.tool_calls
+        ]
+        call["playout"] = session.playout_buffer.snapshot() if session.playout_buffer else None
+        return call
+    
+    def build_live_snapshot(self) -> Dict[str, Any]:
+        """All active calls (with history) and summary metrics, for dashboard resync."""
         calls = []
         agents_set = set()
         total_duration = 0
@@ -498,68 +575,33 @@ class VoiceSessionManager(ISessionManager):
         outbound_count = 0
         
         for session in self._sessions.values():
-            duration = int(time.time() - session.created_at)
-            total_duration += duration
-            
-            direction = session.call_info.direction or "inbound"
-            if direction == "inbound":
+            call = self._live_call_payload(session)
+            calls.append(call)
+            total_duration += call["duration"]
+            if call["direction"] == "inbound":
                 inbound_count += 1
             else:
                 outbound_count += 1
-            
-            if session.agent_type:
-                agents_set.add(session.agent_type)
-            
-            # Build transcript entries
-            transcript = []
-            for msg in session.conversation_history:
-                transcript.append({
-                    "role": msg.get("role", "assistant"),
-                    "content": msg.get("content", ""),
-                    "timestamp": msg.get("timestamp", datetime.utcnow().isoformat())
-                })
-            
-            # Build agent history
-            agent_history = []
-            current_agent = session.agent_type or "triage_agent"
-            agent_history.append({
-                "agentName": current_agent,
-                "action": "Started conversation",
-                "timestamp": datetime.utcfromtimestamp(session.created_at).isoformat()
-            })
-            
-            calls.append({
-                "callSid": session.call_info.call_sid,
-                "sessionId": session.session_id,
-                "from": session.call_info.from_number,
-                "to": session.call_info.to_number,
-                "direction": direction,
-                "status": "in-progress",
-                "startTime": datetime.utcfromtimestamp(session.created_at).isoformat(),
-                "startedAt": datetime.utcfromtimestamp(session.created_at).isoformat(),
-                "duration": duration,
-                "callerName": session.caller_name,
-                "companyName": session.company_name,
-                "currentAgent": current_agent,
-                "agentType": current_agent,
-                "transcript": transcript,
-                "agentHistory": agent_history,
-                "sentiment": "neutral",
-                "ticketCreated": session.ticket_created,
-                "escalated": session.escalated
-            })
+            agents_set.add(call["agentType"])
         
-        avg_duration = total_duration // len(self._sessions) if self._sessions else 0
+        avg_duration = total_duration // len(calls) if calls else 0
         
         metrics = {
-            "activeCalls": len(self._sessions),
+            "activeCalls": len(calls),
             "inbound": inbound_count,
             "outbound": outbound_count,
+            "inboundCalls": inbound_count,
+            "outboundCalls": outbound_count,
             "avgDuration": avg_duration,
-            "activeAgents": list(agents_set)
+            "activeAgents": list(agents_set),
+            "slotHoldSeconds": self.get_slot_hold_stats(),
         }
         
-        return calls, metrics
+        return {"calls": calls, "metrics": metrics}
+    
+    def get_slot_hold_stats(self) -> Dict[str, Any]:
+        """Slot-hold time (hangup decision to session end) over recent AI-ended calls."""
+        return {"count": len(self._slot_hold_seconds), **summarize(self._slot_hold_seconds)}
     
     async def _cleanup_loop(self) -> None:
         """Background task to periodically cleanup expired sessions."""
@@ -4,6 +4,8 @@ Twilio telephony provider implementation for U Rack IT.
 
 from twilio.twiml.voice_response import VoiceResponse, Connect, Stream, Say
 from twilio.request_validator import RequestValidator
+from twilio.rest import Client
+from twilio.http.async_http_client import AsyncTwilioHttpClient
 from typing import Optional
 
 from .interfaces import ITelephonyProvider, CallInfo
@@ -96,3 +98,30 @@ class TwilioProvider(ITelephonyProvider):
 def create_twilio_provider() -> TwilioProvider:
     """Factory function to create a TwilioProvider instance."""
     return TwilioProvider()
+
+
+# Shared REST client for call control (hangup, transfer, conference announcements).
+# Uses the SDK's aiohttp transport, so *_async calls reuse pooled connections
+# and never block the event loop.
+_rest_client: Optional[Client] = None
+
+
+def get_twilio_rest_client() -> Client:
+    """Get the shared async Twilio REST client (created inside the running loop)."""
+    global _rest_client
+    if _rest_client is None:
+        config = get_config()
+        _rest_client = Client(
+            config.twilio_account_sid,
+            config.twilio_auth_token,
+            http_client=AsyncTwilioHttpClient(timeout=config.twilio_rest_timeout),
+        )
+    return _rest_client
+
+
+async def close_twilio_rest_client() -> None:
+    """Close the shared client's connection pool."""
+    global _rest_client
+    if _rest_client is not None:
+        await _rest_client.http_client.close()
+        _rest_client = None
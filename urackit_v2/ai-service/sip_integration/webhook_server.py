@@ -15,8 +15,10 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import get_config, SIPConfig
-from .twilio_provider import TwilioProvider, create_twilio_provider
+from .twilio_provider import TwilioProvider, create_twilio_provider, close_twilio_rest_client
 from .session_manager import get_session_manager, init_session_manager, VoiceSession
+from .live_events import get_live_event_stream
+from .call_log_writer import get_call_log_writer
 from .media_stream import MediaStreamHandler
 from .interfaces import CallInfo
 
@@ -54,6 +56,7 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down U Rack IT Voice Server...")
     session_manager = get_session_manager()
     await session_manager.stop()
+    await close_twilio_rest_client()
     logger.info("U Rack IT Voice Server stopped")
 
 
@@ -123,97 +126,27 @@ def create_app(config: SIPConfig = None) -> FastAPI:
         return {
             "status": "healthy",
             "active_sessions": session_manager.active_session_count,
-            "max_sessions": get_config().max_concurrent_sessions
+            "max_sessions": get_config().max_concurrent_sessions,
+            "slot_hold_seconds": session_manager.get_slot_hold_stats(),
         }
 
     @app.get("/api/live-sessions")
     async def get_live_sessions():
-        """Get all active live call sessions with their details."""
-        import time
-        from datetime import datetime
-        
-        session_manager = get_session_manager()
-        sessions = session_manager.get_all_sessions()
-        
-        calls = []
-        agents_set = set()
-        total_duration = 0
-        inbound_count = 0
-        outbound_count = 0
-        
-        for session in sessions:
-            duration = int(time.time() - session.created_at)
-            total_duration += duration
-            
-            direction = session.call_info.direction or "inbound"
-            if direction == "inbound":
-                inbound_count += 1
-            else:
-                outbound_count += 1
-            
-            if session.agent_type:
-                agents_set.add(session.agent_type)
-            
-            # Build transcript entries
-            transcript = []
-            for msg in session.conversation_history:
-                transcript.append({
-                    "role": msg.get("role", "assistant"),
-                    "content": msg.get("content", ""),
-                    "timestamp": msg.get("timestamp", datetime.utcnow().isoformat())
-                })
-            
-            # Build agent history
-            agent_history = []
-            current_agent = session.agent_type or "triage_agent"
-            agent_history.append({
-                "agentName": current_agent,
-                "action": "Started conversation",
-                "timestamp": datetime.utcfromtimestamp(session.created_at).isoformat()
-            })
-            
-            # Build tool calls
-            tool_calls = []
-            for tc in session.tool_calls:
-                tool_calls.append({
-                    "name": tc.get("name", "unknown"),
-                    "success": tc.get("success", False),
-                    "timestamp": tc.get("timestamp", datetime.utcnow().isoformat()),
-                    "result": str(tc.get("result", ""))[:100]  # Truncate result
-                })
-            
-            calls.append({
-                "callSid": session.call_info.call_sid,
-                "sessionId": session.session_id,
-                "status": session.state.value if hasattr(session.state, 'value') else str(session.state),
-                "from": session.call_info.from_number,
-                "to": session.call_info.to_number,
-                "direction": direction,
-                "startedAt": datetime.utcfromtimestamp(session.created_at).isoformat(),
-                "callerName": session.caller_name,
-                "companyName": session.company_name,
-                "agentType": session.agent_type or "triage_agent",
-                "duration": duration,
-                "transcript": transcript,
-                "agentHistory": agent_history,
-                "toolCalls": tool_calls,
-                "sentiment": "neutral",  # Could be derived from conversation analysis
-                "aiResolution": session.ai_resolution
-            })
-        
-        avg_duration = total_duration // len(calls) if calls else 0
-        
-        return {
-            "calls": calls,
-            "metrics": {
-                "activeCalls": len(calls),
-                "inboundCalls": inbound_count,
-                "outboundCalls": outbound_count,
-                "avgDuration": avg_duration,
-                "activeAgents": list(agents_set)
-            }
-        }
-
+        """Get all active live call sessions with their details (tagged with the event seq)."""
+        get_session_manager()  # registers the snapshot provider
+        return get_live_event_stream().snapshot()
+    
+    @app.get("/api/live-sessions/events")
+    async def get_live_session_events(since: int = 0, epoch: str | None = None):
+        """Replay live call events after `since`, or a snapshot if they are no longer retained or `epoch` is stale."""
+        get_session_manager()
+        return get_live_event_stream().resync(since, epoch)
+    
+    @app.get("/api/call-logs/stats")
+    async def get_call_log_stats():
+        """Write-behind call log backlog and write lag."""
+        return await get_call_log_writer().get_stats()
+    
     @app.api_route("/get", methods=["GET", "HEAD"])
     async def uptime_check():
         """UptimeRobot health check endpoint."""
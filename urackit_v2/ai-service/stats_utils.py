@@ -0,0 +1,38 @@
+"""
+Latency statistics helpers.
+
+Nearest-rank percentiles over the small in-memory sample windows kept for
+metrics endpoints and benchmarks.
+"""
+
+from typing import Dict, Iterable
+
+
+def percentile(samples: Iterable[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of samples.
+
+    Args:
+        samples: Sample values (any order)
+        pct: Percentile as a fraction, e.g. 0.95
+
+    Returns:
+        The percentile value, or 0.0 when there are no samples
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def summarize(samples: Iterable[float], digits: int = 2) -> Dict[str, float]:
+    """Average, p50, p95 and max of samples, rounded to `digits`."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"avg": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    return {
+        "avg": round(sum(ordered) / len(ordered), digits),
+        "p50": round(percentile(ordered, 0.50), digits),
+        "p95": round(percentile(ordered, 0.95), digits),
+        "max": round(ordered[-1], digits),
+    }
@@ -61,7 +61,7 @@ export class CallsController {
   @Post('live/update')
   @ApiExcludeEndpoint()
   async pushLiveCallUpdate(
-    @Body() body: { calls: any[]; metrics: any },
+    @Body() body: { calls: any[]; metrics: any; epoch?: string; seq?: number },
     @Headers('x-internal-key') internalKey: string,
   ) {
     // Simple internal key check (can be enhanced)
@@ -71,10 +71,56 @@ export class CallsController {
     }
     
     // Emit to WebSocket clients
-    this.eventsGateway.emitLiveCallsUpdate(body.calls, body.metrics);
+    this.eventsGateway.emitLiveCallsUpdate(body.calls, body.metrics, body.seq, body.epoch);
     return { success: true };
   }
 
+  @Post('live/events')
+  @ApiExcludeEndpoint()
+  async pushLiveCallEvents(
+    @Body() body: { events: any[] },
+    @Headers('x-internal-key') internalKey: string,
+  ) {
+    const expectedKey = process.env.INTERNAL_API_KEY || 'internal-secret';
+    if (internalKey !== expectedKey) {
+      return { error: 'Unauthorized' };
+    }
+
+    const events = Array.isArray(body.events) ? body.events : [];
+    this.eventsGateway.emitLiveCallEvents(events);
+
+    // Keep the per-call channels used by other pages in step
+    for (const event of events) {
+      switch (event.type) {
+        case 'call_started':
+          this.eventsGateway.emitDashboardUpdate({
+            type: 'call',
+            action: 'created',
+            data: event.data,
+            timestamp: event.timestamp,
+          });
+          break;
+        case 'transcript_appended':
+          this.eventsGateway.emitAIResponse(event.sessionId, {
+            role: event.data.role,
+            content: event.data.content,
+          });
+          break;
+        case 'call_ended':
+          this.eventsGateway.emitCallEnd(event.callSid);
+          this.eventsGateway.emitDashboardUpdate({
+            type: 'call',
+            action: 'status_changed',
+            data: { callSid: event.callSid, status: 'completed' },
+            timestamp: event.timestamp,
+          });
+          break;
+      }
+    }
+
+    return { success: true, received: events.length };
+  }
+
   @Post('live/event')
   @ApiExcludeEndpoint()
   async pushCallEvent(
@@ -82,6 +82,14 @@ export class DashboardController {
     return this.dashboardService.getLiveCalls();
   }
 
+  @Get('live/events')
+  @ApiOperation({ summary: 'Replay live call events after a sequence number (or a snapshot to resync)' })
+  @ApiQuery({ name: 'since', required: true, description: 'Last applied event seq' })
+  @ApiQuery({ name: 'epoch', required: false, description: 'Stream epoch the seq belongs to' })
+  async getLiveCallEvents(@Query('since') since: string, @Query('epoch') epoch?: string) {
+    return this.dashboardService.getLiveCallEvents(Number(since) || 0, epoch);
+  }
+
   @Get('quality')
   @ApiOperation({ summary: 'Get call quality and AI performance metrics' })
   async getQualityMetrics() {
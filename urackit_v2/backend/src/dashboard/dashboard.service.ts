@@ -1007,6 +1007,29 @@ export class DashboardService {
     }
   }
 
+  async getLiveCallEvents(since: number, epoch?: string) {
+    // Events are sequence-numbered by the AI service; it answers with a
+    // snapshot instead when the requested range is no longer retained or
+    // the seq belongs to a previous epoch (service restart)
+    try {
+      const aiServiceUrl = process.env.AI_SERVICE_URL || 'http://localhost:8000';
+      const params = new URLSearchParams({ since: String(since) });
+      if (epoch) {
+        params.set('epoch', epoch);
+      }
+      const response = await fetch(`${aiServiceUrl}/api/live-sessions/events?${params}`);
+      if (response.ok) {
+        return await response.json();
+      }
+    } catch (error) {
+      // Fall through to an empty resync
+    }
+    return {
+      resync: true,
+      snapshot: { seq: 0, calls: [], metrics: { activeCalls: 0, inboundCalls: 0, outboundCalls: 0, avgDuration: 0, activeAgents: [] } },
+    };
+  }
+
   async getQualityMetrics() {
     const today = new Date();
     today.setHours(0, 0, 0, 0);
@@ -36,6 +36,16 @@ interface CallEvent {
   transcript?: string;
 }
 
+interface LiveCallEvent {
+  epoch: string;
+  seq: number;
+  type: 'call_started' | 'transcript_appended' | 'tool_called' | 'agent_changed' | 'call_ended';
+  callSid: string;
+  sessionId: string;
+  timestamp: string;
+  data: any;
+}
+
 interface TicketEvent {
   ticketId: string;
   action: 'created' | 'updated' | 'assigned' | 'escalated' | 'closed';
@@ -145,9 +155,17 @@ export class EventsGateway implements OnGatewayConnection, OnGatewayDisconnect {
   /**
    * Emit live calls update (full list refresh)
    */
-  emitLiveCallsUpdate(calls: unknown[], metrics: unknown) {
-    this.server.to('calls').emit('livecalls:update', { calls, metrics });
-    this.logger.debug(`Live calls update emitted: ${Array.isArray(calls) ? calls.length : 0} calls`);
+  emitLiveCallsUpdate(calls: unknown[], metrics: unknown, seq?: number, epoch?: string) {
+    this.server.to('calls').emit('livecalls:update', { calls, metrics, epoch, seq });
+    this.logger.debug(`Live calls update emitted: ${Array.isArray(calls) ? calls.length : 0} calls (seq ${seq ?? '-'})`);
+  }
+
+  /**
+   * Emit a batch of sequence-numbered live call events (deltas)
+   */
+  emitLiveCallEvents(events: LiveCallEvent[]) {
+    this.server.to('calls').emit('livecalls:events', { events });
+    this.logger.debug(`Live call events emitted: ${events.length}`);
   }
 
   /**
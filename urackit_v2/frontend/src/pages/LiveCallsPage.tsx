@@ -111,6 +111,82 @@ const emptyHandoffMetrics: HandoffMetrics = {
     handoffReasons: [],
 };
 
+// Sequence-numbered delta from the AI service's live call event stream
+interface LiveCallDelta {
+    epoch: string;
+    seq: number;
+    type: 'call_started' | 'transcript_appended' | 'tool_called' | 'agent_changed' | 'call_ended';
+    callSid: string;
+    sessionId: string;
+    timestamp: string;
+    data: any;
+}
+
+function toLiveCall(call: any): LiveCallEvent {
+    return {
+        callSid: call.callSid || call.call_sid,
+        sessionId: call.sessionId || call.session_id,
+        status: call.status || 'in-progress',
+        from: call.from || call.from_number,
+        to: call.to || call.to_number,
+        direction: call.direction || 'inbound',
+        startedAt: call.startedAt || call.started_at || new Date().toISOString(),
+        callerName: call.callerName || call.caller_name,
+        companyName: call.companyName || call.company_name,
+        agentType: call.agentType || call.agent_type || call.currentAgent,
+        duration: call.duration,
+        transcript: call.transcript || [],
+        agentHistory: call.agentHistory || [],
+        toolCalls: call.toolCalls || [],
+        sentiment: call.sentiment,
+        aiResolution: call.aiResolution,
+        waitTime: call.waitTime,
+        queuePosition: call.queuePosition,
+    };
+}
+
+function applyLiveCallDelta(calls: LiveCallEvent[], event: LiveCallDelta): LiveCallEvent[] {
+    if (event.type === 'call_started') {
+        const call = toLiveCall({ ...event.data, callSid: event.callSid, sessionId: event.sessionId });
+        return [...calls.filter(c => c.callSid !== event.callSid), call];
+    }
+    if (event.type === 'call_ended') {
+        return calls.filter(c => c.callSid !== event.callSid);
+    }
+    return calls.map((call): LiveCallEvent => {
+        if (call.callSid !== event.callSid) {
+            return call;
+        }
+        switch (event.type) {
+            case 'transcript_appended':
+                return { ...call, transcript: [...(call.transcript || []), event.data] };
+            case 'tool_called':
+                return {
+                    ...call,
+                    toolCalls: [...(call.toolCalls || []), {
+                        name: event.data.name,
+                        args: event.data.args || {},
+                        result: event.data.result,
+                        timestamp: event.data.timestamp,
+                        status: event.data.success ? 'success' : 'failed',
+                    }],
+                };
+            case 'agent_changed':
+                return {
+                    ...call,
+                    agentType: event.data.toAgent,
+                    agentHistory: [...(call.agentHistory || []), {
+                        agentName: event.data.toAgent,
+                        action: `Handoff from ${event.data.fromAgent}`,
+                        timestamp: event.data.timestamp,
+                    }],
+                };
+            default:
+                return call;
+        }
+    });
+}
+
 // Live indicator component
 function LiveIndicator() {
     return (
@@ -528,6 +604,11 @@ export function LiveCallsPage() {
     const [handoffMetrics, setHandoffMetrics] = useState<HandoffMetrics>(emptyHandoffMetrics);
     const [isLoading, setIsLoading] = useState(true);
     const [lastRefresh, setLastRefresh] = useState<Date>(new Date());
+    // Epoch and seq of the last live call event applied (see livecalls:events);
+    // seqs restart with every AI service process, which gets a new epoch
+    const epochRef = useRef<string | undefined>(undefined);
+    const lastSeqRef = useRef(0);
+    const resyncingRef = useRef(false);
 
     // Fetch live data from API
     const fetchLiveData = useCallback(async () => {
@@ -535,27 +616,9 @@ export function LiveCallsPage() {
             const response = await dashboardApi.getLiveCalls();
             if (response) {
                 // Map API response to our types
-                const calls: LiveCallEvent[] = (response.calls || []).map((call: any) => ({
-                    callSid: call.callSid || call.call_sid,
-                    sessionId: call.sessionId || call.session_id,
-                    status: call.status || 'in-progress',
-                    from: call.from || call.from_number,
-                    to: call.to || call.to_number,
-                    direction: call.direction || 'inbound',
-                    startedAt: call.startedAt || call.started_at || new Date().toISOString(),
-                    callerName: call.callerName || call.caller_name,
-                    companyName: call.companyName || call.company_name,
-                    agentType: call.agentType || call.agent_type || call.currentAgent,
-                    duration: call.duration,
-                    transcript: call.transcript || [],
-                    agentHistory: call.agentHistory || [],
-                    toolCalls: call.toolCalls || [],
-                    sentiment: call.sentiment,
-                    aiResolution: call.aiResolution,
-                    waitTime: call.waitTime,
-                    queuePosition: call.queuePosition,
-                }));
-                setLiveCalls(calls);
+                setLiveCalls((response.calls || []).map(toLiveCall));
+                epochRef.current = response.epoch ?? epochRef.current;
+                lastSeqRef.current = response.seq ?? lastSeqRef.current;
 
                 // Map queue metrics
                 if (response.metrics?.queue) {
@@ -626,29 +689,17 @@ export function LiveCallsPage() {
     useEffect(() => {
         // Handle full live calls update (most common)
         const handleLiveCallsUpdate = (data: unknown) => {
-            const update = data as { calls: any[]; metrics: any };
+            const update = data as { calls: any[]; metrics: any; epoch?: string; seq?: number };
+            // Snapshots older than the events already applied would roll state back;
+            // a snapshot from a new epoch replaces everything
+            const sameEpoch = update.epoch === undefined || update.epoch === epochRef.current;
+            if (sameEpoch && update.seq !== undefined && update.seq < lastSeqRef.current) {
+                return;
+            }
             if (update.calls) {
-                const calls: LiveCallEvent[] = update.calls.map((call: any) => ({
-                    callSid: call.callSid || call.call_sid,
-                    sessionId: call.sessionId || call.session_id,
-                    status: call.status || 'in-progress',
-                    from: call.from || call.from_number,
-                    to: call.to || call.to_number,
-                    direction: call.direction || 'inbound',
-                    startedAt: call.startedAt || call.started_at || new Date().toISOString(),
-                    callerName: call.callerName || call.caller_name,
-                    companyName: call.companyName || call.company_name,
-                    agentType: call.agentType || call.agent_type || call.currentAgent,
-                    duration: call.duration,
-                    transcript: call.transcript || [],
-                    agentHistory: call.agentHistory || [],
-                    toolCalls: call.toolCalls || [],
-                    sentiment: call.sentiment,
-                    aiResolution: call.aiResolution,
-                    waitTime: call.waitTime,
-                    queuePosition: call.queuePosition,
-                }));
-                setLiveCalls(calls);
+                setLiveCalls(update.calls.map(toLiveCall));
+                epochRef.current = update.epoch ?? epochRef.current;
+                lastSeqRef.current = update.seq ?? lastSeqRef.current;
                 setLastRefresh(new Date());
 
                 // Update queue metrics if provided
@@ -659,8 +710,61 @@ export function LiveCallsPage() {
                     }));
                 }
             }
-            // Debug: Log every livecalls:update event
-            console.log("[LiveCallsPage] Received livecalls:update", update);
+        };
+
+        // Apply sequence-numbered deltas; on a gap, replay or resync from the AI service
+        const applyEvents = (events: LiveCallDelta[]) => {
+            const fresh = events.filter(e => e.seq > lastSeqRef.current).sort((a, b) => a.seq - b.seq);
+            if (fresh.length === 0) {
+                return;
+            }
+            lastSeqRef.current = fresh[fresh.length - 1].seq;
+            setLiveCalls(prev => fresh.reduce(applyLiveCallDelta, prev));
+            setLastRefresh(new Date());
+        };
+
+        const resync = async () => {
+            if (resyncingRef.current) {
+                return;
+            }
+            resyncingRef.current = true;
+            try {
+                // The AI service answers with a snapshot when our epoch is stale
+                const result = await dashboardApi.getLiveCallEvents(lastSeqRef.current, epochRef.current);
+                if (result.resync && result.snapshot) {
+                    setLiveCalls(result.snapshot.calls.map(toLiveCall));
+                    epochRef.current = result.snapshot.epoch ?? result.epoch ?? epochRef.current;
+                    lastSeqRef.current = result.snapshot.seq;
+                    setLastRefresh(new Date());
+                } else if (result.events) {
+                    epochRef.current = result.epoch ?? epochRef.current;
+                    applyEvents(result.events);
+                }
+            } catch (error) {
+                console.error('Failed to resync live calls:', error);
+            } finally {
+                resyncingRef.current = false;
+            }
+        };
+
+        const handleLiveCallEvents = (data: unknown) => {
+            const { events } = data as { events: LiveCallDelta[] };
+            if (!events?.length) {
+                return;
+            }
+            if (events[0].epoch !== epochRef.current) {
+                // The AI service restarted: seqs start over and calls from the
+                // old process are gone, so take a fresh snapshot
+                lastSeqRef.current = 0;
+                resync();
+                return;
+            }
+            const first = Math.min(...events.map(e => e.seq));
+            if (lastSeqRef.current > 0 && first > lastSeqRef.current + 1) {
+                resync();
+                return;
+            }
+            applyEvents(events);
         };
 
         const handleCallUpdate = (data: unknown) => {
@@ -687,11 +791,13 @@ export function LiveCallsPage() {
         };
 
         wsService.on('livecalls:update', handleLiveCallsUpdate);
+        wsService.on('livecalls:events', handleLiveCallEvents);
         wsService.on('call:update', handleCallUpdate);
         wsService.on('call:end', handleCallEnd);
 
         return () => {
             wsService.off('livecalls:update', handleLiveCallsUpdate);
+            wsService.off('livecalls:events', handleLiveCallEvents);
             wsService.off('call:update', handleCallUpdate);
             wsService.off('call:end', handleCallEnd);
         };
@@ -155,11 +155,22 @@ export const dashboardApi = {
     return res.data;
   },
 
-  getLiveCalls: async (): Promise<{ calls: any[]; metrics: any }> => {
+  getLiveCalls: async (): Promise<{ calls: any[]; metrics: any; epoch?: string; seq?: number }> => {
     const res = await api.get('/dashboard/live');
     return res.data;
   },
 
+  getLiveCallEvents: async (since: number, epoch?: string): Promise<{
+    resync: boolean;
+    epoch?: string;
+    seq?: number;
+    events?: any[];
+    snapshot?: { calls: any[]; metrics: any; epoch?: string; seq: number };
+  }> => {
+    const res = await api.get('/dashboard/live/events', { params: { since, epoch } });
+    return res.data;
+  },
+
   getQualityMetrics: async (): Promise<any> => {
     const res = await api.get('/dashboard/quality');
     return res.data;